@@ -0,0 +1,181 @@
+"""add_workout_daily_rollups
+
+Revision ID: 7c3e91a4d2b6
+Revises: 4e260577bea0
+Create Date: 2026-10-18 10:12:31.482917
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e91a4d2b6'
+down_revision: Union[str, None] = '4e260577bea0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('workout_daily_rollups',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('workout_count', sa.Integer(), nullable=False),
+    sa.Column('distance_count', sa.Integer(), nullable=False),
+    sa.Column('distance_sum', sa.Float(), nullable=False),
+    sa.Column('distance_sq_sum', sa.Float(), nullable=False),
+    sa.Column('distance_max', sa.Float(), nullable=True),
+    sa.Column('distance_min', sa.Float(), nullable=True),
+    sa.Column('duration_count', sa.Integer(), nullable=False),
+    sa.Column('duration_sum', sa.Float(), nullable=False),
+    sa.Column('pace_count', sa.Integer(), nullable=False),
+    sa.Column('pace_sum', sa.Float(), nullable=False),
+    sa.Column('pace_sq_sum', sa.Float(), nullable=False),
+    sa.Column('intensity_count', sa.Integer(), nullable=False),
+    sa.Column('intensity_sum', sa.Float(), nullable=False),
+    sa.Column('intensity_sq_sum', sa.Float(), nullable=False),
+    sa.Column('easy_count', sa.Integer(), nullable=False),
+    sa.Column('tempo_count', sa.Integer(), nullable=False),
+    sa.Column('interval_count', sa.Integer(), nullable=False),
+    sa.Column('race_intensity_count', sa.Integer(), nullable=False),
+    sa.Column('heart_rate_count', sa.Integer(), nullable=False),
+    sa.Column('heart_rate_sum', sa.Float(), nullable=False),
+    sa.Column('heart_rate_max', sa.Float(), nullable=True),
+    sa.Column('calories_sum', sa.Float(), nullable=False),
+    sa.Column('ascent_sum', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'date', name='uq_workout_daily_rollups_user_date')
+    )
+    # 既存のワークアウトからロールアップを構築
+    _backfill_rollups(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_table('workout_daily_rollups')
+
+
+# 以下はこのリビジョン時点のロールアップ集計（app.models.training_load）の複製。
+# マイグレーションの結果が後のアプリケーションコードの変更に左右されないよう、ここに固定している。
+
+_workouts = sa.table(
+    'workouts',
+    sa.column('user_id', sa.String),
+    sa.column('date', sa.Date),
+    sa.column('actual_distance_meters', sa.Integer),
+    sa.column('target_distance_meters', sa.Integer),
+    sa.column('actual_times_seconds', sa.JSON),
+    sa.column('target_times_seconds', sa.JSON),
+    sa.column('intensity', sa.Integer),
+    sa.column('extended_data', sa.JSON),
+)
+
+_rollups = sa.table(
+    'workout_daily_rollups',
+    sa.column('id', sa.String),
+    sa.column('user_id', sa.String),
+    sa.column('date', sa.Date),
+    *(sa.column(name) for name in (
+        'workout_count',
+        'distance_count', 'distance_sum', 'distance_sq_sum', 'distance_max', 'distance_min',
+        'duration_count', 'duration_sum', 'pace_count', 'pace_sum', 'pace_sq_sum',
+        'intensity_count', 'intensity_sum', 'intensity_sq_sum',
+        'easy_count', 'tempo_count', 'interval_count', 'race_intensity_count',
+        'heart_rate_count', 'heart_rate_sum', 'heart_rate_max', 'calories_sum', 'ascent_sum',
+    ))
+)
+
+
+def _positive(value):
+    """数値に変換できない値・非正の値は None"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def _summarize_day(workouts):
+    """1日分のワークアウトをロールアップ行の値に集計"""
+    row = {
+        'workout_count': 0,
+        'distance_count': 0, 'distance_sum': 0.0, 'distance_sq_sum': 0.0, 'distance_max': None, 'distance_min': None,
+        'duration_count': 0, 'duration_sum': 0.0,
+        'pace_count': 0, 'pace_sum': 0.0, 'pace_sq_sum': 0.0,
+        'intensity_count': 0, 'intensity_sum': 0.0, 'intensity_sq_sum': 0.0,
+        'easy_count': 0, 'tempo_count': 0, 'interval_count': 0, 'race_intensity_count': 0,
+        'heart_rate_count': 0, 'heart_rate_sum': 0.0, 'heart_rate_max': None,
+        'calories_sum': 0.0, 'ascent_sum': 0.0,
+    }
+
+    for w in workouts:
+        row['workout_count'] += 1
+
+        distance = _positive(w.actual_distance_meters or w.target_distance_meters)
+        times = w.actual_times_seconds or w.target_times_seconds
+        if isinstance(times, (list, tuple)):
+            duration = _positive(sum(t for t in times if isinstance(t, (int, float))))
+        else:
+            duration = _positive(times)
+        extended = w.extended_data if isinstance(w.extended_data, dict) else {}
+
+        if distance is not None:
+            row['distance_count'] += 1
+            row['distance_sum'] += distance
+            row['distance_sq_sum'] += distance ** 2
+            row['distance_max'] = distance if row['distance_max'] is None else max(row['distance_max'], distance)
+            row['distance_min'] = distance if row['distance_min'] is None else min(row['distance_min'], distance)
+
+        if duration is not None:
+            row['duration_count'] += 1
+            row['duration_sum'] += duration
+
+        if distance and duration:
+            pace = duration / distance * 1000
+            row['pace_count'] += 1
+            row['pace_sum'] += pace
+            row['pace_sq_sum'] += pace ** 2
+
+        intensity = _positive(w.intensity)
+        if intensity is not None:
+            row['intensity_count'] += 1
+            row['intensity_sum'] += intensity
+            row['intensity_sq_sum'] += intensity ** 2
+            if intensity <= 3:
+                row['easy_count'] += 1
+            elif intensity <= 6:
+                row['tempo_count'] += 1
+            elif intensity <= 8:
+                row['interval_count'] += 1
+            else:
+                row['race_intensity_count'] += 1
+
+        heart_rate = _positive(extended.get('avg_heart_rate'))
+        if heart_rate is not None:
+            row['heart_rate_count'] += 1
+            row['heart_rate_sum'] += heart_rate
+            row['heart_rate_max'] = heart_rate if row['heart_rate_max'] is None else max(row['heart_rate_max'], heart_rate)
+
+        row['calories_sum'] += _positive(extended.get('calories')) or 0.0
+        row['ascent_sum'] += _positive(extended.get('total_ascent')) or 0.0
+
+    return row
+
+
+def _backfill_rollups(connection) -> None:
+    """既存の workouts を (user_id, date) ごとに集計して workout_daily_rollups に書き込む"""
+    days = {}
+    for w in connection.execute(sa.select(_workouts)):
+        days.setdefault((w.user_id, w.date), []).append(w)
+
+    rows = [
+        dict(_summarize_day(workouts), id=str(uuid.uuid4()), user_id=user_id, date=day)
+        for (user_id, day), workouts in days.items()
+    ]
+    if rows:
+        connection.execute(_rollups.insert(), rows)
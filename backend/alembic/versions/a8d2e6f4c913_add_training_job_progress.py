@@ -0,0 +1,34 @@
+"""add_training_job_progress
+
+Revision ID: a8d2e6f4c913
+Revises: f1a6c3d8b247
+Create Date: 2026-10-19 01:14:37.582094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2e6f4c913'
+down_revision: Union[str, None] = 'f1a6c3d8b247'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('model_training_jobs', sa.Column('spec_key', sa.String(length=64), nullable=True, comment='学習条件のキー（同じ条件の重複実行の判定用）'))
+    op.add_column('model_training_jobs', sa.Column('progress', sa.Float(), nullable=True, comment='進捗（0-100）'))
+    op.add_column('model_training_jobs', sa.Column('progress_message', sa.String(length=255), nullable=True, comment='進捗メッセージ'))
+    op.add_column('model_training_jobs', sa.Column('result_model_ids', sa.JSON(), nullable=True, comment='学習・アクティブ化したモデルIDのリスト'))
+    op.create_index(op.f('ix_model_training_jobs_spec_key'), 'model_training_jobs', ['spec_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_model_training_jobs_spec_key'), table_name='model_training_jobs')
+    op.drop_column('model_training_jobs', 'result_model_ids')
+    op.drop_column('model_training_jobs', 'progress_message')
+    op.drop_column('model_training_jobs', 'progress')
+    op.drop_column('model_training_jobs', 'spec_key')
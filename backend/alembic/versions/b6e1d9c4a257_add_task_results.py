@@ -0,0 +1,51 @@
+"""add_task_results
+
+Revision ID: b6e1d9c4a257
+Revises: a8d2e6f4c913
+Create Date: 2026-10-19 02:31:08.914263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1d9c4a257'
+down_revision: Union[str, None] = 'a8d2e6f4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_results',
+    sa.Column('id', sa.String(length=255), nullable=False, comment='CeleryタスクID'),
+    sa.Column('task_name', sa.String(length=100), nullable=False, comment='タスク名'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='状態（running / completed）'),
+    sa.Column('item_count', sa.Integer(), nullable=False, comment='保存した結果の件数'),
+    sa.Column('summary', sa.JSON(), nullable=True, comment='結果の集計'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False, comment='保持期限'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_results_expires_at'), 'task_results', ['expires_at'], unique=False)
+    op.create_table('task_result_items',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('task_id', sa.String(length=255), nullable=False, comment='CeleryタスクID'),
+    sa.Column('seq', sa.Integer(), nullable=False, comment='タスク内の連番'),
+    sa.Column('user_id', sa.String(length=36), nullable=True, comment='ユーザーID'),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=True, comment='結果（予測・分析結果、失敗時はエラー）'),
+    sa.ForeignKeyConstraint(['task_id'], ['task_results.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_result_items_task_id_seq', 'task_result_items', ['task_id', 'seq'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_result_items_task_id_seq', table_name='task_result_items')
+    op.drop_table('task_result_items')
+    op.drop_index(op.f('ix_task_results_expires_at'), table_name='task_results')
+    op.drop_table('task_results')
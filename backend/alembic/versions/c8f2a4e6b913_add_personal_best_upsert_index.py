@@ -0,0 +1,58 @@
+"""add_personal_best_upsert_index
+
+Revision ID: c8f2a4e6b913
+Revises: b6e1d9c4a257
+Create Date: 2026-10-19 04:12:36.507218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a4e6b913'
+down_revision: Union[str, None] = 'b6e1d9c4a257'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 自己ベストの登録元（既存の行は手入力として扱う）
+    op.add_column('personal_bests', sa.Column('source', sa.String(length=10), server_default='manual', nullable=False))
+    # レース結果と種目・距離・タイム・日付が一致するカスタム距離の行はレース結果から作成した自己ベスト
+    op.execute(
+        "UPDATE personal_bests SET source = 'race' "
+        "WHERE distance = 'custom' AND custom_distance_m IS NOT NULL AND EXISTS ("
+        "SELECT 1 FROM race_results "
+        "WHERE race_results.user_id = personal_bests.user_id "
+        "AND race_results.race_type = personal_bests.race_type "
+        "AND race_results.distance_meters = personal_bests.custom_distance_m "
+        "AND race_results.race_date = personal_bests.achieved_date "
+        "AND ABS(race_results.time_seconds - personal_bests.time_seconds) < 1)"
+    )
+    # 同じ種目・距離の重複したレース結果由来の自己ベストは最速の1行だけを残す
+    op.execute(
+        "DELETE FROM personal_bests WHERE id IN ("
+        "SELECT id FROM ("
+        "SELECT id, ROW_NUMBER() OVER ("
+        "PARTITION BY user_id, race_type, distance, custom_distance_m "
+        "ORDER BY time_seconds, achieved_date, id"
+        ") AS pb_rank FROM personal_bests WHERE source = 'race'"
+        ") AS ranked WHERE pb_rank > 1)"
+    )
+    op.create_index(
+        'ix_personal_bests_user_race_distance', 'personal_bests',
+        ['user_id', 'race_type', 'distance', 'custom_distance_m'],
+        unique=True,
+        postgresql_where=sa.text("source = 'race'"),
+        sqlite_where=sa.text("source = 'race'")
+    )
+    op.create_index(op.f('ix_race_results_user_id'), 'race_results', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_race_results_user_id'), table_name='race_results')
+    op.drop_index('ix_personal_bests_user_race_distance', table_name='personal_bests')
+    op.drop_column('personal_bests', 'source')
@@ -0,0 +1,289 @@
+"""add_metrics_summary_accumulators
+
+Revision ID: d9a4c2f7e815
+Revises: b5d27e8f1c39
+Create Date: 2026-10-18 21:48:07.319554
+
+"""
+import math
+import uuid
+from calendar import monthrange
+from datetime import timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4c2f7e815'
+down_revision: Union[str, None] = 'b5d27e8f1c39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # サマリーテーブルはこれまで create_all でのみ作成され、書き込まれることもなかったため作り直す
+    inspector = sa.inspect(op.get_bind())
+    for table_name in ('weekly_metrics_summary', 'monthly_metrics_summary'):
+        if inspector.has_table(table_name):
+            op.drop_table(table_name)
+
+    op.create_table('weekly_metrics_summary',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('week_start_date', sa.Date(), nullable=False),
+    sa.Column('week_end_date', sa.Date(), nullable=False),
+    sa.Column('avg_weight_kg', sa.Float(), nullable=True),
+    sa.Column('avg_sleep_duration_hours', sa.Float(), nullable=True),
+    sa.Column('avg_fatigue_level', sa.Float(), nullable=True),
+    sa.Column('avg_motivation_level', sa.Float(), nullable=True),
+    sa.Column('avg_stress_level', sa.Float(), nullable=True),
+    sa.Column('avg_energy_level', sa.Float(), nullable=True),
+    sa.Column('avg_training_readiness', sa.Float(), nullable=True),
+    sa.Column('avg_resting_heart_rate', sa.Float(), nullable=True),
+    sa.Column('weight_trend', sa.String(length=20), nullable=True),
+    sa.Column('sleep_trend', sa.String(length=20), nullable=True),
+    sa.Column('fatigue_trend', sa.String(length=20), nullable=True),
+    sa.Column('motivation_trend', sa.String(length=20), nullable=True),
+    sa.Column('data_completeness', sa.Float(), nullable=True),
+    sa.Column('days_recorded', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('weight_kg_count', sa.Integer(), nullable=False),
+    sa.Column('weight_kg_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_sq_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_x_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_xy_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_count', sa.Integer(), nullable=False),
+    sa.Column('sleep_duration_hours_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_sq_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_x_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_xy_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_count', sa.Integer(), nullable=False),
+    sa.Column('fatigue_level_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_sq_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_x_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_xy_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_count', sa.Integer(), nullable=False),
+    sa.Column('motivation_level_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_sq_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_x_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_xy_sum', sa.Float(), nullable=False),
+    sa.Column('stress_level_count', sa.Integer(), nullable=False),
+    sa.Column('stress_level_sum', sa.Float(), nullable=False),
+    sa.Column('energy_level_count', sa.Integer(), nullable=False),
+    sa.Column('energy_level_sum', sa.Float(), nullable=False),
+    sa.Column('training_readiness_count', sa.Integer(), nullable=False),
+    sa.Column('training_readiness_sum', sa.Float(), nullable=False),
+    sa.Column('resting_heart_rate_count', sa.Integer(), nullable=False),
+    sa.Column('resting_heart_rate_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'week_start_date', name='uq_weekly_metrics_summary_user_week')
+    )
+    op.create_table('monthly_metrics_summary',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('avg_weight_kg', sa.Float(), nullable=True),
+    sa.Column('avg_sleep_duration_hours', sa.Float(), nullable=True),
+    sa.Column('avg_fatigue_level', sa.Float(), nullable=True),
+    sa.Column('avg_motivation_level', sa.Float(), nullable=True),
+    sa.Column('avg_stress_level', sa.Float(), nullable=True),
+    sa.Column('avg_energy_level', sa.Float(), nullable=True),
+    sa.Column('avg_training_readiness', sa.Float(), nullable=True),
+    sa.Column('avg_resting_heart_rate', sa.Float(), nullable=True),
+    sa.Column('weight_change_kg', sa.Float(), nullable=True),
+    sa.Column('sleep_consistency_score', sa.Float(), nullable=True),
+    sa.Column('stress_peak_days', sa.Integer(), nullable=True),
+    sa.Column('low_energy_days', sa.Integer(), nullable=True),
+    sa.Column('data_completeness', sa.Float(), nullable=True),
+    sa.Column('days_recorded', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('weight_kg_count', sa.Integer(), nullable=False),
+    sa.Column('weight_kg_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_sq_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_x_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('weight_kg_xy_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_count', sa.Integer(), nullable=False),
+    sa.Column('sleep_duration_hours_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_sq_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_x_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('sleep_duration_hours_xy_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_count', sa.Integer(), nullable=False),
+    sa.Column('fatigue_level_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_sq_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_x_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('fatigue_level_xy_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_count', sa.Integer(), nullable=False),
+    sa.Column('motivation_level_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_sq_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_x_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_x_sq_sum', sa.Float(), nullable=False),
+    sa.Column('motivation_level_xy_sum', sa.Float(), nullable=False),
+    sa.Column('stress_level_count', sa.Integer(), nullable=False),
+    sa.Column('stress_level_sum', sa.Float(), nullable=False),
+    sa.Column('energy_level_count', sa.Integer(), nullable=False),
+    sa.Column('energy_level_sum', sa.Float(), nullable=False),
+    sa.Column('training_readiness_count', sa.Integer(), nullable=False),
+    sa.Column('training_readiness_sum', sa.Float(), nullable=False),
+    sa.Column('resting_heart_rate_count', sa.Integer(), nullable=False),
+    sa.Column('resting_heart_rate_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'year', 'month', name='uq_monthly_metrics_summary_user_month')
+    )
+
+    # 既存の DailyMetrics からサマリーを構築
+    if inspector.has_table('daily_metrics'):
+        _backfill_summaries(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_metrics_summary')
+    op.drop_table('weekly_metrics_summary')
+
+
+# 以下はこのリビジョン時点のサマリー集計（app.models.metrics_rollup）の複製。
+# マイグレーションの結果が後のアプリケーションコードの変更に左右されないよう、ここに固定している。
+
+_SUMMARY_METRICS = (
+    'weight_kg', 'sleep_duration_hours', 'fatigue_level', 'motivation_level',
+    'stress_level', 'energy_level', 'training_readiness', 'resting_heart_rate',
+)
+_TREND_METRICS = {
+    'weight_kg': ('weight_trend', 0.5),
+    'sleep_duration_hours': ('sleep_trend', 0.5),
+    'fatigue_level': ('fatigue_trend', 1.0),
+    'motivation_level': ('motivation_trend', 1.0),
+}
+_MIN_TREND_OBSERVATIONS = 3
+_STRESS_PEAK_LEVEL = 8
+_LOW_ENERGY_LEVEL = 3
+
+
+def _accumulator_columns(kind):
+    columns = ['days_recorded']
+    for name in _SUMMARY_METRICS:
+        columns += [f'{name}_count', f'{name}_sum']
+        if name in _TREND_METRICS:
+            columns += [f'{name}_sq_sum', f'{name}_x_sum', f'{name}_x_sq_sum', f'{name}_xy_sum']
+    if kind == 'monthly':
+        columns += ['stress_peak_days', 'low_energy_days']
+    return columns
+
+
+def _add_contributions(totals, user_id, day, values):
+    """DailyMetrics 1行分の累積値を週・月の集計に加える"""
+    for kind, bucket, x in (('weekly', day - timedelta(days=day.weekday()), day.weekday()),
+                            ('monthly', (day.year, day.month), day.day - 1)):
+        row = totals.setdefault((kind, user_id, bucket), dict.fromkeys(_accumulator_columns(kind), 0))
+        row['days_recorded'] += 1
+        for name in _SUMMARY_METRICS:
+            value = values[name]
+            if value is None:
+                continue
+            value = float(value)
+            row[f'{name}_count'] += 1
+            row[f'{name}_sum'] += value
+            if name in _TREND_METRICS:
+                row[f'{name}_sq_sum'] += value * value
+                row[f'{name}_x_sum'] += x
+                row[f'{name}_x_sq_sum'] += x * x
+                row[f'{name}_xy_sum'] += x * value
+        if kind == 'monthly':
+            stress, energy = values['stress_level'], values['energy_level']
+            row['stress_peak_days'] += int(stress is not None and stress >= _STRESS_PEAK_LEVEL)
+            row['low_energy_days'] += int(energy is not None and energy <= _LOW_ENERGY_LEVEL)
+
+
+def _slope(row, name):
+    n = row[f'{name}_count']
+    denominator = n * row[f'{name}_x_sq_sum'] - row[f'{name}_x_sum'] ** 2
+    if n < 2 or abs(denominator) < 1e-9:
+        return None
+    return (n * row[f'{name}_xy_sum'] - row[f'{name}_x_sum'] * row[f'{name}_sum']) / denominator
+
+
+def _recorded_span(row, name):
+    n = row[f'{name}_count']
+    if n < 2:
+        return 0.0
+    mean = row[f'{name}_x_sum'] / n
+    variance = max(row[f'{name}_x_sq_sum'] / n - mean ** 2, 0.0)
+    return math.sqrt(12 * variance * (n - 1) / (n + 1))
+
+
+def _summary_fields(kind, bucket, row):
+    """累積値から平均・トレンド・データ完全性などの表示用の列を計算"""
+    period_days = 7 if kind == 'weekly' else monthrange(*bucket)[1]
+    fields = {}
+
+    for name in _SUMMARY_METRICS:
+        count = row[f'{name}_count']
+        fields[f'avg_{name}'] = row[f'{name}_sum'] / count if count > 0 else None
+
+    if kind == 'weekly':
+        for name, (trend_column, threshold) in _TREND_METRICS.items():
+            slope = _slope(row, name)
+            if slope is None or row[f'{name}_count'] < _MIN_TREND_OBSERVATIONS:
+                fields[trend_column] = None
+                continue
+            change = slope * (period_days - 1)
+            fields[trend_column] = 'increasing' if change > threshold else 'decreasing' if change < -threshold else 'stable'
+
+    recorded = row['days_recorded']
+    data_points = sum(row[f'{name}_count'] for name in _SUMMARY_METRICS)
+    fields['data_completeness'] = data_points / (recorded * len(_SUMMARY_METRICS)) if recorded > 0 else 0.0
+
+    if kind == 'monthly':
+        weight_slope = _slope(row, 'weight_kg')
+        fields['weight_change_kg'] = (
+            weight_slope * min(_recorded_span(row, 'weight_kg'), period_days - 1) if weight_slope is not None else None
+        )
+        sleep_count = row['sleep_duration_hours_count']
+        if sleep_count >= 2:
+            mean = row['sleep_duration_hours_sum'] / sleep_count
+            variance = max(row['sleep_duration_hours_sq_sum'] / sleep_count - mean ** 2, 0.0)
+            fields['sleep_consistency_score'] = 1 / (1 + math.sqrt(variance))
+        else:
+            fields['sleep_consistency_score'] = None
+
+    return fields
+
+
+def _backfill_summaries(connection) -> None:
+    """既存の daily_metrics を週・月ごとに集計してサマリーテーブルに書き込む"""
+    metadata = sa.MetaData()
+    daily = sa.Table('daily_metrics', metadata, autoload_with=connection)
+    weekly = sa.Table('weekly_metrics_summary', metadata, autoload_with=connection)
+    monthly = sa.Table('monthly_metrics_summary', metadata, autoload_with=connection)
+
+    totals = {}
+    query = sa.select(daily.c.user_id, daily.c.date, *(daily.c[name] for name in _SUMMARY_METRICS))
+    for row in connection.execute(query):
+        if row.user_id and row.date:
+            _add_contributions(totals, str(row.user_id), row.date, row._mapping)
+
+    rows = {'weekly': [], 'monthly': []}
+    for (kind, user_id, bucket), accumulators in totals.items():
+        if kind == 'weekly':
+            identity = {'user_id': user_id, 'week_start_date': bucket, 'week_end_date': bucket + timedelta(days=6)}
+        else:
+            identity = {'user_id': user_id, 'year': bucket[0], 'month': bucket[1]}
+        rows[kind].append(dict(accumulators, id=str(uuid.uuid4()), **identity,
+                               **_summary_fields(kind, bucket, accumulators)))
+
+    for table, kind in ((weekly, 'weekly'), (monthly, 'monthly')):
+        if rows[kind]:
+            connection.execute(table.insert(), rows[kind])
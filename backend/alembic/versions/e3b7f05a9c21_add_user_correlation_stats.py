@@ -0,0 +1,34 @@
+"""add_user_correlation_stats
+
+Revision ID: e3b7f05a9c21
+Revises: d9a4c2f7e815
+Create Date: 2026-10-18 22:31:44.905126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7f05a9c21'
+down_revision: Union[str, None] = 'd9a4c2f7e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_correlation_stats',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('through_date', sa.Date(), nullable=False),
+    sa.Column('needs_rebuild', sa.Boolean(), nullable=False),
+    sa.Column('accumulators', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_correlation_stats')
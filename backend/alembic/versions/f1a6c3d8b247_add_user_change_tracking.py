@@ -0,0 +1,42 @@
+"""add_user_change_tracking
+
+Revision ID: f1a6c3d8b247
+Revises: e3b7f05a9c21
+Create Date: 2026-10-18 23:52:10.318460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6c3d8b247'
+down_revision: Union[str, None] = 'e3b7f05a9c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_change_tracking',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('last_data_change_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_feature_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_prediction_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_user_change_tracking_last_data_change_at'), 'user_change_tracking', ['last_data_change_at'], unique=False)
+
+    # 既存ユーザーは初回の定期実行で一度ずつ再計算する
+    op.execute(
+        "INSERT INTO user_change_tracking (user_id, last_data_change_at) "
+        "SELECT id, CURRENT_TIMESTAMP FROM users"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_change_tracking_last_data_change_at'), table_name='user_change_tracking')
+    op.drop_table('user_change_tracking')
@@ -14,15 +14,17 @@
 import logging
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Callable, Dict, List, Tuple, Any, Optional
 from pathlib import Path
-import joblib
 from datetime import datetime
 from sqlalchemy.orm import Session
 
 # 既存のAI機能をインポート
 from app.ml.ensemble_predictor import EnsemblePredictor
 from app.ml.feature_store import FeatureStore
+from app.ml.model_artifacts import save_model_artifact
+from app.ml.model_cache import warm_model_cache
+from app.ml.training_data_store import load_processed_frames
 from app.services.ml_model_manager import MLModelManager
 from app.models.ai import AIModel, PredictionResult, FeatureStore as FeatureStoreModel
 from app.core.exceptions import DatabaseError, ValidationError, NotFoundError
@@ -66,34 +68,31 @@ class RaceTimePredictor:
         """
         処理済みトレーニングデータを読み込み
         
+        prepare_ml_training_data.py が書き出す列指向ファイル（*_processed.npz）があれば
+        CSV をパースせずに読み込む。
+        
         Args:
             data_dir: データディレクトリ
             
         Returns:
             種目別のDataFrame辞書
         """
-        data_path = Path(data_dir)
-        training_data = {}
-        
-        for csv_file in data_path.glob("*_processed.csv"):
-            event_name = csv_file.stem.replace("_processed", "")
-            logger.info(f"Loading training data for {event_name}")
-            
-            try:
-                df = pd.read_csv(csv_file)
-                training_data[event_name] = df
-                logger.info(f"Loaded {len(df)} records for {event_name}")
-            except Exception as e:
-                logger.error(f"Failed to load {csv_file}: {e}")
-        
-        return training_data
+        return load_processed_frames(data_dir)
     
-    def train_models(self, training_data: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+    def train_models(
+        self,
+        training_data: Dict[str, pd.DataFrame],
+        activate: bool = True,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Dict[str, Any]]:
         """
         収集したCSVデータでモデル学習
         
         Args:
             training_data: 種目別のトレーニングデータ
+            activate: 保存したモデルをすぐにアクティブにするか（False の場合、呼び出し元が
+                学習結果の model_id をまとめてアクティブにする）
+            progress_callback: 種目ごとに (完了した種目数, 全種目数, 種目名) で呼ばれる関数
             
         Returns:
             学習結果辞書
@@ -101,8 +100,10 @@ class RaceTimePredictor:
         logger.info("Starting model training for all events")
         training_results = {}
         
-        for event_name, df in training_data.items():
+        for index, (event_name, df) in enumerate(training_data.items()):
             logger.info(f"Training model for {event_name}")
+            if progress_callback:
+                progress_callback(index, len(training_data), event_name)
             
             try:
                 # 特徴量とターゲットを分離
@@ -136,7 +137,9 @@ class RaceTimePredictor:
                 
                 # データベースにモデル情報を保存
                 if self.model_manager:
-                    self._save_model_to_db(event_name, ensemble, training_results[event_name])
+                    model_id = self._save_model_to_db(event_name, ensemble, training_results[event_name], activate)
+                    if model_id:
+                        training_results[event_name]['model_id'] = model_id
                 
                 logger.info(f"Completed training for {event_name}: MAE={ensemble.ensemble_score_:.4f}")
                 
@@ -148,7 +151,13 @@ class RaceTimePredictor:
         logger.info("Model training completed for all events")
         return training_results
     
-    def _save_model_to_db(self, event_name: str, ensemble: EnsemblePredictor, training_info: Dict[str, Any]):
+    def _save_model_to_db(
+        self,
+        event_name: str,
+        ensemble: EnsemblePredictor,
+        training_info: Dict[str, Any],
+        activate: bool = True
+    ) -> Optional[str]:
         """
         モデル情報をデータベースに保存
         
@@ -156,6 +165,10 @@ class RaceTimePredictor:
             event_name: 種目名
             ensemble: 学習済みアンサンブルモデル
             training_info: 学習情報
+            activate: アクティブな状態で保存するか
+            
+        Returns:
+            保存したモデルID、失敗時はNone
         """
         try:
             # モデルファイルのパス
@@ -171,7 +184,7 @@ class RaceTimePredictor:
                     'training_samples': training_info['training_samples'],
                     'feature_count': training_info['feature_count']
                 },
-                is_active=True,
+                is_active=activate,
                 model_path=model_path,
                 training_data_count=training_info['training_samples'],
                 feature_count=training_info['feature_count'],
@@ -186,10 +199,12 @@ class RaceTimePredictor:
             self._save_model_file(ensemble, model_path)
             
             logger.info(f"Saved model for {event_name} to database")
+            return ai_model.id
             
         except Exception as e:
             logger.error(f"Failed to save model for {event_name} to database: {e}")
             self.db.rollback()
+            return None
     
     def _save_model_file(self, ensemble: EnsemblePredictor, model_path: str):
         """
@@ -206,7 +221,7 @@ class RaceTimePredictor:
             
             # モデルを保存
             full_path = model_dir / Path(model_path).name
-            joblib.dump(ensemble, full_path)
+            save_model_artifact(ensemble, full_path, metadata={'model_name': ensemble.name})
             
             logger.info(f"Saved model file to {full_path}")
             
@@ -524,7 +539,7 @@ class RaceTimePredictor:
             event_name = model_file.stem.replace("_model", "")
             
             try:
-                ensemble = joblib.load(model_file)
+                ensemble = warm_model_cache.load_artifact(model_file)
                 self.models[event_name] = ensemble
                 loaded_count += 1
                 logger.info(f"Loaded model for {event_name}")
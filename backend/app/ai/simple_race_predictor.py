@@ -9,7 +9,6 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Any, Optional
 from pathlib import Path
-import joblib
 from datetime import datetime
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression, Ridge
@@ -18,6 +17,9 @@ from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.preprocessing import StandardScaler
 import json
 
+from app.ml.model_artifacts import save_model_artifact, load_model_artifact
+from app.ml.training_data_store import load_processed_frames
+
 logger = logging.getLogger(__name__)
 
 class SimpleRaceTimePredictor:
@@ -53,25 +55,12 @@ class SimpleRaceTimePredictor:
     
     def load_processed_data(self) -> Dict[str, pd.DataFrame]:
         """
-        処理済みデータを読み込み
+        処理済みデータを読み込み（列指向ファイルがあれば CSV をパースしない）
         
         Returns:
             種目別のDataFrame辞書
         """
-        data = {}
-        
-        for csv_file in self.data_dir.glob("*_processed.csv"):
-            event_name = csv_file.stem.replace("_processed", "")
-            logger.info(f"Loading processed data for {event_name}")
-            
-            try:
-                df = pd.read_csv(csv_file)
-                data[event_name] = df
-                logger.info(f"Loaded {len(df)} records for {event_name}")
-            except Exception as e:
-                logger.error(f"Failed to load {csv_file}: {e}")
-        
-        return data
+        return load_processed_frames(self.data_dir)
     
     def train_models(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -286,8 +275,8 @@ class SimpleRaceTimePredictor:
             model_path = output_path / f"{event_name}_model.joblib"
             scaler_path = output_path / f"{event_name}_scaler.joblib"
             
-            joblib.dump(model, model_path)
-            joblib.dump(self.scalers[event_name], scaler_path)
+            save_model_artifact(model, model_path, metadata={'event': event_name})
+            save_model_artifact(self.scalers[event_name], scaler_path, metadata={'event': event_name})
             
             logger.info(f"Saved model for {event_name}")
         
@@ -329,8 +318,8 @@ class SimpleRaceTimePredictor:
             scaler_file = model_path / f"{event_name}_scaler.joblib"
             
             if scaler_file.exists():
-                self.models[event_name] = joblib.load(model_file)
-                self.scalers[event_name] = joblib.load(scaler_file)
+                self.models[event_name] = load_model_artifact(model_file)
+                self.scalers[event_name] = load_model_artifact(scaler_file)
                 logger.info(f"Loaded model for {event_name}")
         
         logger.info(f"Loaded {len(self.models)} models")
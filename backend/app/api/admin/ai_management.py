@@ -24,11 +24,11 @@ from app.services.ml_model_manager import MLModelManager
 from app.services.feature_store import FeatureStoreService
 from app.services.prediction_service import PredictionService
 from app.core.celery_app import get_queue_status, get_task_status
-from app.tasks.ml_tasks import train_models_task
+from app.services.training_jobs import TrainingJobService
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/admin/ai", tags=["Admin AI Management"])
+router = APIRouter(tags=["Admin AI Management"])
 
 
 @router.get("/models")
@@ -138,25 +138,32 @@ async def start_model_training(
     try:
         logger.info(f"Starting model training: {algorithm}")
         
-        # バックグラウンドタスクの開始
-        task = train_models_task.delay(
-            algorithm=algorithm,
-            optimize_hyperparams=optimize_hyperparams,
-            training_data_limit=training_data_limit
+        # 学習ジョブの投入（同じ条件の学習が実行中ならそのジョブを返す）
+        job, created = TrainingJobService(db).submit(
+            "pipeline",
+            {
+                "algorithm": algorithm,
+                "optimize_hyperparams": optimize_hyperparams,
+                "training_data_limit": training_data_limit
+            },
+            algorithm=algorithm
         )
         
         # レスポンス
         response = {
-            'task_id': task.id,
+            'task_id': job.job_id,
+            'job_id': job.job_id,
             'algorithm': algorithm,
             'optimize_hyperparams': optimize_hyperparams,
             'training_data_limit': training_data_limit,
-            'status': 'started',
-            'created_at': datetime.now().isoformat(),
+            'status': job.status,
+            'progress': job.progress or 0.0,
+            'is_duplicate': not created,
+            'created_at': job.created_at.isoformat() if job.created_at else datetime.now().isoformat(),
             'estimated_completion_time_minutes': 30 if optimize_hyperparams else 15
         }
         
-        logger.info(f"Model training started: {task.id}")
+        logger.info(f"Model training job {'queued' if created else 'already running'}: {job.job_id}")
         return response
         
     except Exception as e:
@@ -3,6 +3,7 @@
 
 このモジュールには以下のエンドポイントが含まれます：
 - POST /api/ai/generate-plan: 個人化された練習プラン生成
+- POST /api/ai/generate-plan/batch: 候補レース日ごとの練習プランの一括生成
 - GET /api/ai/workout-recommendations: 今日の推奨練習を取得
 - POST /api/ai/analyze-effectiveness: 完了した練習の効果分析
 - GET /api/ai/training-insights: 練習パフォーマンスの洞察
@@ -25,14 +26,66 @@ from app.ml.coaching.effectiveness_analyzer import EffectivenessAnalyzer, Workou
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/ai", tags=["AI Coaching"])
+router = APIRouter(tags=["AI Coaching"])
+
+
+def _build_current_fitness(feature_store) -> Dict[str, Any]:
+    """特徴量から現在の体力レベルを構築"""
+    return {
+        'avg_pace': feature_store.features.get('avg_pace', 300),
+        'weekly_distance': feature_store.features.get('weekly_avg_distance', 20),
+        'training_frequency': feature_store.features.get('weekly_avg_frequency', 4),
+        'max_distance': feature_store.features.get('max_distance', 10),
+        'experience_level': 'intermediate',  # 簡易判定
+        'age': feature_store.features.get('age', 30),
+        'recovery_ability': 0.5,
+        'fatigue_tolerance': 0.5
+    }
+
+
+def _plan_to_response(training_plan: TrainingPlan) -> Dict[str, Any]:
+    """練習プランをレスポンス形式に変換"""
+    plan_response = {
+        'user_id': training_plan.user_id,
+        'target_race': training_plan.target_race,
+        'race_date': training_plan.race_date.isoformat(),
+        'weeks_remaining': training_plan.weeks_remaining,
+        'total_distance': training_plan.total_distance,
+        'peak_distance': training_plan.peak_distance,
+        'weekly_plans': []
+    }
+    
+    for weekly_plan in training_plan.weekly_plans:
+        week_data = {
+            'week_number': weekly_plan.week_number,
+            'phase': weekly_plan.phase.value,
+            'total_distance': weekly_plan.total_distance,
+            'workouts': [],
+            'recovery_days': weekly_plan.recovery_days
+        }
+        
+        for workout in weekly_plan.workouts:
+            workout_data = {
+                'type': workout.type.value,
+                'distance': workout.distance,
+                'pace': workout.pace,
+                'description': workout.description,
+                'intensity': workout.intensity,
+                'duration_minutes': workout.duration_minutes,
+                'notes': workout.notes
+            }
+            week_data['workouts'].append(workout_data)
+        
+        plan_response['weekly_plans'].append(week_data)
+    
+    return plan_response
 
 
 @router.post("/generate-plan")
 async def generate_training_plan(
     target_race: str,
     race_date: datetime,
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
@@ -41,7 +94,7 @@ async def generate_training_plan(
     Args:
         target_race: 目標レース種目
         race_date: レース日
-        current_user: 現在のユーザー
+        current_user_id: 現在のユーザーID
         db: データベースセッション
         
     Returns:
@@ -55,11 +108,11 @@ async def generate_training_plan(
                 detail="AI機能は現在無効になっています"
             )
         
-        logger.info(f"Generating training plan for user {current_user.id}")
+        logger.info(f"Generating training plan for user {current_user_id}")
         
         # ユーザーの特徴量を取得
         feature_service = FeatureStoreService(db)
-        feature_store = feature_service.get_latest_features(current_user.id)
+        feature_store = feature_service.get_latest_features(current_user_id)
         
         if not feature_store:
             raise HTTPException(
@@ -68,23 +121,14 @@ async def generate_training_plan(
             )
         
         # 現在の体力レベルを構築
-        current_fitness = {
-            'avg_pace': feature_store.features.get('avg_pace', 300),
-            'weekly_distance': feature_store.features.get('weekly_avg_distance', 20),
-            'training_frequency': feature_store.features.get('weekly_avg_frequency', 4),
-            'max_distance': feature_store.features.get('max_distance', 10),
-            'experience_level': 'intermediate',  # 簡易判定
-            'age': feature_store.features.get('age', 30),
-            'recovery_ability': 0.5,
-            'fatigue_tolerance': 0.5
-        }
+        current_fitness = _build_current_fitness(feature_store)
         
         # 練習プランナーの実行
         planner = WorkoutPlanner()
         
-        # 期分けプランの生成
+        # 期分けプランの生成（正規化した入力が同じならキャッシュから返る）
         training_plan = planner.generate_periodized_plan(
-            user_id=current_user.id,
+            user_id=current_user_id,
             current_fitness=current_fitness,
             target_race=target_race,
             race_date=race_date,
@@ -94,38 +138,7 @@ async def generate_training_plan(
         )
         
         # レスポンス形式に変換
-        plan_response = {
-            'user_id': current_user.id,
-            'target_race': target_race,
-            'race_date': race_date.isoformat(),
-            'weeks_remaining': training_plan.weeks_remaining,
-            'total_distance': training_plan.total_distance,
-            'peak_distance': training_plan.peak_distance,
-            'weekly_plans': []
-        }
-        
-        for weekly_plan in training_plan.weekly_plans:
-            week_data = {
-                'week_number': weekly_plan.week_number,
-                'phase': weekly_plan.phase.value,
-                'total_distance': weekly_plan.total_distance,
-                'workouts': [],
-                'recovery_days': weekly_plan.recovery_days
-            }
-            
-            for workout in weekly_plan.workouts:
-                workout_data = {
-                    'type': workout.type.value,
-                    'distance': workout.distance,
-                    'pace': workout.pace,
-                    'description': workout.description,
-                    'intensity': workout.intensity,
-                    'duration_minutes': workout.duration_minutes,
-                    'notes': workout.notes
-                }
-                week_data['workouts'].append(workout_data)
-            
-            plan_response['weekly_plans'].append(week_data)
+        plan_response = _plan_to_response(training_plan)
         
         logger.info(f"Training plan generated: {training_plan.weeks_remaining} weeks")
         return plan_response
@@ -140,6 +153,88 @@ async def generate_training_plan(
         )
 
 
+@router.post("/generate-plan/batch")
+async def generate_training_plans_batch(
+    target_race: str,
+    race_dates: List[datetime],
+    current_user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    候補レース日ごとの練習プランを一括生成
+    
+    Args:
+        target_race: 目標レース種目
+        race_dates: 候補のレース日
+        current_user_id: 現在のユーザーID
+        db: データベースセッション
+        
+    Returns:
+        候補レース日と同じ順の練習プラン（生成できない日は error に理由）
+    """
+    try:
+        # AI機能の有効性チェック
+        if not settings.ai_features_enabled:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="AI機能は現在無効になっています"
+            )
+        
+        if not race_dates or len(race_dates) > settings.plan_batch_max_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"候補レース日は1件以上{settings.plan_batch_max_size}件以下で指定してください"
+            )
+        
+        logger.info(f"Generating {len(race_dates)} training plans for user {current_user_id}")
+        
+        # ユーザーの特徴量を取得
+        feature_service = FeatureStoreService(db)
+        feature_store = feature_service.get_latest_features(current_user_id)
+        
+        if not feature_store:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="ユーザーの練習データが不足しています"
+            )
+        
+        current_fitness = _build_current_fitness(feature_store)
+        current_date = datetime.now()
+        
+        planner = WorkoutPlanner()
+        results = planner.generate_periodized_plans([
+            {
+                'user_id': current_user_id,
+                'current_fitness': current_fitness,
+                'target_race': target_race,
+                'race_date': race_date,
+                'current_date': current_date,
+                'current_weekly_distance': current_fitness['weekly_distance'],
+                'training_frequency': current_fitness['training_frequency']
+            }
+            for race_date in race_dates
+        ])
+        
+        plans = []
+        for result, race_date in zip(results, race_dates):
+            if result.plan is None:
+                plans.append({'race_date': race_date.isoformat(), 'plan': None, 'error': result.error})
+            else:
+                plans.append({'race_date': race_date.isoformat(), 'plan': _plan_to_response(result.plan), 'error': None})
+        
+        logger.info(f"Batch training plans generated: {sum(1 for r in results if r.plan is not None)}/{len(results)}")
+        return {'target_race': target_race, 'plans': plans}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to generate training plans: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="練習プランの生成に失敗しました"
+        )
+
+
 @router.get("/workout-recommendations")
 async def get_workout_recommendations(
     current_user: User = Depends(get_current_user),
@@ -26,6 +26,7 @@ from app.services.ml_model_manager import MLModelManager
 from app.services.feature_store import FeatureStoreService
 from app.models.user import User
 from app.ai.race_time_predictor import RaceTimePredictor
+from app.services.training_jobs import TrainingJobService, job_to_response
 
 logger = logging.getLogger(__name__)
 
@@ -238,13 +239,13 @@ def format_time(seconds):
     else:
         return f"{minutes}:{secs:02d}"
 
-router = APIRouter(prefix="/api/ai", tags=["AI Predictions"])
+router = APIRouter(tags=["AI Predictions"])
 
 
 @router.post("/predict-time", response_model=PredictionResponse)
 async def predict_time(
     request: PredictionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -252,21 +253,21 @@ async def predict_time(
     
     Args:
         request: 予測リクエスト
-        current_user: 現在のユーザー
+        current_user_id: 現在のユーザーID
         db: データベースセッション
         
     Returns:
         予測結果
     """
     try:
-        logger.info(f"予測リクエスト受信: user_id={current_user.id}, race_type={request.race_type}, distance={request.distance}")
+        logger.info(f"予測リクエスト受信: user_id={current_user_id}, race_type={request.race_type}, distance={request.distance}")
         
         # 予測サービスの初期化
         prediction_service = PredictionService(db)
         
         # 予測実行
         prediction_result = await prediction_service.execute_prediction(
-            user_id=current_user.id,
+            user_id=current_user_id,
             race_type=request.race_type,
             distance=request.distance
         )
@@ -624,23 +625,26 @@ async def predict_race_performance(
         )
 
 
-@router.post("/train-models")
+@router.post("/train-models", status_code=status.HTTP_202_ACCEPTED)
 async def train_race_models(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    レースタイム予測モデルの学習を実行
+    レースタイム予測モデルの学習ジョブを開始
+    
+    学習は ml_queue のワーカーで実行し、ジョブIDをすぐに返す。
+    進捗と結果は /api/tasks/training-jobs/{job_id} で確認できる。
     
     Args:
         current_user: 現在のユーザー
         db: データベースセッション
         
     Returns:
-        学習結果
+        学習ジョブ情報
     """
     try:
-        logger.info(f"Model training request from user {current_user.id}")
+        logger.info("Race model training requested")
         
         # AI機能の有効性チェック
         if not settings.ai_features_enabled:
@@ -649,56 +653,17 @@ async def train_race_models(
                 detail="AI機能は現在無効になっています"
             )
         
-        # レースタイム予測器を初期化
-        predictor = RaceTimePredictor(db)
-        
-        # トレーニングデータを読み込み
-        training_data = predictor.load_training_data()
-        
-        if not training_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="トレーニングデータが見つかりません"
-            )
-        
-        # モデル学習を実行
-        training_results = predictor.train_models(training_data)
-        
-        # 学習結果を集計
-        successful_models = []
-        failed_models = []
-        
-        for event_name, result in training_results.items():
-            if 'error' in result:
-                failed_models.append({
-                    'event': event_name,
-                    'error': result['error']
-                })
-            else:
-                successful_models.append({
-                    'event': event_name,
-                    'mae': result['ensemble_score'],
-                    'training_samples': result['training_samples'],
-                    'feature_count': result['feature_count']
-                })
-        
-        logger.info(f"Model training completed: {len(successful_models)} successful, {len(failed_models)} failed")
-        
-        return {
-            'training_completed': True,
-            'successful_models': successful_models,
-            'failed_models': failed_models,
-            'total_events': len(training_results),
-            'success_rate': len(successful_models) / len(training_results) if training_results else 0
-        }
+        # 学習ジョブの投入（実行中の学習があればそのジョブを返す）
+        job, created = TrainingJobService(db).submit("race_time", {}, algorithm="ensemble")
+        return job_to_response(job, created)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Model training failed: {str(e)}")
+        logger.error(f"Failed to start model training: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"モデル学習に失敗しました: {str(e)}"
+            detail=f"モデル学習の開始に失敗しました: {str(e)}"
         )
 
 
@@ -8,6 +8,7 @@ import logging
 from app.core.database import get_db
 from app.core.security import get_current_user_from_token
 from app.models.daily_metrics import DailyMetrics, WeeklyMetricsSummary, MonthlyMetricsSummary
+from app.models.metrics_rollup import week_start
 from app.schemas.daily_metrics import (
     DailyMetricsCreate,
     DailyMetricsUpdate,
@@ -18,6 +19,7 @@ from app.schemas.daily_metrics import (
     MetricsTrendResponse,
     HealthInsightsResponse
 )
+from app.services.metrics_trends import MetricsTrendService, MIN_TREND_DAYS, MAX_TREND_DAYS
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -174,6 +176,40 @@ async def create_daily_metrics(
         )
 
 
+@router.get("/trends", response_model=MetricsTrendResponse)
+async def get_metrics_trends(
+    days: int = Query(30, ge=MIN_TREND_DAYS, le=MAX_TREND_DAYS),
+    resolution: str = Query("auto", pattern="^(auto|daily|weekly|monthly)$"),
+    method: str = Query("mean", pattern="^(mean|lttb)$"),
+    current_user_id: str = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    """メトリクストレンド取得（長期間は週・月単位にダウンサンプリング）
+    
+    /{metrics_id} より先に定義しないと "trends" が記録IDとして解釈される。
+    """
+    try:
+        logger.info(f"🔍 メトリクストレンド取得開始: user_id={current_user_id}, days={days}, resolution={resolution}")
+        
+        trends = MetricsTrendService(db).get_trends(
+            current_user_id,
+            days=days,
+            resolution=resolution,
+            method=method
+        )
+        
+        logger.info(f"✅ メトリクストレンド取得成功: {len(trends['dates'])}点 ({trends['resolution']})")
+        
+        return trends
+        
+    except Exception as e:
+        logger.error(f"❌ メトリクストレンド取得エラー: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch metrics trends"
+        )
+
+
 @router.get("/{metrics_id}", response_model=DailyMetricsResponse)
 async def get_daily_metrics_by_id(
     metrics_id: str,
@@ -281,202 +317,76 @@ async def delete_daily_metrics(
         )
 
 
-@router.get("/trends", response_model=MetricsTrendResponse)
-async def get_metrics_trends(
-    days: int = Query(30, ge=7, le=365),
+@router.get("/weekly-summary/{week_start_date}", response_model=WeeklyMetricsSummaryResponse)
+async def get_weekly_summary(
+    week_start_date: date,
     current_user_id: str = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    """メトリクストレンド取得"""
+    """週間サマリー取得（DailyMetrics の書き込み時に更新される集計行を返す）"""
     try:
-        logger.info(f"🔍 メトリクストレンド取得開始: user_id={current_user_id}, days={days}")
+        logger.info(f"🔍 週間サマリー取得開始: user_id={current_user_id}, week_start_date={week_start_date}")
         
-        # 期間の計算
-        end_date = date.today()
-        start_date = end_date - timedelta(days=days-1)
+        # 週の途中の日付が指定された場合はその週（月曜日始まり）のサマリーを返す
+        week_start_date = week_start(week_start_date)
         
-        # データ取得
-        metrics = db.query(DailyMetrics).filter(
-            DailyMetrics.user_id == current_user_id,
-            DailyMetrics.date >= start_date,
-            DailyMetrics.date <= end_date
-        ).order_by(asc(DailyMetrics.date)).all()
-        
-        # レスポンス用データの構築
-        dates = []
-        weight_kg = []
-        sleep_duration_hours = []
-        fatigue_level = []
-        motivation_level = []
-        stress_level = []
-        energy_level = []
-        training_readiness = []
-        resting_heart_rate = []
-        
-        # 日付の範囲を生成
-        current_date = start_date
-        while current_date <= end_date:
-            dates.append(current_date.isoformat())
-            
-            # その日のデータを検索
-            day_metrics = next((m for m in metrics if m.date == current_date), None)
-            
-            if day_metrics:
-                weight_kg.append(day_metrics.weight_kg)
-                sleep_duration_hours.append(day_metrics.sleep_duration_hours)
-                fatigue_level.append(day_metrics.fatigue_level)
-                motivation_level.append(day_metrics.motivation_level)
-                stress_level.append(day_metrics.stress_level)
-                energy_level.append(day_metrics.energy_level)
-                training_readiness.append(day_metrics.training_readiness)
-                resting_heart_rate.append(day_metrics.resting_heart_rate)
-            else:
-                weight_kg.append(None)
-                sleep_duration_hours.append(None)
-                fatigue_level.append(None)
-                motivation_level.append(None)
-                stress_level.append(None)
-                energy_level.append(None)
-                training_readiness.append(None)
-                resting_heart_rate.append(None)
-            
-            current_date += timedelta(days=1)
-        
-        logger.info(f"✅ メトリクストレンド取得成功: {len(dates)}日分")
+        summary = db.query(WeeklyMetricsSummary).filter(
+            WeeklyMetricsSummary.user_id == current_user_id,
+            WeeklyMetricsSummary.week_start_date == week_start_date
+        ).first()
         
-        return {
-            "dates": dates,
-            "weight_kg": weight_kg,
-            "sleep_duration_hours": sleep_duration_hours,
-            "fatigue_level": fatigue_level,
-            "motivation_level": motivation_level,
-            "stress_level": stress_level,
-            "energy_level": energy_level,
-            "training_readiness": training_readiness,
-            "resting_heart_rate": resting_heart_rate
-        }
+        if not summary:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No data found for this week"
+            )
         
+        logger.info(f"✅ 週間サマリー取得成功: {summary.days_recorded}日分")
+        
+        return summary
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"❌ メトリクストレンド取得エラー: {e}")
+        logger.error(f"❌ 週間サマリー取得エラー: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch metrics trends"
+            detail="Failed to fetch weekly summary"
         )
 
 
-@router.get("/weekly-summary/{week_start_date}", response_model=WeeklyMetricsSummaryResponse)
-async def get_weekly_summary(
-    week_start_date: date,
+@router.get("/monthly-summary/{year}/{month}", response_model=MonthlyMetricsSummaryResponse)
+async def get_monthly_summary(
+    year: int = Path(..., ge=1900, le=2100),
+    month: int = Path(..., ge=1, le=12),
     current_user_id: str = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    """週間サマリー取得"""
+    """月間サマリー取得（DailyMetrics の書き込み時に更新される集計行を返す）"""
     try:
-        logger.info(f"🔍 週間サマリー取得開始: user_id={current_user_id}, week_start_date={week_start_date}")
-        
-        # 週の終了日を計算（日曜日）
-        week_end_date = week_start_date + timedelta(days=6)
+        logger.info(f"🔍 月間サマリー取得開始: user_id={current_user_id}, year={year}, month={month}")
         
-        # 週間データを取得
-        weekly_metrics = db.query(DailyMetrics).filter(
-            DailyMetrics.user_id == current_user_id,
-            DailyMetrics.date >= week_start_date,
-            DailyMetrics.date <= week_end_date
-        ).all()
+        summary = db.query(MonthlyMetricsSummary).filter(
+            MonthlyMetricsSummary.user_id == current_user_id,
+            MonthlyMetricsSummary.year == year,
+            MonthlyMetricsSummary.month == month
+        ).first()
         
-        if not weekly_metrics:
+        if not summary:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="No data found for this week"
+                detail="No data found for this month"
             )
         
-        # 週間平均値を計算
-        avg_weight_kg = None
-        avg_sleep_duration_hours = None
-        avg_fatigue_level = None
-        avg_motivation_level = None
-        avg_stress_level = None
-        avg_energy_level = None
-        avg_training_readiness = None
-        avg_resting_heart_rate = None
-        
-        # 各メトリクスの平均値を計算
-        weights = [m.weight_kg for m in weekly_metrics if m.weight_kg is not None]
-        if weights:
-            avg_weight_kg = sum(weights) / len(weights)
-        
-        sleep_hours = [m.sleep_duration_hours for m in weekly_metrics if m.sleep_duration_hours is not None]
-        if sleep_hours:
-            avg_sleep_duration_hours = sum(sleep_hours) / len(sleep_hours)
-        
-        fatigue_levels = [m.fatigue_level for m in weekly_metrics if m.fatigue_level is not None]
-        if fatigue_levels:
-            avg_fatigue_level = sum(fatigue_levels) / len(fatigue_levels)
-        
-        motivation_levels = [m.motivation_level for m in weekly_metrics if m.motivation_level is not None]
-        if motivation_levels:
-            avg_motivation_level = sum(motivation_levels) / len(motivation_levels)
-        
-        stress_levels = [m.stress_level for m in weekly_metrics if m.stress_level is not None]
-        if stress_levels:
-            avg_stress_level = sum(stress_levels) / len(stress_levels)
-        
-        energy_levels = [m.energy_level for m in weekly_metrics if m.energy_level is not None]
-        if energy_levels:
-            avg_energy_level = sum(energy_levels) / len(energy_levels)
-        
-        training_readiness_levels = [m.training_readiness for m in weekly_metrics if m.training_readiness is not None]
-        if training_readiness_levels:
-            avg_training_readiness = sum(training_readiness_levels) / len(training_readiness_levels)
-        
-        resting_heart_rates = [m.resting_heart_rate for m in weekly_metrics if m.resting_heart_rate is not None]
-        if resting_heart_rates:
-            avg_resting_heart_rate = sum(resting_heart_rates) / len(resting_heart_rates)
-        
-        # データ完全性を計算
-        total_possible_data_points = len(weekly_metrics) * 8  # 8つの主要メトリクス
-        actual_data_points = sum([
-            len(weights),
-            len(sleep_hours),
-            len(fatigue_levels),
-            len(motivation_levels),
-            len(stress_levels),
-            len(energy_levels),
-            len(training_readiness_levels),
-            len(resting_heart_rates)
-        ])
-        data_completeness = actual_data_points / total_possible_data_points if total_possible_data_points > 0 else 0
-        
-        logger.info(f"✅ 週間サマリー取得成功: {len(weekly_metrics)}日分")
+        logger.info(f"✅ 月間サマリー取得成功: {summary.days_recorded}日分")
         
-        return {
-            "id": f"weekly_{week_start_date}_{current_user_id}",
-            "user_id": current_user_id,
-            "week_start_date": week_start_date,
-            "week_end_date": week_end_date,
-            "avg_weight_kg": avg_weight_kg,
-            "avg_sleep_duration_hours": avg_sleep_duration_hours,
-            "avg_fatigue_level": avg_fatigue_level,
-            "avg_motivation_level": avg_motivation_level,
-            "avg_stress_level": avg_stress_level,
-            "avg_energy_level": avg_energy_level,
-            "avg_training_readiness": avg_training_readiness,
-            "avg_resting_heart_rate": avg_resting_heart_rate,
-            "weight_trend": None,  # 実装予定
-            "sleep_trend": None,  # 実装予定
-            "fatigue_trend": None,  # 実装予定
-            "motivation_trend": None,  # 実装予定
-            "data_completeness": data_completeness,
-            "days_recorded": len(weekly_metrics),
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
-        }
+        return summary
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ 週間サマリー取得エラー: {e}")
+        logger.error(f"❌ 月間サマリー取得エラー: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch weekly summary"
+            detail="Failed to fetch monthly summary"
         )
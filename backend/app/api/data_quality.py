@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
+from sqlalchemy.orm import Session
 
-from ..core.auth import get_current_user_id_from_token
+from ..core.auth import get_current_user
+from ..core.database import get_db
+from ..core.exceptions import RunMasterException, ValidationError
 from ..services.data_quality_service import DataQualityService, DataQualityReport, DataQualityIssue
+from ..services.duplicate_detection import DuplicateDetectionService
 from ..schemas.data_quality import (
     DataQualityReportResponse,
     DataQualityIssueResponse,
@@ -21,7 +25,7 @@ data_quality_service = DataQualityService()
 
 @router.get("/quality/report", response_model=DataQualityReportResponse)
 async def get_data_quality_report(
-    user_id: str = Depends(get_current_user_id_from_token)
+    user_id: str = Depends(get_current_user)
 ):
     """データ品質レポート取得"""
     try:
@@ -63,7 +67,7 @@ async def get_data_quality_report(
 
 @router.get("/quality/stats", response_model=DataQualityStatsResponse)
 async def get_data_quality_stats(
-    user_id: str = Depends(get_current_user_id_from_token)
+    user_id: str = Depends(get_current_user)
 ):
     """データ品質統計取得"""
     try:
@@ -96,7 +100,7 @@ async def get_data_quality_stats(
 @router.post("/quality/validate", response_model=DataQualityReportResponse)
 async def validate_workout_data(
     workout_data: Dict[str, Any],
-    user_id: str = Depends(get_current_user_id_from_token)
+    user_id: str = Depends(get_current_user)
 ):
     """練習記録データの品質検証"""
     try:
@@ -128,46 +132,34 @@ async def validate_workout_data(
 @router.post("/duplicates/detect", response_model=DuplicateDetectionResponse)
 async def detect_duplicates(
     request: DuplicateDetectionRequest,
-    user_id: str = Depends(get_current_user_id_from_token)
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """重複記録の検出"""
     try:
-        # 実際の実装では、データベースからユーザーの記録を取得して重複検出
-        # ここではサンプルデータを使用
-        sample_duplicates = [
-            {
-                "id": "1",
-                "date": "2024-12-26",
-                "distance_km": 5.0,
-                "time_minutes": 25.0,
-                "pace_per_km": 5.0,
-                "workout_name": "朝練",
-                "similarity_score": 0.95
-            },
-            {
-                "id": "2",
-                "date": "2024-12-26",
-                "distance_km": 5.0,
-                "time_minutes": 25.0,
-                "pace_per_km": 5.0,
-                "workout_name": "朝練",
-                "similarity_score": 0.95
-            }
-        ]
+        start_date = end_date = None
+        if request.date_range:
+            try:
+                start_date, end_date = (date.fromisoformat(d) for d in request.date_range)
+            except ValueError:
+                raise ValidationError("期間の日付形式が不正です（YYYY-MM-DD）", field="date_range")
+
+        scan = DuplicateDetectionService(db).detect(
+            user_id,
+            start_date=start_date,
+            end_date=end_date,
+            similarity_threshold=request.similarity_threshold,
+            include_potential=request.include_potential
+        )
         
         return DuplicateDetectionResponse(
-            duplicate_groups=[
-                {
-                    "id": "group_1",
-                    "records": sample_duplicates,
-                    "similarity_type": "exact",
-                    "suggested_action": "delete_duplicates"
-                }
-            ],
-            total_duplicates=2,
-            total_groups=1,
+            duplicate_groups=[group.to_dict() for group in scan.groups + scan.potential_links],
+            total_duplicates=scan.total_duplicates,
+            total_groups=len(scan.groups),
             scan_completed_at=datetime.now().isoformat()
         )
+    except RunMasterException:
+        raise
     except Exception as e:
         logger.error(f"重複検出エラー: {e}")
         raise HTTPException(status_code=500, detail="重複検出に失敗しました")
@@ -175,13 +167,17 @@ async def detect_duplicates(
 @router.post("/duplicates/merge")
 async def merge_duplicates(
     group_id: str,
-    user_id: str = Depends(get_current_user_id_from_token)
+    similarity_threshold: float = Query(0.8, gt=0.0, le=1.0),
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
-    """重複記録の統合"""
+    """重複記録の統合（検出時と同じ similarity_threshold を指定。重複の可能性がある組は統合不可）"""
     try:
-        # 実際の実装では、データベースで重複記録を統合
+        result = DuplicateDetectionService(db).merge_group(user_id, group_id, similarity_threshold)
         logger.info(f"重複グループ {group_id} を統合しました")
-        return {"message": "重複記録を統合しました", "group_id": group_id}
+        return {"message": "重複記録を統合しました", "group_id": group_id, **result}
+    except RunMasterException:
+        raise
     except Exception as e:
         logger.error(f"重複統合エラー: {e}")
         raise HTTPException(status_code=500, detail="重複統合に失敗しました")
@@ -189,20 +185,23 @@ async def merge_duplicates(
 @router.delete("/duplicates/delete")
 async def delete_duplicates(
     record_ids: List[str],
-    user_id: str = Depends(get_current_user_id_from_token)
+    user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """重複記録の削除"""
     try:
-        # 実際の実装では、データベースから重複記録を削除
-        logger.info(f"重複記録 {record_ids} を削除しました")
-        return {"message": "重複記録を削除しました", "deleted_count": len(record_ids)}
+        deleted_count = DuplicateDetectionService(db).delete_records(user_id, record_ids)
+        logger.info(f"重複記録 {deleted_count} 件を削除しました")
+        return {"message": "重複記録を削除しました", "deleted_count": deleted_count}
+    except RunMasterException:
+        raise
     except Exception as e:
         logger.error(f"重複削除エラー: {e}")
         raise HTTPException(status_code=500, detail="重複削除に失敗しました")
 
 @router.get("/quality/tips")
 async def get_data_quality_tips(
-    user_id: str = Depends(get_current_user_id_from_token)
+    user_id: str = Depends(get_current_user)
 ):
     """データ品質向上のヒント取得"""
     try:
@@ -214,7 +213,7 @@ async def get_data_quality_tips(
 
 @router.get("/quality/weekly-report", response_model=DataQualityReportResponse)
 async def get_weekly_quality_report(
-    user_id: str = Depends(get_current_user_id_from_token)
+    user_id: str = Depends(get_current_user)
 ):
     """週次データ品質レポート取得"""
     try:
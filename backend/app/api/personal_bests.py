@@ -5,7 +5,7 @@ from datetime import date
 from app.core.database import get_db
 from app.core.security import get_current_user_from_token
 from app.models.user import User
-from app.models.personal_best import PersonalBest
+from app.models.personal_best import PersonalBest, SOURCE_MANUAL
 from app.schemas.personal_best import (
     PersonalBestCreate, 
     PersonalBestResponse, 
@@ -13,6 +13,7 @@ from app.schemas.personal_best import (
     PersonalBestWithPace
 )
 from app.core.exceptions import NotFoundError, ValidationError
+from app.services.personal_best_service import get_personal_best_stats
 
 router = APIRouter(prefix="/personal-bests", tags=["personal-bests"])
 
@@ -88,6 +89,8 @@ async def create_personal_best(
             existing_pb.time_seconds = personal_best_data.time_seconds
             existing_pb.achieved_date = personal_best_data.achieved_date
             existing_pb.race_name = personal_best_data.race_name
+            # 手入力で更新した記録はレース結果からの再計算で上書きしない
+            existing_pb.source = SOURCE_MANUAL
             db.commit()
             db.refresh(existing_pb)
             return existing_pb
@@ -105,7 +108,8 @@ async def create_personal_best(
         custom_distance_m=personal_best_data.custom_distance_m,
         time_seconds=personal_best_data.time_seconds,
         achieved_date=personal_best_data.achieved_date,
-        race_name=personal_best_data.race_name
+        race_name=personal_best_data.race_name,
+        source=SOURCE_MANUAL
     )
     
     db.add(personal_best)
@@ -137,6 +141,9 @@ async def update_personal_best(
     for field, value in update_data.items():
         setattr(personal_best, field, value)
     
+    # 手入力で編集した記録はレース結果からの再計算で上書きしない
+    personal_best.source = SOURCE_MANUAL
+    
     db.commit()
     db.refresh(personal_best)
     
@@ -170,43 +177,7 @@ async def get_personal_best_summary(
     db: Session = Depends(get_db)
 ):
     """自己ベスト統計サマリーを取得"""
-    personal_bests = db.query(PersonalBest).filter(
-        PersonalBest.user_id == current_user_id
-    ).all()
-    
-    if not personal_bests:
+    summary = get_personal_best_stats(db, current_user_id)
+    if summary is None:
         return {"message": "自己ベスト記録がありません"}
-    
-    # 種目別統計
-    race_type_stats = {}
-    for pb in personal_bests:
-        if pb.race_type not in race_type_stats:
-            race_type_stats[pb.race_type] = {
-                "count": 0,
-                "best_time": float('inf'),
-                "best_distance": None,
-                "recent_date": None
-            }
-        
-        race_type_stats[pb.race_type]["count"] += 1
-        
-        if pb.time_seconds < race_type_stats[pb.race_type]["best_time"]:
-            race_type_stats[pb.race_type]["best_time"] = pb.time_seconds
-            race_type_stats[pb.race_type]["best_distance"] = pb.distance
-            race_type_stats[pb.race_type]["recent_date"] = pb.achieved_date
-    
-    # 総統計
-    total_count = len(personal_bests)
-    latest_achievement = max(personal_bests, key=lambda x: x.achieved_date)
-    
-    return {
-        "total_count": total_count,
-        "race_type_stats": race_type_stats,
-        "latest_achievement": {
-            "race_type": latest_achievement.race_type,
-            "distance": latest_achievement.distance,
-            "time_seconds": latest_achievement.time_seconds,
-            "achieved_date": latest_achievement.achieved_date,
-            "race_name": latest_achievement.race_name
-        }
-    }
+    return summary
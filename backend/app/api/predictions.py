@@ -11,6 +11,7 @@ from app.schemas.prediction import PredictionCreate, PredictionResponse, Predict
 from app.services.prediction_engine import PredictionEngine
 from app.services.ai_prediction_engine import AIPredictionEngine
 from app.services.model_training_service import ModelTrainingService
+from app.services.training_jobs import TrainingJobService, job_to_response
 
 router = APIRouter()
 
@@ -78,19 +79,17 @@ async def calculate_prediction(
         )
 
 
-@router.post("/train-model")
+@router.post("/train-model", status_code=status.HTTP_202_ACCEPTED)
 async def train_model(
     target_event: str,
     current_user = Depends(get_current_user_from_token),
     db: Session = Depends(get_db)
 ):
-    """機械学習モデルの学習"""
+    """機械学習モデルの学習ジョブを開始（学習はワーカーで実行し、ジョブIDをすぐに返す）"""
     try:
         # 管理者権限チェック（簡易実装）
         # 実際の実装では適切な権限管理を行う
         
-        training_service = ModelTrainingService(db)
-        
         # TargetEventEnumに変換
         try:
             event_enum = TargetEventEnum(target_event)
@@ -100,17 +99,16 @@ async def train_model(
                 detail=f"Invalid target event: {target_event}"
             )
         
-        # モデル学習実行
-        result = training_service.train_models_for_event(event_enum)
-        
-        return result
+        # 学習ジョブの投入（同じ種目の学習が実行中ならそのジョブを返す）
+        job, created = TrainingJobService(db).submit("event", {"target_event": event_enum.value})
+        return job_to_response(job, created)
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to train model: {str(e)}"
+            detail=f"Failed to start model training: {str(e)}"
         )
 
 
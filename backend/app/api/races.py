@@ -11,7 +11,7 @@ from app.models.race import RaceResult, RaceType
 from app.models.prediction import Prediction
 from app.schemas.race import RaceResultCreate, RaceResultUpdate, RaceResultResponse, RaceResultListResponse
 from app.schemas.common import PaginatedResponse
-from app.services.personal_best_service import update_personal_best_from_race_result
+from app.services.personal_best_service import recompute_user_personal_bests
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -203,9 +203,8 @@ async def create_race_result(
 
         # 自己ベストの自動更新
         try:
-            updated_pb = update_personal_best_from_race_result(db, current_user_id, db_race)
-            if updated_pb:
-                logger.info(f"🏆 自己ベスト自動更新完了: {updated_pb.id}")
+            counts = recompute_user_personal_bests(db, current_user_id)
+            logger.info(f"🏆 自己ベスト自動更新完了: {counts}")
         except Exception as pb_error:
             logger.warning(f"⚠️ 自己ベスト更新でエラー: {pb_error}")
             # 自己ベスト更新のエラーはレース結果作成を阻害しない
@@ -251,7 +250,7 @@ async def update_race_result(
         race = (
             db.query(RaceResult)
             .filter(
-                RaceResult.id == race_uuid,
+                RaceResult.id == str(race_uuid),
                 RaceResult.user_id == current_user_id
             )
             .first()
@@ -273,9 +272,8 @@ async def update_race_result(
 
         # 自己ベストの自動更新
         try:
-            updated_pb = update_personal_best_from_race_result(db, current_user_id, race)
-            if updated_pb:
-                logger.info(f"🏆 自己ベスト自動更新完了: {updated_pb.id}")
+            counts = recompute_user_personal_bests(db, current_user_id)
+            logger.info(f"🏆 自己ベスト自動更新完了: {counts}")
         except Exception as pb_error:
             logger.warning(f"⚠️ 自己ベスト更新でエラー: {pb_error}")
             # 自己ベスト更新のエラーはレース結果更新を阻害しない
@@ -320,7 +318,7 @@ async def delete_race_result(
         race = (
             db.query(RaceResult)
             .filter(
-                RaceResult.id == race_uuid,
+                RaceResult.id == str(race_uuid),
                 RaceResult.user_id == current_user_id
             )
             .first()
@@ -335,6 +333,13 @@ async def delete_race_result(
         db.delete(race)
         db.commit()
 
+        # 削除したレースが自己ベストだった場合は次に速いレースに置き換える
+        try:
+            counts = recompute_user_personal_bests(db, current_user_id)
+            logger.info(f"🏆 自己ベスト自動更新完了: {counts}")
+        except Exception as pb_error:
+            logger.warning(f"⚠️ 自己ベスト更新でエラー: {pb_error}")
+
         logger.info(f"✅ レース結果削除成功: {race_id}")
         return {"message": "Race result deleted successfully"}
 
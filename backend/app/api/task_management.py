@@ -3,14 +3,14 @@
 
 このモジュールには以下のエンドポイントが含まれます：
 - GET /api/tasks/status/{task_id}: タスク状態取得
-- GET /api/tasks/results/{task_id}: タスク結果取得
+- GET /api/tasks/results/{task_id}: タスク結果取得（保存済みの結果はページング）
 - POST /api/tasks/cancel/{task_id}: タスクキャンセル
 - GET /api/tasks/queue-status: キュー状態取得
 - POST /api/tasks/train-model: モデル学習タスク開始
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 
@@ -20,11 +20,12 @@ from app.core.config import settings
 from app.core.celery_app import celery_app, get_task_status, cancel_task, get_queue_status
 from app.schemas.ai_prediction import ModelTrainingRequest, ModelTrainingResponse
 from app.models.user import User
-from app.tasks.ml_tasks import train_models_task
+from app.services.training_jobs import TrainingJobService
+from app.services.task_results import get_task_result, read_result_page
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/tasks", tags=["Task Management"])
+router = APIRouter(tags=["Task Management"])
 
 
 @router.get("/status/{task_id}")
@@ -66,14 +67,23 @@ async def get_task_status_endpoint(
 @router.get("/results/{task_id}")
 async def get_task_results(
     task_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    cursor: int = -1,
+    limit: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     タスクの結果を取得
     
+    ユーザーごとの結果をデータベースに保存するタスク（バッチ予測・パフォーマンス分析）は、
+    集計と結果の1ページ分を返す。次のページは next_cursor を cursor に指定して取得する。
+    
     Args:
         task_id: タスクID
         current_user: 現在のユーザー
+        db: データベースセッション
+        cursor: 前のページの next_cursor（最初のページは -1）
+        limit: 1ページの件数
         
     Returns:
         タスク結果
@@ -81,6 +91,17 @@ async def get_task_results(
     try:
         logger.info(f"Getting results for task {task_id}")
         
+        # 保存済みの結果は結果バックエンドを参照せずに返す（結果バックエンドの期限切れ後も取得できる）
+        stored = get_task_result(db, task_id)
+        if stored is not None and stored.status == "completed":
+            return {
+                "task_id": task_id,
+                "status": "completed",
+                "result": stored.summary,
+                "item_count": stored.item_count,
+                **read_result_page(db, task_id, cursor=cursor, limit=limit)
+            }
+        
         status_info = get_task_status(task_id)
         
         if status_info["status"] == "SUCCESS":
@@ -222,11 +243,15 @@ async def start_model_training(
         
         logger.info(f"Starting model training task: {request.algorithm}")
         
-        # バックグラウンドタスクの開始
-        task = train_models_task.delay(
-            algorithm=request.algorithm,
-            optimize_hyperparams=request.optimize_hyperparams,
-            training_data_limit=request.training_data_limit
+        # 学習ジョブの投入（同じ条件の学習が実行中ならそのジョブを返す）
+        job, created = TrainingJobService(db).submit(
+            "pipeline",
+            {
+                "algorithm": request.algorithm,
+                "optimize_hyperparams": request.optimize_hyperparams,
+                "training_data_limit": request.training_data_limit
+            },
+            algorithm=request.algorithm
         )
         
         # 推定完了時間の計算（簡易版）
@@ -235,14 +260,16 @@ async def start_model_training(
             estimated_time += 180  # ハイパーパラメータ最適化で3分追加
         
         response = ModelTrainingResponse(
-            job_id=task.id,
-            status="started",
-            algorithm=request.algorithm,
-            created_at=task.date_done or task.date_done,
-            estimated_completion_time=estimated_time
+            job_id=job.job_id,
+            status=job.status,
+            algorithm=job.algorithm,
+            created_at=job.created_at,
+            estimated_completion_time=estimated_time,
+            progress=job.progress or 0.0,
+            is_duplicate=not created
         )
         
-        logger.info(f"Model training task started: {task.id}")
+        logger.info(f"Model training job {'queued' if created else 'already running'}: {job.job_id}")
         return response
         
     except HTTPException:
@@ -293,7 +320,10 @@ async def get_training_jobs(
                 "created_at": job.created_at,
                 "started_at": job.started_at,
                 "completed_at": job.completed_at,
+                "progress": job.progress,
+                "progress_message": job.progress_message,
                 "result_model_id": job.result_model_id,
+                "result_model_ids": job.result_model_ids,
                 "error_message": job.error_message,
                 "performance_metrics": job.performance_metrics
             }
@@ -358,7 +388,10 @@ async def get_training_job_details(
             "created_at": job.created_at,
             "started_at": job.started_at,
             "completed_at": job.completed_at,
+            "progress": job.progress,
+            "progress_message": job.progress_message,
             "result_model_id": job.result_model_id,
+            "result_model_ids": job.result_model_ids,
             "error_message": job.error_message,
             "performance_metrics": job.performance_metrics,
             "celery_status": task_status["status"],
@@ -564,7 +564,7 @@ async def import_csv_confirm(
             raise CSVImportError.validation_error("workout_type_id", workout_type_id, "UUID形式が不正です")
 
         workout_type = db.query(WorkoutType).filter(
-            WorkoutType.id == workout_type_uuid
+            WorkoutType.id == str(workout_type_uuid)
         ).first()
         if not workout_type:
             raise HTTPException(
@@ -608,9 +608,9 @@ async def import_csv_confirm(
                 workout = Workout(
                     user_id=current_user_id,
                     date=import_date,
-                    workout_type_id=workout_type_uuid,
-                    distance_meters=data.get('distance_meters'),
-                    times_seconds=data.get('times_seconds'),
+                    workout_type_id=str(workout_type_uuid),
+                    actual_distance_meters=data.get('distance_meters'),
+                    actual_times_seconds=data.get('times_seconds'),
                     repetitions=data.get('repetitions', 1),
                     intensity=intensity,
                     notes=data.get('notes', ''),
@@ -5,11 +5,14 @@ Celeryアプリケーションの設定
 - Redis をブローカーとして設定
 - タスクの設定とルーティング
 - エラーハンドリング
+- Celery beat の定期実行スケジュール
+- ワーカープロセス起動時のモデルのプリロード
 """
 
 import logging
 from celery import Celery
-from celery.signals import task_prerun, task_postrun, task_failure
+from celery.schedules import crontab
+from celery.signals import task_prerun, task_postrun, task_failure, worker_process_init
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -21,7 +24,6 @@ celery_app = Celery(
     backend=settings.redis_url,
     include=[
         "app.tasks.ml_tasks",
-        "app.tasks.prediction_tasks",
         "app.tasks.feature_tasks",
         "app.tasks.analysis_tasks"
     ]
@@ -57,7 +59,6 @@ celery_app.conf.update(
     # ルーティング設定
     task_routes={
         "app.tasks.ml_tasks.*": {"queue": "ml_queue"},
-        "app.tasks.prediction_tasks.*": {"queue": "prediction_queue"},
         "app.tasks.feature_tasks.*": {"queue": "feature_queue"},
         "app.tasks.analysis_tasks.*": {"queue": "analysis_queue"},
     },
@@ -90,10 +91,41 @@ celery_app.conf.update(
             "exchange_type": "direct",
             "routing_key": "analysis",
         },
+    },
+
+    # 定期実行の設定（celery beat）
+    beat_schedule={
+        "refresh-dirty-users": {
+            "task": "refresh_dirty_users_task",
+            "schedule": crontab(hour=settings.dirty_refresh_hour, minute=0),
+        },
+        "fail-stale-training-jobs": {
+            "task": "fail_stale_training_jobs_task",
+            "schedule": crontab(minute="*/15"),
+        },
     }
 )
 
 
+@worker_process_init.connect
+def worker_process_init_handler(**kwargs):
+    """ワーカープロセス起動時のハンドラー（アクティブなモデルと全種目のモデルをプリロード）"""
+    if not settings.model_preload_enabled:
+        return
+
+    from app.core.database import SessionLocal
+    from app.ml.model_cache import warm_model_cache
+
+    db = SessionLocal()
+    try:
+        warm_model_cache.preload(db)
+    except Exception as e:
+        # プリロードに失敗してもタスクは初回の取得時に読み込めるため、ワーカーは起動させる
+        logger.error(f"Failed to preload models: {str(e)}")
+    finally:
+        db.close()
+
+
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **kwds):
     """タスク実行前のハンドラー"""
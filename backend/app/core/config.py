@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Optional, List, Dict
 import os
 
 
@@ -52,8 +52,33 @@ class Settings(BaseSettings):
     # AI機能設定
     ai_features_enabled: bool = True
     ml_models_path: str = "backend/ml_models"
+    ml_models_mmap: bool = True  # モデル読み込み時にmmap_mode='r'を使用（ワーカー間でページキャッシュを共有）
+    model_preload_enabled: bool = True  # Celery ワーカープロセスの起動時にモデルをプリロード
+    model_cache_check_seconds: int = 30  # プロセス内のモデルキャッシュとアクティブなモデルを照合する間隔（秒）
     feature_store_retention_days: int = 90
+    feature_chunk_size: int = 200  # 特徴量計算タスクの1チャンクのユーザー数
+    retention_batch_size: int = 5000  # 保持期間クリーンアップの1回の DELETE の最大件数
+    retention_time_budget_seconds: float = 300.0  # 保持期間クリーンアップ1回の処理時間の上限（秒）
+    task_result_retention_hours: int = 72  # バッチ予測などのユーザーごとの結果を保持する時間
+    task_result_write_batch_size: int = 500  # タスク結果を書き込む1回の INSERT の件数
+    task_result_page_size: int = 100  # タスク結果の1ページの件数
+    task_result_max_page_size: int = 1000  # タスク結果の1ページの最大件数
+    training_lock_ttl: int = 2 * 60 * 60  # 同じ条件の学習の重複実行を防ぐロックの有効期間（秒）
+    training_job_timeout: int = 2 * 60 * 60  # 開始（未開始なら作成）からこの秒数を過ぎても終わらない学習ジョブは失敗にする
+    dirty_refresh_hour: int = 3  # データが変わったユーザーの特徴量・予測を再計算する時刻（Asia/Tokyo）
+    dirty_refresh_limit: int = 50000  # 1回の定期再計算で対象にする最大ユーザー数
+    prediction_refresh_races: Dict[str, float] = {  # 定期再計算で予測するレース種目と距離（km）
+        "5k": 5.0,
+        "10k": 10.0,
+        "half_marathon": 21.0975,
+        "marathon": 42.195
+    }
     prediction_cache_ttl: int = 3600
+    health_analysis_cache_ttl: int = 3600  # 健康分析結果のキャッシュ有効期間（秒）
+    health_analysis_cache_size: int = 4096
+    plan_cache_ttl: int = 3600  # 期分けプランのキャッシュ有効期間（秒）
+    plan_cache_size: int = 1024
+    plan_batch_max_size: int = 52  # 一括生成できる候補レース日の最大数
     rate_limit_window: int = 60  # seconds
     
     # Redis設定（キャッシュ用）
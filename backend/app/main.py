@@ -15,7 +15,7 @@ from app.core.database import engine, Base, get_db
 from app.core.logging_config import setup_logging
 from app.core.middleware import rate_limit_middleware, SecurityHeadersMiddleware
 from app.core.response import add_request_id_middleware, standardize_response_middleware, log_api_call
-from app.api import auth, workouts, workout_types, predictions, races, race_types, dashboard, user_profile, personal_bests, race_schedules, daily_metrics, custom_workouts, interval_analysis, races_runmaster
+from app.api import auth, workouts, workout_types, predictions, races, race_types, dashboard, user_profile, personal_bests, race_schedules, daily_metrics, custom_workouts, interval_analysis, races_runmaster, data_quality
 from app.api.admin import ai_management
 from app.core.exceptions import RunMasterException, ValidationError, DatabaseError
 
@@ -154,6 +154,7 @@ app.include_router(personal_bests.router, prefix="/api", tags=["personal-bests"]
 app.include_router(race_schedules.router, prefix="/api", tags=["race-schedules"])
 app.include_router(daily_metrics.router, prefix="/api/daily-metrics", tags=["daily-metrics"])
 app.include_router(custom_workouts.router, prefix="/api/custom-workouts", tags=["custom-workouts"])
+app.include_router(data_quality.router, prefix="/api/data-quality", tags=["data-quality"])
 
 # AI機能を有効化（バグ修正のため）
 from app.api import ai_stats, ai_predictions, ai_coaching, ai_health, task_management
@@ -7,6 +7,7 @@
 - 適応予測
 - 練習負荷最適化
 - 個人化要素の考慮
+- フィットネス・疲労モデルによる候補計画の一括予測
 """
 
 import logging
@@ -16,6 +17,21 @@ import numpy as np
 from dataclasses import dataclass
 from enum import Enum
 
+from app.ml.health.workload_engine import (
+    ACWR_SWEET_SPOT_MAX,
+    DailyLoadSeries,
+    WorkloadEngine,
+    daily_load_series_from_arrays,
+    intensity_weighted_load,
+)
+from app.ml.coaching.fitness_fatigue import (
+    FitnessFatigueModel,
+    FitnessFatigueSeries,
+    plan_stress_matrix,
+    training_stress_scores,
+    workout_arrays,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -79,6 +95,9 @@ class EffectivenessAnalyzer:
             'advanced': 0.95      # 95%の回復率
         }
         
+        self.workload_engine = WorkloadEngine()
+        self.fitness_fatigue_model = FitnessFatigueModel()
+        
         logger.info("EffectivenessAnalyzer initialized")
     
     def analyze_workout_effect(
@@ -170,17 +189,10 @@ class EffectivenessAnalyzer:
             duration = workout_data.get('duration_minutes', 0)
             intensity = workout_data.get('intensity', 0.5)
             
-            # ストレススコアの計算（簡易版）
-            base_stress = distance * intensity
-            
-            # ペースによる調整
-            pace_factor = self._calculate_pace_factor(pace, user_profile)
-            
-            # 継続時間による調整
-            duration_factor = min(duration / 60, 2.0)  # 最大2時間
-            
-            # 総合ストレススコア
-            stress_score = base_stress * pace_factor * duration_factor
+            # ストレススコア（距離×強度×ペース係数×継続時間係数）
+            stress_score = float(training_stress_scores(
+                distance, intensity, pace, duration, user_profile.get('avg_pace', 300)
+            ))
             
             # ボリュームファクター
             volume_factor = distance / user_profile.get('weekly_distance', 20)
@@ -228,26 +240,26 @@ class EffectivenessAnalyzer:
             
             predictions = []
             
+            # 計画された練習ごとの適応タイプと効果は1回だけ計算し、タイプごとに集計する
+            total_effects = {adaptation_type: 0.0 for adaptation_type in AdaptationType}
+            workout_counts = {adaptation_type: 0 for adaptation_type in AdaptationType}
+            for workout in planned_workouts:
+                adaptation_type = self._determine_adaptation_type(
+                    workout.get('type', 'easy'), workout.get('pace', 300), workout.get('distance', 0)
+                )
+                total_effects[adaptation_type] += self._calculate_effect_magnitude(workout, user_profile, [])
+                workout_counts[adaptation_type] += 1
+            
+            user_multiplier = self._get_user_adaptation_multiplier(user_profile)
+            
             # 各適応タイプについて予測
             for adaptation_type in AdaptationType:
                 current_level = current_fitness.get(f'{adaptation_type.value}_level', 0.5)
-                
-                # 計画された練習から該当する適応タイプの効果を計算
-                total_effect = 0
-                adaptation_workouts = 0
-                
-                for workout in planned_workouts:
-                    workout_effect = self.analyze_workout_effect(
-                        workout, user_profile, []
-                    )
-                    
-                    if workout_effect.adaptation_type == adaptation_type:
-                        total_effect += workout_effect.effect_magnitude
-                        adaptation_workouts += 1
+                total_effect = total_effects[adaptation_type]
+                adaptation_workouts = workout_counts[adaptation_type]
                 
                 # 適応率の計算
                 adaptation_rate = self.adaptation_rates[adaptation_type]
-                user_multiplier = self._get_user_adaptation_multiplier(user_profile)
                 
                 # 予測レベルの計算
                 weeks = time_horizon_days / 7
@@ -277,6 +289,151 @@ class EffectivenessAnalyzer:
             logger.error(f"Failed to predict adaptation: {str(e)}")
             raise RuntimeError(f"適応予測に失敗しました: {str(e)}")
     
+    def calculate_stress_series(
+        self,
+        workouts: List[Dict[str, Any]],
+        user_profile: Dict[str, Any],
+        end_date: Optional[datetime] = None
+    ) -> DailyLoadSeries:
+        """
+        練習履歴を日次ストレス系列に変換
+        
+        Args:
+            workouts: 'date' を持つ練習データ
+            user_profile: ユーザープロフィール
+            end_date: 系列の最終日（デフォルト: 今日と最終練習日の遅い方）
+            
+        Returns:
+            日次ストレス系列（同じ日の練習は合算）
+        """
+        try:
+            stress = training_stress_scores(
+                avg_pace=user_profile.get('avg_pace', 300), **workout_arrays(workouts)
+            )
+            return daily_load_series_from_arrays((w.get('date') for w in workouts), stress, end_date)
+            
+        except Exception as e:
+            logger.error(f"Failed to calculate stress series: {str(e)}")
+            raise RuntimeError(f"日次ストレスの計算に失敗しました: {str(e)}")
+    
+    def calculate_fitness_fatigue(
+        self,
+        workouts: List[Dict[str, Any]],
+        user_profile: Dict[str, Any],
+        end_date: Optional[datetime] = None
+    ) -> FitnessFatigueSeries:
+        """
+        練習履歴からフィットネス（CTL）・疲労（ATL）・フォーム（TSB）を計算
+        
+        Args:
+            workouts: 'date' を持つ練習データ
+            user_profile: ユーザープロフィール
+            end_date: 系列の最終日（デフォルト: 今日と最終練習日の遅い方）
+            
+        Returns:
+            日次のフィットネス・疲労系列
+        """
+        series = self.calculate_stress_series(workouts, user_profile, end_date)
+        return self.fitness_fatigue_model.compute(series.loads, series.start_date)
+    
+    def project_training_plans(
+        self,
+        workout_history: List[Dict[str, Any]],
+        candidate_plans: List[List[Dict[str, Any]]],
+        user_profile: Dict[str, Any],
+        time_horizon_days: int = 30,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        候補となる練習計画のパフォーマンスを一括で予測
+        
+        履歴のフィットネス・疲労を1回だけ計算し、その最終日の状態から
+        全計画の日次ストレス（計画数, 日数）を同時に畳み込む。
+        
+        Args:
+            workout_history: 'date' を持つ過去の練習データ
+            candidate_plans: 計画ごとの練習データ（'date' / 'day' がなければ1日1練習として並べる）
+            user_profile: ユーザープロフィール
+            time_horizon_days: 予測期間（日）
+            end_date: 履歴の最終日（デフォルト: 今日と最終練習日の遅い方）。計画は翌日から始まる
+            
+        Returns:
+            計画ごとの予測（予測期間末のパフォーマンスが高い順、'plan_index' は入力の位置）
+        """
+        try:
+            if time_horizon_days < 1:
+                raise ValueError("予測期間は1日以上で指定してください")
+            
+            logger.info(f"Projecting {len(candidate_plans)} training plans over {time_horizon_days} days")
+            
+            history = self.calculate_fitness_fatigue(workout_history, user_profile, end_date)
+            # 履歴がない場合の系列は end_date から始まる長さ0の系列
+            plan_start = history.start_date + timedelta(days=max(history.days, 1))
+            stress = plan_stress_matrix(
+                candidate_plans, time_horizon_days, plan_start, user_profile.get('avg_pace', 300)
+            )
+            projection = self.fitness_fatigue_model.project_plans(history, stress)
+            
+            order = np.argsort(-projection.final_performance, kind='stable')
+            return [
+                {
+                    'plan_index': int(i),
+                    'total_stress': float(stress[i].sum()),
+                    'final_fitness': float(projection.final_fitness[i]),
+                    'final_fatigue': float(projection.final_fatigue[i]),
+                    'final_form': float(projection.final_form[i]),
+                    'final_performance': float(projection.final_performance[i]),
+                    'performance_change': float(projection.performance_change[i]),
+                    'peak_performance': float(projection.peak_performance[i]),
+                    'peak_date': (plan_start + timedelta(days=int(projection.peak_day[i]))).isoformat(),
+                    'min_form': float(projection.min_form[i])
+                }
+                for i in order
+            ]
+            
+        except Exception as e:
+            logger.error(f"Failed to project training plans: {str(e)}")
+            raise RuntimeError(f"練習計画の予測に失敗しました: {str(e)}")
+    
+    def summarize_training_load(
+        self,
+        recent_workouts: List[Dict[str, Any]],
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        現在の練習負荷の集計
+        
+        Args:
+            recent_workouts: 最近の練習データ（'date' を持つ）
+            end_date: 集計の最終日（デフォルト: 今日）
+            
+        Returns:
+            optimize_training_load の current_load として使える負荷指標
+        """
+        try:
+            distance = self.workload_engine.compute_for_workouts(recent_workouts, end_date=end_date)
+            weighted = self.workload_engine.compute_for_workouts(
+                recent_workouts, intensity_weighted_load, end_date=end_date
+            )
+            
+            weekly_distance = distance.window_load(7)
+            latest = distance.latest()
+            
+            return {
+                'weekly_distance': weekly_distance,
+                'training_frequency': distance.window_count(7),
+                'avg_intensity': weighted.window_load(7) / weekly_distance if weekly_distance > 0 else 0.0,
+                'acute_load': latest['acute_load'],
+                'chronic_load': latest['chronic_load'],
+                'acwr': latest['acwr'],
+                'monotony': latest['monotony'],
+                'strain': latest['strain']
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to summarize training load: {str(e)}")
+            raise RuntimeError(f"練習負荷の集計に失敗しました: {str(e)}")
+    
     def optimize_training_load(
         self,
         current_load: Dict[str, Any],
@@ -310,7 +467,9 @@ class EffectivenessAnalyzer:
             min_recovery_days = constraints.get('min_recovery_days', 1)
             
             # 最適化計算（簡易版）
-            optimized_volume = min(current_volume * 1.1, max_volume)
+            # 急性:慢性負荷比が適正範囲を超えている場合は距離を増やさない
+            volume_growth = 1.0 if current_load.get('acwr', 0) > ACWR_SWEET_SPOT_MAX else 1.1
+            optimized_volume = min(current_volume * volume_growth, max_volume)
             optimized_frequency = min(current_frequency + 1, max_frequency)
             
             # 強度の調整
@@ -459,14 +618,6 @@ class EffectivenessAnalyzer:
         
         return age_factor * experience_factor
     
-    def _calculate_pace_factor(self, pace: float, user_profile: Dict[str, Any]) -> float:
-        """ペースファクターの計算"""
-        avg_pace = user_profile.get('avg_pace', 300)
-        
-        # ペースが速いほどストレスが高い
-        pace_ratio = avg_pace / pace
-        return min(2.0, max(0.5, pace_ratio))
-    
     def _generate_load_recommendations(
         self,
         volume: float,
@@ -0,0 +1,292 @@
+"""
+Banister のフィットネス・疲労（インパルス応答）モデル
+
+このモジュールには以下の機能が含まれます：
+- 練習データの配列からの練習ストレスのベクトル計算
+- 日次ストレス系列からのフィットネス（CTL）・疲労（ATL）・フォーム（TSB）の計算
+- 候補となる練習計画（計画数, 日数）の一括パフォーマンス予測
+
+フィットネスと疲労は日次ストレスの指数減衰の畳み込みで、workload_engine の ewma
+（scipy.signal.lfilter）により日数に比例する1回のベクトル演算で計算します。
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from app.ml.health.workload_engine import ewma
+
+logger = logging.getLogger(__name__)
+
+# 時定数（日）: フィットネスは42日、疲労は7日で 1/e に減衰
+FITNESS_TIME_CONSTANT_DAYS = 42
+FATIGUE_TIME_CONSTANT_DAYS = 7
+
+# パフォーマンス = フィットネス × k1 - 疲労 × k2
+FITNESS_GAIN = 1.0
+FATIGUE_GAIN = 2.0
+
+
+def decay_alpha(time_constant_days: float) -> float:
+    """時定数 τ の指数減衰に対応する平滑化係数 1 - exp(-1/τ)"""
+    return 1.0 - float(np.exp(-1.0 / time_constant_days))
+
+
+def training_stress_scores(
+    distance: np.ndarray,
+    intensity: np.ndarray,
+    pace: np.ndarray,
+    duration_minutes: np.ndarray,
+    avg_pace: float = 300
+) -> np.ndarray:
+    """
+    練習ストレススコアをまとめて計算
+
+    EffectivenessAnalyzer.calculate_training_stress と同じ定義
+    （距離 × 強度 × ペース係数 × 継続時間係数）。
+
+    Args:
+        distance: 距離（km）
+        intensity: 強度（0-1）
+        pace: ペース（秒/km）
+        duration_minutes: 継続時間（分）
+        avg_pace: ユーザーの平均ペース（秒/km）
+
+    Returns:
+        練習ごとのストレススコア
+    """
+    distance = np.asarray(distance, dtype=np.float64)
+    intensity = np.asarray(intensity, dtype=np.float64)
+    pace = np.asarray(pace, dtype=np.float64)
+    duration_minutes = np.asarray(duration_minutes, dtype=np.float64)
+
+    # ペースが速いほどストレスが高い
+    pace_factor = np.clip(avg_pace / pace, 0.5, 2.0)
+    duration_factor = np.minimum(duration_minutes / 60, 2.0)  # 最大2時間
+    return distance * intensity * pace_factor * duration_factor
+
+
+def workout_arrays(workouts: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    練習データのリストを列ごとの配列に変換
+
+    継続時間がない練習は距離とペースから推定する。
+
+    Args:
+        workouts: 練習データ（distance / intensity / pace / duration_minutes）
+
+    Returns:
+        'distance' / 'intensity' / 'pace' / 'duration_minutes' の配列
+    """
+    columns = np.array([
+        (
+            w.get('distance', 0) or 0,
+            w.get('intensity') or 0.5,
+            w.get('pace', 300) or 300,
+            np.nan if w.get('duration_minutes') is None else w['duration_minutes']
+        )
+        for w in workouts
+    ], dtype=np.float64).reshape(-1, 4)
+    distance, intensity, pace, duration = columns.T
+    duration = np.where(np.isnan(duration), distance * pace / 60, duration)
+    return {'distance': distance, 'intensity': intensity, 'pace': pace, 'duration_minutes': duration}
+
+
+@dataclass
+class FitnessFatigueSeries:
+    """日次のフィットネス・疲労・フォーム（各配列の最後の軸が日付）"""
+    start_date: date
+    stress: np.ndarray
+    fitness: np.ndarray  # CTL
+    fatigue: np.ndarray  # ATL
+    form: np.ndarray  # TSB（前日のフィットネス - 前日の疲労）
+    performance: np.ndarray
+
+    @property
+    def days(self) -> int:
+        return self.stress.shape[-1]
+
+    def latest(self) -> Dict[str, float]:
+        """最終日の指標（1次元系列用）"""
+        if self.days == 0:
+            return {'fitness': 0.0, 'fatigue': 0.0, 'form': 0.0, 'performance': 0.0}
+        return {
+            'fitness': float(self.fitness[-1]),
+            'fatigue': float(self.fatigue[-1]),
+            'form': float(self.form[-1]),
+            'performance': float(self.performance[-1])
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON 用の表現（1次元系列用）"""
+        return {
+            'dates': [(self.start_date + timedelta(days=offset)).isoformat() for offset in range(self.days)],
+            'stress': self.stress.tolist(),
+            'fitness': self.fitness.tolist(),
+            'fatigue': self.fatigue.tolist(),
+            'form': self.form.tolist(),
+            'performance': self.performance.tolist()
+        }
+
+
+@dataclass
+class PlanProjection:
+    """候補計画ごとの予測（各配列の長さは計画数）"""
+    final_fitness: np.ndarray
+    final_fatigue: np.ndarray
+    final_form: np.ndarray
+    final_performance: np.ndarray
+    performance_change: np.ndarray  # 計画開始前日からの変化
+    peak_performance: np.ndarray
+    peak_day: np.ndarray  # 計画開始日からの日数
+    min_form: np.ndarray  # 期間中の最も低いフォーム（オーバーリーチングの目安）
+
+
+class FitnessFatigueModel:
+    """フィットネス・疲労モデル"""
+
+    def __init__(
+        self,
+        fitness_days: float = FITNESS_TIME_CONSTANT_DAYS,
+        fatigue_days: float = FATIGUE_TIME_CONSTANT_DAYS,
+        fitness_gain: float = FITNESS_GAIN,
+        fatigue_gain: float = FATIGUE_GAIN
+    ):
+        """
+        初期化
+
+        Args:
+            fitness_days: フィットネスの時定数（日）
+            fatigue_days: 疲労の時定数（日）
+            fitness_gain: パフォーマンスに対するフィットネスの係数
+            fatigue_gain: パフォーマンスに対する疲労の係数
+        """
+        self.fitness_days = fitness_days
+        self.fatigue_days = fatigue_days
+        self.fitness_gain = fitness_gain
+        self.fatigue_gain = fatigue_gain
+
+    def compute(
+        self,
+        stress: np.ndarray,
+        start_date: Optional[date] = None,
+        initial_fitness: float = 0.0,
+        initial_fatigue: float = 0.0
+    ) -> FitnessFatigueSeries:
+        """
+        日次ストレスからフィットネス・疲労・フォームを計算
+
+        Args:
+            stress: 日次ストレス（最後の軸が日付。(計画数, 日数) も可）
+            start_date: stress[..., 0] の日付
+            initial_fitness: 系列開始前日のフィットネス
+            initial_fatigue: 系列開始前日の疲労
+
+        Returns:
+            日次のフィットネス・疲労系列
+        """
+        stress = np.asarray(stress, dtype=np.float64)
+        start_date = start_date or date.today() - timedelta(days=stress.shape[-1] - 1)
+
+        fitness = ewma(stress, decay_alpha(self.fitness_days), initial_fitness)
+        fatigue = ewma(stress, decay_alpha(self.fatigue_days), initial_fatigue)
+
+        # その日の練習前の状態として前日の値を使う
+        balance = fitness - fatigue
+        form = np.empty_like(balance)
+        form[..., :1] = initial_fitness - initial_fatigue
+        form[..., 1:] = balance[..., :-1]
+
+        return FitnessFatigueSeries(
+            start_date=start_date,
+            stress=stress,
+            fitness=fitness,
+            fatigue=fatigue,
+            form=form,
+            performance=self.fitness_gain * fitness - self.fatigue_gain * fatigue
+        )
+
+    def project_plans(self, history: FitnessFatigueSeries, plan_stress: np.ndarray) -> PlanProjection:
+        """
+        履歴の最終日の状態から候補計画を一括で予測
+
+        Args:
+            history: 過去の日次系列（1次元）
+            plan_stress: 計画ごとの日次ストレス（計画数, 日数）。1日目は履歴の翌日で、日数は1以上
+
+        Returns:
+            計画ごとの予測
+        """
+        plan_stress = np.atleast_2d(np.asarray(plan_stress, dtype=np.float64))
+        current = history.latest()
+        start_date = history.start_date + timedelta(days=max(history.days, 1))
+
+        projected = self.compute(plan_stress, start_date, current['fitness'], current['fatigue'])
+        current_performance = self.fitness_gain * current['fitness'] - self.fatigue_gain * current['fatigue']
+
+        return PlanProjection(
+            final_fitness=projected.fitness[:, -1],
+            final_fatigue=projected.fatigue[:, -1],
+            final_form=projected.fitness[:, -1] - projected.fatigue[:, -1],
+            final_performance=projected.performance[:, -1],
+            performance_change=projected.performance[:, -1] - current_performance,
+            peak_performance=projected.performance.max(axis=-1),
+            peak_day=projected.performance.argmax(axis=-1),
+            min_form=projected.form.min(axis=-1)
+        )
+
+
+def plan_stress_matrix(
+    plans: Sequence[Sequence[Dict[str, Any]]],
+    horizon_days: int,
+    start_date: date,
+    avg_pace: float = 300
+) -> np.ndarray:
+    """
+    候補計画のリストを日次ストレスの行列に変換
+
+    すべての計画の練習を1つの配列にまとめてストレスを計算し、(計画, 日) ごとに合算する。
+    練習の日は 'date'（start_date からの日数）、'day'（0始まり）、どちらもなければ計画内の順番とし、
+    期間外の練習は無視する。
+
+    Args:
+        plans: 計画ごとの練習データのリスト
+        horizon_days: 予測期間（日）
+        start_date: 計画の1日目
+        avg_pace: ユーザーの平均ペース（秒/km）
+
+    Returns:
+        (計画数, horizon_days) の日次ストレス
+    """
+    workouts = [workout for plan in plans for workout in plan]
+    plan_index = np.repeat(np.arange(len(plans)), [len(plan) for plan in plans])
+    offsets = np.fromiter(
+        (_plan_day_offset(workout, position, start_date) for plan in plans for position, workout in enumerate(plan)),
+        dtype=np.int64, count=len(workouts)
+    )
+
+    matrix = np.zeros((len(plans), horizon_days))
+    if not workouts:
+        return matrix
+
+    arrays = workout_arrays(workouts)
+    stress = training_stress_scores(avg_pace=avg_pace, **arrays)
+    in_range = (offsets >= 0) & (offsets < horizon_days)
+    cells = plan_index[in_range] * horizon_days + offsets[in_range]
+    matrix.ravel()[:] = np.bincount(cells, weights=stress[in_range], minlength=matrix.size)
+    return matrix
+
+
+def _plan_day_offset(workout: Dict[str, Any], position: int, start_date: date) -> int:
+    """計画内の練習の日（計画の1日目からの日数）"""
+    workout_date = workout.get('date')
+    if workout_date is None:
+        return workout.get('day', position)
+    if isinstance(workout_date, str):
+        workout_date = date.fromisoformat(workout_date[:10])
+    elif isinstance(workout_date, datetime):
+        workout_date = workout_date.date()
+    return (workout_date - start_date).days
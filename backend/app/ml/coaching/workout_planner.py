@@ -7,17 +7,36 @@
 - 弱点分析
 - 練習提案
 - 科学的根拠に基づく計画立案
+- 正規化した入力をキーとする期分けプランのLRU+TTLキャッシュ
+- 期分けごとのテンプレートを共有する複数プランの一括生成
 """
 
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from dataclasses import dataclass
 from enum import Enum
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# キャッシュキー用の正規化の幅（平均ペースは5秒/km、週間距離は1km単位に丸める）
+PACE_BUCKET_SECONDS = 5
+DISTANCE_BUCKET_KM = 1.0
+
+# 期分けに応じた練習配分（イージー, テンポ, インターバル, ロングの順の1回あたり距離の割合）
+WORKOUT_DISTRIBUTIONS = {
+    'base': (0.4, 0.3, 0.2, 0.1),
+    'build': (0.3, 0.4, 0.2, 0.1),
+    'peak': (0.2, 0.3, 0.4, 0.1),
+    'recovery': (0.6, 0.2, 0.1, 0.1),
+}
+
 
 class TrainingPhase(Enum):
     """練習期分け"""
@@ -36,9 +55,9 @@ class WorkoutType(Enum):
     RECOVERY = "recovery"   # 回復
 
 
-@dataclass
+@dataclass(frozen=True)
 class Workout:
-    """練習メニュー"""
+    """練習メニュー（変更不可のため、キャッシュしたプラン間で共有する）"""
     type: WorkoutType
     distance: float
     pace: float
@@ -71,6 +90,124 @@ class TrainingPlan:
     peak_distance: float
 
 
+@dataclass(frozen=True)
+class WorkoutTemplate:
+    """期分け・頻度・ペースごとに共通の練習メニューのひな形（距離は週ごとに決まる）"""
+    type: WorkoutType
+    distance_share: float  # 1回あたり距離に対する割合
+    pace: float
+    description: str
+    intensity: float
+    notes: str
+
+    def instantiate(self, distance_per_workout: float) -> Workout:
+        """1回あたり距離から練習メニューを作成"""
+        distance = distance_per_workout * self.distance_share
+        return Workout(
+            type=self.type,
+            distance=distance,
+            pace=self.pace,
+            description=self.description,
+            intensity=self.intensity,
+            duration_minutes=int(distance * self.pace / 60),
+            notes=self.notes
+        )
+
+
+@dataclass
+class PlanBatchResult:
+    """一括生成の1件分の結果（失敗した場合は plan が None で error に理由）"""
+    index: int
+    plan: Optional[TrainingPlan]
+    error: Optional[str] = None
+
+
+PlanCacheKey = Tuple[Optional[str], float, str, int, float, int]
+PlanBody = Tuple[List[WeeklyPlan], float, float]
+
+
+class PeriodizedPlanCache:
+    """期分けプラン（週ごとのプラン・総距離・ピーク距離）のLRUキャッシュ"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 3600):
+        """
+        初期化
+
+        Args:
+            max_entries: 保持する最大エントリ数
+            ttl_seconds: エントリの有効期間（秒）
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[PlanCacheKey, Tuple[float, PlanBody]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: PlanCacheKey) -> Optional[PlanBody]:
+        """有効なエントリのコピーを返す（なければ None）"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy_plan_body(entry[1])
+
+    def put(self, key: PlanCacheKey, body: PlanBody):
+        """エントリを保存し、最大数を超えた分を古い順に削除"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, _copy_plan_body(body))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """キャッシュの統計情報"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+def _copy_plan_body(body: PlanBody) -> PlanBody:
+    """キャッシュ内のプランを呼び出し側の変更から切り離すためのコピー（Workout は変更不可のため共有）"""
+    weekly_plans, total_distance, peak_distance = body
+    return [
+        WeeklyPlan(
+            week_number=plan.week_number,
+            phase=plan.phase,
+            total_distance=plan.total_distance,
+            workouts=list(plan.workouts),
+            recovery_days=list(plan.recovery_days)
+        )
+        for plan in weekly_plans
+    ], total_distance, peak_distance
+
+
+# プロセス共有のキャッシュインスタンス（API はリクエストごとに WorkoutPlanner を作るため）
+periodized_plan_cache = PeriodizedPlanCache(
+    max_entries=settings.plan_cache_size,
+    ttl_seconds=settings.plan_cache_ttl
+)
+
+
 class WorkoutPlanner:
     """練習プラン生成エンジン"""
     
@@ -113,36 +250,14 @@ class WorkoutPlanner:
         try:
             logger.info(f"Generating weekly plan for user {user_id}")
             
-            # 現在の期分けを決定
-            phase = self._determine_training_phase(race_date, current_date)
-            
-            # 週間距離の調整
-            adjusted_distance = self._adjust_weekly_distance(
-                weekly_distance, phase, current_fitness
-            )
-            
-            # 練習頻度の調整
-            adjusted_frequency = self._adjust_training_frequency(
-                training_frequency, adjusted_distance
+            weekly_plan = self._build_weekly_plan(
+                self._calculate_weeks_remaining(race_date, current_date),
+                current_fitness, target_race, weekly_distance, training_frequency
             )
             
-            # 練習メニューの生成
-            workouts = self._generate_workouts(
-                phase, adjusted_distance, adjusted_frequency, current_fitness, target_race
+            logger.info(
+                f"Weekly plan generated: {len(weekly_plan.workouts)} workouts, {weekly_plan.total_distance:.1f}km"
             )
-            
-            # 回復日の設定
-            recovery_days = self._determine_recovery_days(adjusted_frequency)
-            
-            weekly_plan = WeeklyPlan(
-                week_number=self._get_week_number(race_date, current_date),
-                phase=phase,
-                total_distance=adjusted_distance,
-                workouts=workouts,
-                recovery_days=recovery_days
-            )
-            
-            logger.info(f"Weekly plan generated: {len(workouts)} workouts, {adjusted_distance:.1f}km")
             return weekly_plan
             
         except Exception as e:
@@ -182,53 +297,10 @@ class WorkoutPlanner:
             if weeks_remaining < 4:
                 raise ValueError("レースまで4週間未満のため、期分けプランは生成できません")
             
-            # 期分けの設定
-            phase_weeks = self._calculate_phase_weeks(weeks_remaining)
-            
-            # ピーク距離の計算
-            peak_distance = self._calculate_peak_distance(
-                current_weekly_distance, target_race, current_fitness
+            weekly_plans, total_distance, peak_distance = self._get_or_build_plan_body(
+                current_fitness, target_race, weeks_remaining, current_weekly_distance, training_frequency, {}
             )
             
-            # 各週のプラン生成
-            weekly_plans = []
-            current_phase_distance = current_weekly_distance
-            
-            for week_num in range(weeks_remaining):
-                phase = self._get_phase_for_week(week_num, phase_weeks)
-                
-                # 週間距離の調整
-                if phase == TrainingPhase.BASE:
-                    current_phase_distance = min(
-                        current_phase_distance * 1.1,  # 10%増加
-                        peak_distance * 0.7
-                    )
-                elif phase == TrainingPhase.BUILD:
-                    current_phase_distance = min(
-                        current_phase_distance * 1.05,  # 5%増加
-                        peak_distance
-                    )
-                elif phase == TrainingPhase.PEAK:
-                    current_phase_distance = peak_distance
-                else:  # RECOVERY
-                    current_phase_distance = peak_distance * 0.6
-                
-                # 週間プラン生成
-                weekly_plan = self.generate_weekly_plan(
-                    user_id=user_id,
-                    current_fitness=current_fitness,
-                    target_race=target_race,
-                    race_date=race_date,
-                    current_date=current_date + timedelta(weeks=week_num),
-                    weekly_distance=current_phase_distance,
-                    training_frequency=training_frequency
-                )
-                
-                weekly_plans.append(weekly_plan)
-            
-            # 総距離の計算
-            total_distance = sum(plan.total_distance for plan in weekly_plans)
-            
             training_plan = TrainingPlan(
                 user_id=user_id,
                 target_race=target_race,
@@ -247,6 +319,170 @@ class WorkoutPlanner:
             logger.error(f"Failed to generate periodized plan: {str(e)}")
             raise RuntimeError(f"期分けプランの生成に失敗しました: {str(e)}")
     
+    def generate_periodized_plans(self, requests: List[Dict[str, Any]]) -> List[PlanBatchResult]:
+        """
+        複数の期分けプランを一括生成
+        
+        複数の選手、または同じ選手の候補レース日ごとのプランを1回の呼び出しで生成する。
+        期分け・頻度・ペースごとの練習テンプレートはバッチ内で共有し、
+        正規化した入力が同じリクエストはキャッシュから返す。
+        
+        Args:
+            requests: generate_periodized_plan の引数（user_id, current_fitness, target_race,
+                race_date, current_date, current_weekly_distance, training_frequency）の辞書のリスト
+            
+        Returns:
+            リクエストと同じ順の結果（4週間未満などで生成できないものは error に理由）
+        """
+        logger.info(f"Generating {len(requests)} periodized plans")
+        
+        templates: Dict[Tuple, Tuple[WorkoutTemplate, ...]] = {}
+        results = []
+        for index, request in enumerate(requests):
+            weeks_remaining = self._calculate_weeks_remaining(request['race_date'], request['current_date'])
+            if weeks_remaining < 4:
+                results.append(PlanBatchResult(
+                    index=index, plan=None, error="レースまで4週間未満のため、期分けプランは生成できません"
+                ))
+                continue
+            
+            try:
+                weekly_plans, total_distance, peak_distance = self._get_or_build_plan_body(
+                    request['current_fitness'], request['target_race'], weeks_remaining,
+                    request['current_weekly_distance'], request['training_frequency'], templates
+                )
+            except Exception as e:
+                logger.error(f"Failed to generate periodized plan {index} in batch: {str(e)}")
+                results.append(PlanBatchResult(index=index, plan=None, error=str(e)))
+                continue
+            
+            results.append(PlanBatchResult(index=index, plan=TrainingPlan(
+                user_id=request['user_id'],
+                target_race=request['target_race'],
+                race_date=request['race_date'],
+                current_date=request['current_date'],
+                weeks_remaining=weeks_remaining,
+                weekly_plans=weekly_plans,
+                total_distance=total_distance,
+                peak_distance=peak_distance
+            )))
+        
+        logger.info(f"Batch plan generation completed: {len(templates)} phase templates shared")
+        return results
+    
+    def _get_or_build_plan_body(
+        self,
+        current_fitness: Dict[str, Any],
+        target_race: str,
+        weeks_remaining: int,
+        weekly_distance: float,
+        training_frequency: float,
+        templates: Dict[Tuple, Tuple[WorkoutTemplate, ...]]
+    ) -> PlanBody:
+        """
+        正規化した入力でキャッシュを引き、なければ週ごとのプランを生成して保存
+        
+        プランの内容は平均ペース・経験レベル・目標レース・残り週数・週間距離・頻度だけで決まるため、
+        平均ペースと週間距離を丸めた値をキーにする（生成にも丸めた値を使う）。
+        """
+        fitness = {
+            'avg_pace': round(current_fitness.get('avg_pace', 300) / PACE_BUCKET_SECONDS) * PACE_BUCKET_SECONDS
+        }
+        if 'experience_level' in current_fitness:
+            fitness['experience_level'] = current_fitness['experience_level']
+        weekly_distance = round(weekly_distance / DISTANCE_BUCKET_KM) * DISTANCE_BUCKET_KM
+        frequency = max(1, int(round(training_frequency)))
+        
+        key = (fitness.get('experience_level'), fitness['avg_pace'], target_race,
+               weeks_remaining, weekly_distance, frequency)
+        body = periodized_plan_cache.get(key)
+        if body is None:
+            body = self._build_plan_body(fitness, target_race, weeks_remaining, weekly_distance, frequency, templates)
+            periodized_plan_cache.put(key, body)
+        return body
+    
+    def _build_plan_body(
+        self,
+        fitness: Dict[str, Any],
+        target_race: str,
+        weeks_remaining: int,
+        current_weekly_distance: float,
+        training_frequency: int,
+        templates: Dict[Tuple, Tuple[WorkoutTemplate, ...]]
+    ) -> PlanBody:
+        """週ごとのプラン・総距離・ピーク距離を生成"""
+        # 期分けの設定
+        phase_weeks = self._calculate_phase_weeks(weeks_remaining)
+        
+        # ピーク距離の計算
+        peak_distance = self._calculate_peak_distance(
+            current_weekly_distance, target_race, fitness
+        )
+        
+        # 各週のプラン生成
+        weekly_plans = []
+        current_phase_distance = current_weekly_distance
+        
+        for week_num in range(weeks_remaining):
+            phase = self._get_phase_for_week(week_num, phase_weeks)
+            
+            # 週間距離の調整
+            if phase == TrainingPhase.BASE:
+                current_phase_distance = min(
+                    current_phase_distance * 1.1,  # 10%増加
+                    peak_distance * 0.7
+                )
+            elif phase == TrainingPhase.BUILD:
+                current_phase_distance = min(
+                    current_phase_distance * 1.05,  # 5%増加
+                    peak_distance
+                )
+            elif phase == TrainingPhase.PEAK:
+                current_phase_distance = peak_distance
+            else:  # RECOVERY
+                current_phase_distance = peak_distance * 0.6
+            
+            # 週間プラン（その週から見た残り週数で決まる）
+            weekly_plans.append(self._build_weekly_plan(
+                weeks_remaining - week_num, fitness, target_race,
+                current_phase_distance, training_frequency, templates
+            ))
+        
+        # 総距離の計算
+        total_distance = sum(plan.total_distance for plan in weekly_plans)
+        return weekly_plans, total_distance, peak_distance
+    
+    def _build_weekly_plan(
+        self,
+        weeks_remaining: int,
+        fitness: Dict[str, Any],
+        target_race: str,
+        weekly_distance: float,
+        training_frequency: int,
+        templates: Optional[Dict[Tuple, Tuple[WorkoutTemplate, ...]]] = None
+    ) -> WeeklyPlan:
+        """残り週数から週間プランを作成"""
+        phase = self._phase_for_weeks_remaining(weeks_remaining)
+        
+        # 週間距離の調整
+        adjusted_distance = self._adjust_weekly_distance(weekly_distance, phase, fitness)
+        
+        # 練習頻度の調整
+        adjusted_frequency = self._adjust_training_frequency(training_frequency, adjusted_distance)
+        
+        # 練習メニューの生成
+        workouts = self._generate_workouts(
+            phase, adjusted_distance, adjusted_frequency, fitness, target_race, templates
+        )
+        
+        return WeeklyPlan(
+            week_number=weeks_remaining,
+            phase=phase,
+            total_distance=adjusted_distance,
+            workouts=workouts,
+            recovery_days=self._determine_recovery_days(adjusted_frequency)
+        )
+    
     def analyze_weaknesses(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         弱点分析
@@ -407,8 +643,10 @@ class WorkoutPlanner:
     
     def _determine_training_phase(self, race_date: datetime, current_date: datetime) -> TrainingPhase:
         """現在の期分けを決定"""
-        weeks_remaining = self._calculate_weeks_remaining(race_date, current_date)
-        
+        return self._phase_for_weeks_remaining(self._calculate_weeks_remaining(race_date, current_date))
+    
+    def _phase_for_weeks_remaining(self, weeks_remaining: int) -> TrainingPhase:
+        """残り週数から期分けを決定"""
         if weeks_remaining <= 2:
             return TrainingPhase.PEAK
         elif weeks_remaining <= 6:
@@ -493,34 +731,38 @@ class WorkoutPlanner:
         weekly_distance: float,
         frequency: int,
         fitness: Dict[str, Any],
-        target_race: str
+        target_race: str,
+        templates: Optional[Dict[Tuple, Tuple[WorkoutTemplate, ...]]] = None
     ) -> List[Workout]:
         """練習メニューの生成"""
-        workouts = []
         distance_per_workout = weekly_distance / frequency
+        template = self._get_phase_template(phase, frequency, fitness, target_race, templates)
+        return [workout.instantiate(distance_per_workout) for workout in template]
+    
+    def _get_phase_template(
+        self,
+        phase: TrainingPhase,
+        frequency: int,
+        fitness: Dict[str, Any],
+        target_race: str,
+        templates: Optional[Dict[Tuple, Tuple[WorkoutTemplate, ...]]] = None
+    ) -> Tuple[WorkoutTemplate, ...]:
+        """期分け・頻度・ペースごとの練習テンプレート（templates があれば共有する）"""
+        key = (phase, frequency, fitness.get('avg_pace', 300), target_race)
+        if templates is not None and key in templates:
+            return templates[key]
         
         # 期分けに応じた練習配分
-        if phase == TrainingPhase.BASE:
-            workout_distribution = [0.4, 0.3, 0.2, 0.1]  # イージー, テンポ, インターバル, ロング
-        elif phase == TrainingPhase.BUILD:
-            workout_distribution = [0.3, 0.4, 0.2, 0.1]
-        elif phase == TrainingPhase.PEAK:
-            workout_distribution = [0.2, 0.3, 0.4, 0.1]
-        else:  # RECOVERY
-            workout_distribution = [0.6, 0.2, 0.1, 0.1]
-        
-        # 各練習の生成
-        for i in range(frequency):
-            if i < len(workout_distribution):
-                workout_distance = distance_per_workout * workout_distribution[i]
-                workout_type = self._get_workout_type_by_index(i, phase)
-                
-                workout = self._create_workout(
-                    workout_type, workout_distance, fitness, target_race
-                )
-                workouts.append(workout)
-        
-        return workouts
+        workout_distribution = WORKOUT_DISTRIBUTIONS[phase.value]
+        template = tuple(
+            self._create_workout_template(
+                self._get_workout_type_by_index(i, phase), workout_distribution[i], fitness, target_race
+            )
+            for i in range(min(frequency, len(workout_distribution)))
+        )
+        if templates is not None:
+            templates[key] = template
+        return template
     
     def _get_workout_type_by_index(self, index: int, phase: TrainingPhase) -> WorkoutType:
         """インデックスから練習種目を取得"""
@@ -543,6 +785,16 @@ class WorkoutPlanner:
         target_race: str
     ) -> Workout:
         """練習メニューの作成"""
+        return self._create_workout_template(workout_type, 1.0, fitness, target_race).instantiate(distance)
+    
+    def _create_workout_template(
+        self,
+        workout_type: WorkoutType,
+        distance_share: float,
+        fitness: Dict[str, Any],
+        target_race: str
+    ) -> WorkoutTemplate:
+        """練習種目ごとのペース・強度・説明を決定"""
         current_pace = fitness.get('avg_pace', 300)
         target_pace = self.base_paces.get(target_race, 300)
         
@@ -572,15 +824,12 @@ class WorkoutPlanner:
             description = "回復走"
             notes = "非常にゆっくりとしたペース"
         
-        duration_minutes = int(distance * pace / 60)
-        
-        return Workout(
+        return WorkoutTemplate(
             type=workout_type,
-            distance=distance,
+            distance_share=distance_share,
             pace=pace,
             description=description,
             intensity=intensity,
-            duration_minutes=duration_minutes,
             notes=notes
         )
     
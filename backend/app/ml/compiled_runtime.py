@@ -0,0 +1,405 @@
+"""
+NumPyのみで動作する軽量推論ランタイム
+
+このモジュールには学習済みモデルを推論専用の配列表現に変換する機能が含まれます：
+- 線形回帰・リッジ回帰（スケーラー込み）の係数ベクトルへの変換
+- ランダムフォレスト・勾配ブースティングのノードテーブルへの平坦化
+- ノードテーブルのベクトル化トラバーサルによる予測
+- アンサンブル予測器の重み付き合成
+
+sklearnのpredictが行う入力検証や推定器ごとのディスパッチを省くため、
+単一サンプル予測のオーバーヘッドが小さい。変換後のオブジェクトは
+NumPy配列のみを保持するので、model_artifactsでmmap読み込みした際に
+ワーカー間でページキャッシュを共有できる。
+"""
+
+import logging
+from typing import Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledLinearModel:
+    """係数ベクトルによる線形モデル"""
+
+    def __init__(self, coef: np.ndarray, intercept: float, name: str = "CompiledLinearModel"):
+        """
+        初期化
+
+        Args:
+            coef: 係数ベクトル（スケーリング込み）
+            intercept: 切片（スケーリング込み）
+            name: モデル名
+        """
+        self.name = name
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.n_features = len(self.coef)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        予測実行
+
+        Args:
+            X: 特徴量配列
+
+        Returns:
+            予測値配列
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return X @ self.coef + self.intercept
+
+    def predict_single(self, features: List[float]) -> float:
+        """
+        単一サンプルの予測
+
+        Args:
+            features: 特徴量リスト
+
+        Returns:
+            予測値
+        """
+        return float(np.dot(np.asarray(features, dtype=np.float64), self.coef) + self.intercept)
+
+    def __repr__(self):
+        return f"{self.name}(n_features={self.n_features})"
+
+
+class CompiledTreeEnsemble:
+    """配列ベースのノードテーブルによる決定木アンサンブル"""
+
+    # 作業配列（サンプル数 × 木数）がCPUキャッシュに収まるよう行をこの単位で処理する
+    chunk_size = 512
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children_left: np.ndarray,
+        children_right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        scale: float = 1.0,
+        base: float = 0.0,
+        name: str = "CompiledTreeEnsemble"
+    ):
+        """
+        初期化
+
+        葉ノードは自分自身を左右の子として持つため、最大深さ分だけ
+        遷移を繰り返すと全サンプルが葉に到達する。
+
+        Args:
+            feature: ノードごとの分割特徴量インデックス
+            threshold: ノードごとの分割閾値
+            children_left: 左の子ノード（全木通しのインデックス）
+            children_right: 右の子ノード（全木通しのインデックス）
+            value: ノードごとの出力値
+            roots: 各木のルートノードのインデックス
+            max_depth: 全木の最大深さ
+            scale: 木の出力合計に掛ける係数（平均なら1/木数、ブースティングなら学習率）
+            base: 初期予測値
+            name: モデル名
+        """
+        self.name = name
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        # 左右の子を交互に並べ、children[2 * node + go_right] の1回の参照で遷移できるようにする
+        self.children = np.ascontiguousarray(
+            np.column_stack([children_left, children_right]).ravel(), dtype=np.intp
+        )
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.scale = float(scale)
+        self.base = float(base)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        各サンプル・各木の到達葉ノードを計算
+
+        Args:
+            X: 特徴量配列
+
+        Returns:
+            葉ノードインデックス配列（サンプル数 × 木数）
+        """
+        # sklearnの決定木と同様にfloat32へ変換してから閾値と比較する
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        n_samples, n_features = X.shape
+        leaves = np.empty((n_samples, self.n_trees), dtype=np.intp)
+
+        for start in range(0, n_samples, self.chunk_size):
+            X_chunk = X[start:start + self.chunk_size]
+            flat_X = X_chunk.ravel()
+            row_offsets = (np.arange(len(X_chunk), dtype=np.intp) * n_features)[:, np.newaxis]
+
+            nodes = np.repeat(self.roots[np.newaxis, :], len(X_chunk), axis=0)
+            for _ in range(self.max_depth):
+                go_right = flat_X[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+                nodes = self.children[2 * nodes + go_right]
+
+            leaves[start:start + len(X_chunk)] = nodes
+
+        return leaves
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        予測実行
+
+        Args:
+            X: 特徴量配列
+
+        Returns:
+            予測値配列
+        """
+        leaves = self.apply(X)
+        return self.value[leaves].sum(axis=1) * self.scale + self.base
+
+    def predict_single(self, features: List[float]) -> float:
+        """
+        単一サンプルの予測
+
+        Args:
+            features: 特徴量リスト
+
+        Returns:
+            予測値
+        """
+        return float(self.predict(np.asarray(features).reshape(1, -1))[0])
+
+    def __repr__(self):
+        return f"{self.name}(n_trees={self.n_trees}, n_nodes={self.n_nodes}, max_depth={self.max_depth})"
+
+
+class CompiledEnsemble:
+    """変換済みモデルの重み付きアンサンブル"""
+
+    def __init__(self, members: List[Any], weights: np.ndarray, name: str = "CompiledEnsemble"):
+        """
+        初期化
+
+        Args:
+            members: 変換済みモデルのリスト
+            weights: 各モデルの重み
+            name: モデル名
+        """
+        self.name = name
+        self.members = members
+        weights = np.asarray(weights, dtype=np.float64)
+        self.weights = weights / np.sum(weights)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        重み付きアンサンブル予測
+
+        Args:
+            X: 特徴量配列
+
+        Returns:
+            予測値配列
+        """
+        predictions = np.array([member.predict(X) for member in self.members])
+        return self.weights @ predictions
+
+    def predict_single(self, features: List[float]) -> float:
+        """
+        単一サンプルの予測
+
+        Args:
+            features: 特徴量リスト
+
+        Returns:
+            予測値
+        """
+        return float(self.predict(np.asarray(features).reshape(1, -1))[0])
+
+    def __repr__(self):
+        return f"{self.name}(members={[m.name for m in self.members]})"
+
+
+def compile_linear(estimator: Any, scaler: Optional[Any] = None, name: str = "CompiledLinearModel") -> CompiledLinearModel:
+    """
+    線形モデルを係数ベクトルに変換
+
+    StandardScalerが指定された場合は標準化を係数と切片に畳み込む。
+
+    Args:
+        estimator: 学習済みのLinearRegression / Ridge
+        scaler: 学習済みのStandardScaler
+
+    Returns:
+        変換済み線形モデル
+    """
+    coef = np.asarray(estimator.coef_, dtype=np.float64).ravel()
+    intercept = float(np.ravel(estimator.intercept_)[0]) if np.ndim(estimator.intercept_) else float(estimator.intercept_)
+
+    if scaler is not None:
+        scale = getattr(scaler, 'scale_', None)
+        mean = getattr(scaler, 'mean_', None)
+        if scale is not None:
+            coef = coef / scale
+        if mean is not None:
+            intercept -= float(np.dot(coef, mean))
+
+    return CompiledLinearModel(coef, intercept, name=name)
+
+
+def compile_trees(trees: List[Any], scale: float, base: float = 0.0, name: str = "CompiledTreeEnsemble") -> CompiledTreeEnsemble:
+    """
+    決定木のリストをノードテーブルに平坦化
+
+    Args:
+        trees: 学習済みのDecisionTreeRegressorのリスト
+        scale: 木の出力合計に掛ける係数
+        base: 初期予測値
+
+    Returns:
+        変換済み決定木アンサンブル
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    max_depth = 0
+    offset = 0
+
+    for tree in trees:
+        tree_ = tree.tree_
+        n_nodes = tree_.node_count
+        node_ids = np.arange(n_nodes, dtype=np.intp)
+        is_leaf = tree_.children_left == -1
+
+        # 葉ノードは自己ループにし、分割特徴量は有効なインデックスにしておく
+        features.append(np.where(is_leaf, 0, tree_.feature))
+        thresholds.append(np.where(is_leaf, 0.0, tree_.threshold))
+        lefts.append(np.where(is_leaf, node_ids, tree_.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree_.children_right) + offset)
+        values.append(tree_.value[:, 0, 0])
+        roots.append(offset)
+
+        max_depth = max(max_depth, tree_.max_depth)
+        offset += n_nodes
+
+    return CompiledTreeEnsemble(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        children_left=np.concatenate(lefts),
+        children_right=np.concatenate(rights),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=np.intp),
+        max_depth=max_depth,
+        scale=scale,
+        base=base,
+        name=name
+    )
+
+
+def compile_random_forest(estimator: Any, name: str = "CompiledRandomForest") -> CompiledTreeEnsemble:
+    """
+    RandomForestRegressorをノードテーブルに変換
+
+    Args:
+        estimator: 学習済みのRandomForestRegressor
+
+    Returns:
+        変換済み決定木アンサンブル
+    """
+    trees = list(estimator.estimators_)
+    return compile_trees(trees, scale=1.0 / len(trees), name=name)
+
+
+def compile_gradient_boosting(estimator: Any, name: str = "CompiledGradientBoosting") -> CompiledTreeEnsemble:
+    """
+    GradientBoostingRegressorをノードテーブルに変換
+
+    Args:
+        estimator: 学習済みのGradientBoostingRegressor（二乗誤差系の損失）
+
+    Returns:
+        変換済み決定木アンサンブル
+    """
+    init = estimator.init_
+    if init == 'zero':
+        base = 0.0
+    else:
+        base = float(np.ravel(init.predict(np.zeros((1, estimator.n_features_in_))))[0])
+
+    trees = [stage[0] for stage in estimator.estimators_]
+    return compile_trees(trees, scale=estimator.learning_rate, base=base, name=name)
+
+
+def compile_predictor(model: Any) -> Optional[Any]:
+    """
+    予測器を推論ランタイムに変換
+
+    BasePredictorのサブクラス、EnsemblePredictor、またはsklearnの推定器を受け付ける。
+    変換に対応していないモデルの場合はNoneを返す。
+
+    Args:
+        model: 学習済みの予測器
+
+    Returns:
+        変換済みモデル、未対応の場合はNone
+    """
+    from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import LinearRegression, Ridge
+
+    from .ensemble_predictor import EnsemblePredictor
+    from .predictors.base_predictor import BasePredictor
+
+    try:
+        if isinstance(model, EnsemblePredictor):
+            members, weights = [], []
+            for member in model.models:
+                if not member.is_trained:
+                    continue
+                compiled = compile_predictor(member)
+                if compiled is None:
+                    logger.warning(f"Ensemble member {member.name} cannot be compiled")
+                    return None
+                members.append(compiled)
+                weights.append(model.model_weights.get(member.name, 0.0))
+
+            if not members or sum(weights) <= 0:
+                return None
+            return CompiledEnsemble(members, np.array(weights), name=f"Compiled{model.name}")
+
+        if isinstance(model, BasePredictor):
+            if not model.is_trained or model.model is None:
+                raise RuntimeError(f"{model.name} predictor is not trained")
+
+            scaler = model.scaler if getattr(model, 'use_scaling', False) else None
+            if isinstance(model.model, (LinearRegression, Ridge)):
+                return compile_linear(model.model, scaler, name=f"Compiled{model.name}")
+            if scaler is not None:
+                logger.warning(f"{model.name} uses input scaling that cannot be folded into trees")
+                return None
+            return compile_predictor(model.model)
+
+        if isinstance(model, (LinearRegression, Ridge)):
+            return compile_linear(model)
+        if isinstance(model, RandomForestRegressor):
+            return compile_random_forest(model)
+        if isinstance(model, GradientBoostingRegressor):
+            return compile_gradient_boosting(model)
+
+    except Exception as e:
+        logger.error(f"Failed to compile {type(model).__name__}: {str(e)}")
+        return None
+
+    logger.info(f"Compilation not supported for {type(model).__name__}")
+    return None
@@ -3,15 +3,18 @@
 機械学習用の特徴量を計算・保存・取得する機能
 """
 
-import numpy as np
-import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
 
-from app.models.workout import Workout
 from app.models.ai import FeatureStore as FeatureStoreModel
+from app.models.data_version import bump_user_data_versions
+from app.ml.training_load_features import (
+    calculate_training_load_features,
+    calculate_user_training_load_features,
+    load_daily_rollups_bulk,
+)
 
 
 class FeatureStore:
@@ -21,114 +24,95 @@ class FeatureStore:
         self.db = db
     
     def calculate_features(self, user_id: str, analysis_period_days: int = 30) -> Dict[str, Any]:
-        """ユーザーの特徴量を計算"""
+        """ユーザーの特徴量を計算（日次ロールアップから計算）"""
         try:
-            # ワークアウトデータを取得
-            workouts = self.get_user_workouts(user_id, analysis_period_days)
+            load = calculate_user_training_load_features(self.db, user_id, analysis_period_days)
             
-            if not workouts:
+            if load["total_workouts"] == 0:
                 raise ValueError("Insufficient training data")
             
-            # 特徴量を計算
-            features = self._calculate_basic_features(workouts)
-            features.update(self._calculate_trend_features(workouts))
-            features.update(self._calculate_intensity_features(workouts))
-            features.update(self._calculate_consistency_features(workouts))
-            
-            return features
+            return self._features_from_load(load, analysis_period_days)
             
         except Exception as e:
             raise ValueError(f"Feature calculation failed: {str(e)}")
     
-    def get_user_workouts(self, user_id: str, analysis_period_days: int) -> List[Dict]:
-        """ユーザーのワークアウトデータを取得"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=analysis_period_days)
+    def calculate_features_bulk(
+        self,
+        user_ids: Sequence[str],
+        analysis_period_days: int = 30,
+        end_date: Optional[date] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        複数ユーザーの特徴量を1回のロールアップ取得で計算
+        
+        Args:
+            user_ids: ユーザーIDのリスト
+            analysis_period_days: 分析期間（日数）
+            end_date: 期間の終了日（デフォルト: 今日）
+            
+        Returns:
+            (ユーザーIDごとの特徴量, 期間内に練習がなかったユーザーID)
+        """
+        end_date = end_date or date.today()
+        rollups = load_daily_rollups_bulk(
+            self.db, user_ids, end_date - timedelta(days=analysis_period_days), end_date
+        )
         
-        workouts = self.db.query(Workout).filter(
-            and_(
-                Workout.user_id == user_id,
-                Workout.date >= start_date,
-                Workout.date <= end_date
-            )
-        ).order_by(Workout.date.desc()).all()
+        features = {}
+        insufficient = []
+        for user_id in (str(u) for u in user_ids):
+            load = calculate_training_load_features(rollups.get(user_id, []))
+            if load["total_workouts"] == 0:
+                insufficient.append(user_id)
+                continue
+            features[user_id] = self._features_from_load(load, analysis_period_days)
         
-        return [
-            {
-                "id": workout.id,
-                "user_id": workout.user_id,
-                "distance_km": workout.distance_km,
-                "duration_minutes": workout.duration_minutes,
-                "avg_pace_min_per_km": workout.avg_pace_min_per_km,
-                "avg_heart_rate": workout.avg_heart_rate,
-                "max_heart_rate": workout.max_heart_rate,
-                "calories_burned": workout.calories_burned,
-                "elevation_gain_m": workout.elevation_gain_m,
-                "date": workout.date,
-                "created_at": workout.created_at
-            }
-            for workout in workouts
-        ]
+        return features, insufficient
     
-    def _calculate_basic_features(self, workouts: List[Dict]) -> Dict[str, Any]:
+    def _features_from_load(self, load: Dict[str, float], analysis_period_days: int) -> Dict[str, Any]:
+        """練習負荷特徴量から保存用の特徴量を作成"""
+        features = self._calculate_basic_features(load, analysis_period_days)
+        features.update(self._calculate_trend_features(load))
+        features.update(self._calculate_intensity_features(load))
+        features.update(self._calculate_consistency_features(load))
+        return features
+    
+    def _calculate_basic_features(self, load: Dict[str, float], analysis_period_days: int) -> Dict[str, Any]:
         """基本統計特徴量を計算"""
-        distances = [w["distance_km"] for w in workouts if w["distance_km"] is not None]
-        paces = [w["avg_pace_min_per_km"] for w in workouts if w["avg_pace_min_per_km"] is not None]
-        durations = [w["duration_minutes"] for w in workouts if w["duration_minutes"] is not None]
-        
         return {
-            "avg_distance": np.mean(distances) if distances else 0,
-            "avg_pace": np.mean(paces) if paces else 0,
-            "avg_duration": np.mean(durations) if durations else 0,
-            "total_distance": np.sum(distances) if distances else 0,
-            "total_workouts": len(workouts),
-            "training_frequency": len(workouts) / 30.0  # 30日間での頻度
+            "avg_distance": load["avg_distance"] / 1000,
+            "avg_pace": load["avg_pace"] / 60,
+            "avg_duration": load["avg_duration"] / 60,
+            "total_distance": load["total_distance"] / 1000,
+            "total_workouts": load["total_workouts"],
+            "training_frequency": load["total_workouts"] / max(1, analysis_period_days)
         }
     
-    def _calculate_trend_features(self, workouts: List[Dict]) -> Dict[str, Any]:
-        """トレンド特徴量を計算"""
-        if len(workouts) < 2:
+    def _calculate_trend_features(self, load: Dict[str, float]) -> Dict[str, Any]:
+        """トレンド特徴量を計算（1日あたりの変化量）"""
+        if load["total_workouts"] < 2:
             return {"distance_trend": 0, "pace_trend": 0, "duration_trend": 0}
         
-        # 日付順にソート
-        sorted_workouts = sorted(workouts, key=lambda x: x["date"])
-        
-        distances = [w["distance_km"] for w in sorted_workouts if w["distance_km"] is not None]
-        paces = [w["avg_pace_min_per_km"] for w in sorted_workouts if w["avg_pace_min_per_km"] is not None]
-        durations = [w["duration_minutes"] for w in sorted_workouts if w["duration_minutes"] is not None]
-        
-        # 線形回帰でトレンドを計算
-        distance_trend = self._calculate_linear_trend(distances)
-        pace_trend = self._calculate_linear_trend(paces)
-        duration_trend = self._calculate_linear_trend(durations)
-        
         return {
-            "distance_trend": distance_trend,
-            "pace_trend": pace_trend,
-            "duration_trend": duration_trend
+            "distance_trend": load["distance_trend"] / 1000,
+            "pace_trend": load["pace_trend"] / 60,
+            "duration_trend": load["duration_trend"] / 60
         }
     
-    def _calculate_intensity_features(self, workouts: List[Dict]) -> Dict[str, Any]:
+    def _calculate_intensity_features(self, load: Dict[str, float]) -> Dict[str, Any]:
         """強度特徴量を計算"""
-        heart_rates = [w["avg_heart_rate"] for w in workouts if w["avg_heart_rate"] is not None]
-        calories = [w["calories_burned"] for w in workouts if w["calories_burned"] is not None]
-        elevations = [w["elevation_gain_m"] for w in workouts if w["elevation_gain_m"] is not None]
-        
         return {
-            "avg_heart_rate": np.mean(heart_rates) if heart_rates else 0,
-            "max_heart_rate": np.max(heart_rates) if heart_rates else 0,
-            "avg_calories": np.mean(calories) if calories else 0,
-            "total_elevation": np.sum(elevations) if elevations else 0,
-            "intensity_score": self._calculate_intensity_score(workouts)
+            "avg_heart_rate": load["avg_heart_rate"],
+            "max_heart_rate": load["max_heart_rate"],
+            "avg_calories": load["avg_calories"],
+            "total_elevation": load["total_ascent"],
+            "intensity_score": self._calculate_intensity_score(load)
         }
     
-    def _calculate_consistency_features(self, workouts: List[Dict]) -> Dict[str, Any]:
+    def _calculate_consistency_features(self, load: Dict[str, float]) -> Dict[str, Any]:
         """一貫性特徴量を計算"""
-        distances = [w["distance_km"] for w in workouts if w["distance_km"] is not None]
-        paces = [w["avg_pace_min_per_km"] for w in workouts if w["avg_pace_min_per_km"] is not None]
-        
-        distance_consistency = 1 - (np.std(distances) / np.mean(distances)) if distances and np.mean(distances) > 0 else 0
-        pace_consistency = 1 - (np.std(paces) / np.mean(paces)) if paces and np.mean(paces) > 0 else 0
+        distance_consistency = 1 - (load["distance_std"] / load["avg_distance"]) if load["avg_distance"] > 0 else 0
+        pace_consistency = 1 - (load["pace_std"] / load["avg_pace"]) if load["avg_pace"] > 0 else 0
         
         return {
             "distance_consistency": max(0, min(1, distance_consistency)),
@@ -136,62 +120,81 @@ class FeatureStore:
             "overall_consistency": (distance_consistency + pace_consistency) / 2
         }
     
-    def _calculate_linear_trend(self, values: List[float]) -> float:
-        """線形回帰でトレンドを計算"""
-        if len(values) < 2:
+    def _calculate_intensity_score(self, load: Dict[str, float]) -> float:
+        """強度スコアを計算（距離・心拍数・カロリーの期間平均から算出）"""
+        if load["total_workouts"] == 0:
             return 0
         
-        x = np.arange(len(values))
-        y = np.array(values)
-        
-        # 線形回帰
-        slope = np.polyfit(x, y, 1)[0]
-        return slope
+        score = min(load["avg_distance"] / 1000 / 10.0, 1.0) * 0.4
+        score += min(load["avg_heart_rate"] / 180.0, 1.0) * 0.3
+        score += min(load["avg_calories"] / 500.0, 1.0) * 0.3
+        return score
     
-    def _calculate_intensity_score(self, workouts: List[Dict]) -> float:
-        """強度スコアを計算"""
-        if not workouts:
-            return 0
-        
-        total_score = 0
-        for workout in workouts:
-            score = 0
-            
-            # 距離スコア
-            if workout["distance_km"]:
-                score += min(workout["distance_km"] / 10.0, 1.0) * 0.4
-            
-            # 心拍数スコア
-            if workout["avg_heart_rate"]:
-                score += min(workout["avg_heart_rate"] / 180.0, 1.0) * 0.3
-            
-            # カロリースコア
-            if workout["calories_burned"]:
-                score += min(workout["calories_burned"] / 500.0, 1.0) * 0.3
-            
-            total_score += score
-        
-        return total_score / len(workouts)
-    
-    def save_features(self, user_id: str, features: Dict[str, Any]) -> str:
+    def save_features(self, user_id: str, features: Dict[str, Any], analysis_period_days: Optional[int] = None) -> str:
         """特徴量をデータベースに保存"""
-        feature_data = FeatureStoreModel(
-            id=f"features_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            user_id=user_id,
-            features=features,
-            calculated_at=datetime.now(),
-            created_at=datetime.now()
-        )
+        feature_data = FeatureStoreModel(user_id=user_id, **self._feature_row_values(features, analysis_period_days))
         
         self.db.add(feature_data)
         self.db.commit()
         
         return feature_data.id
     
+    def save_features_bulk(
+        self,
+        features_by_user: Dict[str, Dict[str, Any]],
+        analysis_period_days: Optional[int] = None
+    ) -> int:
+        """
+        複数ユーザーの特徴量を1回の INSERT でまとめて保存
+        
+        ORM の after_flush フックを通らないため、データバージョンは同じトランザクション内で更新する。
+        
+        Args:
+            features_by_user: ユーザーIDごとの特徴量
+            analysis_period_days: 分析期間（日数）
+            
+        Returns:
+            保存した行数
+        """
+        if not features_by_user:
+            return 0
+        
+        calculation_date = datetime.now()
+        rows = [
+            dict(
+                self._feature_row_values(features, analysis_period_days),
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                calculation_date=calculation_date
+            )
+            for user_id, features in features_by_user.items()
+        ]
+        
+        try:
+            connection = self.db.connection()
+            connection.execute(FeatureStoreModel.__table__.insert(), rows)
+            bump_user_data_versions(connection, features_by_user.keys())
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        return len(rows)
+    
+    def _feature_row_values(self, features: Dict[str, Any], analysis_period_days: Optional[int]) -> Dict[str, Any]:
+        """feature_store の列の値（統計情報の列は特徴量から埋める）"""
+        return {
+            "features": features,
+            "total_workouts": features.get("total_workouts"),
+            "total_distance": features.get("total_distance"),
+            "avg_pace": features.get("avg_pace"),
+            "training_period_days": analysis_period_days
+        }
+    
     def get_latest_features(self, user_id: str) -> Optional[Dict[str, Any]]:
         """最新の特徴量を取得"""
         feature_data = self.db.query(FeatureStoreModel).filter(
             FeatureStoreModel.user_id == user_id
-        ).order_by(FeatureStoreModel.calculated_at.desc()).first()
+        ).order_by(FeatureStoreModel.calculation_date.desc()).first()
         
         return feature_data.features if feature_data else None
@@ -18,6 +18,9 @@ from enum import Enum
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 
+from app.ml.health.roster import RosterHealthData, latest_observed, nan_slope
+from app.ml.health.workload_engine import WorkloadEngine, intensity_weighted_load
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,6 +73,7 @@ class ConditionAnalyzer:
         self.isolation_forest = IsolationForest(contamination=0.1, random_state=42)
         self.scaler = StandardScaler()
         self.baseline_metrics = {}
+        self.workload_engine = WorkloadEngine()
         
         logger.info("ConditionAnalyzer initialized")
     
@@ -136,6 +140,82 @@ class ConditionAnalyzer:
             logger.error(f"Failed to analyze condition: {str(e)}")
             raise RuntimeError(f"調子分析に失敗しました: {str(e)}")
     
+    def analyze_condition_batch(self, roster: RosterHealthData) -> Dict[str, Any]:
+        """
+        チーム全体の調子分析（analyze_condition のバッチ版）
+        
+        健康指標は直近7日以内の最新の記録（1-10）を0-1に換算して使い、
+        記録がない選手は analyze_condition と同じデフォルト値を使う。
+        
+        Args:
+            roster: 選手×日の日次データ
+            
+        Returns:
+            選手ごとのスコア配列・アラート配列・総合コンディション
+        """
+        try:
+            logger.info(f"Analyzing condition for {roster.num_athletes} athletes")
+            
+            # 疲労スコア（直近7日間の負荷と期間平均の週間距離の比較）
+            recent_load = roster.training_load[:, -7:].sum(axis=1)
+            avg_weekly_distance = roster.distance.sum(axis=1) / max(1.0, roster.days / 7)
+            avg_weekly_distance = np.where(avg_weekly_distance > 0, avg_weekly_distance, 20)
+            fatigue_score = np.minimum(1.0, recent_load / (avg_weekly_distance * 0.6) * 0.5)
+            
+            # 健康指標
+            sleep_quality = np.nan_to_num(latest_observed(roster.sleep_quality, 7) / 10, nan=0.7)
+            subjective_fatigue = np.nan_to_num(latest_observed(roster.fatigue_level, 7) / 10, nan=0.5)
+            subjective_stress = np.nan_to_num(latest_observed(roster.stress_level, 7) / 10, nan=0.5)
+            
+            # 回復スコア（心拍変動の記録がないため hrv スコアは0.5）
+            recovery_score = (sleep_quality + (1.0 - subjective_fatigue) + 0.5) / 3
+            readiness_score = np.clip(recovery_score - fatigue_score * 0.5, 0.0, 1.0)
+            stress_level = (subjective_stress + 0.5) / 2
+            
+            # パフォーマンストレンド（直近14日間の日次平均ペースの傾き）
+            pace_trend = nan_slope(roster.avg_pace[:, -14:], min_observations=4)
+            performance_trend = np.clip(-pace_trend / 10, -1.0, 1.0)
+            
+            alerts = {
+                AlertType.OVERTRAINING.value: (fatigue_score > 0.8) & (recovery_score < 0.3),
+                AlertType.FATIGUE_ACCUMULATION.value: fatigue_score > 0.7,
+                AlertType.RECOVERY_INSUFFICIENT.value: recovery_score < 0.4,
+                AlertType.PERFORMANCE_DECLINE.value: performance_trend < -0.3,
+                AlertType.HEALTH_RISK.value: (stress_level > 0.8) & (sleep_quality < 0.4),
+            }
+            alert_count = np.sum(list(alerts.values()), axis=0)
+            
+            overall_condition = np.select(
+                [
+                    (alert_count >= 3) | (readiness_score < 0.2),
+                    (alert_count >= 2) | (readiness_score < 0.4),
+                    (alert_count >= 1) | (readiness_score < 0.6),
+                    (readiness_score >= 0.8) & (fatigue_score < 0.3),
+                ],
+                [
+                    ConditionLevel.CRITICAL.value,
+                    ConditionLevel.POOR.value,
+                    ConditionLevel.FAIR.value,
+                    ConditionLevel.EXCELLENT.value,
+                ],
+                default=ConditionLevel.GOOD.value
+            )
+            
+            return {
+                'overall_condition': overall_condition,
+                'fatigue_score': fatigue_score,
+                'recovery_score': recovery_score,
+                'readiness_score': readiness_score,
+                'stress_level': stress_level,
+                'sleep_quality': sleep_quality,
+                'performance_trend': performance_trend,
+                'alerts': alerts
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to analyze condition batch: {str(e)}")
+            raise RuntimeError(f"チームの調子分析に失敗しました: {str(e)}")
+    
     def detect_overtraining(
         self,
         user_data: Dict[str, Any],
@@ -159,9 +239,10 @@ class ConditionAnalyzer:
             symptoms = []
             risk_score = 0.0
             
-            # 練習負荷の分析
-            if len(recent_workouts) >= 7:
-                weekly_distance = sum(w.get('distance', 0) for w in recent_workouts[-7:])
+            # 練習負荷の分析（直近7日間）
+            workload = self.workload_engine.compute_for_workouts(recent_workouts)
+            if workload.days >= 7:
+                weekly_distance = workload.window_load(7)
                 avg_weekly_distance = user_data.get('avg_weekly_distance', 20)
                 
                 if weekly_distance > avg_weekly_distance * 1.5:
@@ -280,7 +361,8 @@ class ConditionAnalyzer:
             
             # 最近の練習負荷による調整
             if recent_workouts:
-                recent_load = sum(w.get('distance', 0) * w.get('intensity', 0.5) for w in recent_workouts[-3:])
+                workload = self.workload_engine.compute_for_workouts(recent_workouts, intensity_weighted_load)
+                recent_load = workload.window_load(3)
                 avg_load = user_profile.get('avg_weekly_distance', 20) / 7 * 0.6
                 
                 if recent_load > avg_load * 2:
@@ -318,12 +400,9 @@ class ConditionAnalyzer:
         if not recent_workouts:
             return 0.0
         
-        # 最近7日間の練習負荷
-        recent_load = 0
-        for workout in recent_workouts[-7:]:
-            distance = workout.get('distance', 0)
-            intensity = workout.get('intensity', 0.5)
-            recent_load += distance * intensity
+        # 最近7日間の練習負荷（距離×強度）
+        workload = self.workload_engine.compute_for_workouts(recent_workouts, intensity_weighted_load)
+        recent_load = workload.window_load(7)
         
         # 平均負荷との比較
         avg_weekly_load = user_data.get('avg_weekly_distance', 20) * 0.6
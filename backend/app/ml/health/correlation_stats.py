@@ -0,0 +1,187 @@
+"""
+メトリクス間の相関のオンライン統計
+
+このモジュールには以下の機能が含まれます：
+- 日付で揃えたメトリクスペアごとの co-moment（Welford 法）の逐次追加
+- 1日分の値による全ペアの O(1) 更新と、相関係数の定数時間の読み出し
+- 日付で揃えた (日数, メトリクス数) 配列からの全ペアの co-moment の一括計算（バックフィル用）
+
+相関は両方のメトリクスが記録されている日だけで計算する（pairwise-complete）。
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 相関を保持するメトリクス（日次の値）
+CORRELATION_METRICS = (
+    'training_load',  # 日次負荷（距離km×強度0-1、練習のない日は0）
+    'fatigue_level',
+    'sleep_quality_score',
+    'sleep_duration_hours',
+    'motivation_level',
+    'energy_level',
+    'stress_level',
+    'training_readiness',
+    'readiness_composite',  # (10 - 疲労度) + エネルギー + 睡眠の質
+)
+
+# 相関係数を返す最小観測数
+MIN_CORRELATION_OBSERVATIONS = 4
+
+
+def readiness_composite(fatigue_level: Any, energy_level: Any, sleep_quality_score: Any) -> Optional[float]:
+    """疲労（逆）・エネルギー・睡眠の質の複合指標（いずれかが欠測なら None）"""
+    if fatigue_level is None or energy_level is None or sleep_quality_score is None:
+        return None
+    return (10 - fatigue_level) + energy_level + sleep_quality_score
+
+
+@dataclass
+class CoMoment:
+    """2変数の件数・平均・偏差平方和・共偏差積和"""
+    n: int = 0
+    mean_x: float = 0.0
+    mean_y: float = 0.0
+    m2_x: float = 0.0
+    m2_y: float = 0.0
+    c_xy: float = 0.0
+
+    def add(self, x: float, y: float):
+        """観測を1件追加"""
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    @property
+    def correlation(self) -> Optional[float]:
+        """ピアソンの相関係数（観測不足・分散0なら None）"""
+        if self.n < MIN_CORRELATION_OBSERVATIONS:
+            return None
+        denominator = self.m2_x * self.m2_y
+        if denominator <= 1e-12:
+            return None
+        return float(max(-1.0, min(1.0, self.c_xy / np.sqrt(denominator))))
+
+    def to_list(self) -> List[float]:
+        return [self.n, self.mean_x, self.mean_y, self.m2_x, self.m2_y, self.c_xy]
+
+    @classmethod
+    def from_list(cls, values: Sequence[float]) -> 'CoMoment':
+        n, mean_x, mean_y, m2_x, m2_y, c_xy = values
+        return cls(int(n), float(mean_x), float(mean_y), float(m2_x), float(m2_y), float(c_xy))
+
+
+def _pair_key(x: str, y: str) -> str:
+    return f"{x}|{y}"
+
+
+class CorrelationAccumulators:
+    """全メトリクスペアの co-moment"""
+
+    def __init__(self, metrics: Sequence[str] = CORRELATION_METRICS,
+                 moments: Optional[Dict[Tuple[str, str], CoMoment]] = None):
+        self.metrics = tuple(metrics)
+        self._index = {name: i for i, name in enumerate(self.metrics)}
+        self.moments = moments or {pair: CoMoment() for pair in combinations(self.metrics, 2)}
+
+    def _observed(self, values: Mapping[str, Any]) -> List[Tuple[str, float]]:
+        return [(name, float(values[name])) for name in self.metrics if values.get(name) is not None]
+
+    def add_day(self, values: Mapping[str, Any]):
+        """1日分の値を追加（両方記録されているペアだけ更新）"""
+        observed = self._observed(values)
+        for (x_name, x), (y_name, y) in combinations(observed, 2):
+            self.moments[(x_name, y_name)].add(x, y)
+
+    def _moment(self, x: str, y: str) -> CoMoment:
+        if self._index[x] > self._index[y]:
+            x, y = y, x
+        return self.moments[(x, y)]
+
+    def correlation(self, x: str, y: str) -> Optional[float]:
+        """2メトリクスの相関係数（順序は問わない）"""
+        return self._moment(x, y).correlation
+
+    def count(self, x: str, y: str) -> int:
+        """2メトリクスが両方記録されている日数"""
+        return self._moment(x, y).n
+
+    def correlation_matrix(self) -> np.ndarray:
+        """相関行列（計算できないペアは NaN、対角は1）"""
+        matrix = np.eye(len(self.metrics))
+        for (x, y), moment in self.moments.items():
+            r = moment.correlation
+            i, j = self._index[x], self._index[y]
+            matrix[i, j] = matrix[j, i] = np.nan if r is None else r
+        return matrix
+
+    def to_dict(self) -> Dict[str, List[float]]:
+        """JSON 保存用の表現"""
+        return {_pair_key(x, y): moment.to_list() for (x, y), moment in self.moments.items()}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Sequence[float]],
+                  metrics: Sequence[str] = CORRELATION_METRICS) -> 'CorrelationAccumulators':
+        accumulators = cls(metrics)
+        for pair in accumulators.moments:
+            stored = data.get(_pair_key(*pair))
+            if stored is not None:
+                accumulators.moments[pair] = CoMoment.from_list(stored)
+        return accumulators
+
+    @classmethod
+    def from_matrix(cls, values: np.ndarray,
+                    metrics: Sequence[str] = CORRELATION_METRICS) -> 'CorrelationAccumulators':
+        """
+        日付で揃えた配列から全ペアの co-moment を一括計算
+
+        列ごとの平均で中心化してから行列積で件数・和・平方和・積和を求めるため、
+        日数 D・メトリクス数 K に対して O(D K²) の1パスで済む。
+
+        Args:
+            values: (日数, メトリクス数) の配列（欠測は NaN、列は metrics の順）
+            metrics: 列のメトリクス名
+
+        Returns:
+            add_day を日ごとに呼んだ場合と同じ統計
+        """
+        values = np.asarray(values, dtype=np.float64)
+        observed = ~np.isnan(values)
+        mask = observed.astype(np.float64)
+
+        column_count = mask.sum(axis=0)
+        center = np.zeros(values.shape[1])
+        np.divide(np.where(observed, values, 0.0).sum(axis=0), column_count, out=center, where=column_count > 0)
+        centered = np.where(observed, values - center, 0.0)
+
+        # [i, j] はメトリクス i, j が両方記録されている日だけの集計
+        n = mask.T @ mask
+        sums = centered.T @ mask  # Σx_i
+        sq_sums = (centered * centered).T @ mask  # Σx_i²
+        products = centered.T @ centered  # Σx_i x_j
+
+        accumulators = cls(metrics)
+        index = accumulators._index
+        for x, y in accumulators.moments:
+            i, j = index[x], index[y]
+            count = int(n[i, j])
+            if count == 0:
+                continue
+            sum_x, sum_y = sums[i, j], sums[j, i]
+            accumulators.moments[(x, y)] = CoMoment(
+                n=count,
+                mean_x=sum_x / count + center[i],
+                mean_y=sum_y / count + center[j],
+                m2_x=max(sq_sums[i, j] - sum_x * sum_x / count, 0.0),
+                m2_y=max(sq_sums[j, i] - sum_y * sum_y / count, 0.0),
+                c_xy=products[i, j] - sum_x * sum_y / count
+            )
+        return accumulators
@@ -16,6 +16,14 @@ import numpy as np
 from dataclasses import dataclass
 from enum import Enum
 
+from app.ml.health.roster import RosterHealthData
+from app.ml.health.workload_engine import (
+    ACWR_DANGER,
+    CHRONIC_WINDOW_DAYS,
+    WorkloadEngine,
+    WorkloadMetrics,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -91,11 +99,13 @@ class InjuryPredictor:
                 'warning_signs': ['局所的な痛み', '夜間の痛み', '体重負荷時の痛み']
             },
             InjuryType.TENDINITIS: {
-                'risk_factors': [RiskFactor.HIGH_FREQUENCY, RiskFactor.OVERUSE],
+                'risk_factors': [RiskFactor.HIGH_FREQUENCY, RiskFactor.RAPID_INCREASE],
                 'warning_signs': ['腱の痛み', '朝のこわばり', '使用時の痛み']
             }
         }
         
+        self.workload_engine = WorkloadEngine()
+        
         logger.info("InjuryPredictor initialized")
     
     def assess_injury_risk(
@@ -162,6 +172,87 @@ class InjuryPredictor:
             logger.error(f"Failed to assess injury risk: {str(e)}")
             raise RuntimeError(f"怪我リスク評価に失敗しました: {str(e)}")
     
+    def assess_injury_risk_batch(self, roster: RosterHealthData) -> Dict[str, Any]:
+        """
+        チーム全体の怪我リスク評価（assess_injury_risk のバッチ版）
+        
+        練習負荷に基づくリスク要因（急激な増加・高頻度・回復不足）を
+        _analyze_rapid_increase / _analyze_high_frequency / _analyze_insufficient_recovery と
+        同じ閾値で全選手まとめて評価する。
+        
+        Args:
+            roster: 選手×日の日次データ
+            
+        Returns:
+            選手ごとのリスクスコア・リスクレベル・要因別の深刻度・最新の負荷指標
+        """
+        try:
+            logger.info(f"Assessing injury risk for {roster.num_athletes} athletes")
+            
+            workload = self.workload_engine.compute(roster.distance, roster.workout_counts, roster.start_date)
+            acwr = np.nan_to_num(workload.acwr[:, -1])
+            monotony = workload.monotony[:, -1]
+            
+            # 急激な練習量増加
+            rapid_increase = np.zeros(roster.num_athletes)
+            if workload.days >= CHRONIC_WINDOW_DAYS:
+                recent_2weeks = workload.loads[:, -14:].sum(axis=1)
+                previous_2weeks = workload.loads[:, -28:-14].sum(axis=1)
+                increase_ratio = np.zeros(roster.num_athletes)
+                np.divide(recent_2weeks, previous_2weeks, out=increase_ratio, where=previous_2weeks > 0)
+                rapid_increase = np.where(
+                    (increase_ratio > 1.5) | (acwr > ACWR_DANGER),
+                    np.minimum(1.0, (np.maximum(increase_ratio, acwr) - 1.5) / 0.5),
+                    0.0
+                )
+            
+            # 高頻度練習
+            frequency = workload.counts[:, -7:].sum(axis=1)
+            high_frequency = np.where(frequency > 5, np.minimum(1.0, (frequency - 5) / 2), 0.0)
+            
+            # 回復不足
+            max_consecutive = workload.streak[:, -CHRONIC_WINDOW_DAYS:].max(axis=1)
+            insufficient_recovery = np.maximum(
+                np.where(max_consecutive > 4, np.minimum(1.0, (max_consecutive - 4) / 3), 0.0),
+                np.where(monotony > 2.0, np.minimum(1.0, (monotony - 2.0) / 2.0), 0.0)
+            )
+            
+            # 検出された要因の影響度で重み付けした総合リスクスコア
+            severities = np.stack([rapid_increase, high_frequency, insufficient_recovery], axis=1)
+            impacts = np.array([0.8, 0.6, 0.7]) * (severities > 0)
+            total_weight = impacts.sum(axis=1)
+            risk_score = np.zeros(roster.num_athletes)
+            np.divide((severities * impacts).sum(axis=1), total_weight, out=risk_score, where=total_weight > 0)
+            
+            overall_risk = np.select(
+                [risk_score >= 0.8, risk_score >= 0.6, risk_score >= 0.4],
+                [InjuryRiskLevel.CRITICAL.value, InjuryRiskLevel.HIGH.value, InjuryRiskLevel.MODERATE.value],
+                default=InjuryRiskLevel.LOW.value
+            )
+            risk_timeline_days = np.select(
+                [risk_score >= 0.8, risk_score >= 0.6, risk_score >= 0.4], [7, 14, 30], default=90
+            )
+            
+            return {
+                'overall_risk': overall_risk,
+                'risk_score': risk_score,
+                'risk_timeline_days': risk_timeline_days,
+                'factor_severity': {
+                    RiskFactor.RAPID_INCREASE.value: rapid_increase,
+                    RiskFactor.HIGH_FREQUENCY.value: high_frequency,
+                    RiskFactor.INSUFFICIENT_RECOVERY.value: insufficient_recovery,
+                },
+                'acute_load': workload.acute_load[:, -1],
+                'chronic_load': workload.chronic_load[:, -1],
+                'acwr': acwr,
+                'monotony': monotony,
+                'strain': workload.strain[:, -1]
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to assess injury risk batch: {str(e)}")
+            raise RuntimeError(f"チームの怪我リスク評価に失敗しました: {str(e)}")
+    
     def identify_risk_factors(
         self,
         user_data: Dict[str, Any],
@@ -183,19 +274,20 @@ class InjuryPredictor:
             logger.info("Identifying risk factors")
             
             risk_analyses = []
+            workload = self.workload_engine.compute_for_workouts(recent_workouts)
             
             # 急激な練習量増加の検出
-            rapid_increase_analysis = self._analyze_rapid_increase(user_data, recent_workouts)
+            rapid_increase_analysis = self._analyze_rapid_increase(user_data, workload)
             if rapid_increase_analysis:
                 risk_analyses.append(rapid_increase_analysis)
             
             # 高頻度練習の検出
-            high_frequency_analysis = self._analyze_high_frequency(user_data, recent_workouts)
+            high_frequency_analysis = self._analyze_high_frequency(user_data, workload)
             if high_frequency_analysis:
                 risk_analyses.append(high_frequency_analysis)
             
             # 回復不足の検出
-            recovery_analysis = self._analyze_insufficient_recovery(user_data, recent_workouts)
+            recovery_analysis = self._analyze_insufficient_recovery(user_data, workload)
             if recovery_analysis:
                 risk_analyses.append(recovery_analysis)
             
@@ -378,17 +470,18 @@ class InjuryPredictor:
     ) -> List[RiskFactorAnalysis]:
         """リスク要因の分析"""
         risk_analyses = []
+        workload = self.workload_engine.compute_for_workouts(recent_workouts)
         
         # 各リスク要因の分析
-        rapid_increase = self._analyze_rapid_increase(user_data, recent_workouts)
+        rapid_increase = self._analyze_rapid_increase(user_data, workload)
         if rapid_increase:
             risk_analyses.append(rapid_increase)
         
-        high_frequency = self._analyze_high_frequency(user_data, recent_workouts)
+        high_frequency = self._analyze_high_frequency(user_data, workload)
         if high_frequency:
             risk_analyses.append(high_frequency)
         
-        recovery = self._analyze_insufficient_recovery(user_data, recent_workouts)
+        recovery = self._analyze_insufficient_recovery(user_data, workload)
         if recovery:
             risk_analyses.append(recovery)
         
@@ -401,43 +494,41 @@ class InjuryPredictor:
     def _analyze_rapid_increase(
         self,
         user_data: Dict[str, Any],
-        recent_workouts: List[Dict[str, Any]]
+        workload: WorkloadMetrics
     ) -> Optional[RiskFactorAnalysis]:
-        """急激な練習量増加の分析"""
-        if len(recent_workouts) < 14:
+        """急激な練習量増加の分析（直近2週間の増加率と急性:慢性負荷比）"""
+        if workload.days < CHRONIC_WINDOW_DAYS:
             return None
         
         # 最近2週間とその前2週間の比較
-        recent_2weeks = sum(w.get('distance', 0) for w in recent_workouts[-14:])
-        previous_2weeks = sum(w.get('distance', 0) for w in recent_workouts[-28:-14])
-        
-        if previous_2weeks > 0:
-            increase_ratio = recent_2weeks / previous_2weeks
-            
-            if increase_ratio > 1.5:  # 50%以上の増加
-                severity = min(1.0, (increase_ratio - 1.5) / 0.5)
-                return RiskFactorAnalysis(
-                    factor=RiskFactor.RAPID_INCREASE,
-                    severity=severity,
-                    description=f"練習量が{increase_ratio:.1f}倍に急増しています",
-                    impact_on_risk=0.8,
-                    mitigation_strategy="週間走行距離を10%以内の増加に制限してください"
-                )
+        recent_2weeks = workload.window_load(14)
+        previous_2weeks = workload.window_load(14, offset=14)
+        increase_ratio = recent_2weeks / previous_2weeks if previous_2weeks > 0 else 0.0
+        acwr = workload.latest()['acwr']
+        
+        if increase_ratio > 1.5 or acwr > ACWR_DANGER:  # 50%以上の増加
+            severity = min(1.0, (max(increase_ratio, acwr) - 1.5) / 0.5)
+            return RiskFactorAnalysis(
+                factor=RiskFactor.RAPID_INCREASE,
+                severity=severity,
+                description=f"練習量が{max(increase_ratio, acwr):.1f}倍に急増しています（急性:慢性負荷比 {acwr:.2f}）",
+                impact_on_risk=0.8,
+                mitigation_strategy="週間走行距離を10%以内の増加に制限してください"
+            )
         
         return None
     
     def _analyze_high_frequency(
         self,
         user_data: Dict[str, Any],
-        recent_workouts: List[Dict[str, Any]]
+        workload: WorkloadMetrics
     ) -> Optional[RiskFactorAnalysis]:
         """高頻度練習の分析"""
-        if len(recent_workouts) < 7:
+        if workload.days == 0:
             return None
         
         # 最近1週間の練習頻度
-        recent_week = recent_workouts[-7:]
-        frequency = len(recent_week)
+        frequency = workload.window_count(7)
         
         if frequency > 5:  # 週5回以上
             severity = min(1.0, (frequency - 5) / 2)  # 週7回で最大
@@ -454,37 +545,28 @@ class InjuryPredictor:
     def _analyze_insufficient_recovery(
         self,
         user_data: Dict[str, Any],
-        recent_workouts: List[Dict[str, Any]]
+        workload: WorkloadMetrics
     ) -> Optional[RiskFactorAnalysis]:
-        """回復不足の分析"""
-        if len(recent_workouts) < 7:
+        """回復不足の分析（連続練習日数と週内の負荷の単調さ）"""
+        if workload.days < 7:
             return None
         
-        # 連続練習日の分析
-        consecutive_days = 0
-        max_consecutive = 0
+        # 直近4週間の最大連続練習日数
+        max_consecutive = workload.max_streak(CHRONIC_WINDOW_DAYS)
+        monotony = workload.latest()['monotony']
         
-        for i in range(len(recent_workouts) - 1):
-            current_date = recent_workouts[i].get('date', datetime.now())
-            next_date = recent_workouts[i + 1].get('date', datetime.now())
-            
-            if isinstance(current_date, str):
-                current_date = datetime.fromisoformat(current_date)
-            if isinstance(next_date, str):
-                next_date = datetime.fromisoformat(next_date)
-            
-            if (next_date - current_date).days == 1:
-                consecutive_days += 1
-                max_consecutive = max(max_consecutive, consecutive_days)
-            else:
-                consecutive_days = 0
+        streak_severity = min(1.0, (max_consecutive - 4) / 3) if max_consecutive > 4 else 0.0  # 5日以上連続
+        monotony_severity = min(1.0, (monotony - 2.0) / 2.0) if monotony > 2.0 else 0.0  # Foster の目安
         
-        if max_consecutive > 3:  # 3日以上連続
-            severity = min(1.0, (max_consecutive - 3) / 3)
+        if streak_severity > 0 or monotony_severity > 0:
+            if streak_severity >= monotony_severity:
+                description = f"{max_consecutive}日連続で練習を行っています"
+            else:
+                description = f"練習負荷の変化が乏しく、回復の機会が不足しています（モノトニー {monotony:.1f}）"
             return RiskFactorAnalysis(
                 factor=RiskFactor.INSUFFICIENT_RECOVERY,
-                severity=severity,
-                description=f"{max_consecutive}日連続で練習を行っています",
+                severity=max(streak_severity, monotony_severity),
+                description=description,
                 impact_on_risk=0.7,
                 mitigation_strategy="適切な休養日を設けてください"
             )
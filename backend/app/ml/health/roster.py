@@ -0,0 +1,99 @@
+"""
+チーム単位の健康評価に使う選手×日の構造体配列
+
+このモジュールには以下の機能が含まれます：
+- 選手×日の日次データ（練習負荷・コンディション記録）の保持
+- 欠測（NaN）を含む配列の直近値・傾き・標準偏差のベクトル計算
+
+ConditionAnalyzer / InjuryPredictor / TrainingConditionCorrelator のバッチ評価はこの配列を入力とします。
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List
+
+import numpy as np
+
+
+@dataclass
+class RosterHealthData:
+    """選手×日の日次データ（各配列の形状は (選手数, 日数)、欠測は NaN）"""
+    user_ids: List[str]
+    start_date: date
+    distance: np.ndarray  # 日次走行距離（km）
+    training_load: np.ndarray  # 日次負荷（距離×強度、強度は0-1）
+    workout_counts: np.ndarray  # 日次練習回数
+    avg_pace: np.ndarray  # 日次平均ペース（秒/km）
+    fatigue_level: np.ndarray  # 疲労度（1-10）
+    sleep_quality: np.ndarray  # 睡眠の質（1-10）
+    sleep_duration_hours: np.ndarray  # 睡眠時間（時間）
+    motivation_level: np.ndarray  # モチベーション（1-10）
+    stress_level: np.ndarray  # ストレスレベル（1-10）
+
+    @property
+    def num_athletes(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def days(self) -> int:
+        return self.distance.shape[-1]
+
+    @property
+    def end_date(self) -> date:
+        return self.start_date + timedelta(days=self.days - 1)
+
+
+def latest_observed(values: np.ndarray, lookback: int) -> np.ndarray:
+    """
+    直近 lookback 日以内で最後に観測された値
+
+    Args:
+        values: (選手数, 日数) の配列（欠測は NaN）
+        lookback: 遡る日数
+
+    Returns:
+        選手ごとの値（期間内に観測がなければ NaN）
+    """
+    window = values[:, -lookback:]
+    observed = ~np.isnan(window)
+    last_index = window.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    latest = window[np.arange(window.shape[0]), last_index]
+    return np.where(observed.any(axis=1), latest, np.nan)
+
+
+def nan_slope(values: np.ndarray, min_observations: int = 3) -> np.ndarray:
+    """
+    欠測を除いた日付オフセットに対する回帰の傾き（単位/日）
+
+    Args:
+        values: (選手数, 日数) の配列（欠測は NaN）
+        min_observations: 傾きを計算する最小観測数
+
+    Returns:
+        選手ごとの傾き（観測数が足りない選手は 0）
+    """
+    observed = ~np.isnan(values)
+    n = observed.sum(axis=1)
+    x = np.broadcast_to(np.arange(values.shape[1], dtype=np.float64), values.shape)
+    y = np.where(observed, values, 0.0)
+    x = np.where(observed, x, 0.0)
+
+    sum_x = x.sum(axis=1)
+    sum_y = y.sum(axis=1)
+    denominator = n * (x * x).sum(axis=1) - sum_x ** 2
+    numerator = n * (x * y).sum(axis=1) - sum_x * sum_y
+
+    slope = np.zeros(values.shape[0])
+    valid = (n >= min_observations) & (np.abs(denominator) > 1e-9)
+    np.divide(numerator, denominator, out=slope, where=valid)
+    return slope
+
+
+def nan_std(values: np.ndarray, min_observations: int = 3) -> np.ndarray:
+    """欠測を除いた母標準偏差（観測数が足りない選手は NaN）"""
+    observed = ~np.isnan(values)
+    n = observed.sum(axis=1)
+    mean = np.where(observed, values, 0.0).sum(axis=1) / np.maximum(n, 1)
+    centered = np.where(observed, values - mean[:, None], 0.0)
+    std = np.sqrt((centered ** 2).sum(axis=1) / np.maximum(n, 1))
+    return np.where(n >= min_observations, std, np.nan)
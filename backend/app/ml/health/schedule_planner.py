@@ -0,0 +1,255 @@
+"""
+疲労状態を考慮した練習スケジュールの探索
+
+このモジュールには以下の機能が含まれます：
+- 1日の練習選択による疲労の状態遷移と準備度のベクトル計算
+- (日, 疲労バケット) 上のビームサーチ（バケットごとに上位 k 件を残す動的計画法）
+- 準備度で重み付けした練習負荷が大きい上位 k 件のスケジュールの取得
+- レイテンシ予算を超えた場合の貪欲法による残り日数の補完
+
+各日の選択肢は TrainingConditionCorrelator._determine_workout_suggestion と同じく
+休養・軽い練習・中程度・高強度の4つで、その日の体調で許される最大強度以下から選ぶ。
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 練習の選択肢（強度の昇順）。distance_factor は1回の標準距離に対する倍率
+WORKOUT_OPTIONS = (
+    {'workout_type': 'rest', 'intensity': 0.0, 'distance_factor': 0.0,
+     'recommended': False, 'reason': '体調不良のため休息を推奨'},
+    {'workout_type': 'easy', 'intensity': 0.4, 'distance_factor': 1.0,
+     'recommended': True, 'reason': '軽い練習を推奨'},
+    {'workout_type': 'moderate', 'intensity': 0.6, 'distance_factor': 1.0,
+     'recommended': True, 'reason': '中程度の練習を推奨'},
+    {'workout_type': 'high_intensity', 'intensity': 0.8, 'distance_factor': 0.8,
+     'recommended': True, 'reason': '体調良好、高強度練習可能'},
+)
+REST, EASY, MODERATE, HIGH_INTENSITY = range(len(WORKOUT_OPTIONS))
+
+MIN_HORIZON_DAYS = 1
+MAX_HORIZON_DAYS = 28
+
+DEFAULT_BEAM_WIDTH = 512
+DEFAULT_FATIGUE_BUCKET = 0.1
+DEFAULT_LATENCY_BUDGET_MS = 50.0
+
+# 期間末の疲労が目標を上回った分に対するペナルティ（負荷の単位）
+DEFAULT_FATIGUE_CARRYOVER_WEIGHT = 2.0
+
+# 日ごとの練習後の疲労が目標から離れるほどのペナルティ（休みすぎ・詰め込みすぎを避ける）
+DEFAULT_FATIGUE_TARGET = 5.0
+DEFAULT_FATIGUE_DEVIATION_WEIGHT = 0.2
+
+
+def training_readiness(
+    fatigue: np.ndarray,
+    energy: np.ndarray,
+    sleep_quality: float,
+    stress_level: float
+) -> np.ndarray:
+    """トレーニング準備度（TrainingConditionCorrelator._calculate_training_readiness と同じ重み）"""
+    readiness = energy * 0.3 + sleep_quality * 0.25 + (10 - fatigue) * 0.25 + (10 - stress_level) * 0.2
+    return np.clip(readiness, 1, 10)
+
+
+def max_allowed_option(readiness: np.ndarray, fatigue: np.ndarray, energy: np.ndarray) -> np.ndarray:
+    """体調で許される最大強度の選択肢（_determine_workout_suggestion と同じしきい値）"""
+    return np.select(
+        [(readiness < 4) | (fatigue > 7), (readiness >= 8) & (energy >= 7), readiness >= 6],
+        [REST, HIGH_INTENSITY, MODERATE],
+        default=EASY
+    )
+
+
+@dataclass
+class ScheduleCandidate:
+    """探索で得たスケジュール1件"""
+    options: np.ndarray  # 日ごとの選択肢のインデックス
+    fatigue: np.ndarray  # 日ごとの練習前の疲労
+    readiness: np.ndarray  # 日ごとの練習前の準備度
+    score: float  # 準備度で重み付けした負荷の合計 - 疲労のペナルティ
+    total_load: float
+
+
+@dataclass
+class ScheduleSearchResult:
+    """スケジュール探索の結果"""
+    candidates: List[ScheduleCandidate]
+    elapsed_ms: float
+    within_budget: bool  # False なら予算超過後の日は貪欲法で補完
+    expanded_states: int
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+class WorkoutSchedulePlanner:
+    """疲労バケット上のビームサーチによるスケジュール探索"""
+
+    def __init__(
+        self,
+        beam_width: int = DEFAULT_BEAM_WIDTH,
+        fatigue_bucket: float = DEFAULT_FATIGUE_BUCKET,
+        fatigue_carryover_weight: float = DEFAULT_FATIGUE_CARRYOVER_WEIGHT,
+        fatigue_target: float = DEFAULT_FATIGUE_TARGET,
+        fatigue_deviation_weight: float = DEFAULT_FATIGUE_DEVIATION_WEIGHT
+    ):
+        """
+        初期化
+
+        Args:
+            beam_width: 各日に残す部分スケジュールの最大数
+            fatigue_bucket: 疲労の状態を同一視する幅
+            fatigue_carryover_weight: 期間末の疲労が目標を上回った分1あたりのペナルティ
+            fatigue_target: 練習後の疲労の目標
+            fatigue_deviation_weight: 練習後の疲労の目標からの差の2乗に対するペナルティ
+        """
+        self.beam_width = beam_width
+        self.fatigue_bucket = fatigue_bucket
+        self.fatigue_carryover_weight = fatigue_carryover_weight
+        self.fatigue_target = fatigue_target
+        self.fatigue_deviation_weight = fatigue_deviation_weight
+
+    def search(
+        self,
+        initial_fatigue: float,
+        energy_by_day: np.ndarray,
+        sleep_quality: float,
+        stress_level: float,
+        fatigue_gains: np.ndarray,
+        loads: np.ndarray,
+        daily_recovery: float,
+        top_k: int = 3,
+        latency_budget_ms: float = DEFAULT_LATENCY_BUDGET_MS
+    ) -> ScheduleSearchResult:
+        """
+        準備度で重み付けした負荷が最大になるスケジュールを探索
+
+        各日は練習前の疲労から準備度と許される選択肢を決め、選択肢ごとの報酬
+        （準備度/10 × 負荷 - 練習後の疲労の目標からの差の2乗のペナルティ）と翌日の疲労を
+        部分スケジュール×選択肢の配列でまとめて計算する。
+        同じ疲労バケットに入った部分スケジュールは上位 top_k 件だけを残すため、
+        top_k=1 なら (日, 疲労バケット) 上の動的計画法と同じになる。
+
+        Args:
+            initial_fatigue: 1日目の練習前の疲労（1-10）
+            energy_by_day: 日ごとのエネルギーレベル（長さが期間の日数）
+            sleep_quality: 睡眠の質（1-10）
+            stress_level: ストレスレベル（1-10）
+            fatigue_gains: 選択肢ごとの疲労の増加
+            loads: 選択肢ごとの練習負荷（距離km × 強度）
+            daily_recovery: 1日あたりの疲労回復量
+            top_k: 返すスケジュール数
+            latency_budget_ms: 探索の時間予算（ミリ秒）
+
+        Returns:
+            スコアの高い順のスケジュールと探索の統計
+        """
+        started = time.perf_counter()
+        energy_by_day = np.asarray(energy_by_day, dtype=np.float64)
+        fatigue_gains = np.asarray(fatigue_gains, dtype=np.float64)
+        loads = np.asarray(loads, dtype=np.float64)
+        horizon = len(energy_by_day)
+        num_options = len(loads)
+        option_index = np.arange(num_options)
+
+        # ビーム: 部分スケジュールごとの現在の疲労・スコア・直前の日のビーム内の位置
+        fatigue = np.array([float(initial_fatigue)])
+        scores = np.zeros(1)
+        parents: List[np.ndarray] = []
+        choices: List[np.ndarray] = []
+        fatigue_history: List[np.ndarray] = []
+        readiness_history: List[np.ndarray] = []
+        within_budget = True
+        expanded = 0
+
+        for day in range(horizon):
+            readiness = training_readiness(fatigue, energy_by_day[day], sleep_quality, stress_level)
+            allowed = option_index[None, :] <= max_allowed_option(readiness, fatigue, energy_by_day[day])[:, None]
+
+            if within_budget and (time.perf_counter() - started) * 1000 > latency_budget_ms:
+                within_budget = False
+            if not within_budget:
+                # 予算超過後は各部分スケジュールを最大強度で延長する
+                allowed = option_index[None, :] == allowed.sum(axis=1, keepdims=True) - 1
+
+            # (ビーム, 選択肢) の翌日の疲労と報酬
+            next_fatigue = np.clip(fatigue[:, None] + fatigue_gains[None, :] - daily_recovery, 1, 10)
+            rewards = (
+                readiness[:, None] / 10 * loads[None, :]
+                - self.fatigue_deviation_weight * (next_fatigue - self.fatigue_target) ** 2
+            )
+            candidate_scores = np.where(allowed, scores[:, None] + rewards, -np.inf)
+
+            parent, choice = np.nonzero(allowed)
+            candidate_scores = candidate_scores[parent, choice]
+            candidate_fatigue = next_fatigue[parent, choice]
+            expanded += len(parent)
+
+            keep = self._select(candidate_fatigue, candidate_scores, top_k if within_budget else 1)
+
+            parents.append(parent[keep])
+            choices.append(choice[keep])
+            fatigue_history.append(fatigue[parent[keep]])
+            readiness_history.append(readiness[parent[keep]])
+            fatigue = candidate_fatigue[keep]
+            scores = candidate_scores[keep]
+
+        final_scores = scores - self.fatigue_carryover_weight * np.maximum(fatigue - self.fatigue_target, 0.0)
+        order = np.argsort(-final_scores, kind='stable')[:top_k]
+        candidates = [self._backtrack(int(i), parents, choices, fatigue_history, readiness_history,
+                                      loads, float(final_scores[i])) for i in order]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return ScheduleSearchResult(
+            candidates=candidates,
+            elapsed_ms=elapsed_ms,
+            within_budget=within_budget,
+            expanded_states=expanded,
+            stats={'horizon_days': horizon, 'beam_width': self.beam_width, 'fatigue_bucket': self.fatigue_bucket}
+        )
+
+    def _select(self, fatigue: np.ndarray, scores: np.ndarray, per_bucket: int) -> np.ndarray:
+        """疲労バケットごとにスコア上位 per_bucket 件、全体で beam_width 件を残す"""
+        buckets = np.round(fatigue / self.fatigue_bucket).astype(np.int64)
+        order = np.lexsort((-scores, buckets))
+        sorted_buckets = buckets[order]
+        first = np.searchsorted(sorted_buckets, sorted_buckets, side='left')
+        rank = np.arange(len(order)) - first
+        kept = order[rank < per_bucket]
+        if len(kept) > self.beam_width:
+            kept = kept[np.argpartition(-scores[kept], self.beam_width - 1)[:self.beam_width]]
+        return kept
+
+    @staticmethod
+    def _backtrack(
+        index: int,
+        parents: List[np.ndarray],
+        choices: List[np.ndarray],
+        fatigue_history: List[np.ndarray],
+        readiness_history: List[np.ndarray],
+        loads: np.ndarray,
+        score: float
+    ) -> ScheduleCandidate:
+        """最終日のビーム内の位置から日ごとの選択をたどる"""
+        horizon = len(choices)
+        options = np.zeros(horizon, dtype=np.int64)
+        fatigue = np.zeros(horizon)
+        readiness = np.zeros(horizon)
+        for day in range(horizon - 1, -1, -1):
+            options[day] = choices[day][index]
+            fatigue[day] = fatigue_history[day][index]
+            readiness[day] = readiness_history[day][index]
+            index = int(parents[day][index])
+        return ScheduleCandidate(
+            options=options,
+            fatigue=fatigue,
+            readiness=readiness,
+            score=score,
+            total_load=float(loads[options].sum())
+        )
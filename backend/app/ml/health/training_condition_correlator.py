@@ -16,6 +16,15 @@ from datetime import datetime, timedelta, date
 from dataclasses import dataclass
 import logging
 
+from app.ml.health.roster import RosterHealthData, nan_slope, nan_std
+from app.ml.health.schedule_planner import (
+    DEFAULT_LATENCY_BUDGET_MS,
+    MAX_HORIZON_DAYS,
+    MIN_HORIZON_DAYS,
+    WORKOUT_OPTIONS,
+    WorkoutSchedulePlanner,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -310,6 +319,77 @@ class TrainingConditionCorrelator:
             logger.error(f"Failed to analyze health patterns: {e}")
             raise RuntimeError(f"健康パターン分析に失敗しました: {e}")
     
+    def analyze_health_patterns_batch(self, roster: RosterHealthData) -> Dict[str, Any]:
+        """
+        チーム全体の健康パターン分析（analyze_health_patterns のバッチ版）
+        
+        体調記録は暦日で並べるため、記録のない日は計算から除外する。
+        期間内の記録が7日未満の選手は pattern_type を "insufficient_data" とする。
+        
+        Args:
+            roster: 選手×日の日次データ
+            
+        Returns:
+            選手ごとのパターンタイプ・各指標・リスク要因フラグ
+        """
+        try:
+            logger.info(f"Analyzing health patterns for {roster.num_athletes} athletes")
+            
+            fatigue = roster.fatigue_level
+            records = (~np.isnan(fatigue)).sum(axis=1)
+            
+            # 疲労トレンド（直近7日間）
+            fatigue_trend = nan_slope(fatigue[:, -7:]) / 10.0
+            
+            # 回復効率（連続する2日の記録で疲労が減少した割合の平均）
+            previous, current = fatigue[:, :-1], fatigue[:, 1:]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                recovering = (previous > current) & (previous > 0)
+                rates = np.where(recovering, (previous - current) / previous, 0.0)
+            recovery_count = recovering.sum(axis=1)
+            recovery_efficiency = np.full(roster.num_athletes, 0.5)
+            np.divide(rates.sum(axis=1), recovery_count, out=recovery_efficiency, where=recovery_count > 0)
+            
+            # 睡眠の一貫性・モチベーションの安定性（直近7日間）
+            sleep_std = nan_std(roster.sleep_duration_hours[:, -7:])
+            sleep_consistency = np.where(np.isnan(sleep_std), 0.5, np.minimum(1.0, 1.0 / (1.0 + np.nan_to_num(sleep_std))))
+            motivation_std = nan_std(roster.motivation_level[:, -7:])
+            motivation_stability = np.where(
+                np.isnan(motivation_std), 0.5, np.minimum(1.0, 1.0 / (1.0 + np.nan_to_num(motivation_std)))
+            )
+            
+            risk_factors = {
+                'fatigue_accumulation': fatigue_trend > 0.3,
+                'low_recovery_efficiency': recovery_efficiency < 0.3,
+                'unstable_sleep': sleep_consistency < 0.5,
+                'unstable_motivation': motivation_stability < 0.5,
+            }
+            risk_factor_count = np.sum(list(risk_factors.values()), axis=0)
+            
+            pattern_type = np.select(
+                [
+                    records < 7,
+                    (risk_factor_count >= 3) | (fatigue_trend > 0.5),
+                    (risk_factor_count >= 2) | (recovery_efficiency < 0.4),
+                ],
+                ["insufficient_data", "critical", "concerning"],
+                default="healthy"
+            )
+            
+            return {
+                'pattern_type': pattern_type,
+                'fatigue_trend': fatigue_trend,
+                'recovery_efficiency': recovery_efficiency,
+                'sleep_consistency': sleep_consistency,
+                'motivation_stability': motivation_stability,
+                'risk_factors': risk_factors,
+                'condition_records': records
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to analyze health patterns batch: {e}")
+            raise RuntimeError(f"チームの健康パターン分析に失敗しました: {e}")
+    
     def suggest_optimal_workout_schedule(
         self,
         current_condition: Dict[str, Any],
@@ -327,34 +407,102 @@ class TrainingConditionCorrelator:
         Returns:
             推奨練習スケジュール
         """
-        try:
-            logger.info(f"Suggesting optimal workout schedule for {days_ahead} days")
+        return self.suggest_workout_schedules(current_condition, user_profile, days_ahead, top_k=1)[0]['schedule']
+    
+    def suggest_workout_schedules(
+        self,
+        current_condition: Dict[str, Any],
+        user_profile: Dict[str, Any],
+        days_ahead: int = 7,
+        top_k: int = 3,
+        latency_budget_ms: float = DEFAULT_LATENCY_BUDGET_MS
+    ) -> List[Dict[str, Any]]:
+        """
+        練習による疲労の蓄積を考慮した上位 k 件の練習スケジュールを提案
+        
+        日ごとに貪欲に決めるのではなく、(日, 疲労バケット) 上のビームサーチで
+        期間全体の準備度で重み付けした練習負荷が大きいスケジュールを探す。
+        
+        Args:
+            current_condition: 現在の体調
+            user_profile: ユーザープロフィール
+            days_ahead: 先読み日数（1-28）
+            top_k: 返すスケジュール数
+            latency_budget_ms: 探索の時間予算（ミリ秒）
             
-            schedule = []
-            current_fatigue = current_condition.get('fatigue_level', 5)
-            current_energy = current_condition.get('energy_level', 7)
-            current_motivation = current_condition.get('motivation_level', 7)
+        Returns:
+            スコアの高い順のスケジュール（'schedule' は日ごとの予測体調と練習提案）
+        """
+        if not MIN_HORIZON_DAYS <= days_ahead <= MAX_HORIZON_DAYS:
+            raise ValueError(f"先読み日数は{MIN_HORIZON_DAYS}-{MAX_HORIZON_DAYS}日で指定してください")
+        
+        try:
+            logger.info(f"Suggesting {top_k} workout schedules for {days_ahead} days")
+            
+            recovery_ability = user_profile.get('recovery_ability', 0.5)
+            session_distance = user_profile.get('weekly_distance', 30) / max(user_profile.get('training_frequency', 5), 1)
+            pace = user_profile.get('avg_pace', 330)
+            
+            distances = np.array([option['distance_factor'] * session_distance for option in WORKOUT_OPTIONS])
+            intensities = np.array([option['intensity'] for option in WORKOUT_OPTIONS])
+            fatigue_gains = np.array([
+                self._calculate_fatigue_impact(intensity, distance, distance * pace / 60, user_profile)
+                for intensity, distance in zip(intensities, distances)
+            ])
+            
+            # エネルギーは _predict_daily_condition と同じく日数に比例して回復する
+            energy_by_day = np.minimum(
+                10.0, current_condition.get('energy_level', 7) + recovery_ability * 0.3 * np.arange(days_ahead)
+            )
             
-            for day in range(days_ahead):
-                # その日の体調を予測
-                predicted_condition = self._predict_daily_condition(
-                    current_condition, day, user_profile
-                )
-                
-                # 練習の可否と強度を決定
-                workout_suggestion = self._determine_workout_suggestion(
-                    predicted_condition, user_profile
-                )
-                
-                schedule.append({
-                    'day': day + 1,
-                    'date': (datetime.now() + timedelta(days=day)).date(),
-                    'predicted_condition': predicted_condition,
-                    'workout_suggestion': workout_suggestion
+            result = WorkoutSchedulePlanner().search(
+                initial_fatigue=current_condition.get('fatigue_level', 5),
+                energy_by_day=energy_by_day,
+                sleep_quality=current_condition.get('sleep_quality_score', 7),
+                stress_level=current_condition.get('stress_level', 5),
+                fatigue_gains=fatigue_gains,
+                loads=intensities * distances,
+                daily_recovery=recovery_ability * 0.5,
+                top_k=top_k,
+                latency_budget_ms=latency_budget_ms
+            )
+            if not result.within_budget:
+                logger.warning(f"Schedule search exceeded {latency_budget_ms}ms; remaining days filled greedily")
+            
+            start = datetime.now().date()
+            schedules = []
+            for candidate in result.candidates:
+                schedule = []
+                for day, option_index in enumerate(candidate.options):
+                    option = WORKOUT_OPTIONS[option_index]
+                    predicted_condition = current_condition.copy()
+                    predicted_condition.update({
+                        'fatigue_level': round(float(candidate.fatigue[day]), 1),
+                        'energy_level': round(float(energy_by_day[day]), 1),
+                        'training_readiness': round(float(candidate.readiness[day]), 1)
+                    })
+                    schedule.append({
+                        'day': day + 1,
+                        'date': start + timedelta(days=day),
+                        'predicted_condition': predicted_condition,
+                        'workout_suggestion': {
+                            'recommended': option['recommended'],
+                            'reason': option['reason'],
+                            'intensity': option['intensity'],
+                            'workout_type': option['workout_type'],
+                            'distance_km': round(float(distances[option_index]), 1)
+                        }
+                    })
+                schedules.append({
+                    'score': candidate.score,
+                    'total_load': candidate.total_load,
+                    'within_budget': result.within_budget,
+                    'schedule': schedule
                 })
             
-            logger.info(f"Workout schedule suggested for {len(schedule)} days")
-            return schedule
+            logger.info(f"Workout schedules suggested in {result.elapsed_ms:.1f}ms "
+                        f"({result.expanded_states} states expanded)")
+            return schedules
             
         except Exception as e:
             logger.error(f"Failed to suggest workout schedule: {e}")
@@ -0,0 +1,370 @@
+"""
+日次練習負荷から急性・慢性負荷を計算するワークロードエンジン
+
+このモジュールには以下の機能が含まれます：
+- 日付付きの練習データを日次の密な負荷配列に変換
+- 急性負荷（7日）・慢性負荷（28日）の指数加重移動平均（EWMA）
+- 急性:慢性負荷比（ACWR）
+- Foster のモノトニー（週内の日次負荷の平均/標準偏差）とストレイン（週間負荷×モノトニー）
+- 連続練習日数
+
+すべての系列は日数に比例する1回のベクトル演算で計算し、最後の軸を日付軸として
+（選手数, 日数）の2次元配列もそのまま扱えます。
+InjuryPredictor / ConditionAnalyzer / EffectivenessAnalyzer はこのエンジンを共有します。
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+logger = logging.getLogger(__name__)
+
+ACUTE_WINDOW_DAYS = 7
+CHRONIC_WINDOW_DAYS = 28
+MONOTONY_WINDOW_DAYS = 7
+
+# 7日間の負荷が一定（標準偏差0）の場合のモノトニー上限
+MAX_MONOTONY = 10.0
+
+# ACWR の目安（0.8-1.3 が適正、1.5 超で怪我リスクが急増）
+ACWR_SWEET_SPOT_MIN = 0.8
+ACWR_SWEET_SPOT_MAX = 1.3
+ACWR_DANGER = 1.5
+
+
+def distance_load(workout: Dict[str, Any]) -> float:
+    """走行距離をそのまま負荷とする"""
+    return float(workout.get('distance', 0) or 0)
+
+
+def intensity_weighted_load(workout: Dict[str, Any]) -> float:
+    """距離×強度を負荷とする（強度未指定は0.5）"""
+    return float(workout.get('distance', 0) or 0) * float(workout.get('intensity', 0.5))
+
+
+def _to_date(value: Any) -> Optional[date]:
+    """ISO文字列・datetime・date を date に変換"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            return None
+    return None
+
+
+def ewma_alpha(span_days: int) -> float:
+    """期間 N 日の EWMA の平滑化係数 2 / (N + 1)"""
+    return 2.0 / (span_days + 1)
+
+
+def ewma(values: np.ndarray, alpha: float, initial: float = 0.0) -> np.ndarray:
+    """
+    指数加重移動平均 y[t] = alpha * x[t] + (1 - alpha) * y[t-1]
+
+    Args:
+        values: 日次の値（最後の軸が日付）
+        alpha: 平滑化係数
+        initial: 系列開始前日の値
+
+    Returns:
+        values と同じ形状の EWMA
+    """
+    values = np.asarray(values, dtype=np.float64)
+    zi = np.full(values.shape[:-1] + (1,), (1.0 - alpha) * initial)
+    smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=-1, zi=zi)
+    return smoothed
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """各日を末尾とする window 日間の合計（系列開始前は0として扱う）"""
+    values = np.asarray(values, dtype=np.float64)
+    cumulative = np.cumsum(values, axis=-1)
+    shifted = np.zeros_like(cumulative)
+    shifted[..., window:] = cumulative[..., :-window]
+    return cumulative - shifted
+
+
+def consecutive_day_streak(active: np.ndarray) -> np.ndarray:
+    """各日を末尾とする連続練習日数（その日が休養日なら0）"""
+    active = np.asarray(active, dtype=bool)
+    index = np.broadcast_to(np.arange(active.shape[-1]), active.shape)
+    last_rest_day = np.maximum.accumulate(np.where(active, -1, index), axis=-1)
+    return index - last_rest_day
+
+
+@dataclass
+class DailyLoadSeries:
+    """開始日からの日次負荷と練習回数（ワークアウトのない日は0）"""
+    start_date: date
+    loads: np.ndarray
+    counts: np.ndarray
+
+    @property
+    def end_date(self) -> date:
+        return self.start_date + timedelta(days=self.loads.shape[-1] - 1)
+
+
+def densify_daily_loads(
+    day_offsets: np.ndarray,
+    loads: np.ndarray,
+    num_days: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    日付オフセット付きの負荷を日次の密な配列に集計
+
+    Args:
+        day_offsets: 開始日からの日数（0 <= offset < num_days）
+        loads: 各練習の負荷
+        num_days: 配列の日数
+
+    Returns:
+        (日次負荷, 日次練習回数)
+    """
+    day_offsets = np.asarray(day_offsets, dtype=np.int64)
+    daily_loads = np.bincount(day_offsets, weights=np.asarray(loads, dtype=np.float64), minlength=num_days)
+    daily_counts = np.bincount(day_offsets, minlength=num_days)
+    return daily_loads[:num_days], daily_counts[:num_days]
+
+
+def build_daily_load_series(
+    workouts: Iterable[Dict[str, Any]],
+    load_fn: Callable[[Dict[str, Any]], float] = distance_load,
+    end_date: Optional[date] = None
+) -> DailyLoadSeries:
+    """
+    練習データのリストから日次負荷系列を作成
+
+    日付のない練習は集計対象外。同じ日の複数回の練習は合算する。
+
+    Args:
+        workouts: 'date' を持つ練習データ
+        load_fn: 練習1件の負荷を返す関数
+        end_date: 系列の最終日（デフォルト: 今日と最終練習日の遅い方）
+
+    Returns:
+        最初の練習日から end_date までの日次負荷系列
+    """
+    dates: List[date] = []
+    loads: List[float] = []
+    for workout in workouts:
+        workout_date = _to_date(workout.get('date'))
+        if workout_date is None:
+            continue
+        dates.append(workout_date)
+        loads.append(load_fn(workout))
+
+    return daily_load_series_from_arrays(dates, np.asarray(loads, dtype=np.float64), end_date)
+
+
+def daily_load_series_from_arrays(
+    dates: Iterable[Any],
+    loads: np.ndarray,
+    end_date: Optional[date] = None
+) -> DailyLoadSeries:
+    """
+    日付と負荷の配列から日次負荷系列を作成
+
+    負荷をベクトル演算でまとめて計算した呼び出し元向け。日付が None の要素は集計対象外。
+
+    Args:
+        dates: 各練習の日付（ISO文字列・datetime・date）
+        loads: 各練習の負荷
+        end_date: 系列の最終日（デフォルト: 今日と最終練習日の遅い方）
+
+    Returns:
+        最初の練習日から end_date までの日次負荷系列
+    """
+    parsed = [_to_date(value) for value in dates]
+    valid = np.fromiter((d is not None for d in parsed), dtype=bool, count=len(parsed))
+    loads = np.asarray(loads, dtype=np.float64)[valid]
+
+    end_date = _to_date(end_date) or date.today()
+    if not valid.any():
+        return DailyLoadSeries(start_date=end_date, loads=np.zeros(0), counts=np.zeros(0, dtype=np.int64))
+
+    ordinals = np.fromiter((d.toordinal() for d in parsed if d is not None), dtype=np.int64, count=len(loads))
+    start_ordinal = int(ordinals.min())
+    end_ordinal = max(end_date.toordinal(), int(ordinals.max()))
+
+    daily_loads, daily_counts = densify_daily_loads(
+        ordinals - start_ordinal, loads, end_ordinal - start_ordinal + 1
+    )
+    return DailyLoadSeries(start_date=date.fromordinal(start_ordinal), loads=daily_loads, counts=daily_counts)
+
+
+@dataclass
+class WorkloadMetrics:
+    """日次のワークロード指標（各配列の最後の軸が日付）"""
+    start_date: date
+    loads: np.ndarray
+    counts: np.ndarray
+    acute_load: np.ndarray
+    chronic_load: np.ndarray
+    acwr: np.ndarray  # 慢性負荷が確立していない日は NaN
+    weekly_load: np.ndarray
+    monotony: np.ndarray
+    strain: np.ndarray
+    streak: np.ndarray
+
+    @property
+    def days(self) -> int:
+        return self.loads.shape[-1]
+
+    def window_load(self, days: int, offset: int = 0) -> float:
+        """最終日から offset 日前を末尾とする days 日間の負荷合計（1次元系列用）"""
+        end = self.days - offset
+        return float(self.loads[max(0, end - days):max(0, end)].sum())
+
+    def window_count(self, days: int, offset: int = 0) -> int:
+        """最終日から offset 日前を末尾とする days 日間の練習回数（1次元系列用）"""
+        end = self.days - offset
+        return int(self.counts[max(0, end - days):max(0, end)].sum())
+
+    def max_streak(self, days: int) -> int:
+        """直近 days 日間の最大連続練習日数（1次元系列用）"""
+        if self.days == 0:
+            return 0
+        return int(self.streak[-days:].max())
+
+    def latest(self) -> Dict[str, float]:
+        """最終日の指標（1次元系列用）"""
+        if self.days == 0:
+            return {
+                'acute_load': 0.0, 'chronic_load': 0.0, 'acwr': 0.0,
+                'weekly_load': 0.0, 'monotony': 0.0, 'strain': 0.0, 'streak': 0
+            }
+        acwr = self.acwr[-1]
+        return {
+            'acute_load': float(self.acute_load[-1]),
+            'chronic_load': float(self.chronic_load[-1]),
+            'acwr': 0.0 if np.isnan(acwr) else float(acwr),
+            'weekly_load': float(self.weekly_load[-1]),
+            'monotony': float(self.monotony[-1]),
+            'strain': float(self.strain[-1]),
+            'streak': int(self.streak[-1])
+        }
+
+
+class WorkloadEngine:
+    """急性・慢性負荷エンジン"""
+
+    def __init__(
+        self,
+        acute_days: int = ACUTE_WINDOW_DAYS,
+        chronic_days: int = CHRONIC_WINDOW_DAYS,
+        monotony_days: int = MONOTONY_WINDOW_DAYS
+    ):
+        """
+        初期化
+
+        Args:
+            acute_days: 急性負荷の EWMA 期間（日）
+            chronic_days: 慢性負荷の EWMA 期間（日）
+            monotony_days: モノトニー・ストレイン・週間負荷の集計期間（日）
+        """
+        self.acute_days = acute_days
+        self.chronic_days = chronic_days
+        self.monotony_days = monotony_days
+
+    def compute(
+        self,
+        loads: np.ndarray,
+        counts: Optional[np.ndarray] = None,
+        start_date: Optional[date] = None
+    ) -> WorkloadMetrics:
+        """
+        日次負荷配列からワークロード指標を計算
+
+        系列開始前は負荷0とみなし、ACWR は慢性負荷の期間分の履歴がそろった日以降のみ定義する。
+
+        Args:
+            loads: 日次負荷（最後の軸が日付。(選手数, 日数) も可）
+            counts: 日次練習回数（省略時は負荷 > 0 の日を1回とみなす）
+            start_date: loads[..., 0] の日付
+
+        Returns:
+            ワークロード指標
+        """
+        loads = np.asarray(loads, dtype=np.float64)
+        counts = (loads > 0).astype(np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        num_days = loads.shape[-1]
+        start_date = start_date or date.today() - timedelta(days=num_days - 1)
+
+        if num_days == 0:
+            empty = np.zeros(loads.shape)
+            return WorkloadMetrics(
+                start_date=start_date, loads=loads, counts=counts,
+                acute_load=empty, chronic_load=empty, acwr=empty, weekly_load=empty,
+                monotony=empty, strain=empty, streak=np.zeros(loads.shape, dtype=np.int64)
+            )
+
+        acute = ewma(loads, ewma_alpha(self.acute_days))
+        chronic = ewma(loads, ewma_alpha(self.chronic_days))
+
+        acwr = np.full(loads.shape, np.nan)
+        established = np.zeros(loads.shape, dtype=bool)
+        established[..., self.chronic_days - 1:] = True
+        established &= chronic > 0
+        np.divide(acute, chronic, out=acwr, where=established)
+
+        weekly_load = rolling_sum(loads, self.monotony_days)
+
+        # 系列開始前の日を0で埋めて、各日を末尾とする週の平均・標準偏差を求める
+        padded = np.concatenate(
+            [np.zeros(loads.shape[:-1] + (self.monotony_days - 1,)), loads], axis=-1
+        )
+        windows = sliding_window_view(padded, self.monotony_days, axis=-1)
+        daily_mean = weekly_load / self.monotony_days
+        daily_std = windows.std(axis=-1)
+
+        monotony = np.where(daily_mean > 0, MAX_MONOTONY, 0.0)
+        np.divide(daily_mean, daily_std, out=monotony, where=daily_std > 1e-9)
+        np.minimum(monotony, MAX_MONOTONY, out=monotony)
+        strain = weekly_load * monotony
+
+        return WorkloadMetrics(
+            start_date=start_date,
+            loads=loads,
+            counts=counts,
+            acute_load=acute,
+            chronic_load=chronic,
+            acwr=acwr,
+            weekly_load=weekly_load,
+            monotony=monotony,
+            strain=strain,
+            streak=consecutive_day_streak(counts > 0)
+        )
+
+    def compute_series(self, series: DailyLoadSeries) -> WorkloadMetrics:
+        """DailyLoadSeries からワークロード指標を計算"""
+        return self.compute(series.loads, series.counts, series.start_date)
+
+    def compute_for_workouts(
+        self,
+        workouts: Iterable[Dict[str, Any]],
+        load_fn: Callable[[Dict[str, Any]], float] = distance_load,
+        end_date: Optional[date] = None
+    ) -> WorkloadMetrics:
+        """
+        練習データのリストからワークロード指標を計算
+
+        Args:
+            workouts: 'date' を持つ練習データ
+            load_fn: 練習1件の負荷を返す関数
+            end_date: 系列の最終日（デフォルト: 今日と最終練習日の遅い方）
+
+        Returns:
+            ワークロード指標
+        """
+        return self.compute_series(build_daily_load_series(workouts, load_fn, end_date))
@@ -0,0 +1,185 @@
+"""
+モデルアーティファクトの保存・読み込み
+
+このモジュールには学習済みモデルファイルの入出力が含まれます：
+- メモリマップ可能な非圧縮形式での保存
+- アーティファクトのフォーマットバージョン記録（サイドカーJSON）
+- mmap_mode='r' による読み込み（同一ホストのワーカー間でページキャッシュを共有）
+- 旧形式（メタデータなし）アーティファクトの互換読み込み
+"""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import joblib
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# アーティファクトのフォーマットバージョン
+# 1: 旧形式（圧縮の有無不明・メタデータなし）
+# 2: 非圧縮joblib + サイドカーメタデータ（mmap対応）
+ARTIFACT_FORMAT_VERSION = 2
+LEGACY_FORMAT_VERSION = 1
+MMAP_MIN_FORMAT_VERSION = 2
+
+METADATA_SUFFIX = ".meta.json"
+
+PathLike = Union[str, Path]
+
+
+def get_metadata_path(artifact_path: PathLike) -> Path:
+    """
+    アーティファクトに対応するメタデータファイルのパスを取得
+
+    Args:
+        artifact_path: アーティファクトのパス
+
+    Returns:
+        メタデータファイルのパス
+    """
+    artifact_path = Path(artifact_path)
+    return artifact_path.with_name(artifact_path.name + METADATA_SUFFIX)
+
+
+def save_model_artifact(obj: Any, artifact_path: PathLike, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    モデルをメモリマップ可能な形式で保存
+
+    NumPy配列を圧縮せずに書き出すため、読み込み時に mmap_mode='r' で
+    ページキャッシュ上の同一コピーを複数プロセスから参照できる。
+    書き込みは一時ファイル経由の置き換えで行い、読み込み中のワーカーが
+    書きかけのファイルを開くことはない。
+
+    Args:
+        obj: 保存するオブジェクト（モデル・スケーラー等）
+        artifact_path: 保存先パス
+        metadata: 追加で記録するメタデータ
+
+    Returns:
+        記録したメタデータ辞書
+    """
+    artifact_path = Path(artifact_path)
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=artifact_path.parent, prefix=f".{artifact_path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp_path, compress=0)
+        os.replace(tmp_path, artifact_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    artifact_metadata = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'mmap_compatible': True,
+        'object_type': f"{type(obj).__module__}.{type(obj).__name__}",
+        'size_bytes': artifact_path.stat().st_size,
+        'numpy_version': np.__version__,
+        'joblib_version': joblib.__version__,
+        'saved_at': datetime.now().isoformat()
+    }
+    try:
+        import sklearn
+        artifact_metadata['sklearn_version'] = sklearn.__version__
+    except ImportError:
+        pass
+
+    if metadata:
+        artifact_metadata.update(metadata)
+
+    metadata_path = get_metadata_path(artifact_path)
+    tmp_metadata_path = metadata_path.with_name(f".{metadata_path.name}.tmp")
+    with open(tmp_metadata_path, 'w') as f:
+        json.dump(artifact_metadata, f, indent=2, default=str)
+    os.replace(tmp_metadata_path, metadata_path)
+
+    logger.info(f"Saved model artifact to {artifact_path} (format v{ARTIFACT_FORMAT_VERSION})")
+    return artifact_metadata
+
+
+def get_artifact_metadata(artifact_path: PathLike) -> Dict[str, Any]:
+    """
+    アーティファクトのメタデータを取得
+
+    メタデータが存在しない旧形式のアーティファクトはフォーマットバージョン1として扱う。
+
+    Args:
+        artifact_path: アーティファクトのパス
+
+    Returns:
+        メタデータ辞書
+    """
+    metadata_path = get_metadata_path(artifact_path)
+
+    if not metadata_path.exists():
+        return {'format_version': LEGACY_FORMAT_VERSION, 'mmap_compatible': False}
+
+    try:
+        with open(metadata_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Failed to read artifact metadata {metadata_path}: {e}")
+        return {'format_version': LEGACY_FORMAT_VERSION, 'mmap_compatible': False}
+
+
+def is_mmap_compatible(artifact_path: PathLike) -> bool:
+    """
+    アーティファクトがメモリマップで読み込めるかを判定
+
+    Args:
+        artifact_path: アーティファクトのパス
+
+    Returns:
+        メモリマップ可能な場合True
+    """
+    metadata = get_artifact_metadata(artifact_path)
+    return (
+        metadata.get('format_version', LEGACY_FORMAT_VERSION) >= MMAP_MIN_FORMAT_VERSION
+        and bool(metadata.get('mmap_compatible', False))
+    )
+
+
+def load_model_artifact(artifact_path: PathLike, mmap: Optional[bool] = None) -> Any:
+    """
+    モデルアーティファクトを読み込み
+
+    Args:
+        artifact_path: アーティファクトのパス
+        mmap: メモリマップで読み込むか（Noneの場合は設定値に従う）
+
+    Returns:
+        読み込まれたオブジェクト
+    """
+    artifact_path = Path(artifact_path)
+    use_mmap = settings.ml_models_mmap if mmap is None else mmap
+
+    if use_mmap and is_mmap_compatible(artifact_path):
+        logger.debug(f"Loading model artifact {artifact_path} with mmap_mode='r'")
+        return joblib.load(artifact_path, mmap_mode='r')
+
+    return joblib.load(artifact_path)
+
+
+def convert_model_artifact(artifact_path: PathLike, output_path: Optional[PathLike] = None) -> Dict[str, Any]:
+    """
+    旧形式のアーティファクトを現行フォーマットに変換
+
+    Args:
+        artifact_path: 変換元のパス
+        output_path: 出力先パス（省略時は上書き）
+
+    Returns:
+        記録したメタデータ辞書
+    """
+    obj = joblib.load(artifact_path)
+    return save_model_artifact(obj, output_path or artifact_path)
@@ -0,0 +1,256 @@
+"""
+プロセス内の学習済みモデルのキャッシュ
+
+このモジュールには以下の機能が含まれます：
+- モデルアーティファクトのプロセス内キャッシュ（ファイルの更新日時・サイズで置き換えを検出）
+- アクティブなモデル（AIModel.is_active）との照合と、非アクティブになったモデルの破棄
+- 種目ごとのモデル・スケーラーの読み込み
+- Celery ワーカープロセス起動時（worker_process_init）の一括プリロード
+
+prefork のワーカープロセスは API プロセスとモデルを共有しないため、プロセスの起動時に
+アクティブなモデルと全種目のモデル・スケーラーを読み込んでおき、最初のタスクから
+読み込みなしで推論できるようにする。アクティブなモデルの照合は
+settings.model_cache_check_seconds ごとに1回のクエリで行う。
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.ml.model_artifacts import PathLike, load_model_artifact
+from app.models.ai import AIModel
+
+logger = logging.getLogger(__name__)
+
+# ModelTrainingService が種目ごとのモデル・スケーラーを保存するディレクトリ
+EVENT_MODEL_DIR = "models"
+EVENT_SCALER_DIR = "scalers"
+# RaceTimePredictor が種目ごとのアンサンブルモデルを保存するディレクトリ
+ENSEMBLE_MODEL_DIR = "ml_models"
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """ファイルの (更新日時, サイズ)（存在しない場合は None）"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class WarmModelCache:
+    """プロセス内の学習済みモデルのキャッシュ
+
+    アーティファクトはパスごとに (更新日時, サイズ) と一緒に保持し、学習ジョブが
+    ファイルを置き換えた場合は次の取得時に読み直す。AIModel の行から読み込んだモデルは
+    モデルIDごとに保持し、アクティブでなくなったモデルは照合時に破棄する。
+    """
+
+    def __init__(self):
+        self._artifacts: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._model_paths: Dict[str, str] = {}  # モデルID -> アーティファクトのパス
+        self._active_versions: Dict[str, Any] = {}  # アクティブなモデルID -> updated_at
+        self._checked_at: Optional[float] = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.loads = 0
+
+    def load_artifact(self, path: PathLike) -> Optional[Any]:
+        """
+        アーティファクトを読み込み（キャッシュ済みでファイルが変わっていなければ再利用）
+
+        Args:
+            path: アーティファクトのパス
+
+        Returns:
+            読み込まれたオブジェクト、ファイルがない場合はNone
+        """
+        path = Path(path)
+        key = str(path.resolve())
+        signature = _file_signature(path)
+        if signature is None:
+            with self._lock:
+                self._artifacts.pop(key, None)
+            return None
+
+        with self._lock:
+            cached = self._artifacts.get(key)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return cached[1]
+
+            obj = load_model_artifact(path)
+            self._artifacts[key] = (signature, obj)
+            self.loads += 1
+            return obj
+
+    def load_event_model(
+        self,
+        event: str,
+        model_dir: str = EVENT_MODEL_DIR,
+        scaler_dir: str = EVENT_SCALER_DIR
+    ) -> Tuple[Optional[Any], Optional[Any]]:
+        """
+        種目のモデルとスケーラーを取得（どちらかがなければ (None, None)）
+
+        Args:
+            event: 種目（TargetEventEnum の値）
+            model_dir: モデルのディレクトリ
+            scaler_dir: スケーラーのディレクトリ
+
+        Returns:
+            (モデル, スケーラー)
+        """
+        model_path = Path(model_dir) / f"{event}_model.joblib"
+        scaler_path = Path(scaler_dir) / f"{event}_scaler.joblib"
+        if not model_path.exists() or not scaler_path.exists():
+            return None, None
+        return self.load_artifact(model_path), self.load_artifact(scaler_path)
+
+    def get_model(self, db: Session, model_id: str) -> Optional[Any]:
+        """
+        AIModel の行のモデルを取得（アーティファクトがない場合はNone）
+
+        キャッシュするのはアクティブなモデルだけで、非アクティブなモデルは照合で破棄されないため
+        キャッシュせずに毎回読み込む。
+
+        Args:
+            db: データベースセッション
+            model_id: モデルID
+
+        Returns:
+            読み込まれたモデル
+        """
+        self.check_active_models(db)
+        with self._lock:
+            path = self._model_paths.get(model_id)
+        if path is not None:
+            return self.load_artifact(path)
+
+        row = db.query(AIModel.model_path, AIModel.is_active).filter(AIModel.id == model_id).first()
+        if row is None or not row.model_path:
+            return None
+        if not row.is_active:
+            if _file_signature(Path(row.model_path)) is None:
+                return None
+            return load_model_artifact(row.model_path)
+
+        # 前回の照合の後にアクティブになったモデル（次の照合で破棄の対象にもなる）
+        with self._lock:
+            self._model_paths[model_id] = row.model_path
+        return self.load_artifact(row.model_path)
+
+    def check_active_models(self, db: Session, force: bool = False) -> bool:
+        """
+        アクティブなモデルと照合（settings.model_cache_check_seconds 以内の再照合は省略）
+
+        新しくアクティブになったモデルを読み込み、アクティブでなくなったモデルを破棄する。
+
+        Args:
+            db: データベースセッション
+            force: 間隔に関係なく照合するか
+
+        Returns:
+            アクティブなモデルが変わった場合True
+        """
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < settings.model_cache_check_seconds:
+            return False
+
+        rows = db.query(AIModel.id, AIModel.model_path, AIModel.updated_at).filter(AIModel.is_active.is_(True)).all()
+        versions = {row.id: row.updated_at for row in rows}
+
+        with self._lock:
+            self._checked_at = now
+            # 照合の間に get_model がキャッシュしたモデルも含めて、アクティブでないものを破棄する
+            for model_id in (set(self._active_versions) | set(self._model_paths)) - set(versions):
+                path = self._model_paths.pop(model_id, None)
+                if path is not None:
+                    self._artifacts.pop(str(Path(path).resolve()), None)
+            if versions == self._active_versions:
+                return False
+            self._active_versions = versions
+
+        for row in rows:
+            if row.model_path:
+                with self._lock:
+                    self._model_paths[row.id] = row.model_path
+                try:
+                    self.load_artifact(row.model_path)
+                except Exception as e:
+                    logger.error(f"Failed to load active model {row.id}: {str(e)}")
+
+        logger.info(f"Active models changed: {len(versions)} active")
+        return True
+
+    def preload(self, db: Session, events: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        アクティブなモデルと全種目のモデル・スケーラーを読み込む
+
+        Args:
+            db: データベースセッション
+            events: 種目（デフォルト: TargetEventEnum の全種目）
+
+        Returns:
+            読み込んだ件数
+        """
+        if events is None:
+            from app.schemas.prediction import TargetEventEnum
+            events = [event.value for event in TargetEventEnum]
+
+        loads_before = self.loads
+        self.check_active_models(db, force=True)
+
+        event_models = 0
+        for event in events:
+            try:
+                model, scaler = self.load_event_model(event)
+                event_models += model is not None
+            except Exception as e:
+                logger.error(f"Failed to preload model for {event}: {str(e)}")
+
+        ensemble_models = 0
+        for model_file in sorted(Path(ENSEMBLE_MODEL_DIR).glob("*_model.joblib")):
+            try:
+                ensemble_models += self.load_artifact(model_file) is not None
+            except Exception as e:
+                logger.error(f"Failed to preload model {model_file}: {str(e)}")
+
+        summary = {
+            "active_models": len(self._active_versions),
+            "event_models": event_models,
+            "ensemble_models": ensemble_models,
+            "artifacts_loaded": self.loads - loads_before
+        }
+        logger.info(f"Preloaded models in process {os.getpid()}: {summary}")
+        return summary
+
+    def stats(self) -> Dict[str, int]:
+        """キャッシュの統計"""
+        with self._lock:
+            return {
+                "artifacts": len(self._artifacts),
+                "active_models": len(self._active_versions),
+                "hits": self.hits,
+                "loads": self.loads
+            }
+
+    def clear(self) -> None:
+        """キャッシュをすべて破棄"""
+        with self._lock:
+            self._artifacts.clear()
+            self._model_paths.clear()
+            self._active_versions.clear()
+            self._checked_at = None
+            self.hits = 0
+            self.loads = 0
+
+
+# プロセスごとのキャッシュ（Celery ワーカーでは worker_process_init でプリロードする）
+warm_model_cache = WarmModelCache()
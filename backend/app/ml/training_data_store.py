@@ -0,0 +1,128 @@
+"""
+処理済みトレーニングデータの列指向バイナリ形式
+
+このモジュールには以下の機能が含まれます：
+- 処理済みデータ（DataFrame）の列ごとの NumPy 配列としての保存（{event}_processed.npz）
+- CSV をパースせずに DataFrame を復元する読み込み
+- 種目ごとの読み込み（CSV より新しい .npz があればそれを使い、なければ CSV を読む）
+
+scripts/prepare_ml_training_data.py が CSV と同じディレクトリに .npz を書き出し、
+RaceTimePredictor / SimpleRaceTimePredictor はこのモジュール経由で読み込む。
+追加の依存パッケージなしで扱えるよう、形式は非圧縮の .npz（列ごとに1配列）にしている。
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+CSV_SUFFIX = "_processed.csv"
+COLUMNAR_SUFFIX = "_processed.npz"
+_COLUMNS_KEY = "__columns__"
+
+
+def columnar_path(data_dir: PathLike, event: str) -> Path:
+    """種目の列指向ファイルのパス"""
+    return Path(data_dir) / f"{event}{COLUMNAR_SUFFIX}"
+
+
+def save_columnar(df: pd.DataFrame, path: PathLike) -> Path:
+    """
+    DataFrame を列ごとの配列として保存
+
+    数値列はそのまま、文字列列は Unicode 配列と欠損のマスクとして保存する（pickle を使わない）。
+    書き込みは一時ファイル経由の置き換えで行う。
+
+    Args:
+        df: 保存する DataFrame
+        path: 保存先（.npz）
+
+    Returns:
+        保存先のパス
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = {_COLUMNS_KEY: np.array([str(col) for col in df.columns], dtype=str)}
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            arrays[f"c{i}"] = series.to_numpy()
+        else:
+            # 文字列列は欠損のマスクと一緒に保存する
+            missing = series.isna().to_numpy()
+            arrays[f"c{i}"] = series.astype(object).where(~missing, "").to_numpy().astype(str)
+            arrays[f"m{i}"] = missing
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def load_columnar(path: PathLike) -> pd.DataFrame:
+    """
+    save_columnar で保存した DataFrame を読み込み
+
+    Args:
+        path: 列指向ファイルのパス
+
+    Returns:
+        DataFrame（列の順序・dtype は保存時と同じ）
+    """
+    with np.load(path, allow_pickle=False) as data:
+        columns = [str(col) for col in data[_COLUMNS_KEY]]
+        series = {}
+        for i, col in enumerate(columns):
+            values = pd.Series(data[f"c{i}"])
+            if f"m{i}" in data.files:
+                values = values.where(~data[f"m{i}"])
+            series[col] = values
+        return pd.DataFrame(series, columns=columns)
+
+
+def load_processed_frames(data_dir: PathLike) -> Dict[str, pd.DataFrame]:
+    """
+    ディレクトリ内の全種目の処理済みデータを読み込み
+
+    CSV と同時かそれより新しい .npz がある種目は .npz から、それ以外は CSV から読み込む。
+
+    Args:
+        data_dir: 処理済みデータのディレクトリ
+
+    Returns:
+        種目別のDataFrame辞書
+    """
+    data_dir = Path(data_dir)
+    events = sorted(
+        {p.name[:-len(CSV_SUFFIX)] for p in data_dir.glob(f"*{CSV_SUFFIX}")}
+        | {p.name[:-len(COLUMNAR_SUFFIX)] for p in data_dir.glob(f"*{COLUMNAR_SUFFIX}")}
+    )
+
+    frames = {}
+    for event in events:
+        csv_file = data_dir / f"{event}{CSV_SUFFIX}"
+        npz_file = columnar_path(data_dir, event)
+        try:
+            if npz_file.exists() and (not csv_file.exists() or npz_file.stat().st_mtime >= csv_file.stat().st_mtime):
+                frames[event] = load_columnar(npz_file)
+            else:
+                frames[event] = pd.read_csv(csv_file)
+            logger.info(f"Loaded {len(frames[event])} records for {event}")
+        except Exception as e:
+            logger.error(f"Failed to load processed data for {event}: {e}")
+    return frames
@@ -0,0 +1,290 @@
+"""
+練習負荷ロールアップからの特徴量計算
+
+workout_daily_rollups（ユーザー×日の件数・合計・二乗和）だけを読み、
+ワークアウト単位の平均・標準偏差・強度分布・回帰トレンド・練習間隔の一貫性を計算します。
+計算量は期間内の日数に比例し、ワークアウト数には依存しません。
+
+FeatureStoreService / FeatureStore / AIPredictionEngine の特徴量計算はすべてこのモジュールを経由します。
+"""
+
+import math
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.training_load import WorkoutDailyRollup
+
+
+class MomentAccumulator:
+    """件数・合計・二乗和から平均と母標準偏差を求める累積器"""
+
+    __slots__ = ('n', 'total', 'sq_total')
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.sq_total = 0.0
+
+    def add(self, total: float, sq_total: float, count: int = 1):
+        self.n += count
+        self.total += total
+        self.sq_total += sq_total
+
+    def remove(self, total: float, sq_total: float, count: int = 1):
+        self.n -= count
+        self.total -= total
+        self.sq_total -= sq_total
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n > 0 else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.n <= 0:
+            return 0.0
+        variance = self.sq_total / self.n - self.mean ** 2
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+
+class RegressionAccumulator:
+    """
+    単回帰（最小二乗）の十分統計量 n, Σx, Σy, Σx², Σxy
+
+    同じ x（日付オフセット）を持つ count 件の観測値を合計 y_sum としてまとめて追加できるため、
+    日次ロールアップ1行の追加・削除が O(1) で、傾きは np.polyfit(x, y, 1)[0] と一致する。
+    """
+
+    __slots__ = ('n', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy')
+
+    def __init__(self):
+        self.n = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.sum_xx = 0.0
+        self.sum_xy = 0.0
+
+    def add(self, x: float, y_sum: float, count: int = 1):
+        self.n += count
+        self.sum_x += count * x
+        self.sum_y += y_sum
+        self.sum_xx += count * x * x
+        self.sum_xy += x * y_sum
+
+    def remove(self, x: float, y_sum: float, count: int = 1):
+        self.add(x, -y_sum, -count)
+
+    @property
+    def slope(self) -> float:
+        if self.n < 2:
+            return 0.0
+        denominator = self.n * self.sum_xx - self.sum_x ** 2
+        # 全観測が同じ x の場合は傾きを定義できない
+        if abs(denominator) <= 1e-9 * max(1.0, self.n * self.sum_xx):
+            return 0.0
+        return (self.n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+
+def load_daily_rollups(db: Session, user_id: Any, start_date: date, end_date: date) -> List[WorkoutDailyRollup]:
+    """
+    期間内のロールアップ行を日付順に取得
+
+    Args:
+        db: データベースセッション
+        user_id: ユーザーID
+        start_date: 開始日（含む）
+        end_date: 終了日（含む）
+
+    Returns:
+        WorkoutDailyRollup のリスト（ワークアウトのない日は含まない）
+    """
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+
+    return db.query(WorkoutDailyRollup).filter(
+        WorkoutDailyRollup.user_id == str(user_id),
+        WorkoutDailyRollup.date >= start_date,
+        WorkoutDailyRollup.date <= end_date,
+        WorkoutDailyRollup.workout_count > 0
+    ).order_by(WorkoutDailyRollup.date).all()
+
+
+def load_daily_rollups_bulk(db: Session, user_ids: Iterable[Any], start_date: date,
+                            end_date: date) -> Dict[str, List[WorkoutDailyRollup]]:
+    """
+    複数ユーザーの期間内のロールアップ行を1回のクエリで取得
+
+    Args:
+        db: データベースセッション
+        user_ids: ユーザーID
+        start_date: 開始日（含む）
+        end_date: 終了日（含む）
+
+    Returns:
+        ユーザーIDごとの日付順の WorkoutDailyRollup のリスト（ロールアップのないユーザーは含まない）
+    """
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+
+    user_ids = [str(user_id) for user_id in user_ids]
+    by_user: Dict[str, List[WorkoutDailyRollup]] = {}
+    if not user_ids:
+        return by_user
+
+    rows = db.query(WorkoutDailyRollup).filter(
+        WorkoutDailyRollup.user_id.in_(user_ids),
+        WorkoutDailyRollup.date >= start_date,
+        WorkoutDailyRollup.date <= end_date,
+        WorkoutDailyRollup.workout_count > 0
+    ).order_by(WorkoutDailyRollup.user_id, WorkoutDailyRollup.date)
+
+    for rollup in rows:
+        by_user.setdefault(rollup.user_id, []).append(rollup)
+    return by_user
+
+
+def calculate_training_load_features(rollups: Iterable[WorkoutDailyRollup]) -> Dict[str, float]:
+    """
+    日次ロールアップから練習負荷特徴量を計算
+
+    統計量はすべてワークアウト単位（1日に複数回練習した場合はそれぞれ1件）で、
+    トレンドは日付オフセット（日）に対する回帰の傾き（単位/日）。
+
+    Args:
+        rollups: 日付昇順の WorkoutDailyRollup
+
+    Returns:
+        特徴量辞書（単位: 距離 m、時間 秒、ペース 秒/km）
+    """
+    distance = MomentAccumulator()
+    duration = MomentAccumulator()
+    pace = MomentAccumulator()
+    intensity = MomentAccumulator()
+    heart_rate = MomentAccumulator()
+    gaps = MomentAccumulator()
+
+    distance_trend = RegressionAccumulator()
+    duration_trend = RegressionAccumulator()
+    pace_trend = RegressionAccumulator()
+    intensity_trend = RegressionAccumulator()
+
+    total_workouts = 0
+    active_days = 0
+    easy = tempo = interval = race = 0
+    max_distance: Optional[float] = None
+    min_distance: Optional[float] = None
+    max_heart_rate: Optional[float] = None
+    total_calories = 0.0
+    total_ascent = 0.0
+    first_date: Optional[date] = None
+    previous_date: Optional[date] = None
+
+    for rollup in rollups:
+        if not rollup.workout_count:
+            continue
+        if first_date is None:
+            first_date = rollup.date
+        x = float((rollup.date - first_date).days)
+
+        total_workouts += rollup.workout_count
+        active_days += 1
+
+        # 練習間隔: 同日内の複数回練習は間隔0日として数える
+        same_day_gaps = rollup.workout_count - 1
+        gaps.add(0.0, 0.0, same_day_gaps)
+        if previous_date is not None:
+            gap = float((rollup.date - previous_date).days)
+            gaps.add(gap, gap * gap)
+        previous_date = rollup.date
+
+        if rollup.distance_count:
+            distance.add(rollup.distance_sum, rollup.distance_sq_sum, rollup.distance_count)
+            distance_trend.add(x, rollup.distance_sum, rollup.distance_count)
+            max_distance = rollup.distance_max if max_distance is None else max(max_distance, rollup.distance_max)
+            min_distance = rollup.distance_min if min_distance is None else min(min_distance, rollup.distance_min)
+
+        if rollup.duration_count:
+            duration.add(rollup.duration_sum, 0.0, rollup.duration_count)
+            duration_trend.add(x, rollup.duration_sum, rollup.duration_count)
+
+        if rollup.pace_count:
+            pace.add(rollup.pace_sum, rollup.pace_sq_sum, rollup.pace_count)
+            pace_trend.add(x, rollup.pace_sum, rollup.pace_count)
+
+        if rollup.intensity_count:
+            intensity.add(rollup.intensity_sum, rollup.intensity_sq_sum, rollup.intensity_count)
+            intensity_trend.add(x, rollup.intensity_sum, rollup.intensity_count)
+            easy += rollup.easy_count
+            tempo += rollup.tempo_count
+            interval += rollup.interval_count
+            race += rollup.race_intensity_count
+
+        if rollup.heart_rate_count:
+            heart_rate.add(rollup.heart_rate_sum, 0.0, rollup.heart_rate_count)
+            max_heart_rate = rollup.heart_rate_max if max_heart_rate is None else max(max_heart_rate, rollup.heart_rate_max)
+
+        total_calories += rollup.calories_sum or 0.0
+        total_ascent += rollup.ascent_sum or 0.0
+
+    span_days = (previous_date - first_date).days if first_date is not None else 0
+    span_weeks = max(1.0, span_days / 7)
+
+    return {
+        'total_workouts': total_workouts,
+        'active_days': active_days,
+        'span_days': span_days,
+        'total_distance': distance.total,
+        'avg_distance': distance.mean,
+        'distance_std': distance.std,
+        'max_distance': max_distance or 0.0,
+        'min_distance': min_distance or 0.0,
+        'total_duration': duration.total,
+        'avg_duration': duration.mean,
+        'pace_count': pace.n,
+        'avg_pace': pace.mean,
+        'pace_std': pace.std,
+        'intensity_count': intensity.n,
+        'avg_intensity': intensity.mean,
+        'intensity_std': intensity.std,
+        'easy_ratio': easy / intensity.n if intensity.n else 0.0,
+        'tempo_ratio': tempo / intensity.n if intensity.n else 0.0,
+        'interval_ratio': interval / intensity.n if intensity.n else 0.0,
+        'race_ratio': race / intensity.n if intensity.n else 0.0,
+        'avg_heart_rate': heart_rate.mean,
+        'max_heart_rate': max_heart_rate or 0.0,
+        'total_calories': total_calories,
+        'avg_calories': total_calories / total_workouts if total_workouts else 0.0,
+        'total_ascent': total_ascent,
+        'distance_trend': distance_trend.slope,
+        'duration_trend': duration_trend.slope,
+        'pace_trend': pace_trend.slope,
+        'intensity_trend': intensity_trend.slope,
+        'weekly_avg_distance': distance.total / span_weeks,
+        'weekly_avg_frequency': total_workouts / span_weeks,
+        'consistency_score': 1.0 / (1.0 + gaps.std) if gaps.n > 0 else 0.0,
+    }
+
+
+def calculate_user_training_load_features(db: Session, user_id: Any, days_back: int,
+                                          end_date: Optional[date] = None) -> Dict[str, float]:
+    """
+    ユーザーの直近 days_back 日の練習負荷特徴量を計算
+
+    Args:
+        db: データベースセッション
+        user_id: ユーザーID
+        days_back: 遡る日数
+        end_date: 期間の終了日（デフォルト: 今日）
+
+    Returns:
+        calculate_training_load_features と同じ特徴量辞書
+    """
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days_back)
+    return calculate_training_load_features(load_daily_rollups(db, user_id, start_date, end_date))
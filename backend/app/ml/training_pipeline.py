@@ -7,6 +7,7 @@
 - 全モデルの学習実行
 - モデル性能評価
 - 最良モデルの保存
+- 推論ランタイムへのエクスポート
 """
 
 import logging
@@ -23,6 +24,8 @@ from .predictors.random_forest_predictor import RandomForestPredictor
 from .predictors.gradient_boosting_predictor import GradientBoostingPredictor
 from .predictors.linear_regression_predictor import LinearRegressionPredictor
 from .predictors.ridge_regression_predictor import RidgeRegressionPredictor
+from .compiled_runtime import compile_predictor
+from .model_artifacts import save_model_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +46,7 @@ class TrainingPipeline:
         self.results: Dict[str, Dict[str, Any]] = {}
         self.best_model = None
         self.best_score = float('inf')
+        self.compiled_model = None
         
         logger.info("Training pipeline initialized")
     
@@ -227,12 +231,15 @@ class TrainingPipeline:
             logger.error(f"Failed to evaluate models: {str(e)}")
             raise RuntimeError(f"モデル評価に失敗しました: {str(e)}")
     
-    def save_best_model(self, metric: str = 'mae') -> Dict[str, Any]:
+    def save_best_model(self, metric: str = 'mae', export_path: Optional[str] = None) -> Dict[str, Any]:
         """
         最良モデルの保存
         
+        最良モデルはNumPyのみの推論ランタイム（compiled_runtime）にも変換される。
+        
         Args:
             metric: 評価指標名
+            export_path: 変換済みモデルの保存先（省略時は保存しない）
             
         Returns:
             最良モデル情報
@@ -248,13 +255,25 @@ class TrainingPipeline:
             self.best_model = self.models[best_name]['model']
             self.best_score = self.results[best_name]['test_metrics'][metric]
             
+            # 推論ランタイムへのエクスポート
+            self.compiled_model = compile_predictor(self.best_model)
+            
             best_model_info = {
                 'name': best_name,
                 'score': self.best_score,
                 'metrics': self.results[best_name]['test_metrics'],
-                'model': self.best_model
+                'model': self.best_model,
+                'compiled_model': self.compiled_model
             }
             
+            if self.compiled_model is not None and export_path:
+                save_model_artifact(
+                    self.compiled_model,
+                    export_path,
+                    metadata={'runtime': 'numpy', 'source_model': best_name}
+                )
+                best_model_info['compiled_model_path'] = export_path
+            
             logger.info(f"Best model selected: {best_name} with {metric}={self.best_score:.4f}")
             
             return best_model_info
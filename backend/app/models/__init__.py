@@ -1,6 +1,7 @@
 # モデルのインポート（循環インポートを避けるため、正しい順序でインポート）
 from .user import User
 from .workout import WorkoutType, Workout
+from .training_load import WorkoutDailyRollup
 from .prediction import Prediction
 from .race import RaceResult, RaceType
 from .user_profile import UserProfile
@@ -8,13 +9,19 @@ from .personal_best import PersonalBest
 from .race_schedule import RaceSchedule
 from .custom_workout import CustomWorkoutTemplate, CustomWorkoutPlan, CustomWorkoutPlanItem
 from .daily_metrics import DailyMetrics
+from . import metrics_rollup  # DailyMetrics の書き込みを週間・月間サマリーに反映するフック
 from .workout_import_data import WorkoutImportData
 from .ai import AIModel, PredictionResult, FeatureStore, TrainingMetrics, ModelTrainingJob, AISystemConfig
+from .data_version import UserDataVersion
+from .change_tracking import UserChangeTracking
+from .correlation_stats import UserCorrelationStats
+from .task_result import TaskResult, TaskResultItem
 
 __all__ = [
     "User", 
     "WorkoutType", 
     "Workout", 
+    "WorkoutDailyRollup", 
     "Prediction", 
     "RaceResult", 
     "RaceType", 
@@ -31,5 +38,10 @@ __all__ = [
     "FeatureStore",
     "TrainingMetrics",
     "ModelTrainingJob",
-    "AISystemConfig"
+    "AISystemConfig",
+    "UserDataVersion",
+    "UserChangeTracking",
+    "UserCorrelationStats",
+    "TaskResult",
+    "TaskResultItem"
 ]
\ No newline at end of file
@@ -138,9 +138,15 @@ class ModelTrainingJob(Base):
     algorithm = Column(String(100), comment="使用アルゴリズム")
     training_data_count = Column(Integer, comment="学習データ数")
     hyperparameters = Column(JSON, comment="ハイパーパラメータ")
+    spec_key = Column(String(64), index=True, comment="学習条件のキー（同じ条件の重複実行の判定用）")
+    
+    # 進捗
+    progress = Column(Float, default=0.0, comment="進捗（0-100）")
+    progress_message = Column(String(255), comment="進捗メッセージ")
     
     # 結果
     result_model_id = Column(Integer, ForeignKey("ai_models.id"), comment="結果モデルID")
+    result_model_ids = Column(JSON, comment="学習・アクティブ化したモデルIDのリスト")
     error_message = Column(Text, comment="エラーメッセージ")
     performance_metrics = Column(JSON, comment="性能指標")
     
@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import event, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.workout import Workout
+from app.models.race import RaceResult
+from app.models.daily_metrics import DailyMetrics
+from app.models.user_profile import UserProfile
+from app.models.data_version import changed_user_ids, track_previous_user_id
+
+
+# 書き込まれると特徴量・予測の再計算が必要になるモデル
+TRACKED_MODELS = (Workout, RaceResult, DailyMetrics, UserProfile)
+
+# user_id の付け替えで変更前のユーザーも再計算の対象にする
+track_previous_user_id(*TRACKED_MODELS)
+
+# select_dirty_users の kind と、比較する最終計算日時の列名
+REFRESH_KINDS = {'feature': 'last_feature_at', 'prediction': 'last_prediction_at'}
+
+
+class UserChangeTracking(Base):
+    """ユーザーごとのデータ変更と再計算の日時
+
+    Workout / RaceResult / DailyMetrics / UserProfile の追加・更新・削除のたびに after_flush フックで
+    last_data_change_at を更新する。last_data_change_at が last_feature_at（last_prediction_at）より
+    新しいユーザーだけが、定期実行の特徴量（予測）の再計算の対象になる。
+    """
+    __tablename__ = "user_change_tracking"
+
+    user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    last_data_change_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    last_feature_at = Column(DateTime(timezone=True), nullable=True)
+    last_prediction_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserChangeTracking(user_id={self.user_id}, last_data_change_at={self.last_data_change_at})>"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def mark_users_changed(connection, user_ids: Iterable[str], changed_at: Optional[datetime] = None) -> None:
+    """
+    指定したユーザーの last_data_change_at を更新する（行がなければ作成）
+
+    Args:
+        connection: SQLAlchemy Connection（呼び出し元のトランザクション内で実行）
+        user_ids: 対象ユーザーID
+        changed_at: 変更日時（デフォルト: 現在時刻）
+    """
+    user_ids = sorted(set(str(user_id) for user_id in user_ids))
+    if not user_ids:
+        return
+
+    changed_at = changed_at or _utcnow()
+    table = UserChangeTracking.__table__
+    dialect_insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(connection.dialect.name)
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values(
+            [{'user_id': user_id, 'last_data_change_at': changed_at} for user_id in user_ids]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={'last_data_change_at': stmt.excluded.last_data_change_at, 'updated_at': func.now()}
+        )
+        connection.execute(stmt)
+        return
+
+    connection.execute(
+        update(table).where(table.c.user_id.in_(user_ids)).values(last_data_change_at=changed_at, updated_at=func.now())
+    )
+    existing = set(connection.execute(select(table.c.user_id).where(table.c.user_id.in_(user_ids))).scalars())
+    missing = [{'user_id': user_id, 'last_data_change_at': changed_at} for user_id in user_ids if user_id not in existing]
+    if missing:
+        connection.execute(table.insert(), missing)
+
+
+def mark_users_refreshed(connection, kind: str, user_ids: Iterable[str], refreshed_at: datetime) -> None:
+    """
+    指定したユーザーの最終計算日時（kind: feature / prediction）を refreshed_at に更新する
+
+    refreshed_at は計算の開始前（データを読む前）の時刻を渡す。計算中に書き込まれた変更は
+    last_data_change_at の方が新しくなるため、次回も再計算の対象に残る。
+    変更の記録がないユーザー（行がないユーザー）は再計算の対象にならないため、行は作成しない。
+
+    Args:
+        connection: SQLAlchemy Connection（呼び出し元のトランザクション内で実行）
+        kind: 'feature' または 'prediction'
+        user_ids: 対象ユーザーID
+        refreshed_at: 計算の開始日時
+    """
+    column_name = REFRESH_KINDS[kind]
+    user_ids = sorted(set(str(user_id) for user_id in user_ids))
+    if not user_ids:
+        return
+
+    table = UserChangeTracking.__table__
+    column = table.c[column_name]
+    connection.execute(
+        update(table)
+        .where(table.c.user_id.in_(user_ids))
+        .where(or_(column.is_(None), column < refreshed_at))
+        .values({column_name: refreshed_at})
+    )
+
+
+def select_dirty_users(db: Session, kind: str, limit: Optional[int] = None) -> List[str]:
+    """
+    最後の計算以降にデータが変わったユーザーIDを、変更の古い順に取得
+
+    Args:
+        db: データベースセッション
+        kind: 'feature' または 'prediction'
+        limit: 最大件数
+
+    Returns:
+        ユーザーIDのリスト
+    """
+    column = getattr(UserChangeTracking, REFRESH_KINDS[kind])
+    query = (
+        select(UserChangeTracking.user_id)
+        .where(or_(column.is_(None), UserChangeTracking.last_data_change_at > column))
+        .order_by(UserChangeTracking.last_data_change_at, UserChangeTracking.user_id)
+    )
+    if limit:
+        query = query.limit(limit)
+    return list(db.execute(query).scalars())
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_users_changed_after_flush(session: Session, flush_context):
+    """特徴量・予測の入力データの書き込みを同一トランザクション内で変更日時に反映"""
+    user_ids = changed_user_ids(session, TRACKED_MODELS)
+    if user_ids:
+        mark_users_changed(session.connection(), user_ids)
@@ -0,0 +1,94 @@
+from sqlalchemy import Column, String, Date, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import event, inspect, update, bindparam
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from datetime import date as date_type
+from typing import Dict, Iterable, Tuple
+from app.core.database import Base
+from app.models.workout import Workout
+from app.models.daily_metrics import DailyMetrics
+
+# 相関統計の元データになるモデル（練習ロールアップは Workout から作られる）
+SOURCE_MODELS = (Workout, DailyMetrics)
+
+
+class UserCorrelationStats(Base):
+    """ユーザーごとのメトリクス間相関の累積統計
+
+    accumulators はメトリクスペアごとの co-moment（件数・平均・偏差平方和・共偏差積和）で、
+    through_date までの日次データを反映している。through_date 以前の Workout / DailyMetrics が
+    追加・更新・削除されると after_flush フックで needs_rebuild を立て、次の読み出しで再構築する。
+    """
+    __tablename__ = "user_correlation_stats"
+
+    user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    through_date = Column(Date, nullable=False)  # 反映済みの最終日
+    needs_rebuild = Column(Boolean, nullable=False, default=False)  # 反映済みの日が書き換えられた
+    accumulators = Column(JSON, nullable=False)  # {"x|y": [n, mean_x, mean_y, m2_x, m2_y, c_xy]}
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserCorrelationStats(user_id={self.user_id}, through_date='{self.through_date}')>"
+
+
+def _earliest_changed_dates(session: Session) -> Dict[str, date_type]:
+    """flush 対象の Workout / DailyMetrics から、ユーザーごとの変更された最も古い日を収集"""
+    earliest = {}
+
+    def add(user_id, day):
+        if user_id and day and (user_id not in earliest or day < earliest[user_id]):
+            earliest[user_id] = day
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, SOURCE_MODELS):
+            add(obj.user_id, obj.date)
+
+    for obj in session.dirty:
+        if not isinstance(obj, SOURCE_MODELS) or not session.is_modified(obj, include_collections=False):
+            continue
+        add(obj.user_id, obj.date)
+
+        # user_id / date の変更前の値は training_load / metrics_rollup / data_version の
+        # active_history リスナーで履歴に残っている
+        state = inspect(obj)
+        for old_user_id in state.attrs.user_id.history.deleted or [obj.user_id]:
+            for old_date in state.attrs.date.history.deleted or [obj.date]:
+                add(old_user_id, old_date)
+
+    return earliest
+
+
+def invalidate_correlation_stats(connection, keys: Iterable[Tuple[str, date_type]]) -> None:
+    """
+    反映済みの日が書き換えられたユーザーの相関統計に再構築フラグを立てる
+
+    ORM の after_flush フックを通らない一括 UPDATE / DELETE で Workout / DailyMetrics を
+    書き換えた場合は、同じトランザクション内でこの関数を呼ぶ。
+
+    Args:
+        connection: SQLAlchemy Connection（呼び出し元のトランザクション内で実行）
+        keys: 書き換えた (user_id, date) の組
+    """
+    earliest = {}
+    for user_id, day in keys:
+        user_id = str(user_id)
+        if user_id not in earliest or day < earliest[user_id]:
+            earliest[user_id] = day
+    if not earliest:
+        return
+
+    table = UserCorrelationStats.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.user_id == bindparam('changed_user_id'), table.c.through_date >= bindparam('changed_date'))
+        .values(needs_rebuild=True),
+        [{'changed_user_id': user_id, 'changed_date': day} for user_id, day in earliest.items()]
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_correlation_stats_after_flush(session: Session, flush_context):
+    """反映済みの日が書き換えられたユーザーの相関統計に再構築フラグを立てる"""
+    earliest = _earliest_changed_dates(session)
+    if earliest:
+        invalidate_correlation_stats(session.connection(), earliest.items())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, ForeignKey, JSON, Date
+from sqlalchemy import Column, String, DateTime, Integer, Float, Boolean, ForeignKey, JSON, Date, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -53,9 +53,57 @@ class DailyMetrics(Base):
     user = relationship("User")
 
 
-class WeeklyMetricsSummary(Base):
+class MetricsSummaryAccumulators:
+    """週間・月間サマリーの増分更新用の累積値
+
+    各メトリクスの件数・合計（トレンドを出す4項目は二乗和と、期間内の日オフセット x との
+    Σx・Σx²・Σxy も）を保持する。DailyMetrics の追加・更新・削除時に差分だけを加減算し、
+    平均・トレンド・データ完全性はこの累積値から再計算する（app/models/metrics_rollup.py）。
+    """
+    weight_kg_count = Column(Integer, nullable=False, default=0)
+    weight_kg_sum = Column(Float, nullable=False, default=0.0)
+    weight_kg_sq_sum = Column(Float, nullable=False, default=0.0)
+    weight_kg_x_sum = Column(Float, nullable=False, default=0.0)
+    weight_kg_x_sq_sum = Column(Float, nullable=False, default=0.0)
+    weight_kg_xy_sum = Column(Float, nullable=False, default=0.0)
+
+    sleep_duration_hours_count = Column(Integer, nullable=False, default=0)
+    sleep_duration_hours_sum = Column(Float, nullable=False, default=0.0)
+    sleep_duration_hours_sq_sum = Column(Float, nullable=False, default=0.0)
+    sleep_duration_hours_x_sum = Column(Float, nullable=False, default=0.0)
+    sleep_duration_hours_x_sq_sum = Column(Float, nullable=False, default=0.0)
+    sleep_duration_hours_xy_sum = Column(Float, nullable=False, default=0.0)
+
+    fatigue_level_count = Column(Integer, nullable=False, default=0)
+    fatigue_level_sum = Column(Float, nullable=False, default=0.0)
+    fatigue_level_sq_sum = Column(Float, nullable=False, default=0.0)
+    fatigue_level_x_sum = Column(Float, nullable=False, default=0.0)
+    fatigue_level_x_sq_sum = Column(Float, nullable=False, default=0.0)
+    fatigue_level_xy_sum = Column(Float, nullable=False, default=0.0)
+
+    motivation_level_count = Column(Integer, nullable=False, default=0)
+    motivation_level_sum = Column(Float, nullable=False, default=0.0)
+    motivation_level_sq_sum = Column(Float, nullable=False, default=0.0)
+    motivation_level_x_sum = Column(Float, nullable=False, default=0.0)
+    motivation_level_x_sq_sum = Column(Float, nullable=False, default=0.0)
+    motivation_level_xy_sum = Column(Float, nullable=False, default=0.0)
+
+    stress_level_count = Column(Integer, nullable=False, default=0)
+    stress_level_sum = Column(Float, nullable=False, default=0.0)
+    energy_level_count = Column(Integer, nullable=False, default=0)
+    energy_level_sum = Column(Float, nullable=False, default=0.0)
+    training_readiness_count = Column(Integer, nullable=False, default=0)
+    training_readiness_sum = Column(Float, nullable=False, default=0.0)
+    resting_heart_rate_count = Column(Integer, nullable=False, default=0)
+    resting_heart_rate_sum = Column(Float, nullable=False, default=0.0)
+
+
+class WeeklyMetricsSummary(MetricsSummaryAccumulators, Base):
     """週間メトリクスサマリー"""
     __tablename__ = "weekly_metrics_summary"
+    __table_args__ = (
+        UniqueConstraint("user_id", "week_start_date", name="uq_weekly_metrics_summary_user_week"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
@@ -90,9 +138,12 @@ class WeeklyMetricsSummary(Base):
     user = relationship("User")
 
 
-class MonthlyMetricsSummary(Base):
+class MonthlyMetricsSummary(MetricsSummaryAccumulators, Base):
     """月間メトリクスサマリー"""
     __tablename__ = "monthly_metrics_summary"
+    __table_args__ = (
+        UniqueConstraint("user_id", "year", "month", name="uq_monthly_metrics_summary_user_month"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,119 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from typing import Iterable, Set, Tuple, Type
+from app.core.database import Base
+from app.models.workout import Workout
+from app.models.daily_metrics import DailyMetrics
+from app.models.ai import FeatureStore
+
+
+# 書き込まれるとユーザーの分析結果が変わるモデル
+VERSIONED_MODELS = (Workout, DailyMetrics, FeatureStore)
+
+
+class UserDataVersion(Base):
+    """ユーザーごとのデータバージョン
+
+    Workout / DailyMetrics / FeatureStore の追加・更新・削除のたびに after_flush フックで
+    version を1増やす。分析結果のキャッシュは (user_id, 日付, version) をキーにするため、
+    書き込みがあればどのプロセスのキャッシュも自動的に無効になる。
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserDataVersion(user_id={self.user_id}, version={self.version})>"
+
+
+def get_user_data_version(db: Session, user_id: str) -> int:
+    """ユーザーの現在のデータバージョン（書き込みがまだなければ0）"""
+    version = db.execute(
+        select(UserDataVersion.version).where(UserDataVersion.user_id == str(user_id))
+    ).scalar()
+    return version or 0
+
+
+def bump_user_data_versions(connection, user_ids: Iterable[str]) -> None:
+    """
+    指定したユーザーのデータバージョンを1増やす（行がなければ version=1 で作成）
+
+    Args:
+        connection: SQLAlchemy Connection（呼び出し元のトランザクション内で実行）
+        user_ids: 対象ユーザーID
+    """
+    user_ids = sorted(set(str(user_id) for user_id in user_ids))
+    if not user_ids:
+        return
+
+    table = UserDataVersion.__table__
+    dialect_insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(connection.dialect.name)
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(table).values([{'user_id': user_id, 'version': 1} for user_id in user_ids])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={'version': table.c.version + 1, 'updated_at': func.now()}
+        )
+        connection.execute(stmt)
+        return
+
+    connection.execute(
+        update(table).where(table.c.user_id.in_(user_ids)).values(version=table.c.version + 1, updated_at=func.now())
+    )
+    existing = set(connection.execute(select(table.c.user_id).where(table.c.user_id.in_(user_ids))).scalars())
+    missing = [{'user_id': user_id, 'version': 1} for user_id in user_ids if user_id not in existing]
+    if missing:
+        connection.execute(table.insert(), missing)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """旧値の読み込み（active_history）のためだけのリスナー"""
+
+
+def track_previous_user_id(*models: Type) -> None:
+    """
+    models の user_id を代入時に旧値を読み込む属性にする
+
+    commit 後などの期限切れのオブジェクトでは旧値が読み込まれていないため、
+    そのままでは user_id を変更しても after_flush で変更前のユーザーが分からない。
+    """
+    for model in models:
+        if not event.contains(model.user_id, "set", _keep_previous_value):
+            event.listen(model.user_id, "set", _keep_previous_value, active_history=True)
+
+
+track_previous_user_id(*VERSIONED_MODELS)
+
+
+def changed_user_ids(session: Session, models: Tuple[Type, ...] = VERSIONED_MODELS) -> Set[str]:
+    """flush 対象の models の行から、データが変わったユーザーを収集"""
+    user_ids = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, models) and obj.user_id:
+            user_ids.add(obj.user_id)
+
+    for obj in session.dirty:
+        if not isinstance(obj, models) or not session.is_modified(obj, include_collections=False):
+            continue
+        if obj.user_id:
+            user_ids.add(obj.user_id)
+        # user_id 自体が変更された場合は変更前のユーザーも更新する
+        for old_user_id in inspect(obj).attrs.user_id.history.deleted:
+            if old_user_id:
+                user_ids.add(old_user_id)
+
+    return user_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_data_versions_after_flush(session: Session, flush_context):
+    """分析対象データの書き込みを同一トランザクション内でデータバージョンに反映"""
+    user_ids = changed_user_ids(session)
+    if user_ids:
+        bump_user_data_versions(session.connection(), user_ids)
@@ -0,0 +1,362 @@
+from sqlalchemy import event, inspect, select, update, delete, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from calendar import monthrange
+from datetime import date as date_type, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import math
+import uuid
+from app.models.daily_metrics import DailyMetrics, WeeklyMetricsSummary, MonthlyMetricsSummary
+
+
+# サマリーの平均を出すメトリクス
+SUMMARY_METRICS = (
+    'weight_kg',
+    'sleep_duration_hours',
+    'fatigue_level',
+    'motivation_level',
+    'stress_level',
+    'energy_level',
+    'training_readiness',
+    'resting_heart_rate',
+)
+
+# 週間トレンドを出すメトリクス -> (トレンド列, 週内の変化量がこれを超えたら increasing / decreasing)
+TREND_METRICS = {
+    'weight_kg': ('weight_trend', 0.5),
+    'sleep_duration_hours': ('sleep_trend', 0.5),
+    'fatigue_level': ('fatigue_trend', 1.0),
+    'motivation_level': ('motivation_trend', 1.0),
+}
+MIN_TREND_OBSERVATIONS = 3
+
+STRESS_PEAK_LEVEL = 8  # これ以上を高ストレス日とする
+LOW_ENERGY_LEVEL = 3  # これ以下を低エネルギー日とする
+
+WEEKLY = 'weekly'
+MONTHLY = 'monthly'
+
+# (種類, user_id, 週の開始日 or (年, 月))
+BucketKey = Tuple[str, str, Any]
+
+
+def accumulator_columns(kind: str) -> Tuple[str, ...]:
+    """サマリー行で差分更新する列"""
+    columns = ['days_recorded']
+    for name in SUMMARY_METRICS:
+        columns += [f'{name}_count', f'{name}_sum']
+        if name in TREND_METRICS:
+            columns += [f'{name}_sq_sum', f'{name}_x_sum', f'{name}_x_sq_sum', f'{name}_xy_sum']
+    if kind == MONTHLY:
+        columns += ['stress_peak_days', 'low_energy_days']
+    return tuple(columns)
+
+
+_ACCUMULATOR_COLUMNS = {kind: accumulator_columns(kind) for kind in (WEEKLY, MONTHLY)}
+
+
+def week_start(day: date_type) -> date_type:
+    """週の開始日（月曜日）"""
+    return day - timedelta(days=day.weekday())
+
+
+def metrics_contributions(user_id: str, day: date_type, values: Mapping[str, Any]):
+    """
+    DailyMetrics 1行分が週間・月間サマリーの累積値に加える量
+
+    Args:
+        user_id: ユーザーID
+        day: 記録日
+        values: SUMMARY_METRICS の値
+
+    Returns:
+        [(BucketKey, {列名: 加算量})]（週・月の2件）
+    """
+    result = []
+    for kind, bucket, x in ((WEEKLY, week_start(day), day.weekday()),
+                            (MONTHLY, (day.year, day.month), day.day - 1)):
+        deltas = {'days_recorded': 1}
+        for name in SUMMARY_METRICS:
+            value = values.get(name)
+            if value is None:
+                continue
+            value = float(value)
+            deltas[f'{name}_count'] = 1
+            deltas[f'{name}_sum'] = value
+            if name in TREND_METRICS:
+                deltas[f'{name}_sq_sum'] = value * value
+                deltas[f'{name}_x_sum'] = x
+                deltas[f'{name}_x_sq_sum'] = x * x
+                deltas[f'{name}_xy_sum'] = x * value
+        if kind == MONTHLY:
+            stress, energy = values.get('stress_level'), values.get('energy_level')
+            deltas['stress_peak_days'] = int(stress is not None and stress >= STRESS_PEAK_LEVEL)
+            deltas['low_energy_days'] = int(energy is not None and energy <= LOW_ENERGY_LEVEL)
+        result.append(((kind, str(user_id), bucket), deltas))
+    return result
+
+
+def _add_contributions(totals: Dict[BucketKey, Dict[str, float]], user_id: str, day: date_type,
+                       values: Mapping[str, Any], sign: int = 1) -> None:
+    """metrics_contributions を sign 倍して集計先に加える"""
+    for key, deltas in metrics_contributions(user_id, day, values):
+        bucket = totals.setdefault(key, {})
+        for column, delta in deltas.items():
+            bucket[column] = bucket.get(column, 0) + sign * delta
+
+
+def _slope(row: Mapping[str, Any], name: str) -> Optional[float]:
+    """期間内の日オフセットに対する回帰の傾き（単位/日）"""
+    n = row[f'{name}_count']
+    denominator = n * row[f'{name}_x_sq_sum'] - row[f'{name}_x_sum'] ** 2
+    if n < 2 or abs(denominator) < 1e-9:
+        return None
+    return (n * row[f'{name}_xy_sum'] - row[f'{name}_x_sum'] * row[f'{name}_sum']) / denominator
+
+
+def _recorded_span(row: Mapping[str, Any], name: str) -> float:
+    """
+    記録のある期間の長さ（日）を日オフセットの分散から推定
+
+    削除に対応できない最小・最大値の代わりに、等間隔の n 点では
+    範囲 = sqrt(12 * 分散 * (n - 1) / (n + 1)) となることを使う。
+    """
+    n = row[f'{name}_count']
+    if n < 2:
+        return 0.0
+    mean = row[f'{name}_x_sum'] / n
+    variance = max(row[f'{name}_x_sq_sum'] / n - mean ** 2, 0.0)
+    return math.sqrt(12 * variance * (n - 1) / (n + 1))
+
+
+def summary_fields(kind: str, bucket: Any, row: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    累積値から平均・トレンド・データ完全性などの表示用の列を計算
+
+    Args:
+        kind: weekly / monthly
+        bucket: 週の開始日 or (年, 月)
+        row: 累積値（accumulator_columns の列）
+
+    Returns:
+        サマリー行に書き込む表示用の列
+    """
+    period_days = 7 if kind == WEEKLY else monthrange(*bucket)[1]
+    fields = {}
+
+    for name in SUMMARY_METRICS:
+        count = row[f'{name}_count']
+        fields[f'avg_{name}'] = row[f'{name}_sum'] / count if count > 0 else None
+
+    if kind == WEEKLY:
+        for name, (trend_column, threshold) in TREND_METRICS.items():
+            slope = _slope(row, name)
+            if slope is None or row[f'{name}_count'] < MIN_TREND_OBSERVATIONS:
+                fields[trend_column] = None
+                continue
+            change = slope * (period_days - 1)
+            fields[trend_column] = 'increasing' if change > threshold else 'decreasing' if change < -threshold else 'stable'
+
+    recorded = row['days_recorded']
+    data_points = sum(row[f'{name}_count'] for name in SUMMARY_METRICS)
+    fields['data_completeness'] = data_points / (recorded * len(SUMMARY_METRICS)) if recorded > 0 else 0.0
+
+    if kind == MONTHLY:
+        # 回帰直線上の、記録のある期間での変化量（月末まで外挿しない）
+        weight_slope = _slope(row, 'weight_kg')
+        fields['weight_change_kg'] = (
+            weight_slope * min(_recorded_span(row, 'weight_kg'), period_days - 1) if weight_slope is not None else None
+        )
+
+        sleep_count = row['sleep_duration_hours_count']
+        if sleep_count >= 2:
+            mean = row['sleep_duration_hours_sum'] / sleep_count
+            variance = max(row['sleep_duration_hours_sq_sum'] / sleep_count - mean ** 2, 0.0)
+            fields['sleep_consistency_score'] = 1 / (1 + math.sqrt(variance))
+        else:
+            fields['sleep_consistency_score'] = None
+
+    return fields
+
+
+def _table_and_identity(kind: str, user_id: str, bucket: Any):
+    """サマリーのテーブルと行を特定する列の値"""
+    if kind == WEEKLY:
+        return WeeklyMetricsSummary.__table__, {
+            'user_id': user_id, 'week_start_date': bucket, 'week_end_date': bucket + timedelta(days=6)
+        }
+    year, month = bucket
+    return MonthlyMetricsSummary.__table__, {'user_id': user_id, 'year': year, 'month': month}
+
+
+def _identity_filter(table, identity: Mapping[str, Any]):
+    return and_(*(table.c[column] == value for column, value in identity.items() if column != 'week_end_date'))
+
+
+def _empty_row(kind: str) -> Dict[str, Any]:
+    return {column: 0 for column in _ACCUMULATOR_COLUMNS[kind]}
+
+
+def apply_summary_deltas(connection, totals: Mapping[BucketKey, Mapping[str, float]]) -> None:
+    """
+    週間・月間サマリー行に累積値の差分を加え、表示用の列を再計算
+
+    行がなければ作成し、記録件数が0になった行は削除する。差分は UPDATE ... SET col = col + :delta
+    で加えるため、同じ行を同時に更新するトランザクションがあっても加算は失われない。
+
+    Args:
+        connection: SQLAlchemy Connection（呼び出し元のトランザクション内で実行）
+        totals: BucketKey -> {列名: 加算量}
+    """
+    dialect_insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(connection.dialect.name)
+
+    for (kind, user_id, bucket), deltas in sorted(totals.items(), key=lambda item: str(item[0])):
+        deltas = {column: delta for column, delta in deltas.items() if delta}
+        if not deltas:
+            continue
+
+        table, identity = _table_and_identity(kind, user_id, bucket)
+        where = _identity_filter(table, identity)
+        new_row = dict(_empty_row(kind), id=str(uuid.uuid4()), **identity)
+
+        if dialect_insert is not None:
+            connection.execute(dialect_insert(table).values(new_row).on_conflict_do_nothing())
+        elif connection.execute(select(table.c.id).where(where)).first() is None:
+            connection.execute(table.insert().values(new_row))
+
+        connection.execute(
+            update(table).where(where).values({column: table.c[column] + delta for column, delta in deltas.items()})
+        )
+
+        row = connection.execute(
+            select(*(table.c[column] for column in _ACCUMULATOR_COLUMNS[kind])).where(where)
+        ).mappings().one()
+
+        if row['days_recorded'] <= 0:
+            connection.execute(delete(table).where(where))
+            continue
+
+        # 件数が0になった項目の合計は浮動小数点の誤差を残さないよう0に戻す
+        values = summary_fields(kind, bucket, row)
+        for name in SUMMARY_METRICS:
+            if row[f'{name}_count'] == 0:
+                values.update({column: 0.0 for column in _ACCUMULATOR_COLUMNS[kind]
+                               if column.startswith(f'{name}_') and column != f'{name}_count'})
+        values['updated_at'] = func.now()
+        connection.execute(update(table).where(where).values(values))
+
+
+def _metrics_values(obj: DailyMetrics, old: bool = False) -> Tuple[Optional[str], Optional[date_type], Dict[str, Any]]:
+    """DailyMetrics の (user_id, date, メトリクス値)。old=True なら flush 前の値"""
+    state = inspect(obj)
+
+    def value(name):
+        if old:
+            history = state.attrs[name].history
+            if history.deleted:
+                return history.deleted[0]
+            if history.added:
+                return None
+        return getattr(obj, name)
+
+    return value('user_id'), value('date'), {name: value(name) for name in SUMMARY_METRICS}
+
+
+def _summary_deltas(session: Session) -> Dict[BucketKey, Dict[str, float]]:
+    """flush 対象の DailyMetrics からサマリーの差分を集計"""
+    totals: Dict[BucketKey, Dict[str, float]] = {}
+
+    for obj in session.new:
+        if isinstance(obj, DailyMetrics):
+            user_id, day, values = _metrics_values(obj)
+            if user_id and day:
+                _add_contributions(totals, user_id, day, values)
+
+    for obj in session.deleted:
+        if isinstance(obj, DailyMetrics):
+            user_id, day, values = _metrics_values(obj, old=True)
+            if user_id and day:
+                _add_contributions(totals, user_id, day, values, sign=-1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, DailyMetrics) or not session.is_modified(obj, include_collections=False):
+            continue
+        old_user_id, old_day, old_values = _metrics_values(obj, old=True)
+        user_id, day, values = _metrics_values(obj)
+        if old_user_id and old_day:
+            _add_contributions(totals, old_user_id, old_day, old_values, sign=-1)
+        if user_id and day:
+            _add_contributions(totals, user_id, day, values)
+
+    return totals
+
+
+def summary_rows(totals: Mapping[BucketKey, Mapping[str, float]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    累積値の集計から週間・月間サマリー行（INSERT 用の辞書）を作成
+
+    Args:
+        totals: BucketKey -> {列名: 累積値}（metrics_contributions の合計）
+
+    Returns:
+        {'weekly': 週間サマリー行, 'monthly': 月間サマリー行}
+    """
+    rows = {WEEKLY: [], MONTHLY: []}
+    for (kind, uid, bucket), deltas in totals.items():
+        table, identity = _table_and_identity(kind, uid, bucket)
+        row = dict(_empty_row(kind), **deltas)
+        rows[kind].append(dict(row, id=str(uuid.uuid4()), **identity, **summary_fields(kind, bucket, row)))
+    return rows
+
+
+def rebuild_metrics_summaries(connection, user_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    週間・月間サマリーを DailyMetrics から全件再構築（初回導入・不整合修復用）
+
+    DailyMetrics を1回走査して累積値を集計し、まとめて挿入する。
+
+    Args:
+        connection: SQLAlchemy Connection
+        user_id: 指定時はそのユーザーのみ再構築
+
+    Returns:
+        {'weekly': 週間サマリー行数, 'monthly': 月間サマリー行数}
+    """
+    query = select(DailyMetrics.user_id, DailyMetrics.date, *(getattr(DailyMetrics, name) for name in SUMMARY_METRICS))
+    if user_id is not None:
+        query = query.where(DailyMetrics.user_id == user_id)
+
+    totals: Dict[BucketKey, Dict[str, float]] = {}
+    for row in connection.execute(query):
+        if row.user_id and row.date:
+            _add_contributions(totals, row.user_id, row.date, row._mapping)
+
+    inserts = summary_rows(totals)
+    for kind, model in ((WEEKLY, WeeklyMetricsSummary), (MONTHLY, MonthlyMetricsSummary)):
+        table = model.__table__
+        delete_stmt = delete(table)
+        if user_id is not None:
+            delete_stmt = delete_stmt.where(table.c.user_id == user_id)
+        connection.execute(delete_stmt)
+        if inserts[kind]:
+            connection.execute(table.insert(), inserts[kind])
+
+    return {kind: len(rows) for kind, rows in inserts.items()}
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """旧値の読み込み（active_history）のためだけのリスナー"""
+
+
+# 期限切れ（commit 後など）のオブジェクトでも変更前の値をサマリーから差し引けるよう、代入時に旧値を読み込む
+for _name in ('user_id', 'date') + SUMMARY_METRICS:
+    event.listen(getattr(DailyMetrics, _name), "set", _keep_previous_value, active_history=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_summaries_after_flush(session: Session, flush_context):
+    """DailyMetrics の追加・更新・削除を同一トランザクション内で週間・月間サマリーに反映"""
+    totals = _summary_deltas(session)
+    if totals:
+        apply_summary_deltas(session.connection(), totals)
@@ -1,13 +1,26 @@
-from sqlalchemy import Column, String, Date, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, Date, DateTime, Integer, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
 from app.core.database import Base
 
+# 自己ベストの登録元
+SOURCE_MANUAL = "manual"  # 手入力（再計算では変更しない）
+SOURCE_RACE = "race"  # レース結果から再計算で作成
+
 
 class PersonalBest(Base):
     __tablename__ = "personal_bests"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # レース結果からの自己ベスト再計算の UPSERT の衝突キー（レース結果由来の行のみ）
+        Index(
+            "ix_personal_bests_user_race_distance", "user_id", "race_type", "distance", "custom_distance_m",
+            unique=True,
+            postgresql_where=text(f"source = '{SOURCE_RACE}'"),
+            sqlite_where=text(f"source = '{SOURCE_RACE}'")
+        ),
+        {'extend_existing': True},
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -17,6 +30,7 @@ class PersonalBest(Base):
     time_seconds = Column(Integer, nullable=False)
     achieved_date = Column(Date, nullable=False)
     race_name = Column(String(255))  # レース名
+    source = Column(String(10), nullable=False, default=SOURCE_MANUAL, server_default=SOURCE_MANUAL)  # 'manual', 'race'
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # リレーションシップ
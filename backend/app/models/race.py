@@ -29,7 +29,7 @@ class RaceResult(Base):
     __tablename__ = "race_results"
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
     race_date = Column(Date, nullable=False)
     race_name = Column(String(100), nullable=False)
     race_type_id = Column(String(36), ForeignKey("race_types.id"), nullable=True)
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class TaskResult(Base):
+    """バックグラウンドタスクの結果のヘッダー
+
+    ユーザーごとの結果（予測・分析など）は Celery の結果バックエンドに置かず、
+    task_result_items に1ユーザー1行で保存する。結果バックエンドには summary と
+    このテーブルへの参照だけを返す。
+    """
+    __tablename__ = "task_results"
+
+    id = Column(String(255), primary_key=True, comment="CeleryタスクID")
+    task_name = Column(String(100), nullable=False, comment="タスク名")
+    status = Column(String(20), nullable=False, default="running", comment="状態（running / completed）")
+    item_count = Column(Integer, nullable=False, default=0, comment="保存した結果の件数")
+    summary = Column(JSON, comment="結果の集計")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True, comment="保持期限")
+
+    def __repr__(self):
+        return f"<TaskResult(id={self.id}, task_name={self.task_name}, item_count={self.item_count})>"
+
+
+class TaskResultItem(Base):
+    """バックグラウンドタスクのユーザーごとの結果（seq の順にページングして取得する）"""
+    __tablename__ = "task_result_items"
+    __table_args__ = (
+        Index("ix_task_result_items_task_id_seq", "task_id", "seq", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    task_id = Column(String(255), ForeignKey("task_results.id", ondelete="CASCADE"), nullable=False, comment="CeleryタスクID")
+    seq = Column(Integer, nullable=False, comment="タスク内の連番")
+    user_id = Column(String(36), nullable=True, comment="ユーザーID")
+    success = Column(Boolean, nullable=False, default=True)
+    payload = Column(JSON, comment="結果（予測・分析結果、失敗時はエラー）")
+
+    def __repr__(self):
+        return f"<TaskResultItem(task_id={self.task_id}, seq={self.seq}, user_id={self.user_id})>"
@@ -0,0 +1,311 @@
+from sqlalchemy import Column, String, Date, DateTime, Integer, Float, ForeignKey, UniqueConstraint
+from sqlalchemy import event, inspect, select, delete, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from datetime import date as date_type
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import uuid
+from app.core.database import Base
+from app.models.workout import Workout
+
+
+# 強度区分（AIPredictionEngine の強度分布と同じ閾値）
+EASY_INTENSITY_MAX = 3
+TEMPO_INTENSITY_MAX = 6
+INTERVAL_INTENSITY_MAX = 8
+
+
+class WorkoutDailyRollup(Base):
+    """ユーザー×日ごとの練習負荷ロールアップ
+
+    特徴量計算で生の Workout 行を毎回読み直さないための集計テーブル。
+    各列は「その日のワークアウト単位の値」の件数・合計・二乗和・最大値を保持するため、
+    期間内のワークアウト単位の平均・標準偏差・回帰の傾きを日数に比例するコストで復元できる。
+    Workout の追加・更新・削除時に after_flush フックで該当日の行を再集計する。
+    """
+    __tablename__ = "workout_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", name="uq_workout_daily_rollups_user_date"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    date = Column(Date, nullable=False)
+
+    workout_count = Column(Integer, nullable=False, default=0)
+
+    # 距離（m）
+    distance_count = Column(Integer, nullable=False, default=0)
+    distance_sum = Column(Float, nullable=False, default=0.0)
+    distance_sq_sum = Column(Float, nullable=False, default=0.0)
+    distance_max = Column(Float)
+    distance_min = Column(Float)
+
+    # 所要時間（秒）
+    duration_count = Column(Integer, nullable=False, default=0)
+    duration_sum = Column(Float, nullable=False, default=0.0)
+
+    # ペース（秒/km、距離と時間の両方があるワークアウトのみ）
+    pace_count = Column(Integer, nullable=False, default=0)
+    pace_sum = Column(Float, nullable=False, default=0.0)
+    pace_sq_sum = Column(Float, nullable=False, default=0.0)
+
+    # 強度（1-10）
+    intensity_count = Column(Integer, nullable=False, default=0)
+    intensity_sum = Column(Float, nullable=False, default=0.0)
+    intensity_sq_sum = Column(Float, nullable=False, default=0.0)
+    easy_count = Column(Integer, nullable=False, default=0)  # 強度 <= 3
+    tempo_count = Column(Integer, nullable=False, default=0)  # 強度 4-6
+    interval_count = Column(Integer, nullable=False, default=0)  # 強度 7-8
+    race_intensity_count = Column(Integer, nullable=False, default=0)  # 強度 >= 9
+
+    # 心拍数（extended_data の平均心拍数。最大値もワークアウト平均心拍数の最大）
+    heart_rate_count = Column(Integer, nullable=False, default=0)
+    heart_rate_sum = Column(Float, nullable=False, default=0.0)
+    heart_rate_max = Column(Float)
+
+    # その他（extended_data）
+    calories_sum = Column(Float, nullable=False, default=0.0)
+    ascent_sum = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<WorkoutDailyRollup(user_id={self.user_id}, date='{self.date}', workout_count={self.workout_count})>"
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """数値に変換できない値・非正の値は None として扱う"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def workout_load_values(distance_meters: Any, times_seconds: Any, intensity: Any,
+                        extended_data: Any) -> Dict[str, Optional[float]]:
+    """
+    1ワークアウト分のロールアップ対象値を取り出す
+
+    Args:
+        distance_meters: 距離（actual → target の順で解決済みの値）
+        times_seconds: タイム配列（actual → target の順で解決済みの値）
+        intensity: 強度
+        extended_data: Garmin 詳細データ
+
+    Returns:
+        distance / duration / pace / intensity / heart_rate / calories / ascent
+    """
+    distance = _to_float(distance_meters)
+
+    duration = None
+    if isinstance(times_seconds, (list, tuple)):
+        duration = _to_float(sum(t for t in times_seconds if isinstance(t, (int, float))))
+    else:
+        duration = _to_float(times_seconds)
+
+    extended = extended_data if isinstance(extended_data, dict) else {}
+
+    return {
+        'distance': distance,
+        'duration': duration,
+        'pace': duration / distance * 1000 if distance and duration else None,
+        'intensity': _to_float(intensity),
+        'heart_rate': _to_float(extended.get('avg_heart_rate')),
+        'calories': _to_float(extended.get('calories')),
+        'ascent': _to_float(extended.get('total_ascent')),
+    }
+
+
+def summarize_workout_day(values: Iterable[Dict[str, Optional[float]]]) -> Dict[str, Any]:
+    """workout_load_values の結果（同じ日の全ワークアウト）をロールアップ行の値に集計"""
+    row = {
+        'workout_count': 0,
+        'distance_count': 0, 'distance_sum': 0.0, 'distance_sq_sum': 0.0, 'distance_max': None, 'distance_min': None,
+        'duration_count': 0, 'duration_sum': 0.0,
+        'pace_count': 0, 'pace_sum': 0.0, 'pace_sq_sum': 0.0,
+        'intensity_count': 0, 'intensity_sum': 0.0, 'intensity_sq_sum': 0.0,
+        'easy_count': 0, 'tempo_count': 0, 'interval_count': 0, 'race_intensity_count': 0,
+        'heart_rate_count': 0, 'heart_rate_sum': 0.0, 'heart_rate_max': None,
+        'calories_sum': 0.0, 'ascent_sum': 0.0,
+    }
+
+    for v in values:
+        row['workout_count'] += 1
+
+        if v['distance'] is not None:
+            row['distance_count'] += 1
+            row['distance_sum'] += v['distance']
+            row['distance_sq_sum'] += v['distance'] ** 2
+            row['distance_max'] = v['distance'] if row['distance_max'] is None else max(row['distance_max'], v['distance'])
+            row['distance_min'] = v['distance'] if row['distance_min'] is None else min(row['distance_min'], v['distance'])
+
+        if v['duration'] is not None:
+            row['duration_count'] += 1
+            row['duration_sum'] += v['duration']
+
+        if v['pace'] is not None:
+            row['pace_count'] += 1
+            row['pace_sum'] += v['pace']
+            row['pace_sq_sum'] += v['pace'] ** 2
+
+        if v['intensity'] is not None:
+            intensity = v['intensity']
+            row['intensity_count'] += 1
+            row['intensity_sum'] += intensity
+            row['intensity_sq_sum'] += intensity ** 2
+            if intensity <= EASY_INTENSITY_MAX:
+                row['easy_count'] += 1
+            elif intensity <= TEMPO_INTENSITY_MAX:
+                row['tempo_count'] += 1
+            elif intensity <= INTERVAL_INTENSITY_MAX:
+                row['interval_count'] += 1
+            else:
+                row['race_intensity_count'] += 1
+
+        if v['heart_rate'] is not None:
+            row['heart_rate_count'] += 1
+            row['heart_rate_sum'] += v['heart_rate']
+            row['heart_rate_max'] = v['heart_rate'] if row['heart_rate_max'] is None else max(row['heart_rate_max'], v['heart_rate'])
+
+        row['calories_sum'] += v['calories'] or 0.0
+        row['ascent_sum'] += v['ascent'] or 0.0
+
+    return row
+
+
+_WORKOUT_LOAD_COLUMNS = (
+    Workout.user_id,
+    Workout.date,
+    Workout.actual_distance_meters,
+    Workout.target_distance_meters,
+    Workout.actual_times_seconds,
+    Workout.target_times_seconds,
+    Workout.intensity,
+    Workout.extended_data,
+)
+
+
+def _row_load_values(row) -> Dict[str, Optional[float]]:
+    """Workout の列タプルからロールアップ対象値を取り出す（distance_meters / times_seconds プロパティと同じ解決順）"""
+    return workout_load_values(
+        row.actual_distance_meters or row.target_distance_meters,
+        row.actual_times_seconds or row.target_times_seconds,
+        row.intensity,
+        row.extended_data,
+    )
+
+
+def rollup_rows(day_values: Dict[Tuple[str, date_type], List[Dict[str, Optional[float]]]]) -> List[Dict[str, Any]]:
+    """(user_id, date) ごとの workout_load_values の結果をロールアップ行（INSERT 用の辞書）に変換"""
+    return [
+        dict(summarize_workout_day(values), id=str(uuid.uuid4()), user_id=user_id, date=day)
+        for (user_id, day), values in day_values.items()
+    ]
+
+
+def refresh_workout_daily_rollups(connection, keys: Set[Tuple[str, date_type]]) -> int:
+    """
+    指定した (user_id, date) のロールアップ行を Workout から再集計
+
+    1日分のワークアウトだけを読むため、コストはその日のワークアウト数に比例する。
+
+    Args:
+        connection: SQLAlchemy Connection（呼び出し元のトランザクション内で実行）
+        keys: 再集計する (user_id, date) の集合
+
+    Returns:
+        書き込んだロールアップ行数
+    """
+    if not keys:
+        return 0
+
+    table = WorkoutDailyRollup.__table__
+    key_list = list(keys)
+
+    day_values: Dict[Tuple[str, date_type], List[Dict[str, Optional[float]]]] = {}
+    rows = connection.execute(
+        select(*_WORKOUT_LOAD_COLUMNS).where(tuple_(Workout.user_id, Workout.date).in_(key_list))
+    )
+    for row in rows:
+        day_values.setdefault((row.user_id, row.date), []).append(_row_load_values(row))
+
+    connection.execute(delete(table).where(tuple_(table.c.user_id, table.c.date).in_(key_list)))
+
+    inserts = rollup_rows(day_values)
+    if inserts:
+        connection.execute(table.insert(), inserts)
+
+    return len(inserts)
+
+
+def rebuild_workout_daily_rollups(connection, user_id: Optional[str] = None) -> int:
+    """
+    ロールアップを Workout から全件再構築（初回導入・不整合修復用）
+
+    Args:
+        connection: SQLAlchemy Connection
+        user_id: 指定時はそのユーザーのみ再構築
+
+    Returns:
+        書き込んだロールアップ行数
+    """
+    table = WorkoutDailyRollup.__table__
+
+    query = select(*_WORKOUT_LOAD_COLUMNS)
+    delete_stmt = delete(table)
+    if user_id is not None:
+        query = query.where(Workout.user_id == user_id)
+        delete_stmt = delete_stmt.where(table.c.user_id == user_id)
+
+    day_values: Dict[Tuple[str, date_type], List[Dict[str, Optional[float]]]] = {}
+    for row in connection.execute(query):
+        day_values.setdefault((row.user_id, row.date), []).append(_row_load_values(row))
+
+    connection.execute(delete_stmt)
+    inserts = rollup_rows(day_values)
+    if inserts:
+        connection.execute(table.insert(), inserts)
+
+    return len(inserts)
+
+
+def _affected_rollup_keys(session: Session) -> Set[Tuple[str, date_type]]:
+    """flush 対象の Workout から再集計が必要な (user_id, date) を収集"""
+    keys = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Workout) and obj.user_id and obj.date:
+            keys.add((obj.user_id, obj.date))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Workout) or not session.is_modified(obj, include_collections=False):
+            continue
+        if obj.user_id and obj.date:
+            keys.add((obj.user_id, obj.date))
+
+        # user_id / date 自体が変更された場合は変更前の日付も再集計する
+        state = inspect(obj)
+        old_user_ids = state.attrs.user_id.history.deleted or [obj.user_id]
+        old_dates = state.attrs.date.history.deleted or [obj.date]
+        for old_user_id in old_user_ids:
+            for old_date in old_dates:
+                if old_user_id and old_date:
+                    keys.add((old_user_id, old_date))
+
+    return keys
+
+
+# 期限切れ（commit 後など）のオブジェクトでも変更前の user_id / date が履歴に残るよう、代入時に旧値を読み込む
+@event.listens_for(Workout.user_id, "set", active_history=True)
+@event.listens_for(Workout.date, "set", active_history=True)
+def _keep_previous_rollup_key(target, value, oldvalue, initiator):
+    """旧値の読み込み（active_history）のためだけのリスナー"""
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_rollups_after_flush(session: Session, flush_context):
+    """Workout の追加・更新・削除を同一トランザクション内でロールアップに反映"""
+    keys = _affected_rollup_keys(session)
+    if keys:
+        refresh_workout_daily_rollups(session.connection(), keys)
@@ -0,0 +1,17 @@
+"""
+AI健康監視機能用のPydanticスキーマ
+
+このモジュールには以下のスキーマが含まれます：
+- BatchHealthAssessmentRequest: チーム単位の健康評価リクエスト
+"""
+
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class BatchHealthAssessmentRequest(BaseModel):
+    """チーム単位の健康評価リクエストスキーマ"""
+    user_ids: List[str] = Field(..., min_length=1, max_length=500, description="選手のユーザーIDリスト")
+    days: int = Field(28, ge=28, le=365, description="分析期間（日）")
+    end_date: Optional[date] = Field(None, description="期間の最終日（デフォルト: 今日）")
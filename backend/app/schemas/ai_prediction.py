@@ -137,6 +137,8 @@ class ModelTrainingResponse(BaseModel):
     algorithm: str = Field(..., description="アルゴリズム")
     created_at: datetime = Field(..., description="作成日時")
     estimated_completion_time: Optional[int] = Field(None, description="推定完了時間（秒）")
+    progress: float = Field(0.0, description="進捗（0-100）")
+    is_duplicate: bool = Field(False, description="同じ条件の実行中のジョブを返したか")
 
 
 class PredictionStatistics(BaseModel):
@@ -76,18 +76,20 @@ class DailyMetricsResponse(DailyMetricsBase):
 class WeeklyMetricsSummaryBase(BaseModel):
     week_start_date: date
     week_end_date: date
-    avg_weight: Optional[float] = None
-    avg_body_fat_percentage: Optional[float] = None
-    avg_muscle_mass_kg: Optional[float] = None
-    avg_sleep_hours: Optional[float] = None
-    avg_sleep_quality: Optional[float] = None
+    avg_weight_kg: Optional[float] = None
+    avg_sleep_duration_hours: Optional[float] = None
     avg_fatigue_level: Optional[float] = None
     avg_motivation_level: Optional[float] = None
     avg_stress_level: Optional[float] = None
     avg_energy_level: Optional[float] = None
     avg_training_readiness: Optional[float] = None
     avg_resting_heart_rate: Optional[float] = None
-    total_entries: int = 0
+    weight_trend: Optional[str] = None
+    sleep_trend: Optional[str] = None
+    fatigue_trend: Optional[str] = None
+    motivation_trend: Optional[str] = None
+    data_completeness: Optional[float] = None
+    days_recorded: int = 0
 
     class Config:
         from_attributes = True
@@ -110,18 +112,20 @@ class WeeklyMetricsSummaryResponse(WeeklyMetricsSummaryBase):
 class MonthlyMetricsSummaryBase(BaseModel):
     year: int
     month: int
-    avg_weight: Optional[float] = None
-    avg_body_fat_percentage: Optional[float] = None
-    avg_muscle_mass_kg: Optional[float] = None
-    avg_sleep_hours: Optional[float] = None
-    avg_sleep_quality: Optional[float] = None
+    avg_weight_kg: Optional[float] = None
+    avg_sleep_duration_hours: Optional[float] = None
     avg_fatigue_level: Optional[float] = None
     avg_motivation_level: Optional[float] = None
     avg_stress_level: Optional[float] = None
     avg_energy_level: Optional[float] = None
     avg_training_readiness: Optional[float] = None
     avg_resting_heart_rate: Optional[float] = None
-    total_entries: int = 0
+    weight_change_kg: Optional[float] = None
+    sleep_consistency_score: Optional[float] = None
+    stress_peak_days: Optional[int] = None
+    low_energy_days: Optional[int] = None
+    data_completeness: Optional[float] = None
+    days_recorded: int = 0
 
     class Config:
         from_attributes = True
@@ -155,12 +159,17 @@ class DailyMetricsListResponse(BaseModel):
 
 
 class MetricsTrendResponse(BaseModel):
-    metric_name: str
-    trend_data: List[Dict[str, Any]]
-    trend_direction: str
-    change_percentage: float
-    period: str
-    confidence: Optional[float] = None
+    dates: List[str]
+    weight_kg: List[Optional[float]]
+    sleep_duration_hours: List[Optional[float]]
+    fatigue_level: List[Optional[float]]
+    motivation_level: List[Optional[float]]
+    stress_level: List[Optional[float]]
+    energy_level: List[Optional[float]]
+    training_readiness: List[Optional[float]]
+    resting_heart_rate: List[Optional[float]]
+    resolution: str = "daily"  # daily / weekly / monthly
+    method: Optional[str] = None  # ダウンサンプリング方法（mean / lttb）
 
     class Config:
         from_attributes = True
@@ -10,10 +10,11 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 import os
-from app.models.workout import Workout, WorkoutType
+from app.models.workout import Workout
 from app.models.race import RaceResult
 from app.models.user_profile import UserProfile
 from app.schemas.prediction import TargetEventEnum
+from app.ml.training_load_features import load_daily_rollups, calculate_training_load_features
 
 
 class AIPredictionEngine:
@@ -54,18 +55,9 @@ class AIPredictionEngine:
 
     def _prepare_user_data(self, user_id: str) -> Dict[str, Any]:
         """ユーザーデータの準備"""
-        # 過去12週間の練習データ
+        # 過去12週間の練習データ（日次ロールアップ）
         recent_date = date.today() - timedelta(days=84)
-        workouts = (
-            self.db.query(Workout)
-            .join(WorkoutType)
-            .filter(
-                Workout.user_id == user_id,
-                Workout.date >= recent_date
-            )
-            .order_by(Workout.date.desc())
-            .all()
-        )
+        rollups = load_daily_rollups(self.db, user_id, recent_date, date.today())
         
         # 過去のレース結果
         races = (
@@ -86,7 +78,7 @@ class AIPredictionEngine:
         )
         
         return {
-            'workouts': workouts,
+            'rollups': rollups,
             'races': races,
             'profile': profile,
             'user_id': user_id
@@ -96,18 +88,18 @@ class AIPredictionEngine:
         """高度な特徴量抽出"""
         features = {}
         
-        workouts = user_data['workouts']
+        load = calculate_training_load_features(user_data['rollups'])
         races = user_data['races']
         profile = user_data['profile']
         
         # 基本統計特徴量
-        features.update(self._extract_basic_features(workouts))
+        features.update(self._extract_basic_features(load))
         
         # トレンド特徴量
-        features.update(self._extract_trend_features(workouts))
+        features.update(self._extract_trend_features(load))
         
         # 強度分布特徴量
-        features.update(self._extract_intensity_features(workouts))
+        features.update(self._extract_intensity_features(load))
         
         # レース履歴特徴量
         features.update(self._extract_race_features(races))
@@ -116,13 +108,13 @@ class AIPredictionEngine:
         features.update(self._extract_profile_features(profile))
         
         # 季節性特徴量
-        features.update(self._extract_seasonal_features(workouts))
+        features.update(self._extract_seasonal_features(load))
         
         return features
 
-    def _extract_basic_features(self, workouts: List[Workout]) -> Dict[str, float]:
+    def _extract_basic_features(self, load: Dict[str, float]) -> Dict[str, float]:
         """基本統計特徴量"""
-        if not workouts:
+        if load['total_workouts'] == 0:
             return {
                 'total_workouts': 0,
                 'avg_distance': 0,
@@ -132,31 +124,20 @@ class AIPredictionEngine:
                 'avg_intensity': 0
             }
         
-        distances = [w.distance_meters for w in workouts if w.distance_meters]
-        durations = [w.duration_seconds for w in workouts if w.duration_seconds]
-        intensities = [w.intensity for w in workouts if w.intensity]
-        
-        # ペース計算
-        paces = []
-        for w in workouts:
-            if w.distance_meters and w.duration_seconds:
-                pace = (w.duration_seconds / w.distance_meters) * 1000
-                paces.append(pace)
-        
         return {
-            'total_workouts': len(workouts),
-            'avg_distance': np.mean(distances) if distances else 0,
-            'avg_duration': np.mean(durations) if durations else 0,
-            'avg_pace': np.mean(paces) if paces else 0,
-            'total_distance': sum(distances),
-            'avg_intensity': np.mean(intensities) if intensities else 0,
-            'pace_std': np.std(paces) if paces else 0,
-            'distance_std': np.std(distances) if distances else 0
+            'total_workouts': load['total_workouts'],
+            'avg_distance': load['avg_distance'],
+            'avg_duration': load['avg_duration'],
+            'avg_pace': load['avg_pace'],
+            'total_distance': load['total_distance'],
+            'avg_intensity': load['avg_intensity'],
+            'pace_std': load['pace_std'],
+            'distance_std': load['distance_std']
         }
 
-    def _extract_trend_features(self, workouts: List[Workout]) -> Dict[str, float]:
-        """トレンド特徴量"""
-        if len(workouts) < 4:
+    def _extract_trend_features(self, load: Dict[str, float]) -> Dict[str, float]:
+        """トレンド特徴量（日付に対する線形回帰の傾き）"""
+        if load['total_workouts'] < 4 or load['pace_count'] < 4:
             return {
                 'pace_trend': 0,
                 'distance_trend': 0,
@@ -164,47 +145,16 @@ class AIPredictionEngine:
                 'workout_frequency_trend': 0
             }
         
-        # 時系列データの準備
-        workout_data = []
-        for w in workouts:
-            if w.distance_meters and w.duration_seconds:
-                pace = (w.duration_seconds / w.distance_meters) * 1000
-                workout_data.append({
-                    'date': w.date,
-                    'pace': pace,
-                    'distance': w.distance_meters,
-                    'intensity': w.intensity or 0
-                })
-        
-        if len(workout_data) < 4:
-            return {'pace_trend': 0, 'distance_trend': 0, 'intensity_trend': 0, 'workout_frequency_trend': 0}
-        
-        # トレンド計算（線形回帰の傾き）
-        workout_data.sort(key=lambda x: x['date'])
-        
-        dates = np.array([(d['date'] - workout_data[0]['date']).days for d in workout_data])
-        paces = np.array([d['pace'] for d in workout_data])
-        distances = np.array([d['distance'] for d in workout_data])
-        intensities = np.array([d['intensity'] for d in workout_data])
-        
-        # 線形回帰でトレンドを計算
-        pace_trend = np.polyfit(dates, paces, 1)[0] if len(dates) > 1 else 0
-        distance_trend = np.polyfit(dates, distances, 1)[0] if len(dates) > 1 else 0
-        intensity_trend = np.polyfit(dates, intensities, 1)[0] if len(dates) > 1 else 0
-        
-        # 練習頻度のトレンド
-        workout_frequency_trend = len(workouts) / 84  # 12週間での平均頻度
-        
         return {
-            'pace_trend': pace_trend,
-            'distance_trend': distance_trend,
-            'intensity_trend': intensity_trend,
-            'workout_frequency_trend': workout_frequency_trend
+            'pace_trend': load['pace_trend'],
+            'distance_trend': load['distance_trend'],
+            'intensity_trend': load['intensity_trend'],
+            'workout_frequency_trend': load['total_workouts'] / 84  # 12週間での平均頻度
         }
 
-    def _extract_intensity_features(self, workouts: List[Workout]) -> Dict[str, float]:
+    def _extract_intensity_features(self, load: Dict[str, float]) -> Dict[str, float]:
         """強度分布特徴量"""
-        if not workouts:
+        if load['intensity_count'] == 0:
             return {
                 'easy_ratio': 0,
                 'tempo_ratio': 0,
@@ -213,30 +163,12 @@ class AIPredictionEngine:
                 'intensity_distribution': 0
             }
         
-        intensities = [w.intensity for w in workouts if w.intensity]
-        if not intensities:
-            return {
-                'easy_ratio': 0,
-                'tempo_ratio': 0,
-                'interval_ratio': 0,
-                'race_ratio': 0,
-                'intensity_distribution': 0
-            }
-        
-        # 強度分布
-        easy_count = sum(1 for i in intensities if i <= 3)
-        tempo_count = sum(1 for i in intensities if 4 <= i <= 6)
-        interval_count = sum(1 for i in intensities if 7 <= i <= 8)
-        race_count = sum(1 for i in intensities if i >= 9)
-        
-        total = len(intensities)
-        
         return {
-            'easy_ratio': easy_count / total,
-            'tempo_ratio': tempo_count / total,
-            'interval_ratio': interval_count / total,
-            'race_ratio': race_count / total,
-            'intensity_distribution': np.std(intensities)
+            'easy_ratio': load['easy_ratio'],
+            'tempo_ratio': load['tempo_ratio'],
+            'interval_ratio': load['interval_ratio'],
+            'race_ratio': load['race_ratio'],
+            'intensity_distribution': load['intensity_std']
         }
 
     def _extract_race_features(self, races: List[RaceResult]) -> Dict[str, float]:
@@ -301,9 +233,9 @@ class AIPredictionEngine:
             'max_hr': profile.max_hr or 190
         }
 
-    def _extract_seasonal_features(self, workouts: List[Workout]) -> Dict[str, float]:
+    def _extract_seasonal_features(self, load: Dict[str, float]) -> Dict[str, float]:
         """季節性特徴量"""
-        if not workouts:
+        if load['total_workouts'] == 0:
             return {
                 'seasonal_factor': 1.0,
                 'weather_adaptation': 0,
@@ -320,13 +252,8 @@ class AIPredictionEngine:
         elif current_month in [12, 1, 2]:
             seasonal_factor = 0.95
         
-        # 練習の一貫性
-        dates = [w.date for w in workouts]
-        if len(dates) > 1:
-            date_diffs = [(dates[i] - dates[i+1]).days for i in range(len(dates)-1)]
-            training_consistency = 1.0 / (np.std(date_diffs) + 1) if date_diffs else 0
-        else:
-            training_consistency = 0
+        # 練習の一貫性（練習間隔の標準偏差から算出）
+        training_consistency = load['consistency_score'] if load['total_workouts'] > 1 else 0
         
         return {
             'seasonal_factor': seasonal_factor,
@@ -523,7 +450,6 @@ class AIPredictionEngine:
 
     def _generate_detailed_info(self, user_data: Dict[str, Any], features: Dict[str, float], confidence: float) -> Dict[str, Any]:
         """詳細情報の生成"""
-        workouts = user_data['workouts']
         races = user_data['races']
         
         # 分析期間
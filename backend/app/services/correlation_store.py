@@ -0,0 +1,239 @@
+"""
+メトリクス間相関の累積統計ストア
+
+このモジュールには以下の機能が含まれます：
+- 練習ロールアップと DailyMetrics を日付で揃えた日次配列の取得
+- 新しい日だけを co-moment に追加する増分更新（1日あたり O(1)）
+- 過去の日の書き換え（after_flush フックで立てる再構築フラグ）時の一括再構築
+- 保存済みの統計からの相関係数の読み出し
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.exceptions import DatabaseError
+from app.models.correlation_stats import UserCorrelationStats
+from app.models.daily_metrics import DailyMetrics
+from app.models.training_load import WorkoutDailyRollup
+from app.ml.health.correlation_stats import (
+    CORRELATION_METRICS,
+    CorrelationAccumulators,
+    readiness_composite,
+)
+
+logger = logging.getLogger(__name__)
+
+# DailyMetrics から読むメトリクス
+_CONDITION_METRICS = (
+    'fatigue_level',
+    'sleep_quality_score',
+    'sleep_duration_hours',
+    'motivation_level',
+    'energy_level',
+    'stress_level',
+    'training_readiness',
+)
+
+
+class CorrelationStoreService:
+    """メトリクス間相関の累積統計ストアのサービスクラス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_daily_values(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Tuple[Optional[date], np.ndarray]:
+        """
+        日付で揃えた日次メトリクス配列を取得
+
+        Args:
+            user_id: ユーザーID
+            start_date: 期間の初日（省略時は最初の記録日）
+            end_date: 期間の最終日（省略時は最後の記録日）
+
+        Returns:
+            (初日, (日数, len(CORRELATION_METRICS)) の配列（欠測は NaN）)。記録がなければ (None, 空配列)
+        """
+        try:
+            rollup_query = self.db.query(
+                WorkoutDailyRollup.date,
+                WorkoutDailyRollup.distance_sum,
+                WorkoutDailyRollup.intensity_count,
+                WorkoutDailyRollup.intensity_sum
+            ).filter(WorkoutDailyRollup.user_id == user_id)
+            metrics_query = self.db.query(
+                DailyMetrics.date,
+                *(getattr(DailyMetrics, name) for name in _CONDITION_METRICS)
+            ).filter(DailyMetrics.user_id == user_id)
+
+            if start_date is not None:
+                rollup_query = rollup_query.filter(WorkoutDailyRollup.date >= start_date)
+                metrics_query = metrics_query.filter(DailyMetrics.date >= start_date)
+            if end_date is not None:
+                rollup_query = rollup_query.filter(WorkoutDailyRollup.date <= end_date)
+                metrics_query = metrics_query.filter(DailyMetrics.date <= end_date)
+
+            rollups = rollup_query.all()
+            # 同じ日の複数記録は後から作成されたものを優先
+            metrics = metrics_query.order_by(DailyMetrics.created_at).all()
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading daily values: {str(e)}")
+            raise DatabaseError(f"日次データの取得に失敗しました: {str(e)}")
+
+        dates = [r.date for r in rollups] + [m.date for m in metrics]
+        if not dates:
+            return None, np.empty((0, len(CORRELATION_METRICS)))
+
+        start_date = start_date or min(dates)
+        end_date = end_date or max(dates)
+        days = (end_date - start_date).days + 1
+        column = {name: i for i, name in enumerate(CORRELATION_METRICS)}
+        values = np.full((days, len(CORRELATION_METRICS)), np.nan)
+
+        # 練習のない日の負荷は0（roster_health_service と同じ定義: 距離km × 強度0-1、強度なしは0.5）
+        values[:, column['training_load']] = 0.0
+        for r in rollups:
+            intensity = r.intensity_sum / (r.intensity_count * 10) if r.intensity_count else 0.5
+            values[(r.date - start_date).days, column['training_load']] = r.distance_sum / 1000 * intensity
+
+        for m in metrics:
+            row = values[(m.date - start_date).days]
+            for name in _CONDITION_METRICS:
+                value = getattr(m, name)
+                row[column[name]] = np.nan if value is None else value
+            composite = readiness_composite(m.fatigue_level, m.energy_level, m.sleep_quality_score)
+            row[column['readiness_composite']] = np.nan if composite is None else composite
+
+        return start_date, values
+
+    def rebuild(self, user_id: str, through_date: Optional[date] = None) -> CorrelationAccumulators:
+        """
+        全期間の日次配列から累積統計を一括で再構築
+
+        Args:
+            user_id: ユーザーID
+            through_date: 反映する最終日（デフォルト: 昨日）
+
+        Returns:
+            再構築した累積統計
+        """
+        through_date = through_date or date.today() - timedelta(days=1)
+        stats = self._load_stats(user_id)
+        if stats is not None and stats.needs_rebuild:
+            # 読み込み中の書き込みで立ったフラグを上書きしないよう、読み込み前にフラグを下ろして行をロックする
+            stats.needs_rebuild = False
+            self.db.flush()
+
+        _, values = self.load_daily_values(user_id, end_date=through_date)
+        accumulators = CorrelationAccumulators.from_matrix(values)
+        self._save(user_id, through_date, accumulators, stats)
+        logger.info(f"Rebuilt correlation stats for user {user_id}: {len(values)} days")
+        return accumulators
+
+    def refresh(self, user_id: str, through_date: Optional[date] = None) -> CorrelationAccumulators:
+        """
+        累積統計を through_date まで最新化
+
+        反映済みの日が書き換えられていなければ（再構築フラグが立っていなければ）、新しい日だけを
+        1日ずつ追加する。最新化済みなら保存済みの統計を読むだけで、元データの集計も書き込みも行わない。
+        当日は記録が揃っていない可能性があるため、デフォルトでは昨日までを反映する。
+
+        Args:
+            user_id: ユーザーID
+            through_date: 反映する最終日（デフォルト: 昨日）
+
+        Returns:
+            最新の累積統計
+        """
+        through_date = through_date or date.today() - timedelta(days=1)
+        stats = self._load_stats(user_id)
+
+        if stats is None or stats.through_date > through_date:
+            return self.rebuild(user_id, through_date)
+        if stats.needs_rebuild:
+            logger.info(f"Source data changed before {stats.through_date} for user {user_id}; rebuilding")
+            return self.rebuild(user_id, through_date)
+
+        accumulators = CorrelationAccumulators.from_dict(stats.accumulators)
+        if stats.through_date < through_date:
+            start_date = stats.through_date + timedelta(days=1)
+            _, values = self.load_daily_values(user_id, start_date=start_date, end_date=through_date)
+            for day_values in values:
+                accumulators.add_day({
+                    name: value for name, value in zip(CORRELATION_METRICS, day_values) if not np.isnan(value)
+                })
+            self._save(user_id, through_date, accumulators, stats)
+
+        return accumulators
+
+    def get_correlations(
+        self,
+        user_id: str,
+        pairs: Optional[Sequence[Tuple[str, str]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        メトリクスペアの相関係数を取得
+
+        Args:
+            user_id: ユーザーID
+            pairs: 取得するペア（省略時は全ペア）
+
+        Returns:
+            "x|y" -> {'correlation': 相関係数（計算できなければ None）, 'observations': 両方記録された日数}
+        """
+        accumulators = self.refresh(user_id)
+        pairs = pairs or list(accumulators.moments)
+        return {
+            f"{x}|{y}": {
+                'correlation': accumulators.correlation(x, y),
+                'observations': accumulators.count(x, y)
+            }
+            for x, y in pairs
+        }
+
+    def _load_stats(self, user_id: str) -> Optional[UserCorrelationStats]:
+        """保存済みの累積統計（フックによる再構築フラグを反映するため常に読み直す）"""
+        try:
+            return self.db.query(UserCorrelationStats).filter(
+                UserCorrelationStats.user_id == user_id
+            ).populate_existing().first()
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading correlation stats: {str(e)}")
+            raise DatabaseError(f"相関統計の取得に失敗しました: {str(e)}")
+
+    def _save(
+        self,
+        user_id: str,
+        through_date: date,
+        accumulators: CorrelationAccumulators,
+        stats: Optional[UserCorrelationStats] = None
+    ):
+        """累積統計を保存"""
+        try:
+            if stats is None:
+                stats = self.db.query(UserCorrelationStats).filter(
+                    UserCorrelationStats.user_id == user_id
+                ).first()
+            if stats is None:
+                stats = UserCorrelationStats(user_id=user_id, needs_rebuild=False)
+                self.db.add(stats)
+
+            stats.through_date = through_date
+            stats.accumulators = accumulators.to_dict()
+            self.db.commit()
+
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error saving correlation stats: {str(e)}")
+            raise DatabaseError(f"相関統計の保存に失敗しました: {str(e)}")
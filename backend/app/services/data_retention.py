@@ -0,0 +1,245 @@
+"""
+保持期間を過ぎたデータの一括削除
+
+このモジュールには以下の機能が含まれます：
+- DELETE ... WHERE id IN (SELECT id ... LIMIT n) によるバッチ削除（バッチごとにコミット）
+- ユーザーごとに新しい方から N 件を残すルール（ROW_NUMBER() によるランク付け）
+- 全テーブルで共有する処理時間の上限（超えたら次回の実行に残りを回す）
+- AIモデル・予測結果・特徴量・学習メトリクスの保持期間クリーンアップ
+- 保持期限（expires_at）を過ぎたバックグラウンドタスクの結果の削除
+
+行をセッションに読み込まずに削除し、バッチごとにコミットするため、数百万行の削除でも
+メモリ使用量は一定で、テーブルのロックもバッチ1回分の時間に収まる。
+一括 DELETE は ORM の after_flush フックを通らないため、データバージョン対象のモデル
+（FeatureStore）は削除した行のユーザーのデータバージョンを同じトランザクション内で更新する。
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence, Set
+
+from sqlalchemy import String, cast, delete, exists, func, not_, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.exceptions import DatabaseError, ValidationError
+from app.models.ai import AIModel, FeatureStore, ModelTrainingJob, PredictionResult, TrainingMetrics
+from app.models.data_version import VERSIONED_MODELS, bump_user_data_versions
+from app.models.task_result import TaskResult, TaskResultItem
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchDeleteResult:
+    """バッチ削除の結果"""
+    deleted: int = 0
+    batches: int = 0
+    complete: bool = True  # False の場合は処理時間の上限で打ち切った（残りは次回の実行で削除）
+
+
+def expired_ids_query(
+    model,
+    timestamp_column,
+    cutoff: datetime,
+    conditions: Sequence[Any] = (),
+    keep_latest_per_user: Optional[int] = None
+):
+    """
+    削除対象の ID を返す SELECT を作成
+
+    keep_latest_per_user を指定した場合は、ユーザーごとに timestamp_column の新しい順に
+    ROW_NUMBER() でランク付けし、上位 keep_latest_per_user 件は cutoff より古くても残す。
+    削除される行はいずれも残る行より古いため、バッチを繰り返してもランクは変わらない。
+
+    Args:
+        model: 対象モデル（id 列を持つ）
+        timestamp_column: 保持期間の判定に使う日時列
+        cutoff: この日時より古い行を削除対象にする
+        conditions: 追加の条件
+        keep_latest_per_user: ユーザーごとに残す件数（model.user_id が必要）
+
+    Returns:
+        削除対象の ID を返す SELECT
+    """
+    if not keep_latest_per_user:
+        return select(model.id).where(timestamp_column < cutoff, *conditions)
+
+    ranked = select(
+        model.id.label("id"),
+        timestamp_column.label("ts"),
+        func.row_number().over(
+            partition_by=model.user_id,
+            order_by=(timestamp_column.desc(), model.id.desc())
+        ).label("rank")
+    ).where(*conditions).subquery()
+    return select(ranked.c.id).where(ranked.c.ts < cutoff, ranked.c.rank > keep_latest_per_user)
+
+
+def delete_in_batches(
+    db: Session,
+    model,
+    ids_query,
+    batch_size: int,
+    deadline: Optional[float] = None
+) -> BatchDeleteResult:
+    """
+    ids_query が返す行を batch_size 件ずつ削除し、バッチごとにコミット
+
+    Args:
+        db: データベースセッション
+        model: 対象モデル
+        ids_query: 削除対象の ID を返す SELECT（expired_ids_query）
+        batch_size: 1回の DELETE の最大件数
+        deadline: 処理を打ち切る time.monotonic() の値（None の場合は上限なし）
+
+    Returns:
+        削除件数・バッチ数・すべて削除できたか
+    """
+    result = BatchDeleteResult()
+    versioned = model in VERSIONED_MODELS
+    batch_ids = ids_query.order_by(None).limit(batch_size)
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            result.complete = False
+            break
+
+        stmt = delete(model).where(model.id.in_(batch_ids)).execution_options(synchronize_session=False)
+        user_ids: Set[str] = set()
+        if versioned:
+            connection = db.connection()
+            if connection.dialect.delete_returning:
+                rows = db.execute(stmt.returning(model.user_id)).all()
+                deleted = len(rows)
+                user_ids = {row[0] for row in rows}
+            else:
+                user_ids = set(db.execute(
+                    select(model.user_id).where(model.id.in_(batch_ids)).distinct()
+                ).scalars())
+                deleted = db.execute(stmt).rowcount
+            bump_user_data_versions(connection, user_ids)
+        else:
+            deleted = db.execute(stmt).rowcount
+
+        db.commit()
+        result.deleted += deleted
+        result.batches += 1
+        if deleted < batch_size:
+            break
+
+    return result
+
+
+def _job_result_model_ids(db: Session) -> Set[str]:
+    """
+    学習ジョブの result_model_ids（JSON のリスト）に記録されているモデルID
+
+    JSON の包含検索はデータベースごとに書き方が異なるため、ジョブの行を読んで Python で集める
+    （ジョブの数はモデルの数と同程度で、保持期間クリーンアップ1回につき1回だけ読む）。
+
+    Args:
+        db: データベースセッション
+
+    Returns:
+        ジョブから参照されているモデルID
+    """
+    model_ids: Set[str] = set()
+    for ids in db.execute(
+        select(ModelTrainingJob.result_model_ids).where(ModelTrainingJob.result_model_ids.isnot(None))
+    ).scalars():
+        model_ids.update(str(model_id) for model_id in ids or ())
+    return model_ids
+
+
+def cleanup_expired_data(
+    db: Session,
+    days_to_keep: int = 90,
+    keep_latest_per_user: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    time_budget_seconds: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    保持期間を過ぎた予測結果・特徴量・学習メトリクス・AIモデルと、保持期限を過ぎたタスク結果を削除
+
+    タスク結果は days_to_keep ではなく各結果の expires_at で判定する。アクティブなモデルと、残っている予測結果・学習メトリクス・学習ジョブから参照されている
+    モデル（result_model_id / result_model_ids）は削除しない。処理時間の上限に達した場合は、それ以降のテーブルを次回の実行に回す。
+
+    Args:
+        db: データベースセッション
+        days_to_keep: 保持する日数
+        keep_latest_per_user: 予測結果・特徴量をユーザーごとに残す件数（None の場合は期間のみで判定）
+        batch_size: 1回の DELETE の最大件数（デフォルト: settings.retention_batch_size）
+        time_budget_seconds: 処理時間の上限（秒、デフォルト: settings.retention_time_budget_seconds）
+
+    Returns:
+        テーブルごとの削除件数を含む結果
+    """
+    if days_to_keep < 0:
+        raise ValidationError("保持日数は0以上である必要があります", field="days_to_keep")
+    if keep_latest_per_user is not None and keep_latest_per_user < 0:
+        raise ValidationError("残す件数は0以上である必要があります", field="keep_latest_per_user")
+
+    batch_size = batch_size or settings.retention_batch_size
+    time_budget_seconds = time_budget_seconds or settings.retention_time_budget_seconds
+    deadline = time.monotonic() + time_budget_seconds
+    now = datetime.now(timezone.utc)
+    cutoff_date = now - timedelta(days=days_to_keep)
+
+    # アクティブなモデルと参照されているモデルは残す（参照元を先に削除し、モデルは最後に削除する）
+    model_in_use = or_(
+        AIModel.is_active.is_(True),
+        exists().where(PredictionResult.model_id == AIModel.id),
+        exists().where(TrainingMetrics.model_id == AIModel.id),
+        exists().where(cast(ModelTrainingJob.result_model_id, String) == AIModel.id),
+        AIModel.id.in_(sorted(_job_result_model_ids(db))),
+    )
+    targets = [
+        ("predictions", PredictionResult, expired_ids_query(
+            PredictionResult, PredictionResult.created_at, cutoff_date, keep_latest_per_user=keep_latest_per_user
+        )),
+        ("features", FeatureStore, expired_ids_query(
+            FeatureStore, FeatureStore.calculation_date, cutoff_date, keep_latest_per_user=keep_latest_per_user
+        )),
+        ("metrics", TrainingMetrics, expired_ids_query(TrainingMetrics, TrainingMetrics.created_at, cutoff_date)),
+        ("models", AIModel, expired_ids_query(AIModel, AIModel.created_at, cutoff_date, [not_(model_in_use)])),
+        # タスク結果は明細を先に削除し、明細がすべて消えたヘッダーを削除する
+        ("task_result_items", TaskResultItem, select(TaskResultItem.id).where(
+            TaskResultItem.task_id.in_(expired_ids_query(TaskResult, TaskResult.expires_at, now))
+        )),
+        ("task_results", TaskResult, expired_ids_query(
+            TaskResult, TaskResult.expires_at, now, [~exists().where(TaskResultItem.task_id == TaskResult.id)]
+        )),
+    ]
+
+    deleted: Dict[str, int] = {}
+    batches = 0
+    complete = True
+    try:
+        for name, model, ids_query in targets:
+            result = delete_in_batches(db, model, ids_query, batch_size, deadline)
+            deleted[name] = result.deleted
+            batches += result.batches
+            if not result.complete:
+                complete = False
+                break
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Failed to cleanup expired data: {str(e)}")
+        raise DatabaseError(f"古いデータのクリーンアップに失敗しました: {str(e)}")
+
+    for name, _, _ in targets:
+        deleted.setdefault(name, 0)
+
+    if not complete:
+        logger.info(f"Cleanup stopped after {time_budget_seconds}s; remaining rows are left for the next run")
+    logger.info(f"Cleaned up {sum(deleted.values())} expired rows in {batches} batches")
+    return {
+        "cutoff_date": cutoff_date.isoformat(),
+        "deleted": deleted,
+        "batches": batches,
+        "complete": complete
+    }
@@ -0,0 +1,542 @@
+"""
+ワークアウトの重複検出・統合・削除
+
+このモジュールには以下の機能が含まれます：
+- 距離・時間・心拍数を量子化したフィンガープリントのハッシュによる完全一致の検出
+- 日付をブロッキングキーとした sorted neighborhood 法による近似一致の検出
+- しきい値に少し届かない組の「重複の可能性あり」としての個別の報告（統合の対象外）
+- 重複グループの統合（欠けている値を補完して1件を残す）と一括削除
+
+ユーザーの記録を (日付, 距離, 時間) で1回ソートし、同じ日の近傍 window 件だけを比較するため、
+検出のコストは記録数 n に対して O(n log n) になる。
+統合・削除は ORM の after_flush フックを通らない一括 UPDATE / DELETE のため、
+日次ロールアップ・データバージョン・相関統計の再構築フラグは同じトランザクション内で明示的に更新する。
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.exceptions import DatabaseError, NotFoundError, ValidationError
+from app.models.change_tracking import mark_users_changed
+from app.models.correlation_stats import invalidate_correlation_stats
+from app.models.data_version import bump_user_data_versions
+from app.models.training_load import refresh_workout_daily_rollups, workout_load_values
+from app.models.workout import Workout, WorkoutType
+
+logger = logging.getLogger(__name__)
+
+# フィンガープリントの量子化幅（距離 m, 時間 秒, 心拍数 bpm）
+DISTANCE_QUANTUM_METERS = 10
+DURATION_QUANTUM_SECONDS = 1
+HEART_RATE_QUANTUM_BPM = 1
+
+# 近似一致の項目ごとの許容相対誤差（これだけ離れると項目の類似度が0）
+FIELD_TOLERANCES = {
+    'distance': 0.05,
+    'duration': 0.10,
+    'heart_rate': 0.10,
+}
+
+# 類似度のしきい値からこの幅までを「重複の可能性あり」とする
+POTENTIAL_MARGIN = 0.15
+
+# 同じ日の中で比較する近傍の件数
+DEFAULT_WINDOW_SIZE = 10
+
+# IN 句1回あたりのID数
+DELETE_CHUNK_SIZE = 500
+
+# 統合時に残す記録の空の値を他の記録から補完する列
+_MERGE_COLUMNS = (
+    'target_distance_meters',
+    'target_times_seconds',
+    'actual_distance_meters',
+    'actual_times_seconds',
+    'repetitions',
+    'rest_type',
+    'rest_duration',
+    'intensity',
+    'notes',
+)
+
+_SUGGESTED_ACTIONS = {
+    'exact': 'delete_duplicates',
+    'similar': 'merge',
+    'potential': 'keep_all',
+}
+
+
+@dataclass
+class WorkoutFingerprint:
+    """重複検出に使うワークアウト1件分の値"""
+    id: str
+    date: date
+    created_at: Optional[datetime]
+    distance: Optional[float]  # m
+    duration: Optional[float]  # 秒
+    heart_rate: Optional[float]  # bpm
+    workout_name: Optional[str]
+    completeness: int  # 値が入っている列の数（統合時に残す記録の選択に使う）
+    key: Tuple[date, Optional[int], Optional[int], Optional[int]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # 完全一致のハッシュキー（日付と量子化した距離・時間・心拍数）
+        self.key = (
+            self.date,
+            _quantize(self.distance, DISTANCE_QUANTUM_METERS),
+            _quantize(self.duration, DURATION_QUANTUM_SECONDS),
+            _quantize(self.heart_rate, HEART_RATE_QUANTUM_BPM),
+        )
+
+    @property
+    def has_measurements(self) -> bool:
+        return self.distance is not None or self.duration is not None or self.heart_rate is not None
+
+
+@dataclass
+class WorkoutDuplicateGroup:
+    """重複グループ（records の先頭が残す記録）"""
+    id: str
+    records: List[WorkoutFingerprint]
+    similarity_scores: List[float]  # 残す記録との類似度
+    similarity_type: str  # 'exact', 'similar', 'potential'
+    suggested_action: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """DuplicateGroup スキーマの形式"""
+        return {
+            'id': self.id,
+            'records': [
+                {
+                    'id': record.id,
+                    'date': record.date.isoformat(),
+                    'distance_km': round((record.distance or 0.0) / 1000, 3),
+                    'time_minutes': round((record.duration or 0.0) / 60, 2),
+                    'pace_per_km': round(record.duration / 60 / (record.distance / 1000), 2)
+                    if record.distance and record.duration else 0.0,
+                    'workout_name': record.workout_name,
+                    'similarity_score': round(score, 4)
+                }
+                for record, score in zip(self.records, self.similarity_scores)
+            ],
+            'similarity_type': self.similarity_type,
+            'suggested_action': self.suggested_action
+        }
+
+
+@dataclass
+class DuplicateScanResult:
+    """重複検出の結果（groups は統合・削除の対象、potential_links は確認用の2件組）"""
+    groups: List[WorkoutDuplicateGroup]
+    scanned_records: int
+    compared_pairs: int
+    potential_links: List[WorkoutDuplicateGroup] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def total_duplicates(self) -> int:
+        """グループごとに残す1件を除いた重複記録数"""
+        return sum(len(group.records) - 1 for group in self.groups)
+
+
+def _quantize(value: Optional[float], quantum: float) -> Optional[int]:
+    return None if value is None else int(round(value / quantum))
+
+
+def record_similarity(a: WorkoutFingerprint, b: WorkoutFingerprint) -> float:
+    """
+    2件の記録の類似度（0-1）
+
+    両方に値がある項目ごとに 1 - 相対誤差 / 許容誤差 を計算して平均する。
+    共通の項目がなければ0。
+    """
+    scores = []
+    for name, tolerance in FIELD_TOLERANCES.items():
+        x, y = getattr(a, name), getattr(b, name)
+        if x is None or y is None:
+            continue
+        relative = abs(x - y) / max(x, y)
+        scores.append(max(0.0, 1.0 - relative / tolerance))
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def find_duplicate_groups(
+    records: Sequence[WorkoutFingerprint],
+    similarity_threshold: float = 0.8,
+    include_potential: bool = True,
+    window_size: int = DEFAULT_WINDOW_SIZE
+) -> Tuple[List[WorkoutDuplicateGroup], List[WorkoutDuplicateGroup], int]:
+    """
+    記録のリストから重複グループを検出
+
+    1. フィンガープリントのハッシュで完全一致をまとめる（O(n)）
+    2. 完全一致グループの代表を (日付, 距離, 時間) でソートし、同じ日の近傍 window_size 件と
+       類似度を比較して、しきい値以上の組だけを union-find でつなぐ（O(n log n + n × window)）
+    3. 残す記録との類似度がしきい値未満のメンバーはグループから外す
+
+    しきい値より POTENTIAL_MARGIN 低い類似度までの組は、グループとは別に2件組の
+    「重複の可能性あり」として返す。グループには加えないため、統合・削除の対象にならない。
+
+    Args:
+        records: 重複検出の対象
+        similarity_threshold: 近似一致とみなす類似度
+        include_potential: 「重複の可能性あり」の組を返すか
+        window_size: 同じ日の中で比較する近傍の件数
+
+    Returns:
+        (重複グループのリスト（日付順）, 重複の可能性がある組のリスト（日付順）, 類似度を比較した組の数)
+    """
+    potential_threshold = max(0.0, similarity_threshold - POTENTIAL_MARGIN)
+
+    # 完全一致（値がまったくない記録は対象外）
+    exact: Dict[Tuple, List[WorkoutFingerprint]] = {}
+    for record in records:
+        if record.has_measurements:
+            exact.setdefault(record.key, []).append(record)
+
+    # 完全一致グループの代表を sorted neighborhood で比較
+    keys = sorted(exact, key=_neighborhood_sort_key)
+    parent = list(range(len(keys)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    compared = 0
+    near_misses: List[Tuple[WorkoutFingerprint, WorkoutFingerprint, float]] = []
+    for i, key in enumerate(keys):
+        representative = exact[key][0]
+        for j in range(i + 1, min(i + 1 + window_size, len(keys))):
+            if keys[j][0] != key[0]:
+                break
+            compared += 1
+            score = record_similarity(representative, exact[keys[j]][0])
+            if score >= similarity_threshold:
+                parent[find(j)] = find(i)
+            elif score >= potential_threshold:
+                near_misses.append((representative, exact[keys[j]][0], score))
+
+    clusters: Dict[int, List[WorkoutFingerprint]] = {}
+    for i, key in enumerate(keys):
+        clusters.setdefault(find(i), []).extend(exact[key])
+
+    groups = []
+    group_of: Dict[str, str] = {}
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        members = sorted(members, key=_keep_priority)
+        keeper = members[0]
+        scored = []
+        for record in members[1:]:
+            score = 1.0 if record.key == keeper.key else record_similarity(keeper, record)
+            if score >= similarity_threshold:
+                scored.append((score, record))
+            elif score >= potential_threshold:
+                # 別のメンバー経由でつながっただけの記録は統合せず、可能性ありとして報告する
+                near_misses.append((keeper, record, score))
+        if not scored:
+            continue
+
+        scored.sort(key=lambda item: -item[0])
+        members = [keeper] + [record for _, record in scored]
+        similarity_type = 'exact' if all(record.key == keeper.key for record in members) else 'similar'
+        group = WorkoutDuplicateGroup(
+            id=duplicate_group_id(keeper.date, [record.id for record in members]),
+            records=members,
+            similarity_scores=[1.0] + [score for score, _ in scored],
+            similarity_type=similarity_type,
+            suggested_action=_SUGGESTED_ACTIONS[similarity_type]
+        )
+        groups.append(group)
+        group_of.update((record.id, group.id) for record in members)
+
+    potential_links = []
+    if include_potential:
+        seen: Set[Tuple[str, str]] = set()
+        for a, b, score in near_misses:
+            pair = tuple(sorted((a.id, b.id)))
+            if pair in seen or (a.id in group_of and group_of[a.id] == group_of.get(b.id)):
+                continue
+            seen.add(pair)
+            first, second = sorted((a, b), key=_keep_priority)
+            potential_links.append(WorkoutDuplicateGroup(
+                id=duplicate_group_id(first.date, list(pair)),
+                records=[first, second],
+                similarity_scores=[1.0, score],
+                similarity_type='potential',
+                suggested_action=_SUGGESTED_ACTIONS['potential']
+            ))
+
+    groups.sort(key=lambda group: (group.records[0].date, group.id))
+    potential_links.sort(key=lambda group: (group.records[0].date, group.id))
+    return groups, potential_links, compared
+
+
+def duplicate_group_id(day: date, record_ids: Sequence[str]) -> str:
+    """グループID（日付 + メンバーIDのハッシュ。統合時に同じ日だけを再検出できるよう日付を含める）"""
+    digest = hashlib.sha1(",".join(sorted(record_ids)).encode("utf-8")).hexdigest()[:12]
+    return f"{day.isoformat()}_{digest}"
+
+
+def _neighborhood_sort_key(key: Tuple) -> Tuple:
+    """近傍比較の並び順（日付, 距離, 時間, 心拍数。値がないものは後ろ）"""
+    day, distance, duration, heart_rate = key
+    return (
+        day,
+        distance is None, distance or 0,
+        duration is None, duration or 0,
+        heart_rate is None, heart_rate or 0,
+    )
+
+
+def _keep_priority(record: WorkoutFingerprint) -> Tuple:
+    """残す記録の優先順（値が多い → 先に登録された → ID 順）"""
+    created = record.created_at.timestamp() if record.created_at else float('inf')
+    return (-record.completeness, created, record.id)
+
+
+class DuplicateDetectionService:
+    """ワークアウト重複検出のサービスクラス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_fingerprints(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[WorkoutFingerprint]:
+        """
+        ユーザーのワークアウトを重複検出用の値に変換して取得
+
+        Args:
+            user_id: ユーザーID
+            start_date: 期間の初日
+            end_date: 期間の最終日
+
+        Returns:
+            ワークアウトごとの重複検出用の値
+        """
+        query = (
+            select(
+                Workout.id,
+                Workout.date,
+                Workout.created_at,
+                *(getattr(Workout, column) for column in _MERGE_COLUMNS),
+                Workout.extended_data,
+                WorkoutType.name.label('workout_name'),
+            )
+            .outerjoin(WorkoutType, WorkoutType.id == Workout.workout_type_id)
+            .where(Workout.user_id == str(user_id))
+        )
+        if start_date is not None:
+            query = query.where(Workout.date >= start_date)
+        if end_date is not None:
+            query = query.where(Workout.date <= end_date)
+
+        fingerprints = []
+        for row in self.db.execute(query):
+            values = workout_load_values(
+                row.actual_distance_meters or row.target_distance_meters,
+                row.actual_times_seconds or row.target_times_seconds,
+                row.intensity,
+                row.extended_data,
+            )
+            fingerprints.append(WorkoutFingerprint(
+                id=str(row.id),
+                date=row.date,
+                created_at=row.created_at,
+                distance=values['distance'],
+                duration=values['duration'],
+                heart_rate=values['heart_rate'],
+                workout_name=row.workout_name,
+                completeness=sum(getattr(row, column) is not None for column in _MERGE_COLUMNS)
+                + (len(row.extended_data) if isinstance(row.extended_data, dict) else 0)
+            ))
+        return fingerprints
+
+    def detect(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        similarity_threshold: float = 0.8,
+        include_potential: bool = True
+    ) -> DuplicateScanResult:
+        """
+        ユーザーのワークアウトから重複グループを検出
+
+        Args:
+            user_id: ユーザーID
+            start_date: 期間の初日
+            end_date: 期間の最終日
+            similarity_threshold: 近似一致とみなす類似度
+            include_potential: 「重複の可能性あり」の組を含めるか
+
+        Returns:
+            重複検出の結果
+        """
+        if not 0.0 < similarity_threshold <= 1.0:
+            raise ValidationError("類似度のしきい値は0より大きく1以下で指定してください")
+
+        try:
+            records = self.load_fingerprints(user_id, start_date, end_date)
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to load workouts for duplicate detection: {str(e)}")
+            raise DatabaseError(f"ワークアウトの取得に失敗しました: {str(e)}")
+
+        groups, potential_links, compared = find_duplicate_groups(records, similarity_threshold, include_potential)
+        logger.info(
+            f"Duplicate scan for user {user_id}: {len(records)} records, {compared} pairs, "
+            f"{len(groups)} groups, {len(potential_links)} potential links"
+        )
+        return DuplicateScanResult(
+            groups=groups,
+            scanned_records=len(records),
+            compared_pairs=compared,
+            potential_links=potential_links,
+            stats={
+                'exact_groups': sum(1 for g in groups if g.similarity_type == 'exact'),
+                'similar_groups': sum(1 for g in groups if g.similarity_type == 'similar'),
+                'potential_links': len(potential_links),
+            }
+        )
+
+    def merge_group(
+        self,
+        user_id: str,
+        group_id: str,
+        similarity_threshold: float = 0.8
+    ) -> Dict[str, Any]:
+        """
+        重複グループを1件に統合
+
+        グループIDの日付だけを再検出してグループを特定し、残す記録の空の列を他の記録の値で補完
+        （extended_data はキー単位で補完）したうえで、他の記録を一括削除する。
+        「重複の可能性あり」の組は統合できない。
+
+        Args:
+            user_id: ユーザーID
+            group_id: detect が返したグループID
+            similarity_threshold: 検出時と同じ類似度のしきい値
+
+        Returns:
+            残した記録のIDと削除した記録のID
+        """
+        try:
+            day = date.fromisoformat(group_id.split('_', 1)[0])
+        except ValueError:
+            raise ValidationError(f"重複グループIDが不正です: {group_id}")
+
+        scan = self.detect(user_id, day, day, similarity_threshold, include_potential=True)
+        if any(link.id == group_id for link in scan.potential_links):
+            raise ValidationError("重複の可能性がある組は統合できません。個別に確認して削除してください")
+        group = next((g for g in scan.groups if g.id == group_id), None)
+        if group is None:
+            raise NotFoundError("重複グループ", group_id)
+
+        keep_id = group.records[0].id
+        remove_ids = [record.id for record in group.records[1:]]
+
+        try:
+            rows = {
+                str(row.id): row
+                for row in self.db.execute(
+                    select(Workout.id, *(getattr(Workout, c) for c in _MERGE_COLUMNS), Workout.extended_data)
+                    .where(Workout.id.in_([keep_id] + remove_ids), Workout.user_id == str(user_id))
+                )
+            }
+            keeper = rows[keep_id]
+            others = [rows[record_id] for record_id in remove_ids if record_id in rows]
+
+            values: Dict[str, Any] = {}
+            for column in _MERGE_COLUMNS:
+                if getattr(keeper, column) is None:
+                    fill = next((getattr(r, column) for r in others if getattr(r, column) is not None), None)
+                    if fill is not None:
+                        values[column] = fill
+
+            extended = dict(keeper.extended_data) if isinstance(keeper.extended_data, dict) else {}
+            merged_extended = dict(extended)
+            for other in others:
+                if isinstance(other.extended_data, dict):
+                    for key, value in other.extended_data.items():
+                        merged_extended.setdefault(key, value)
+            if merged_extended != extended:
+                values['extended_data'] = merged_extended
+
+            if values:
+                self.db.execute(
+                    update(Workout).where(Workout.id == keep_id, Workout.user_id == str(user_id)).values(**values)
+                )
+            deleted = self._bulk_delete(user_id, remove_ids)
+            if values and not deleted:
+                self._sync_derived_data(user_id, {(str(user_id), day)})
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to merge duplicate group {group_id}: {str(e)}")
+            raise DatabaseError(f"重複記録の統合に失敗しました: {str(e)}")
+
+        logger.info(f"Merged duplicate group {group_id}: kept {keep_id}, deleted {deleted}")
+        return {'kept_id': keep_id, 'deleted_ids': remove_ids, 'deleted_count': deleted,
+                'filled_columns': sorted(values)}
+
+    def delete_records(self, user_id: str, record_ids: Sequence[str]) -> int:
+        """
+        指定したワークアウトを一括削除（他のユーザーの記録は対象外）
+
+        Args:
+            user_id: ユーザーID
+            record_ids: 削除するワークアウトID
+
+        Returns:
+            削除した件数
+        """
+        try:
+            deleted = self._bulk_delete(user_id, list(dict.fromkeys(str(i) for i in record_ids)))
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to delete duplicate records: {str(e)}")
+            raise DatabaseError(f"重複記録の削除に失敗しました: {str(e)}")
+
+        logger.info(f"Deleted {deleted} duplicate records for user {user_id}")
+        return deleted
+
+    def _bulk_delete(self, user_id: str, record_ids: List[str]) -> int:
+        """ID のチャンクごとに一括 DELETE し、影響した日のロールアップとデータバージョンを更新"""
+        user_id = str(user_id)
+        deleted = 0
+        affected: Set[Tuple[str, date]] = set()
+        for start in range(0, len(record_ids), DELETE_CHUNK_SIZE):
+            chunk = record_ids[start:start + DELETE_CHUNK_SIZE]
+            condition = (Workout.id.in_(chunk), Workout.user_id == user_id)
+            affected.update(
+                (user_id, day) for day in self.db.execute(select(Workout.date).where(*condition).distinct()).scalars()
+            )
+            result = self.db.execute(delete(Workout).where(*condition).execution_options(synchronize_session=False))
+            deleted += result.rowcount or 0
+
+        if deleted:
+            self._sync_derived_data(user_id, affected)
+        return deleted
+
+    def _sync_derived_data(self, user_id: str, keys: Set[Tuple[str, date]]):
+        """一括更新した日のロールアップ・ユーザーのデータバージョン・変更日時・相関統計の再構築フラグを更新"""
+        connection = self.db.connection()
+        refresh_workout_daily_rollups(connection, keys)
+        invalidate_correlation_stats(connection, keys)
+        bump_user_data_versions(connection, [str(user_id)])
+        mark_users_changed(connection, [str(user_id)])
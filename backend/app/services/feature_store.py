@@ -9,18 +9,20 @@
 """
 
 import logging
+import time
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
-import pandas as pd
 import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.config import settings
 from app.models.ai import FeatureStore
-from app.models.workout import Workout
 from app.models.race import RaceResult
 from app.models.user_profile import UserProfile
 from app.core.exceptions import DatabaseError, ValidationError
+from app.services.data_retention import delete_in_batches, expired_ids_query
+from app.ml.training_load_features import load_daily_rollups, calculate_training_load_features
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,9 @@ class FeatureStoreService:
         """
         ユーザーの特徴量を計算
         
+        練習データは日次ロールアップ（workout_daily_rollups）から計算するため、
+        計算量は練習回数ではなく期間の日数に比例する。
+        
         Args:
             user_id: ユーザーID
             days_back: 遡る日数
@@ -49,44 +54,46 @@ class FeatureStoreService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days_back)
             
-            # 練習データの取得
-            workouts = self._get_user_workouts(user_id, start_date, end_date)
+            # 練習データ（日次ロールアップ）の取得
+            rollups = load_daily_rollups(self.db, user_id, start_date, end_date)
             race_results = self._get_user_race_results(user_id, start_date, end_date)
             user_profile = self._get_user_profile(user_id)
             
-            if len(workouts) == 0:
+            if len(rollups) == 0:
                 logger.warning(f"No workout data found for user {user_id}")
                 return self._get_default_features(user_profile)
             
+            load = calculate_training_load_features(rollups)
+            
             # 特徴量計算
             features = {}
             
             # 基本統計特徴量
-            features.update(self._calculate_basic_stats_features(workouts))
+            features.update(self._calculate_basic_stats_features(load))
             
             # トレンド特徴量
-            features.update(self._calculate_trend_features(workouts))
+            features.update(self._calculate_trend_features(load))
             
             # 強度分布特徴量
-            features.update(self._calculate_intensity_features(workouts))
+            features.update(self._calculate_intensity_features(load))
             
             # レース履歴特徴量
             features.update(self._calculate_race_features(race_results))
             
             # 生理指標特徴量
-            features.update(self._calculate_physiological_features(user_profile, workouts))
+            features.update(self._calculate_physiological_features(user_profile, load))
             
             # 季節性特徴量
-            features.update(self._calculate_seasonal_features(workouts))
+            features.update(self._calculate_seasonal_features(load))
             
             # メタデータ
             features.update({
-                "total_workouts": len(workouts),
-                "total_distance": sum(w.distance for w in workouts if w.distance),
-                "avg_pace": np.mean([w.pace for w in workouts if w.pace]),
+                "total_workouts": load["total_workouts"],
+                "total_distance": load["total_distance"],
+                "avg_pace": load["avg_pace"],
                 "training_period_days": days_back,
                 "calculation_date": datetime.now().isoformat(),
-                "feature_version": "v1.0"
+                "feature_version": "v1.1"
             })
             
             logger.info(f"Calculated {len(features)} features for user {user_id}")
@@ -96,21 +103,6 @@ class FeatureStoreService:
             logger.error(f"Failed to calculate features for user {user_id}: {str(e)}")
             raise ValidationError(f"特徴量の計算に失敗しました: {str(e)}")
     
-    def _get_user_workouts(self, user_id: int, start_date: datetime, end_date: datetime) -> List[Workout]:
-        """ユーザーの練習データを取得"""
-        try:
-            workouts = self.db.query(Workout).filter(
-                Workout.user_id == user_id,
-                Workout.date >= start_date,
-                Workout.date <= end_date,
-                Workout.distance.isnot(None),
-                Workout.distance > 0
-            ).order_by(Workout.date).all()
-            return workouts
-        except Exception as e:
-            logger.error(f"Failed to get workouts for user {user_id}: {str(e)}")
-            return []
-    
     def _get_user_race_results(self, user_id: int, start_date: datetime, end_date: datetime) -> List[RaceResult]:
         """ユーザーのレース結果を取得"""
         try:
@@ -135,72 +127,37 @@ class FeatureStoreService:
             logger.error(f"Failed to get user profile for user {user_id}: {str(e)}")
             return None
     
-    def _calculate_basic_stats_features(self, workouts: List[Workout]) -> Dict[str, Any]:
+    def _calculate_basic_stats_features(self, load: Dict[str, float]) -> Dict[str, Any]:
         """基本統計特徴量の計算"""
-        if not workouts:
-            return {}
-        
-        distances = [w.distance for w in workouts if w.distance]
-        paces = [w.pace for w in workouts if w.pace]
-        
         return {
-            "weekly_avg_distance": np.mean(distances) * 7 if distances else 0,
-            "weekly_avg_frequency": len(workouts) / max(1, (workouts[-1].date - workouts[0].date).days / 7),
-            "avg_pace": np.mean(paces) if paces else 0,
-            "max_distance": np.max(distances) if distances else 0,
-            "min_distance": np.min(distances) if distances else 0,
-            "distance_std": np.std(distances) if distances else 0,
-            "pace_std": np.std(paces) if paces else 0
+            "weekly_avg_distance": load["weekly_avg_distance"],
+            "weekly_avg_frequency": load["weekly_avg_frequency"],
+            "avg_pace": load["avg_pace"],
+            "max_distance": load["max_distance"],
+            "min_distance": load["min_distance"],
+            "distance_std": load["distance_std"],
+            "pace_std": load["pace_std"]
         }
     
-    def _calculate_trend_features(self, workouts: List[Workout]) -> Dict[str, Any]:
-        """トレンド特徴量の計算"""
-        if len(workouts) < 2:
+    def _calculate_trend_features(self, load: Dict[str, float]) -> Dict[str, Any]:
+        """トレンド特徴量の計算（日付に対する線形回帰の傾き）"""
+        if load["total_workouts"] < 2:
             return {"distance_trend": 0, "pace_trend": 0, "intensity_trend": 0}
         
-        # 時系列データの準備
-        df = pd.DataFrame([{
-            'date': w.date,
-            'distance': w.distance or 0,
-            'pace': w.pace or 0,
-            'intensity': self._get_workout_intensity(w)
-        } for w in workouts])
-        
-        df = df.sort_values('date')
-        
-        # 線形回帰でトレンドを計算
-        x = np.arange(len(df))
-        
-        distance_trend = np.polyfit(x, df['distance'], 1)[0] if len(df) > 1 else 0
-        pace_trend = np.polyfit(x, df['pace'], 1)[0] if len(df) > 1 else 0
-        intensity_trend = np.polyfit(x, df['intensity'], 1)[0] if len(df) > 1 else 0
-        
         return {
-            "distance_trend": distance_trend,
-            "pace_trend": pace_trend,
-            "intensity_trend": intensity_trend
+            "distance_trend": load["distance_trend"],
+            "pace_trend": load["pace_trend"],
+            "intensity_trend": load["intensity_trend"]
         }
     
-    def _calculate_intensity_features(self, workouts: List[Workout]) -> Dict[str, Any]:
+    def _calculate_intensity_features(self, load: Dict[str, float]) -> Dict[str, Any]:
         """強度分布特徴量の計算"""
-        if not workouts:
-            return {}
-        
-        intensities = [self._get_workout_intensity(w) for w in workouts]
-        
-        easy_count = sum(1 for i in intensities if i < 0.6)
-        tempo_count = sum(1 for i in intensities if 0.6 <= i < 0.8)
-        interval_count = sum(1 for i in intensities if 0.8 <= i < 0.9)
-        race_count = sum(1 for i in intensities if i >= 0.9)
-        
-        total = len(intensities)
-        
         return {
-            "easy_ratio": easy_count / total if total > 0 else 0,
-            "tempo_ratio": tempo_count / total if total > 0 else 0,
-            "interval_ratio": interval_count / total if total > 0 else 0,
-            "race_ratio": race_count / total if total > 0 else 0,
-            "avg_intensity": np.mean(intensities) if intensities else 0
+            "easy_ratio": load["easy_ratio"],
+            "tempo_ratio": load["tempo_ratio"],
+            "interval_ratio": load["interval_ratio"],
+            "race_ratio": load["race_ratio"],
+            "avg_intensity": load["avg_intensity"]
         }
     
     def _calculate_race_features(self, race_results: List[RaceResult]) -> Dict[str, Any]:
@@ -236,7 +193,7 @@ class FeatureStoreService:
             "best_race_pace": np.min(race_paces) if race_paces else 0
         }
     
-    def _calculate_physiological_features(self, profile: Optional[UserProfile], workouts: List[Workout]) -> Dict[str, Any]:
+    def _calculate_physiological_features(self, profile: Optional[UserProfile], load: Dict[str, float]) -> Dict[str, Any]:
         """生理指標特徴量の計算"""
         features = {}
         
@@ -255,24 +212,18 @@ class FeatureStoreService:
             features["gender"] = 1 if profile.gender == "male" else 0
         
         # 心拍数データ（利用可能な場合）
-        heart_rates = [w.avg_heart_rate for w in workouts if w.avg_heart_rate]
-        features["avg_heart_rate"] = np.mean(heart_rates) if heart_rates else 0
-        features["max_heart_rate"] = np.max(heart_rates) if heart_rates else 0
+        features["avg_heart_rate"] = load["avg_heart_rate"]
+        features["max_heart_rate"] = load["max_heart_rate"]
         
         return features
     
-    def _calculate_seasonal_features(self, workouts: List[Workout]) -> Dict[str, Any]:
+    def _calculate_seasonal_features(self, load: Dict[str, float]) -> Dict[str, Any]:
         """季節性特徴量の計算"""
-        if not workouts:
+        if load["total_workouts"] == 0:
             return {"consistency_score": 0, "seasonal_factor": 0}
         
-        # 練習の一貫性スコア
-        dates = [w.date for w in workouts]
-        if len(dates) > 1:
-            intervals = [(dates[i+1] - dates[i]).days for i in range(len(dates)-1)]
-            consistency_score = 1 / (1 + np.std(intervals)) if intervals else 0
-        else:
-            consistency_score = 0
+        # 練習の一貫性スコア（練習間隔の標準偏差から算出）
+        consistency_score = load["consistency_score"] if load["total_workouts"] > 1 else 0
         
         # 季節要因（簡易版）
         current_month = datetime.now().month
@@ -283,26 +234,6 @@ class FeatureStoreService:
             "seasonal_factor": seasonal_factor
         }
     
-    def _get_workout_intensity(self, workout: Workout) -> float:
-        """練習強度の推定"""
-        if workout.pace and workout.avg_heart_rate:
-            # 心拍数ベースの強度推定
-            max_hr = 220 - 30  # 簡易的な最大心拍数推定
-            intensity = workout.avg_heart_rate / max_hr
-            return min(1.0, max(0.0, intensity))
-        elif workout.pace:
-            # ペースベースの強度推定（簡易版）
-            if workout.pace < 300:  # 5分/km未満
-                return 0.9
-            elif workout.pace < 360:  # 6分/km未満
-                return 0.7
-            elif workout.pace < 420:  # 7分/km未満
-                return 0.5
-            else:
-                return 0.3
-        else:
-            return 0.5  # デフォルト値
-    
     def _get_default_features(self, profile: Optional[UserProfile]) -> Dict[str, Any]:
         """デフォルト特徴量（データ不足時）"""
         features = {
@@ -331,7 +262,7 @@ class FeatureStoreService:
             "total_distance": 0,
             "training_period_days": 0,
             "calculation_date": datetime.now().isoformat(),
-            "feature_version": "v1.0"
+            "feature_version": "v1.1"
         }
         
         if profile:
@@ -449,30 +380,45 @@ class FeatureStoreService:
             logger.error(f"Failed to prepare training dataset: {str(e)}")
             raise DatabaseError(f"学習データセットの作成に失敗しました: {str(e)}")
     
-    def cleanup_old_features(self, days_to_keep: int = 90) -> int:
+    def cleanup_old_features(
+        self,
+        days_to_keep: int = 90,
+        keep_latest_per_user: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        time_budget_seconds: Optional[float] = None
+    ) -> int:
         """
         古い特徴量データをクリーンアップ
         
+        行を読み込まずに batch_size 件ずつ DELETE し、バッチごとにコミットする。
+        処理時間の上限に達した場合、残りは次回の呼び出しで削除される。
+        
         Args:
             days_to_keep: 保持する日数
+            keep_latest_per_user: ユーザーごとに期間に関係なく残す最新の件数
+            batch_size: 1回の DELETE の最大件数（デフォルト: settings.retention_batch_size）
+            time_budget_seconds: 処理時間の上限（秒、デフォルト: settings.retention_time_budget_seconds）
             
         Returns:
             削除されたレコード数
         """
         try:
             cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+            deadline = time.monotonic() + (time_budget_seconds or settings.retention_time_budget_seconds)
+            
+            result = delete_in_batches(
+                self.db,
+                FeatureStore,
+                expired_ids_query(
+                    FeatureStore, FeatureStore.calculation_date, cutoff_date,
+                    keep_latest_per_user=keep_latest_per_user
+                ),
+                batch_size or settings.retention_batch_size,
+                deadline
+            )
             
-            old_features = self.db.query(FeatureStore).filter(
-                FeatureStore.calculation_date < cutoff_date
-            ).all()
-            
-            deleted_count = len(old_features)
-            for feature in old_features:
-                self.db.delete(feature)
-            
-            self.db.commit()
-            logger.info(f"Cleaned up {deleted_count} old feature records")
-            return deleted_count
+            logger.info(f"Cleaned up {result.deleted} old feature records in {result.batches} batches")
+            return result.deleted
             
         except Exception as e:
             self.db.rollback()
@@ -0,0 +1,141 @@
+"""
+健康分析結果のメモ化キャッシュ
+
+このモジュールには以下の機能が含まれます：
+- (user_id, 日付, データバージョン) をキーとする分析結果の保存・取得
+- Workout / DailyMetrics / FeatureStore への書き込みによる自動無効化
+- 個別エンドポイントと /health-summary の間での結果の共有
+
+データバージョンは UserDataVersion（after_flush フックで更新）から取得するため、
+書き込みがあったプロセス以外のキャッシュも次のアクセス時にキー不一致で再計算されます。
+"""
+
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.data_version import get_user_data_version
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, int, str, str]
+
+
+class HealthAnalysisCache:
+    """健康分析結果のLRUキャッシュ"""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: int = 3600):
+        """
+        初期化
+
+        Args:
+            max_entries: 保持する最大エントリ数
+            ttl_seconds: エントリの有効期間（秒）
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self,
+        db: Session,
+        user_id: str,
+        kind: str,
+        compute: Callable[[], Dict[str, Any]],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        キャッシュ済みの分析結果を返し、なければ計算して保存
+
+        compute が例外を送出した場合は何も保存しない。
+
+        Args:
+            db: データベースセッション
+            user_id: ユーザーID
+            kind: 分析の種類（condition, risk など）
+            compute: 分析結果を計算する関数
+            params: 結果に影響するリクエストパラメータ
+
+        Returns:
+            分析結果（呼び出し元が変更してもキャッシュに影響しないコピー）
+        """
+        user_id = str(user_id)
+        version = get_user_data_version(db, user_id)
+        key = (user_id, date.today().isoformat(), version, kind, _params_key(params))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+
+        payload = compute()
+
+        with self._lock:
+            # 同じユーザーの古い日付・古いバージョンのエントリは二度と参照されないので削除
+            stale = [k for k in self._entries if k[0] == user_id and (k[1], k[2]) != (key[1], key[2])]
+            for stale_key in stale:
+                del self._entries[stale_key]
+
+            self._entries[key] = (now + self.ttl_seconds, copy.deepcopy(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return payload
+
+    def invalidate_user(self, user_id: str) -> int:
+        """ユーザーのエントリをすべて削除し、削除数を返す"""
+        user_id = str(user_id)
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == user_id]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """キャッシュの統計情報"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+def _params_key(params: Optional[Dict[str, Any]]) -> str:
+    """リクエストパラメータをキー用の文字列に正規化"""
+    if not params:
+        return ""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+# プロセス共有のキャッシュインスタンス
+health_analysis_cache = HealthAnalysisCache(
+    max_entries=settings.health_analysis_cache_size,
+    ttl_seconds=settings.health_analysis_cache_ttl
+)
@@ -0,0 +1,281 @@
+"""
+日次メトリクスのトレンド系列構築
+
+このモジュールには以下の機能が含まれます：
+- DailyMetrics の行を日付オフセットの密な配列に1パスで配置
+- 列指向（メトリクスごとの配列）のトレンド系列の生成
+- 長期間向けのサーバー側ダウンサンプリング（週・月バケットの平均 / LTTB）
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import asc
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.exceptions import DatabaseError, ValidationError
+from app.models.daily_metrics import DailyMetrics
+
+logger = logging.getLogger(__name__)
+
+# トレンドとして返すメトリクス（レスポンスの列）
+TREND_METRICS = (
+    'weight_kg',
+    'sleep_duration_hours',
+    'fatigue_level',
+    'motivation_level',
+    'stress_level',
+    'energy_level',
+    'training_readiness',
+    'resting_heart_rate'
+)
+
+MIN_TREND_DAYS = 7
+MAX_TREND_DAYS = 3650  # 10年
+
+RESOLUTIONS = ('daily', 'weekly', 'monthly')
+DOWNSAMPLE_METHODS = ('mean', 'lttb')
+
+# resolution='auto' のときに日次のまま返す最大日数・週次にする最大日数
+AUTO_DAILY_MAX_DAYS = 365
+AUTO_WEEKLY_MAX_DAYS = 3 * 365
+
+
+def resolve_resolution(resolution: str, days: int) -> str:
+    """
+    resolution='auto' を期間の長さに応じた解像度に解決
+
+    Args:
+        resolution: auto / daily / weekly / monthly
+        days: 期間の日数
+
+    Returns:
+        daily / weekly / monthly
+    """
+    if resolution != 'auto':
+        if resolution not in RESOLUTIONS:
+            raise ValidationError(f"未対応の解像度です: {resolution}", field="resolution")
+        return resolution
+    if days <= AUTO_DAILY_MAX_DAYS:
+        return 'daily'
+    if days <= AUTO_WEEKLY_MAX_DAYS:
+        return 'weekly'
+    return 'monthly'
+
+
+def densify_metrics(
+    rows: List[Tuple[Any, ...]],
+    start_date: date,
+    days: int
+) -> Dict[str, np.ndarray]:
+    """
+    (date, メトリクス...) の行を日付オフセットの密な配列に配置
+
+    同じ日の行が複数ある場合は後の行が優先される（呼び出し元で作成順に並べる）。
+
+    Args:
+        rows: date と TREND_METRICS の順の値からなる行
+        start_date: 期間の初日
+        days: 期間の日数
+
+    Returns:
+        メトリクス名 -> 長さ days の配列（欠測は NaN）
+    """
+    dense = np.full((len(TREND_METRICS), days), np.nan)
+    if rows:
+        offsets = np.fromiter(((row[0] - start_date).days for row in rows), dtype=np.int64, count=len(rows))
+        values = np.array([row[1:] for row in rows], dtype=np.float64)  # None は NaN になる
+        in_range = (offsets >= 0) & (offsets < days)
+        dense[:, offsets[in_range]] = values[in_range].T
+    return dict(zip(TREND_METRICS, dense))
+
+
+def bucket_days(start_date: date, days: int, resolution: str) -> Tuple[np.ndarray, List[date]]:
+    """
+    各日をカレンダーバケット（週は月曜始まり・月は1日始まり）に割り当てる
+
+    Args:
+        start_date: 期間の初日
+        days: 期間の日数
+        resolution: weekly / monthly
+
+    Returns:
+        (日ごとのバケット番号, バケットの開始日（期間の初日で切り詰め）)
+    """
+    day_values = np.datetime64(start_date, 'D') + np.arange(days)
+    if resolution == 'weekly':
+        first_monday = start_date - timedelta(days=start_date.weekday())
+        bucket_ids = (day_values - np.datetime64(first_monday, 'D')).astype(np.int64) // 7
+        starts = [first_monday + timedelta(weeks=int(b)) for b in range(int(bucket_ids[-1]) + 1)]
+    elif resolution == 'monthly':
+        months = day_values.astype('datetime64[M]')
+        bucket_ids = (months - months[0]).astype(np.int64)
+        starts = [m.astype('datetime64[D]').item() for m in np.unique(months)]
+    else:
+        raise ValidationError(f"未対応の解像度です: {resolution}", field="resolution")
+
+    starts[0] = max(starts[0], start_date)
+    return bucket_ids, starts
+
+
+def downsample_mean(values: np.ndarray, bucket_ids: np.ndarray, num_buckets: int) -> np.ndarray:
+    """バケットごとの欠測を除いた平均（観測がないバケットは NaN）"""
+    observed = ~np.isnan(values)
+    sums = np.bincount(bucket_ids, weights=np.where(observed, values, 0.0), minlength=num_buckets)
+    counts = np.bincount(bucket_ids, weights=observed, minlength=num_buckets)
+    means = np.full(num_buckets, np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return means
+
+
+def downsample_lttb(values: np.ndarray, bucket_ids: np.ndarray, num_buckets: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets でバケットごとに代表点を1つ選ぶ
+
+    バケットはカレンダーの週・月で、各バケットでは直前に選んだ点と次のバケットの平均点で作る
+    三角形の面積が最大になる観測値を選ぶ。ピークや谷が平均でならされないため、
+    長期間のグラフでも急な変化が残る。
+
+    Args:
+        values: 日次の値（欠測は NaN）
+        bucket_ids: 日ごとのバケット番号（単調非減少）
+        num_buckets: バケット数
+
+    Returns:
+        バケットごとの代表値（観測がないバケットは NaN）
+    """
+    observed = ~np.isnan(values)
+    x_obs = np.flatnonzero(observed).astype(np.float64)
+    y_obs = values[observed]
+    result = np.full(num_buckets, np.nan)
+    if len(y_obs) == 0:
+        return result
+
+    # 観測点だけを詰めた配列上でのバケット境界と、各バケットの平均点
+    obs_buckets = bucket_ids[observed]
+    bounds = np.searchsorted(obs_buckets, np.arange(num_buckets + 1))
+    counts = np.diff(bounds)
+    non_empty = np.flatnonzero(counts)
+    bucket_x = np.add.reduceat(x_obs, bounds[non_empty]) / counts[non_empty]
+    bucket_y = np.add.reduceat(y_obs, bounds[non_empty]) / counts[non_empty]
+
+    # バケット内の点は高々31個なので、逐次選択はPythonのリストで行う
+    xs, ys = x_obs.tolist(), y_obs.tolist()
+    starts, ends = bounds[non_empty].tolist(), bounds[non_empty + 1].tolist()
+    next_xs, next_ys = bucket_x.tolist(), bucket_y.tolist()
+
+    # 最初と最後の観測点は必ず残す
+    result[non_empty[0]] = ys[0]
+    previous_x, previous_y = xs[0], ys[0]
+    for position in range(1, len(non_empty) - 1):
+        next_x, next_y = next_xs[position + 1], next_ys[position + 1]
+        best_area, best = -1.0, starts[position]
+        for i in range(starts[position], ends[position]):
+            area = abs((previous_x - next_x) * (ys[i] - previous_y) - (previous_x - xs[i]) * (next_y - previous_y))
+            if area > best_area:
+                best_area, best = area, i
+        previous_x, previous_y = xs[best], ys[best]
+        result[non_empty[position]] = previous_y
+    result[non_empty[-1]] = y_obs[-1]
+
+    return result
+
+
+def build_trend_series(
+    rows: List[Tuple[Any, ...]],
+    start_date: date,
+    days: int,
+    resolution: str = 'daily',
+    method: str = 'mean'
+) -> Dict[str, Any]:
+    """
+    DailyMetrics の行から列指向のトレンド系列を構築
+
+    Args:
+        rows: date と TREND_METRICS の順の値からなる行（作成順）
+        start_date: 期間の初日
+        days: 期間の日数
+        resolution: daily / weekly / monthly
+        method: ダウンサンプリング方法（mean / lttb）
+
+    Returns:
+        dates と各メトリクスのリスト（欠測は None）、resolution、method
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValidationError(f"未対応のダウンサンプリング方法です: {method}", field="method")
+
+    dense = densify_metrics(rows, start_date, days)
+
+    if resolution == 'daily':
+        dates = [start_date + timedelta(days=offset) for offset in range(days)]
+        series = dense
+    else:
+        bucket_ids, starts = bucket_days(start_date, days, resolution)
+        downsample = downsample_lttb if method == 'lttb' else downsample_mean
+        dates = starts
+        series = {name: downsample(values, bucket_ids, len(starts)) for name, values in dense.items()}
+
+    result: Dict[str, Any] = {'dates': [d.isoformat() for d in dates]}
+    for name, values in series.items():
+        result[name] = _to_optional_list(values)
+    result['resolution'] = resolution
+    result['method'] = method if resolution != 'daily' else None
+    return result
+
+
+def _to_optional_list(values: np.ndarray) -> List[Optional[float]]:
+    """NaN を None にしたリストに変換"""
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+class MetricsTrendService:
+    """日次メトリクスのトレンド取得サービスクラス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_trends(
+        self,
+        user_id: str,
+        days: int = 30,
+        resolution: str = 'auto',
+        method: str = 'mean',
+        end_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        ユーザーのメトリクストレンドを取得
+
+        Args:
+            user_id: ユーザーID
+            days: 期間の日数
+            resolution: auto / daily / weekly / monthly
+            method: ダウンサンプリング方法（mean / lttb）
+            end_date: 期間の最終日（デフォルト: 今日）
+
+        Returns:
+            列指向のトレンド系列
+        """
+        if not MIN_TREND_DAYS <= days <= MAX_TREND_DAYS:
+            raise ValidationError(f"期間は{MIN_TREND_DAYS}日以上{MAX_TREND_DAYS}日以下で指定してください", field="days")
+
+        end_date = end_date or date.today()
+        start_date = end_date - timedelta(days=days - 1)
+        resolution = resolve_resolution(resolution, days)
+
+        try:
+            rows = self.db.query(
+                DailyMetrics.date,
+                *(getattr(DailyMetrics, name) for name in TREND_METRICS)
+            ).filter(
+                DailyMetrics.user_id == user_id,
+                DailyMetrics.date >= start_date,
+                DailyMetrics.date <= end_date
+            ).order_by(asc(DailyMetrics.date), asc(DailyMetrics.created_at)).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error fetching metrics trends: {str(e)}")
+            raise DatabaseError(f"メトリクストレンドの取得に失敗しました: {str(e)}")
+
+        return build_trend_series(rows, start_date, days, resolution, method)
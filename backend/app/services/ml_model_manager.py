@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models.ai import AIModel
+from app.ml.model_cache import warm_model_cache
 from app.core.exceptions import DatabaseError, ValidationError, NotFoundError
 
 logger = logging.getLogger(__name__)
@@ -64,8 +65,12 @@ class MLModelManager:
         try:
             logger.info(f"モデル読み込み: model_id={model_id}")
             
-            # データ収集段階ではモックモデルを返す
-            # 実際の実装では、model_pathからモデルファイルを読み込む
+            # プロセス内のキャッシュから取得（ワーカーでは起動時にプリロード済み）
+            model = warm_model_cache.get_model(self.db, model_id)
+            if model is not None:
+                return model
+            
+            # データ収集段階（モデルファイルがない場合）ではモックモデルを返す
             return MockModel()
             
         except Exception as e:
@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
@@ -8,16 +9,46 @@ from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
-import joblib
 import os
+import hashlib
 import logging
 from app.models.workout import Workout, WorkoutType
+from app.models.training_load import WorkoutDailyRollup
 from app.models.race import RaceResult
 from app.models.user_profile import UserProfile
 from app.schemas.prediction import TargetEventEnum
+from app.ml.model_artifacts import save_model_artifact
+from app.ml.model_cache import warm_model_cache
 
 logger = logging.getLogger(__name__)
 
+# レース前の練習集計期間（12週間）
+TRAINING_WINDOW_DAYS = 84
+# 学習サンプルとして採用する最小練習数
+MIN_WINDOW_WORKOUTS = 5
+# (ユーザー, 日付) キーの日付部分の幅（date.toordinal() の最大値より大きい値）
+KEY_STRIDE = 1 << 22
+# 学習データセットのキャッシュ形式バージョン
+TRAINING_DATA_VERSION = 2
+
+# 種目距離マッピング（距離の定まらない other は対象外）
+EVENT_DISTANCES = {
+    TargetEventEnum.five_k: 5000,
+    TargetEventEnum.ten_k: 10000,
+    TargetEventEnum.half_marathon: 21097.5,
+    TargetEventEnum.marathon: 42195,
+}
+
+# プロフィール特徴量のデフォルト値
+PROFILE_DEFAULTS = {
+    'age': 30,
+    'bmi': 22,
+    'height': 170,
+    'weight': 65,
+    'resting_hr': 60,
+    'max_hr': 190
+}
+
 
 class ModelTrainingService:
     """機械学習モデルの学習と管理サービス"""
@@ -26,8 +57,10 @@ class ModelTrainingService:
         self.db = db
         self.model_cache_dir = "models"
         self.scaler_cache_dir = "scalers"
+        self.training_data_cache_dir = "training_data_cache"
         os.makedirs(self.model_cache_dir, exist_ok=True)
         os.makedirs(self.scaler_cache_dir, exist_ok=True)
+        os.makedirs(self.training_data_cache_dir, exist_ok=True)
 
     def train_models_for_event(self, target_event: TargetEventEnum) -> Dict[str, Any]:
         """特定の種目に対するモデルを学習"""
@@ -66,8 +99,8 @@ class ModelTrainingService:
             model_path = os.path.join(self.model_cache_dir, f"{target_event.value}_model.joblib")
             scaler_path = os.path.join(self.scaler_cache_dir, f"{target_event.value}_scaler.joblib")
             
-            joblib.dump(best_model, model_path)
-            joblib.dump(scaler, scaler_path)
+            save_model_artifact(best_model, model_path, metadata={'event': target_event.value, 'algorithm': best_model_name})
+            save_model_artifact(scaler, scaler_path, metadata={'event': target_event.value})
             
             # 7. 特徴量重要度の計算
             feature_importance = self._get_feature_importance(best_model, X.columns)
@@ -93,187 +126,322 @@ class ModelTrainingService:
             }
 
     def _prepare_training_data(self, target_event: TargetEventEnum) -> Tuple[pd.DataFrame, pd.Series]:
-        """学習データの準備"""
+        """
+        学習データの準備
+        
+        レース・練習・プロフィールをそれぞれ1クエリで取得し、各レース前12週間の特徴量を
+        ソート済み配列の searchsorted と累積和でまとめて計算する。
+        組み立てたデータセットはデータのウォーターマーク単位でディスクにキャッシュする。
+        """
         # 過去1年のデータを取得
         start_date = date.today() - timedelta(days=365)
         
-        # 該当種目のレース結果を取得
-        races = (
-            self.db.query(RaceResult)
+        if target_event not in EVENT_DISTANCES:
+            return pd.DataFrame(), pd.Series()
+        
+        target_distance = EVENT_DISTANCES[target_event]
+        
+        # 該当距離のレース（±10%の範囲）を取得
+        tolerance = 0.1
+        race_rows = (
+            self.db.query(RaceResult.id, RaceResult.user_id, RaceResult.race_date, RaceResult.time_seconds)
             .filter(
                 RaceResult.race_date >= start_date,
                 RaceResult.distance_meters.isnot(None),
-                RaceResult.time_seconds.isnot(None)
+                RaceResult.time_seconds.isnot(None),
+                RaceResult.distance_meters >= target_distance * (1 - tolerance),
+                RaceResult.distance_meters <= target_distance * (1 + tolerance)
             )
+            .order_by(RaceResult.race_date, RaceResult.id)
             .all()
         )
+        races = pd.DataFrame(race_rows, columns=['id', 'user_id', 'race_date', 'time_seconds'])
         
-        # 種目距離マッピング
-        event_distances = {
-            TargetEventEnum.event_800m: 800,
-            TargetEventEnum.event_1500m: 1500,
-            TargetEventEnum.event_3000m: 3000,
-            TargetEventEnum.event_5000m: 5000,
-            TargetEventEnum.event_10000m: 10000,
-            TargetEventEnum.event_5km: 5000,
-            TargetEventEnum.event_10km: 10000,
-            TargetEventEnum.event_half: 21097.5,
-            TargetEventEnum.event_full: 42195,
-        }
-        
-        target_distance = event_distances[target_event]
-        
-        # 該当距離のレースをフィルタリング（±10%の範囲）
-        tolerance = 0.1
-        filtered_races = [
-            race for race in races
-            if abs(race.distance_meters - target_distance) / target_distance <= tolerance
-        ]
-        
-        training_data = []
-        
-        for race in filtered_races:
-            # 各レースの前12週間の練習データを取得
-            race_date = race.race_date
-            training_start = race_date - timedelta(days=84)
-            
-            workouts = (
-                self.db.query(Workout)
-                .join(WorkoutType)
-                .filter(
-                    Workout.user_id == race.user_id,
-                    Workout.date >= training_start,
-                    Workout.date < race_date
-                )
-                .order_by(Workout.date.desc())
-                .all()
-            )
-            
-            if len(workouts) < 5:  # 最小練習数チェック
-                continue
-            
-            # 特徴量抽出
-            features = self._extract_training_features(workouts, race.user_id)
-            if features:
-                features['target_time'] = race.time_seconds
-                training_data.append(features)
-        
-        if not training_data:
+        if races.empty:
             return pd.DataFrame(), pd.Series()
         
-        # DataFrameに変換
-        df = pd.DataFrame(training_data)
-        X = df.drop('target_time', axis=1)
-        y = df['target_time']
+        user_ids = races['user_id'].unique().tolist()
+        
+        # キャッシュ確認
+        cache_path = os.path.join(
+            self.training_data_cache_dir,
+            f"{target_event.value}_{self._training_data_watermark(races, user_ids)}.pkl"
+        )
+        if os.path.exists(cache_path):
+            try:
+                X, y = pd.read_pickle(cache_path)
+                logger.info(f"Loaded cached training data for {target_event.value}: {len(X)} samples")
+                return X, y
+            except Exception as e:
+                logger.warning(f"Failed to load cached training data {cache_path}: {str(e)}")
+        
+        workouts = self._load_workout_frame(
+            user_ids,
+            races['race_date'].min() - timedelta(days=TRAINING_WINDOW_DAYS),
+            races['race_date'].max()
+        )
+        profiles = self._load_profile_frame(user_ids)
+        
+        X, y = self._build_training_frame(races, workouts, profiles)
+        self._save_training_data_cache(target_event, cache_path, X, y)
         
         return X, y
 
-    def _extract_training_features(self, workouts: List[Workout], user_id: str) -> Optional[Dict[str, float]]:
-        """学習用特徴量の抽出"""
+    def _training_data_watermark(self, races: pd.DataFrame, user_ids: List[str]) -> str:
+        """
+        学習データセットのウォーターマーク
+        
+        対象レースの内容と、対象ユーザーの練習・日次ロールアップ・プロフィールの件数と最終更新日時、
+        ロールアップの距離・時間・強度の合計から算出する（ワークアウトの更新はロールアップに反映される）。
+        """
+        workout_stats = (
+            self.db.query(func.count(Workout.id), func.max(Workout.created_at))
+            .filter(Workout.user_id.in_(user_ids))
+            .one()
+        )
+        rollup_stats = (
+            self.db.query(
+                func.count(WorkoutDailyRollup.id),
+                func.max(WorkoutDailyRollup.updated_at),
+                func.sum(WorkoutDailyRollup.distance_sum),
+                func.sum(WorkoutDailyRollup.duration_sum),
+                func.sum(WorkoutDailyRollup.intensity_sum)
+            )
+            .filter(WorkoutDailyRollup.user_id.in_(user_ids))
+            .one()
+        )
+        profile_stats = (
+            self.db.query(func.count(UserProfile.id), func.max(UserProfile.updated_at))
+            .filter(UserProfile.user_id.in_(user_ids))
+            .one()
+        )
+        
+        digest = hashlib.sha256()
+        digest.update(f"v{TRAINING_DATA_VERSION}".encode())
+        digest.update(pd.util.hash_pandas_object(races.astype(str), index=False).values.tobytes())
+        for stats in (workout_stats, rollup_stats, profile_stats):
+            digest.update(repr(tuple(stats)).encode())
+        return digest.hexdigest()[:16]
+
+    def _save_training_data_cache(self, target_event: TargetEventEnum, cache_path: str, X: pd.DataFrame, y: pd.Series):
+        """学習データセットをキャッシュに保存し、同じ種目の古いキャッシュを削除"""
         try:
-            features = {}
-            
-            # 基本統計特徴量
-            distances = [w.distance_meters for w in workouts if w.distance_meters]
-            durations = [w.duration_seconds for w in workouts if w.duration_seconds]
-            intensities = [w.intensity for w in workouts if w.intensity]
-            
-            if not distances or not durations:
-                return None
-            
-            # ペース計算
-            paces = []
-            for w in workouts:
-                if w.distance_meters and w.duration_seconds:
-                    pace = (w.duration_seconds / w.distance_meters) * 1000
-                    paces.append(pace)
-            
-            features.update({
-                'total_workouts': len(workouts),
-                'avg_distance': np.mean(distances),
-                'avg_duration': np.mean(durations),
-                'avg_pace': np.mean(paces) if paces else 0,
-                'total_distance': sum(distances),
-                'avg_intensity': np.mean(intensities) if intensities else 0,
-                'pace_std': np.std(paces) if paces else 0,
-                'distance_std': np.std(distances),
-                'max_distance': max(distances),
-                'min_distance': min(distances)
-            })
-            
-            # 強度分布
-            if intensities:
-                easy_count = sum(1 for i in intensities if i <= 3)
-                tempo_count = sum(1 for i in intensities if 4 <= i <= 6)
-                interval_count = sum(1 for i in intensities if 7 <= i <= 8)
-                race_count = sum(1 for i in intensities if i >= 9)
-                total = len(intensities)
-                
-                features.update({
-                    'easy_ratio': easy_count / total,
-                    'tempo_ratio': tempo_count / total,
-                    'interval_ratio': interval_count / total,
-                    'race_ratio': race_count / total
-                })
-            
-            # トレンド特徴量
-            if len(workouts) >= 4:
-                workout_data = []
-                for w in workouts:
-                    if w.distance_meters and w.duration_seconds:
-                        pace = (w.duration_seconds / w.distance_meters) * 1000
-                        workout_data.append({
-                            'date': w.date,
-                            'pace': pace,
-                            'distance': w.distance_meters,
-                            'intensity': w.intensity or 0
-                        })
-                
-                if len(workout_data) >= 4:
-                    workout_data.sort(key=lambda x: x['date'])
-                    
-                    dates = np.array([(d['date'] - workout_data[0]['date']).days for d in workout_data])
-                    paces = np.array([d['pace'] for d in workout_data])
-                    distances = np.array([d['distance'] for d in workout_data])
-                    intensities = np.array([d['intensity'] for d in workout_data])
-                    
-                    features.update({
-                        'pace_trend': np.polyfit(dates, paces, 1)[0] if len(dates) > 1 else 0,
-                        'distance_trend': np.polyfit(dates, distances, 1)[0] if len(dates) > 1 else 0,
-                        'intensity_trend': np.polyfit(dates, intensities, 1)[0] if len(dates) > 1 else 0
-                    })
-            
-            # ユーザープロフィール特徴量
-            profile = (
-                self.db.query(UserProfile)
-                .filter(UserProfile.user_id == user_id)
-                .first()
+            prefix = f"{target_event.value}_"
+            for file_name in os.listdir(self.training_data_cache_dir):
+                if file_name.startswith(prefix) and file_name.endswith(".pkl"):
+                    os.remove(os.path.join(self.training_data_cache_dir, file_name))
+            
+            temp_path = f"{cache_path}.tmp"
+            pd.to_pickle((X, y), temp_path)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to cache training data for {target_event.value}: {str(e)}")
+
+    def _load_workout_frame(self, user_ids: List[str], start_date: date, end_date: date) -> pd.DataFrame:
+        """対象ユーザー・期間の練習データを1クエリで列指向のDataFrameとして取得"""
+        rows = (
+            self.db.query(
+                Workout.user_id,
+                Workout.date,
+                Workout.actual_distance_meters,
+                Workout.target_distance_meters,
+                Workout.actual_times_seconds,
+                Workout.target_times_seconds,
+                Workout.intensity
+            )
+            .join(WorkoutType)
+            .filter(
+                Workout.user_id.in_(user_ids),
+                Workout.date >= start_date,
+                Workout.date < end_date
+            )
+            .all()
+        )
+        raw = pd.DataFrame(rows, columns=[
+            'user_id', 'date', 'actual_distance', 'target_distance', 'actual_times', 'target_times', 'intensity'
+        ])
+        
+        def _total_time(times):
+            if isinstance(times, (list, tuple)) and times:
+                return float(sum(t for t in times if isinstance(t, (int, float))))
+            return np.nan
+        
+        # Workout.distance_meters / times_seconds プロパティと同じく actual → target の順で解決
+        distance = pd.to_numeric(raw['actual_distance'], errors='coerce')
+        distance = distance.where(distance > 0, pd.to_numeric(raw['target_distance'], errors='coerce'))
+        times = raw['actual_times'].where(raw['actual_times'].map(bool), raw['target_times'])
+        duration = times.map(_total_time)
+        
+        frame = pd.DataFrame({
+            'user_id': raw['user_id'],
+            'day': raw['date'].map(lambda d: d.toordinal()).astype(np.int64),
+            'distance': distance.where(distance > 0).astype(float),
+            'duration': duration.where(duration > 0).astype(float),
+            'intensity': pd.to_numeric(raw['intensity'], errors='coerce').astype(float)
+        })
+        frame['pace'] = frame['duration'] / frame['distance'] * 1000
+        return frame
+
+    def _load_profile_frame(self, user_ids: List[str]) -> pd.DataFrame:
+        """対象ユーザーのプロフィール特徴量を1クエリで取得"""
+        rows = (
+            self.db.query(
+                UserProfile.user_id,
+                UserProfile.age,
+                UserProfile.bmi,
+                UserProfile.height_cm,
+                UserProfile.weight_kg,
+                UserProfile.resting_hr,
+                UserProfile.max_hr
+            )
+            .filter(UserProfile.user_id.in_(user_ids))
+            .all()
+        )
+        return pd.DataFrame(rows, columns=['user_id'] + list(PROFILE_DEFAULTS.keys())).set_index('user_id')
+
+    def _build_training_frame(self, races: pd.DataFrame, workouts: pd.DataFrame,
+                              profiles: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        各レース前12週間の練習から学習用特徴量を一括計算
+        
+        練習を (ユーザー, 日付) のキーでソートし、各レースの窓 [レース日-84日, レース日) を
+        searchsorted で求めて、累積和の差分から件数・合計・二乗和・回帰の十分統計量を得る。
+        
+        Args:
+            races: id / user_id / race_date / time_seconds
+            workouts: _load_workout_frame の結果
+            profiles: _load_profile_frame の結果（user_id インデックス）
+            
+        Returns:
+            (特徴量DataFrame, ターゲットSeries)
+        """
+        user_codes = {user_id: code for code, user_id in enumerate(races['user_id'].unique())}
+        
+        # 日付（序数）が KEY_STRIDE 未満であることを利用して (ユーザー, 日付) を1つの整数キーにまとめる
+        workouts = workouts[workouts['user_id'].isin(user_codes.keys())]
+        keys = workouts['user_id'].map(user_codes).to_numpy(np.int64) * KEY_STRIDE + workouts['day'].to_numpy(np.int64)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        
+        race_keys = (races['user_id'].map(user_codes).to_numpy(np.int64) * KEY_STRIDE
+                     + races['race_date'].map(lambda d: d.toordinal()).to_numpy(np.int64))
+        lo = np.searchsorted(keys, race_keys - TRAINING_WINDOW_DAYS, side='left')
+        hi = np.searchsorted(keys, race_keys, side='left')
+        
+        def column(name: str) -> np.ndarray:
+            return workouts[name].to_numpy(np.float64)[order]
+        
+        distance = column('distance')
+        duration = column('duration')
+        pace = column('pace')
+        intensity = column('intensity')
+        # 回帰の x は日付オフセット（傾きは平行移動に不変なので全体の最小日を基準にする）
+        day = workouts['day'].to_numpy(np.int64)[order]
+        x = (day - day.min()).astype(np.float64) if len(day) else day.astype(np.float64)
+        
+        def window_sum(values: np.ndarray) -> np.ndarray:
+            prefix = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+            return prefix[hi] - prefix[lo]
+        
+        has_distance = ~np.isnan(distance)
+        has_duration = ~np.isnan(duration)
+        has_pace = ~np.isnan(pace)
+        # 強度0は未設定として扱う
+        has_intensity = ~np.isnan(intensity) & (intensity != 0)
+        d = np.where(has_distance, distance, 0.0)
+        p = np.where(has_pace, pace, 0.0)
+        i = np.where(has_intensity, intensity, 0.0)
+        
+        n_workouts = (hi - lo).astype(np.float64)
+        n_distance = window_sum(has_distance)
+        n_duration = window_sum(has_duration)
+        n_pace = window_sum(has_pace)
+        n_intensity = window_sum(has_intensity)
+        
+        # 最小練習数・距離と時間の有無をチェック
+        valid = (n_workouts >= MIN_WINDOW_WORKOUTS) & (n_distance > 0) & (n_duration > 0)
+        
+        sum_distance = window_sum(d)
+        sum_pace = window_sum(p)
+        sum_intensity = window_sum(i)
+        
+        # 分散は桁落ちを抑えるため全体平均で中心化した値の二乗和から求める
+        d_centered = np.where(has_distance, d - (d[has_distance].mean() if has_distance.any() else 0.0), 0.0)
+        p_centered = np.where(has_pace, p - (p[has_pace].mean() if has_pace.any() else 0.0), 0.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_distance = sum_distance / n_distance
+            avg_pace = np.where(n_pace > 0, sum_pace / n_pace, 0.0)
+            distance_var = np.where(
+                n_distance > 1,
+                window_sum(d_centered ** 2) / n_distance - (window_sum(d_centered) / n_distance) ** 2,
+                0.0
+            )
+            pace_var = np.where(
+                n_pace > 1,
+                window_sum(p_centered ** 2) / n_pace - (window_sum(p_centered) / n_pace) ** 2,
+                0.0
             )
             
-            if profile:
-                features.update({
-                    'age': profile.age or 30,
-                    'bmi': profile.bmi or 22,
-                    'height': profile.height_cm or 170,
-                    'weight': profile.weight_kg or 65,
-                    'resting_hr': profile.resting_hr or 60,
-                    'max_hr': profile.max_hr or 190
-                })
-            else:
-                features.update({
-                    'age': 30,
-                    'bmi': 22,
-                    'height': 170,
-                    'weight': 65,
-                    'resting_hr': 60,
-                    'max_hr': 190
-                })
-            
-            return features
+            features = {
+                'total_workouts': n_workouts,
+                'avg_distance': avg_distance,
+                'avg_duration': window_sum(np.where(has_duration, duration, 0.0)) / n_duration,
+                'avg_pace': avg_pace,
+                'total_distance': sum_distance,
+                'avg_intensity': np.where(n_intensity > 0, sum_intensity / n_intensity, 0.0),
+                'pace_std': np.sqrt(np.clip(pace_var, 0.0, None)),
+                'distance_std': np.sqrt(np.clip(distance_var, 0.0, None)),
+            }
             
-        except Exception as e:
-            logger.error(f"Feature extraction failed: {str(e)}")
-            return None
+            # 強度分布（強度の記録がない場合は欠損）
+            for name, mask in (
+                ('easy_ratio', intensity <= 3),
+                ('tempo_ratio', (intensity >= 4) & (intensity <= 6)),
+                ('interval_ratio', (intensity >= 7) & (intensity <= 8)),
+                ('race_ratio', intensity >= 9),
+            ):
+                features[name] = np.where(n_intensity > 0, window_sum(has_intensity & mask) / n_intensity, np.nan)
+            
+            # トレンド（距離と時間の両方がある練習が4件以上ある場合のみ、日付に対する回帰の傾き）
+            px = np.where(has_pace, x, 0.0)
+            sum_x = window_sum(px)
+            denominator = n_pace * window_sum(px * x) - sum_x ** 2
+            has_trend = (n_pace >= 4) & (np.abs(denominator) > 1e-9)
+            for name, y_values in (
+                ('pace_trend', p),
+                ('distance_trend', np.where(has_pace, d, 0.0)),
+                ('intensity_trend', np.where(has_pace, i, 0.0)),
+            ):
+                slope = (n_pace * window_sum(px * y_values) - sum_x * window_sum(y_values)) / denominator
+                features[name] = np.where(has_trend, slope, np.where(n_pace >= 4, 0.0, np.nan))
+        
+        selected = np.flatnonzero(valid)
+        if len(selected) == 0:
+            return pd.DataFrame(), pd.Series()
+        
+        # 最大・最小距離は累積和で求められないため、有効な窓だけ reduceat で集約
+        bounds = np.empty(len(selected) * 2, dtype=np.int64)
+        bounds[0::2] = lo[selected]
+        bounds[1::2] = hi[selected]
+        max_distance = np.maximum.reduceat(np.append(np.where(has_distance, distance, -np.inf), -np.inf), bounds)[0::2]
+        min_distance = np.minimum.reduceat(np.append(np.where(has_distance, distance, np.inf), np.inf), bounds)[0::2]
+        
+        X = pd.DataFrame({name: values[selected] for name, values in features.items()})
+        X['total_workouts'] = X['total_workouts'].astype(int)
+        X.insert(X.columns.get_loc('distance_std') + 1, 'max_distance', max_distance)
+        X.insert(X.columns.get_loc('max_distance') + 1, 'min_distance', min_distance)
+        
+        # ユーザープロフィール特徴量（未登録・未入力はデフォルト値）
+        race_users = races['user_id'].to_numpy()[selected]
+        profile_values = profiles.reindex(race_users)
+        for name, default in PROFILE_DEFAULTS.items():
+            values = pd.to_numeric(profile_values[name], errors='coerce').to_numpy(np.float64)
+            X[name] = np.where(np.isnan(values) | (values == 0), default, values)
+        
+        y = pd.Series(races['time_seconds'].to_numpy(np.float64)[selected], name='target_time')
+        
+        return X, y
 
     def _train_multiple_models(self, X_train: np.ndarray, y_train: np.ndarray) -> Dict[str, Any]:
         """複数モデルの学習"""
@@ -364,18 +532,9 @@ class ModelTrainingService:
             return {}
 
     def load_trained_model(self, target_event: TargetEventEnum) -> Tuple[Optional[Any], Optional[Any]]:
-        """学習済みモデルの読み込み"""
+        """学習済みモデルの読み込み（プロセス内のキャッシュを使い、ファイルが置き換えられた場合だけ読み直す）"""
         try:
-            model_path = os.path.join(self.model_cache_dir, f"{target_event.value}_model.joblib")
-            scaler_path = os.path.join(self.scaler_cache_dir, f"{target_event.value}_scaler.joblib")
-            
-            if not os.path.exists(model_path) or not os.path.exists(scaler_path):
-                return None, None
-            
-            model = joblib.load(model_path)
-            scaler = joblib.load(scaler_path)
-            
-            return model, scaler
+            return warm_model_cache.load_event_model(target_event.value, self.model_cache_dir, self.scaler_cache_dir)
             
         except Exception as e:
             logger.error(f"Failed to load model for {target_event.value}: {str(e)}")
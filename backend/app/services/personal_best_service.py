@@ -1,88 +1,232 @@
 """
 自己ベスト管理サービス
+
+このモジュールには以下の機能が含まれます：
+- recompute_personal_bests: レース結果から自己ベストを集合演算で再計算（1ユーザー / 指定ユーザー / 全ユーザー）
+- get_personal_best_summary / get_personal_best_stats: 自己ベストの概要・統計（SQL の集計で計算）
+
+レース結果から作成する自己ベストは source="race"・distance="custom"・custom_distance_m=レース距離の行で、
+(user_id, race_type, custom_distance_m) ごとに最速のレース結果を ROW_NUMBER() OVER (PARTITION BY ...) で選び、
+変更のあった行だけを UPSERT でまとめて書き込む。手入力の自己ベスト（source="manual"）は変更・削除せず、
+手入力の方が遅い場合はレース結果由来の行を並べて持つ（統計は種目ごとの最速の行を使う）。
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import Optional
-from datetime import date
 import logging
-from app.models.personal_best import PersonalBest
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.personal_best import PersonalBest, SOURCE_RACE
 from app.models.race import RaceResult
 
 logger = logging.getLogger(__name__)
 
+# レース結果から作成した自己ベストの distance
+RACE_RESULT_DISTANCE = "custom"
+
+# 1文の UPSERT / DELETE で書き込む行数（SQLite のバインド変数の上限を超えないようにする）
+WRITE_BATCH_SIZE = 1000
+
+_PB_VALUE_COLUMNS = ("time_seconds", "achieved_date", "race_name")
+
+
+def best_race_results_query(user_ids: Optional[List[str]] = None):
+    """
+    (user_id, race_type, distance_meters) ごとの最速のレース結果を選ぶクエリ
+
+    同タイムの場合は日付の古いレースを自己ベストとする。
+
+    Args:
+        user_ids: 対象ユーザーID（None の場合は全ユーザー）
+
+    Returns:
+        user_id / race_type / distance_meters / time_seconds / race_date / race_name を返す SELECT
+    """
+    races = RaceResult.__table__
+    rank = func.row_number().over(
+        partition_by=(races.c.user_id, races.c.race_type, races.c.distance_meters),
+        order_by=(races.c.time_seconds, races.c.race_date, races.c.id)
+    ).label("rank")
+
+    ranked = select(
+        races.c.user_id,
+        races.c.race_type,
+        races.c.distance_meters,
+        races.c.time_seconds,
+        races.c.race_date,
+        races.c.race_name,
+        rank
+    )
+    if user_ids is not None:
+        ranked = ranked.where(races.c.user_id.in_(user_ids))
+    ranked = ranked.subquery("ranked_races")
+
+    return select(
+        ranked.c.user_id,
+        ranked.c.race_type,
+        ranked.c.distance_meters,
+        ranked.c.time_seconds,
+        ranked.c.race_date,
+        ranked.c.race_name
+    ).where(ranked.c.rank == 1)
+
+
+def _upsert_personal_bests(connection: Connection, rows: List[dict], existing: Dict[tuple, str]) -> None:
+    """
+    変更のあった自己ベストを WRITE_BATCH_SIZE 行ずつ1文の UPSERT で書き込む
+
+    PostgreSQL / SQLite 以外では既存行の UPDATE と新規行の INSERT に分けて書き込む。
+
+    Args:
+        connection: データベース接続
+        rows: 書き込む行（id は新規作成時に使う）
+        existing: (user_id, race_type, custom_distance_m) ごとの既存の自己ベストID
+    """
+    table = PersonalBest.__table__
+    dialect_insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(connection.dialect.name)
+
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        batch = rows[start:start + WRITE_BATCH_SIZE]
+        if dialect_insert is not None:
+            stmt = dialect_insert(table).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.race_type, table.c.distance, table.c.custom_distance_m],
+                index_where=table.c.source == SOURCE_RACE,
+                set_={column: stmt.excluded[column] for column in _PB_VALUE_COLUMNS}
+            )
+            connection.execute(stmt)
+            continue
+
+        keys = [(row['user_id'], row['race_type'], row['custom_distance_m']) for row in batch]
+        updates = [(existing[key], row) for key, row in zip(keys, batch) if key in existing]
+        inserts = [row for key, row in zip(keys, batch) if key not in existing]
+        if updates:
+            connection.execute(
+                update(table).where(table.c.id == bindparam('pb_id')).values(
+                    {column: bindparam(column) for column in _PB_VALUE_COLUMNS}
+                ),
+                [{'pb_id': pb_id, **{column: row[column] for column in _PB_VALUE_COLUMNS}} for pb_id, row in updates]
+            )
+        if inserts:
+            connection.execute(table.insert(), inserts)
+
+
+def recompute_personal_bests(connection: Connection, user_ids: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    レース結果から自己ベストを再計算
+
+    最速のレース結果を1回の SELECT（ROW_NUMBER() OVER (PARTITION BY ...)）で選び、
+    既存のレース結果由来の自己ベスト（source="race"）と比べて、
+    変更・追加のあった行を UPSERT し、対応するレース結果がなくなった行を削除する。
+    手入力の自己ベスト（source="manual"）は変更・削除しない。同じ種目・距離の手入力の自己ベストが
+    レース結果と同じか速い場合はレース結果由来の行を作らず（既存の行は削除する）、遅い場合は
+    レース結果由来の行を手入力の行と並べて書き込む。コミットは呼び出し側で行う。
+
+    Args:
+        connection: データベース接続（Session.connection() でも可）
+        user_ids: 対象ユーザーID（None の場合は全ユーザー）
+
+    Returns:
+        inserted / updated / deleted の件数
+    """
+    counts = {"inserted": 0, "updated": 0, "deleted": 0}
+    if user_ids is not None:
+        user_ids = sorted({str(user_id) for user_id in user_ids})
+        if not user_ids:
+            return counts
+
+    best = {
+        (row.user_id, row.race_type, row.distance_meters): row
+        for row in connection.execute(best_race_results_query(user_ids))
+    }
+
+    table = PersonalBest.__table__
+    query = select(
+        table.c.id,
+        table.c.user_id,
+        table.c.race_type,
+        table.c.custom_distance_m,
+        table.c.time_seconds,
+        table.c.achieved_date,
+        table.c.race_name
+    ).where(table.c.source == SOURCE_RACE)
+    if user_ids is not None:
+        query = query.where(table.c.user_id.in_(user_ids))
+    existing = {(row.user_id, row.race_type, row.custom_distance_m): row for row in connection.execute(query)}
+
+    # 手入力の自己ベストの種目・距離ごとの最速タイム（レース結果より速いか同じならレース結果の行は作らない）
+    manual_query = select(
+        table.c.user_id, table.c.race_type, table.c.custom_distance_m, func.min(table.c.time_seconds)
+    ).where(
+        table.c.source != SOURCE_RACE,
+        table.c.distance == RACE_RESULT_DISTANCE,
+        table.c.custom_distance_m.isnot(None)
+    ).group_by(table.c.user_id, table.c.race_type, table.c.custom_distance_m)
+    if user_ids is not None:
+        manual_query = manual_query.where(table.c.user_id.in_(user_ids))
+    manual_best = {(row[0], row[1], row[2]): row[3] for row in connection.execute(manual_query)}
+
+    def covered_by_manual(key, race) -> bool:
+        return key in manual_best and manual_best[key] <= int(round(race.time_seconds))
+
+    changes = []
+    for key, race in best.items():
+        if covered_by_manual(key, race):
+            continue
+        values = {
+            "time_seconds": int(round(race.time_seconds)),
+            "achieved_date": race.race_date,
+            "race_name": race.race_name
+        }
+        current = existing.get(key)
+        if current is not None and all(getattr(current, column) == value for column, value in values.items()):
+            continue
+        changes.append({
+            "id": str(uuid.uuid4()),
+            "user_id": key[0],
+            "race_type": key[1],
+            "distance": RACE_RESULT_DISTANCE,
+            "custom_distance_m": key[2],
+            "source": SOURCE_RACE,
+            **values
+        })
+        counts["updated" if current is not None else "inserted"] += 1
+
+    if changes:
+        _upsert_personal_bests(connection, changes, {key: row.id for key, row in existing.items()})
+
+    stale = [row.id for key, row in existing.items() if key not in best or covered_by_manual(key, best[key])]
+    for start in range(0, len(stale), WRITE_BATCH_SIZE):
+        connection.execute(delete(table).where(table.c.id.in_(stale[start:start + WRITE_BATCH_SIZE])))
+    counts["deleted"] = len(stale)
+
+    logger.info(
+        f"Recomputed personal bests for {len(user_ids) if user_ids is not None else 'all'} users: "
+        f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['deleted']} deleted"
+    )
+    return counts
 
-def update_personal_best_from_race_result(
-    db: Session, 
-    user_id: str, 
-    race_result: RaceResult
-) -> Optional[PersonalBest]:
+
+def recompute_user_personal_bests(db: Session, user_id: str) -> Dict[str, int]:
     """
-    レース結果から自己ベストを自動更新
-    
+    1ユーザーの自己ベストを再計算してコミット
+
     Args:
         db: データベースセッション
         user_id: ユーザーID
-        race_result: レース結果
-    
+
     Returns:
-        更新された自己ベスト（新規作成または更新）
+        inserted / updated / deleted の件数
     """
     try:
-        # 同じ種目・距離の既存の自己ベストを検索
-        existing_pb = db.query(PersonalBest).filter(
-            and_(
-                PersonalBest.user_id == user_id,
-                PersonalBest.race_type == race_result.race_type,
-                PersonalBest.custom_distance_m == race_result.distance_meters
-            )
-        ).first()
-        
-        # 自己ベスト更新の判定
-        should_update = False
-        if existing_pb:
-            # 既存の自己ベストより速い場合
-            if race_result.time_seconds < existing_pb.time_seconds:
-                should_update = True
-                logger.info(f"🏆 自己ベスト更新: {race_result.distance_meters}m {race_result.time_seconds}s (前回: {existing_pb.time_seconds}s)")
-        else:
-            # 新しい種目の場合
-            should_update = True
-            logger.info(f"🆕 新しい自己ベスト: {race_result.distance_meters}m {race_result.time_seconds}s")
-        
-        if should_update:
-            if existing_pb:
-                # 既存の自己ベストを更新
-                existing_pb.time_seconds = race_result.time_seconds
-                existing_pb.achieved_date = race_result.race_date
-                existing_pb.race_name = race_result.race_name
-                
-                db.commit()
-                db.refresh(existing_pb)
-                logger.info(f"✅ 自己ベスト更新完了: ID={existing_pb.id}")
-                return existing_pb
-            else:
-                # 新しい自己ベストを作成
-                new_pb = PersonalBest(
-                    user_id=user_id,
-                    race_type=race_result.race_type,
-                    distance="custom",  # カスタム距離として設定
-                    custom_distance_m=race_result.distance_meters,
-                    time_seconds=race_result.time_seconds,
-                    achieved_date=race_result.race_date,
-                    race_name=race_result.race_name
-                )
-                
-                db.add(new_pb)
-                db.commit()
-                db.refresh(new_pb)
-                logger.info(f"✅ 自己ベスト新規作成完了: ID={new_pb.id}")
-                return new_pb
-        
-        return None
-        
+        counts = recompute_personal_bests(db.connection(), [user_id])
+        db.commit()
+        return counts
     except Exception as e:
-        logger.error(f"❌ 自己ベスト更新エラー: {str(e)}")
+        logger.error(f"❌ 自己ベスト再計算エラー: {str(e)}")
         db.rollback()
         raise
 
@@ -90,38 +234,101 @@ def update_personal_best_from_race_result(
 def get_personal_best_summary(db: Session, user_id: str) -> dict:
     """
     ユーザーの自己ベスト概要を取得
-    
+
+    件数と最新更新日は SQL の集計（COUNT / MAX）で取得する。
+
     Args:
         db: データベースセッション
         user_id: ユーザーID
-    
+
     Returns:
         自己ベスト概要の辞書
     """
     try:
+        total_count, latest_update = db.execute(
+            select(func.count(PersonalBest.id), func.max(PersonalBest.achieved_date))
+            .where(PersonalBest.user_id == user_id)
+        ).one()
+
         personal_bests = db.query(PersonalBest).filter(
             PersonalBest.user_id == user_id
         ).order_by(PersonalBest.achieved_date.desc()).all()
-        
+
         # 種目別にグループ化
         grouped_bests = {}
         for pb in personal_bests:
-            if pb.race_type not in grouped_bests:
-                grouped_bests[pb.race_type] = []
-            grouped_bests[pb.race_type].append(pb)
-        
-        # 最新更新日を取得
-        latest_update = None
-        if personal_bests:
-            latest_update = max(pb.achieved_date for pb in personal_bests)
-        
+            grouped_bests.setdefault(pb.race_type, []).append(pb)
+
         return {
-            "total_count": len(personal_bests),
+            "total_count": total_count,
             "grouped_bests": grouped_bests,
             "latest_update": latest_update,
             "personal_bests": personal_bests
         }
-        
+
     except Exception as e:
         logger.error(f"❌ 自己ベスト概要取得エラー: {str(e)}")
         raise
+
+
+def get_personal_best_stats(db: Session, user_id: str) -> Optional[dict]:
+    """
+    ユーザーの自己ベスト統計を SQL の集計で取得
+
+    種目ごとの件数と最速記録は COUNT(*) OVER / ROW_NUMBER() OVER (PARTITION BY race_type) の1クエリ、
+    最新の達成記録は achieved_date の降順の先頭1行で取得する。
+
+    Args:
+        db: データベースセッション
+        user_id: ユーザーID
+
+    Returns:
+        total_count / race_type_stats / latest_achievement の辞書（自己ベストがない場合はNone）
+    """
+    table = PersonalBest.__table__
+    ranked = select(
+        table.c.race_type,
+        table.c.distance,
+        table.c.time_seconds,
+        table.c.achieved_date,
+        func.count().over(partition_by=table.c.race_type).label("count"),
+        func.row_number().over(
+            partition_by=table.c.race_type,
+            order_by=(table.c.time_seconds, table.c.achieved_date, table.c.id)
+        ).label("rank")
+    ).where(table.c.user_id == user_id).subquery("ranked_personal_bests")
+
+    rows = db.execute(
+        select(ranked.c.race_type, ranked.c.distance, ranked.c.time_seconds, ranked.c.achieved_date, ranked.c.count)
+        .where(ranked.c.rank == 1)
+        .order_by(ranked.c.race_type)
+    ).all()
+    if not rows:
+        return None
+
+    latest = db.execute(
+        select(table.c.race_type, table.c.distance, table.c.time_seconds, table.c.achieved_date, table.c.race_name)
+        .where(table.c.user_id == user_id)
+        .order_by(table.c.achieved_date.desc(), table.c.created_at.desc())
+        .limit(1)
+    ).one()
+
+    return {
+        "total_count": sum(row.count for row in rows),
+        "race_type_stats": {
+            row.race_type: {
+                "count": row.count,
+                "best_time": row.time_seconds,
+                "best_distance": row.distance,
+                "recent_date": row.achieved_date
+            }
+            for row in rows
+        },
+        "latest_achievement": {
+            "race_type": latest.race_type,
+            "distance": latest.distance,
+            "time_seconds": latest.time_seconds,
+            "achieved_date": latest.achieved_date,
+            "race_name": latest.race_name
+        }
+    }
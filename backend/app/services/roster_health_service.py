@@ -0,0 +1,230 @@
+"""
+チーム単位の健康評価サービス
+
+このモジュールには以下の機能が含まれます：
+- 複数選手の日次データを選手×日の配列として一括取得
+- 調子分析・怪我リスク評価・健康パターン分析のバッチ実行
+- API / Celery タスク向けの結果整形
+"""
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.exceptions import DatabaseError, ValidationError
+from app.models.daily_metrics import DailyMetrics
+from app.models.training_load import WorkoutDailyRollup
+from app.ml.health.condition_analyzer import ConditionAnalyzer
+from app.ml.health.injury_predictor import InjuryPredictor
+from app.ml.health.roster import RosterHealthData
+from app.ml.health.training_condition_correlator import TrainingConditionCorrelator
+from app.ml.health.workload_engine import CHRONIC_WINDOW_DAYS
+
+logger = logging.getLogger(__name__)
+
+MAX_ROSTER_SIZE = 500
+MAX_ROSTER_DAYS = 365
+
+
+class RosterHealthService:
+    """チーム単位の健康評価サービスクラス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.condition_analyzer = ConditionAnalyzer()
+        self.injury_predictor = InjuryPredictor()
+        self.correlator = TrainingConditionCorrelator()
+
+    def load_roster_data(
+        self,
+        user_ids: List[str],
+        days: int = CHRONIC_WINDOW_DAYS,
+        end_date: Optional[date] = None
+    ) -> RosterHealthData:
+        """
+        選手×日の日次データを取得
+
+        練習データは日次ロールアップ、体調は DailyMetrics から、それぞれ全選手分を1回のクエリで読む。
+
+        Args:
+            user_ids: 選手のユーザーIDリスト（重複は除去）
+            days: 期間の日数
+            end_date: 期間の最終日（デフォルト: 今日）
+
+        Returns:
+            選手×日の日次データ
+        """
+        user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        if not user_ids:
+            raise ValidationError("選手が指定されていません", field="user_ids")
+        if len(user_ids) > MAX_ROSTER_SIZE:
+            raise ValidationError(f"一度に評価できる選手は{MAX_ROSTER_SIZE}人までです", field="user_ids")
+        if not CHRONIC_WINDOW_DAYS <= days <= MAX_ROSTER_DAYS:
+            raise ValidationError(f"期間は{CHRONIC_WINDOW_DAYS}日以上{MAX_ROSTER_DAYS}日以下で指定してください", field="days")
+
+        end_date = end_date or date.today()
+        start_date = end_date - timedelta(days=days - 1)
+        user_index = {user_id: i for i, user_id in enumerate(user_ids)}
+        shape = (len(user_ids), days)
+
+        try:
+            rollups = self.db.query(
+                WorkoutDailyRollup.user_id,
+                WorkoutDailyRollup.date,
+                WorkoutDailyRollup.workout_count,
+                WorkoutDailyRollup.distance_sum,
+                WorkoutDailyRollup.intensity_count,
+                WorkoutDailyRollup.intensity_sum,
+                WorkoutDailyRollup.pace_count,
+                WorkoutDailyRollup.pace_sum
+            ).filter(
+                WorkoutDailyRollup.user_id.in_(user_ids),
+                WorkoutDailyRollup.date >= start_date,
+                WorkoutDailyRollup.date <= end_date
+            ).all()
+
+            # 同じ日の複数記録は後から作成されたものを優先
+            metrics = self.db.query(
+                DailyMetrics.user_id,
+                DailyMetrics.date,
+                DailyMetrics.fatigue_level,
+                DailyMetrics.sleep_quality_score,
+                DailyMetrics.sleep_duration_hours,
+                DailyMetrics.motivation_level,
+                DailyMetrics.stress_level
+            ).filter(
+                DailyMetrics.user_id.in_(user_ids),
+                DailyMetrics.date >= start_date,
+                DailyMetrics.date <= end_date
+            ).order_by(DailyMetrics.created_at).all()
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading roster data: {str(e)}")
+            raise DatabaseError(f"チームデータの取得に失敗しました: {str(e)}")
+
+        distance = np.zeros(shape)
+        training_load = np.zeros(shape)
+        workout_counts = np.zeros(shape, dtype=np.int64)
+        avg_pace = np.full(shape, np.nan)
+
+        if rollups:
+            rows = np.array([user_index[r.user_id] for r in rollups])
+            cols = np.array([(r.date - start_date).days for r in rollups])
+            values = np.array(
+                [(r.workout_count, r.distance_sum, r.intensity_count, r.intensity_sum, r.pace_count, r.pace_sum)
+                 for r in rollups],
+                dtype=np.float64
+            )
+            count, distance_sum, intensity_count, intensity_sum, pace_count, pace_sum = values.T
+
+            # 強度（1-10）は0-1に換算し、記録がない日は0.5とする
+            mean_intensity = np.full(len(rollups), 0.5)
+            np.divide(intensity_sum, intensity_count * 10, out=mean_intensity, where=intensity_count > 0)
+            day_pace = np.full(len(rollups), np.nan)
+            np.divide(pace_sum, pace_count, out=day_pace, where=pace_count > 0)
+
+            workout_counts[rows, cols] = count.astype(np.int64)
+            distance[rows, cols] = distance_sum / 1000
+            training_load[rows, cols] = distance_sum / 1000 * mean_intensity
+            avg_pace[rows, cols] = day_pace
+
+        condition = {name: np.full(shape, np.nan) for name in (
+            'fatigue_level', 'sleep_quality_score', 'sleep_duration_hours', 'motivation_level', 'stress_level'
+        )}
+        if metrics:
+            rows = np.array([user_index[m.user_id] for m in metrics])
+            cols = np.array([(m.date - start_date).days for m in metrics])
+            for name, values in condition.items():
+                values[rows, cols] = np.array([getattr(m, name) for m in metrics], dtype=np.float64)
+
+        return RosterHealthData(
+            user_ids=user_ids,
+            start_date=start_date,
+            distance=distance,
+            training_load=training_load,
+            workout_counts=workout_counts,
+            avg_pace=avg_pace,
+            fatigue_level=condition['fatigue_level'],
+            sleep_quality=condition['sleep_quality_score'],
+            sleep_duration_hours=condition['sleep_duration_hours'],
+            motivation_level=condition['motivation_level'],
+            stress_level=condition['stress_level']
+        )
+
+    def assess_roster(
+        self,
+        user_ids: List[str],
+        days: int = CHRONIC_WINDOW_DAYS,
+        end_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        チーム全体の健康評価
+
+        Args:
+            user_ids: 選手のユーザーIDリスト
+            days: 期間の日数
+            end_date: 期間の最終日（デフォルト: 今日）
+
+        Returns:
+            選手ごとの評価結果とチーム全体の集計（JSONシリアライズ可能）
+        """
+        roster = self.load_roster_data(user_ids, days, end_date)
+        logger.info(f"Assessing roster health: {roster.num_athletes} athletes x {roster.days} days")
+
+        condition = self.condition_analyzer.analyze_condition_batch(roster)
+        risk = self.injury_predictor.assess_injury_risk_batch(roster)
+        pattern = self.correlator.analyze_health_patterns_batch(roster)
+
+        condition_columns = _to_lists(condition, ['overall_condition', 'fatigue_score', 'recovery_score',
+                                                  'readiness_score', 'stress_level', 'sleep_quality',
+                                                  'performance_trend'])
+        risk_columns = _to_lists(risk, ['overall_risk', 'risk_score', 'risk_timeline_days', 'acute_load',
+                                        'chronic_load', 'acwr', 'monotony', 'strain'])
+        pattern_columns = _to_lists(pattern, ['pattern_type', 'fatigue_trend', 'recovery_efficiency',
+                                              'sleep_consistency', 'motivation_stability', 'condition_records'])
+        alerts = {name: mask.tolist() for name, mask in condition['alerts'].items()}
+        severities = {name: values.tolist() for name, values in risk['factor_severity'].items()}
+        pattern_risks = {name: mask.tolist() for name, mask in pattern['risk_factors'].items()}
+
+        athletes = []
+        for i, user_id in enumerate(roster.user_ids):
+            athletes.append({
+                'user_id': user_id,
+                'condition': dict(
+                    {name: values[i] for name, values in condition_columns.items()},
+                    alerts=[name for name, mask in alerts.items() if mask[i]]
+                ),
+                'injury_risk': dict(
+                    {name: values[i] for name, values in risk_columns.items()},
+                    factor_severity={name: values[i] for name, values in severities.items()},
+                    primary_risk_factors=[name for name, values in severities.items() if values[i] > 0.5]
+                ),
+                'health_pattern': dict(
+                    {name: values[i] for name, values in pattern_columns.items()},
+                    risk_factors=[name for name, mask in pattern_risks.items() if mask[i]]
+                )
+            })
+
+        return {
+            'start_date': roster.start_date.isoformat(),
+            'end_date': roster.end_date.isoformat(),
+            'days': roster.days,
+            'athlete_count': roster.num_athletes,
+            'summary': {
+                'condition': dict(Counter(condition_columns['overall_condition'])),
+                'injury_risk': dict(Counter(risk_columns['overall_risk'])),
+                'health_pattern': dict(Counter(pattern_columns['pattern_type']))
+            },
+            'athletes': athletes,
+            'assessed_at': datetime.now().isoformat()
+        }
+
+
+def _to_lists(result: Dict[str, Any], names: List[str]) -> Dict[str, list]:
+    """バッチ結果の配列をPythonのリストに変換"""
+    return {name: np.asarray(result[name]).tolist() for name in names}
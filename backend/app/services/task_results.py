@@ -0,0 +1,212 @@
+"""
+バックグラウンドタスクの結果の保存とページング
+
+このモジュールには以下の機能が含まれます：
+- TaskResultWriter: ユーザーごとの結果をバッチで task_result_items に書き込み、集計と参照を返す
+- get_task_result / read_result_page: 保存した結果を seq のキーセットでページングして取得
+
+バッチ予測・パフォーマンス分析はユーザーごとの結果をすべて Celery の結果として返していたため、
+結果バックエンド（Redis）のメモリを圧迫し、結果の取得も全件のデシリアライズになっていた。
+タスクは集計と参照（result_ref）だけを返し、結果そのものはデータベースに保存する。
+保持期限（settings.task_result_retention_hours）を過ぎた結果は保持期間クリーンアップで削除する。
+"""
+
+import json
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.exceptions import DatabaseError
+from app.models.task_result import TaskResult, TaskResultItem
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    """json.dumps で直接扱えない値の変換（numpy の数値・日時など）"""
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def to_json_payload(value: Any) -> Any:
+    """JSON 列に保存できる値に変換"""
+    return json.loads(json.dumps(value, default=_json_default))
+
+
+class TaskResultWriter:
+    """タスクのユーザーごとの結果を batch_size 件ずつ書き込む
+
+    start() で同じタスクIDの以前の結果（リトライ前の途中結果）を削除してヘッダーを作成し、
+    add() した結果を batch_size 件ごとに1回の INSERT で保存してコミットする。
+    finish() でヘッダーに件数と集計を記録し、タスクの戻り値（集計 + result_ref）を返す。
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        task_id: str,
+        task_name: str,
+        batch_size: Optional[int] = None,
+        retention_hours: Optional[int] = None
+    ):
+        self.db = db
+        self.task_id = task_id
+        self.task_name = task_name
+        self.batch_size = max(1, batch_size or settings.task_result_write_batch_size)
+        self.retention_hours = retention_hours or settings.task_result_retention_hours
+        self.count = 0
+        self._buffer: List[Dict[str, Any]] = []
+
+    def start(self) -> "TaskResultWriter":
+        """以前の結果を削除してヘッダーを作成"""
+        try:
+            self.db.execute(delete(TaskResultItem).where(TaskResultItem.task_id == self.task_id))
+            self.db.execute(delete(TaskResult).where(TaskResult.id == self.task_id))
+            self.db.execute(insert(TaskResult).values(
+                id=self.task_id,
+                task_name=self.task_name,
+                status="running",
+                item_count=0,
+                expires_at=datetime.now(timezone.utc) + timedelta(hours=self.retention_hours)
+            ))
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to start task result {self.task_id}: {str(e)}")
+            raise DatabaseError(f"タスク結果の保存に失敗しました: {str(e)}")
+        self.count = 0
+        self._buffer = []
+        return self
+
+    def add(self, user_id: Optional[Any], success: bool, payload: Any) -> None:
+        """
+        ユーザーごとの結果を追加（batch_size 件たまったら書き込む）
+
+        Args:
+            user_id: ユーザーID
+            success: 成功したか
+            payload: 結果（失敗時はエラー）
+        """
+        self._buffer.append({
+            "task_id": self.task_id,
+            "seq": self.count,
+            "user_id": str(user_id) if user_id is not None else None,
+            "success": bool(success),
+            "payload": to_json_payload(payload)
+        })
+        self.count += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """バッファの結果を書き込んでコミット"""
+        if not self._buffer:
+            return
+        try:
+            self.db.execute(insert(TaskResultItem), self._buffer)
+            self.db.execute(
+                update(TaskResult).where(TaskResult.id == self.task_id).values(item_count=self.count)
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to write task result items for {self.task_id}: {str(e)}")
+            raise DatabaseError(f"タスク結果の保存に失敗しました: {str(e)}")
+        self._buffer = []
+
+    def finish(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        残りの結果を書き込み、ヘッダーを完了にする
+
+        Args:
+            summary: 結果の集計（件数など、結果バックエンドに返す小さな値）
+
+        Returns:
+            集計に result_ref（保存先と件数）を加えた辞書
+        """
+        self.flush()
+        summary = to_json_payload(summary)
+        try:
+            self.db.execute(update(TaskResult).where(TaskResult.id == self.task_id).values(
+                status="completed",
+                item_count=self.count,
+                summary=summary,
+                completed_at=datetime.now(timezone.utc)
+            ))
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to finish task result {self.task_id}: {str(e)}")
+            raise DatabaseError(f"タスク結果の保存に失敗しました: {str(e)}")
+
+        logger.info(f"Stored {self.count} result items for task {self.task_id}")
+        return {
+            **summary,
+            "result_ref": {
+                "store": "database",
+                "task_id": self.task_id,
+                "item_count": self.count,
+                "url": f"/api/tasks/results/{self.task_id}"
+            }
+        }
+
+
+def get_task_result(db: Session, task_id: str) -> Optional[TaskResult]:
+    """
+    保存したタスク結果のヘッダーを取得
+
+    保持期限を過ぎた結果は保持期間クリーンアップで削除される前でも返さない。
+
+    Args:
+        db: データベースセッション
+        task_id: CeleryタスクID
+
+    Returns:
+        ヘッダー（保存されていない・保持期限を過ぎた場合はNone）
+    """
+    return db.execute(
+        select(TaskResult).where(TaskResult.id == task_id, TaskResult.expires_at > datetime.now(timezone.utc))
+    ).scalar_one_or_none()
+
+
+def read_result_page(db: Session, task_id: str, cursor: int = -1, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    保存した結果を seq の順に1ページ取得
+
+    OFFSET を使わず seq > cursor で取得するため、後ろのページでも1ページ分の行だけを読む。
+
+    Args:
+        db: データベースセッション
+        task_id: CeleryタスクID
+        cursor: 前のページの next_cursor（最初のページは -1）
+        limit: 1ページの件数（デフォルト: settings.task_result_page_size、上限: settings.task_result_max_page_size）
+
+    Returns:
+        items / next_cursor（最後のページは None）
+    """
+    limit = min(max(1, limit or settings.task_result_page_size), settings.task_result_max_page_size)
+    rows = db.execute(
+        select(TaskResultItem.seq, TaskResultItem.user_id, TaskResultItem.success, TaskResultItem.payload)
+        .where(TaskResultItem.task_id == task_id, TaskResultItem.seq > cursor)
+        .order_by(TaskResultItem.seq)
+        .limit(limit + 1)
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [
+            {"seq": row.seq, "user_id": row.user_id, "success": row.success, "payload": row.payload}
+            for row in rows
+        ],
+        "limit": limit,
+        "next_cursor": rows[-1].seq if has_more else None
+    }
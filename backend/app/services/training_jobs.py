@@ -0,0 +1,444 @@
+"""
+モデル学習ジョブの管理
+
+このモジュールには以下の機能が含まれます：
+- 学習条件（種類とパラメータ）ごとの分散ロック（Redis の SET NX）による重複実行の防止
+- 学習ジョブ（ModelTrainingJob）の作成と ml_queue への投入
+- ワーカー上での学習の実行と進捗の記録
+- 学習したモデルのアクティブ化とジョブ完了の1トランザクションでの反映
+- ワーカーの停止などで実行中のまま残ったジョブのタイムアウトによる失敗処理
+
+HTTP ハンドラはジョブを作成してすぐにジョブIDを返し、学習は Celery ワーカーで実行する。
+同じ条件の学習が実行中であれば新しいジョブは作らず、実行中のジョブを返す。
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.exceptions import DatabaseError, NotFoundError, ValidationError
+from app.models.ai import AIModel, ModelTrainingJob
+
+logger = logging.getLogger(__name__)
+
+# 実行中とみなすジョブのステータス
+ACTIVE_JOB_STATUSES = ("pending", "running")
+
+LOCK_PREFIX = "training_lock:"
+
+# ロックの値（ジョブID）が一致する場合だけ削除する
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+ProgressCallback = Callable[[float, str], None]
+
+
+def training_spec_key(kind: str, spec: Dict[str, Any]) -> str:
+    """学習の種類とパラメータから、重複判定に使うキーを作成"""
+    payload = json.dumps({"kind": kind, "spec": spec}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class TrainingLock:
+    """学習条件ごとの分散ロック（値はロックを保持しているジョブID）"""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        return self._client
+
+    def acquire(self, spec_key: str, job_id: str, ttl: int) -> bool:
+        return bool(self.client.set(LOCK_PREFIX + spec_key, job_id, nx=True, ex=ttl))
+
+    def owner(self, spec_key: str) -> Optional[str]:
+        owner = self.client.get(LOCK_PREFIX + spec_key)
+        return owner.decode("utf-8") if isinstance(owner, bytes) else owner
+
+    def release(self, spec_key: str, job_id: str) -> bool:
+        return bool(self.client.eval(_RELEASE_SCRIPT, 1, LOCK_PREFIX + spec_key, job_id))
+
+
+@dataclass
+class TrainingOutcome:
+    """学習の結果（アクティブにするモデルと性能指標）"""
+    model_ids: List[str]
+    metrics: Dict[str, Any]
+    training_data_count: Optional[int] = None
+    replace_active: str = "all"  # "all": 他のアクティブモデルをすべて置き換える / "name": 同じ名前のモデルだけ置き換える
+    summary: Dict[str, Any] = field(default_factory=dict)
+
+
+def _train_pipeline(db: Session, spec: Dict[str, Any], report: ProgressCallback) -> TrainingOutcome:
+    """特徴量ストアのデータで TrainingPipeline を学習し、最良モデルを保存"""
+    from app.ml.training_pipeline import TrainingPipeline
+    from app.services.feature_store import FeatureStoreService
+    from app.services.ml_model_manager import MLModelManager
+
+    algorithm = spec["algorithm"]
+    report(5, "Loading training data")
+    X, y = FeatureStoreService(db).get_features_for_training(limit=spec["training_data_limit"])
+    if len(X) < 10:
+        raise ValueError("Insufficient training data")
+
+    report(20, "Training models")
+    pipeline = TrainingPipeline()
+    pipeline.prepare_training_data(X, y)
+    pipeline.split_data()
+    pipeline.train_models(optimize_hyperparams=spec["optimize_hyperparams"])
+
+    report(70, "Evaluating models")
+    pipeline.evaluate_models()
+
+    report(85, "Saving best model")
+    best_model_info = pipeline.save_best_model()
+    model_id = MLModelManager(db).save_model(
+        model=best_model_info["model"],
+        name=f"{algorithm}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        version="1.0",
+        algorithm=algorithm
+    )
+    if not model_id:
+        raise RuntimeError("学習したモデルの保存に失敗しました")
+
+    return TrainingOutcome(
+        model_ids=[model_id],
+        metrics=best_model_info["metrics"],
+        training_data_count=len(X),
+        summary=pipeline.get_training_summary()
+    )
+
+
+def _train_race_time(db: Session, spec: Dict[str, Any], report: ProgressCallback) -> TrainingOutcome:
+    """収集したCSVデータで種目ごとのレースタイム予測モデルを学習"""
+    from app.ai.race_time_predictor import RaceTimePredictor
+
+    report(5, "Loading training data")
+    predictor = RaceTimePredictor(db)
+    training_data = predictor.load_training_data()
+    if not training_data:
+        raise ValueError("トレーニングデータが見つかりません")
+
+    def on_event(done: int, total: int, event_name: str):
+        report(10 + 85 * done / total, f"Training {event_name}")
+
+    results = predictor.train_models(training_data, activate=False, progress_callback=on_event)
+    model_ids = [result["model_id"] for result in results.values() if "model_id" in result]
+    if not model_ids:
+        raise RuntimeError("学習に成功した種目がありません")
+
+    return TrainingOutcome(
+        model_ids=model_ids,
+        metrics={
+            event_name: ({"error": result["error"]} if "error" in result else {
+                "mae": result["ensemble_score"],
+                "training_samples": result["training_samples"],
+                "feature_count": result["feature_count"]
+            })
+            for event_name, result in results.items()
+        },
+        training_data_count=sum(len(df) for df in training_data.values()),
+        replace_active="name"
+    )
+
+
+def _train_event(db: Session, spec: Dict[str, Any], report: ProgressCallback) -> TrainingOutcome:
+    """ModelTrainingService で1種目のモデルを学習（モデルファイルは置き換えで保存される）"""
+    from app.schemas.prediction import TargetEventEnum
+    from app.services.model_training_service import ModelTrainingService
+
+    report(5, f"Training {spec['target_event']}")
+    result = ModelTrainingService(db).train_models_for_event(TargetEventEnum(spec["target_event"]))
+    if not result.get("success"):
+        raise ValueError(result.get("message", "モデル学習に失敗しました"))
+
+    return TrainingOutcome(
+        model_ids=[],
+        metrics=result["model_scores"][result["best_model"]],
+        training_data_count=result["training_samples"],
+        summary={key: result[key] for key in ("best_model", "model_path", "scaler_path")}
+    )
+
+
+# 学習の種類ごとの実行関数
+TRAINING_RUNNERS: Dict[str, Callable[[Session, Dict[str, Any], ProgressCallback], TrainingOutcome]] = {
+    "pipeline": _train_pipeline,
+    "race_time": _train_race_time,
+    "event": _train_event,
+}
+
+
+class TrainingJobService:
+    """モデル学習ジョブ管理サービスクラス"""
+
+    def __init__(self, db: Session, lock: Optional[TrainingLock] = None):
+        self.db = db
+        self.lock = lock or TrainingLock()
+
+    def get_job(self, job_id: str) -> Optional[ModelTrainingJob]:
+        """ジョブIDから学習ジョブを取得"""
+        return self.db.query(ModelTrainingJob).filter(ModelTrainingJob.job_id == job_id).first()
+
+    def submit(self, kind: str, spec: Dict[str, Any], algorithm: Optional[str] = None) -> Tuple[ModelTrainingJob, bool]:
+        """
+        学習ジョブを作成して ml_queue に投入
+
+        同じ条件の学習が実行中の場合は新しいジョブを作らず、実行中のジョブを返す。
+        タイムアウトを過ぎた同じ条件のジョブは先に失敗にするため、実行中とはみなさない。
+        ジョブの行を作成した後に失敗した場合（ロックの取得エラーなど）は、ジョブを失敗として記録する。
+
+        Args:
+            kind: 学習の種類（TRAINING_RUNNERS のキー）
+            spec: 学習パラメータ（JSON にできる値）
+            algorithm: ジョブに記録するアルゴリズム名（デフォルト: kind）
+
+        Returns:
+            (学習ジョブ, 新しく作成したか)
+        """
+        if kind not in TRAINING_RUNNERS:
+            raise ValidationError(f"未対応の学習の種類です: {kind}", field="kind")
+
+        spec_key = training_spec_key(kind, spec)
+        self.fail_stale_jobs(spec_key)
+
+        job_id = str(uuid.uuid4())
+        job = ModelTrainingJob(
+            job_id=job_id,
+            status="pending",
+            algorithm=algorithm or kind,
+            training_data_count=spec.get("training_data_limit"),
+            hyperparameters={"kind": kind, **spec},
+            spec_key=spec_key,
+            progress=0.0,
+            progress_message="Queued"
+        )
+        try:
+            # ロックの所有者は必ずジョブの行を持つよう、ロックの取得より先にコミットする
+            self.db.add(job)
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to create training job: {str(e)}")
+            raise DatabaseError(f"学習ジョブの作成に失敗しました: {str(e)}")
+
+        try:
+            running = self._acquire_lock(spec_key, job_id)
+            if running is not None:
+                self.db.delete(job)
+                self.db.commit()
+                logger.info(f"Training already running for spec {spec_key}: {running.job_id}")
+                return running, False
+        except Exception as e:
+            # 作成済みのジョブが pending のまま残らないよう失敗として記録する
+            self.db.rollback()
+            logger.error(f"Failed to create training job {job_id}: {str(e)}")
+            self._finish_failed(job_id, f"ジョブの作成に失敗しました: {str(e)}")
+            if isinstance(e, SQLAlchemyError):
+                raise DatabaseError(f"学習ジョブの作成に失敗しました: {str(e)}")
+            raise RuntimeError(f"学習ジョブの作成に失敗しました: {str(e)}")
+
+        try:
+            from app.tasks.ml_tasks import run_training_job_task
+            run_training_job_task.apply_async(args=[job.job_id], task_id=job.job_id)
+        except Exception as e:
+            logger.error(f"Failed to enqueue training job {job.job_id}: {str(e)}")
+            self._release_lock(spec_key, job.job_id)
+            self._finish_failed(job.job_id, f"ジョブの投入に失敗しました: {str(e)}")
+            raise RuntimeError(f"学習ジョブの投入に失敗しました: {str(e)}")
+
+        logger.info(f"Training job queued: {job.job_id} ({kind})")
+        return job, True
+
+    def fail_stale_jobs(self, spec_key: Optional[str] = None) -> int:
+        """
+        実行中・待機中のまま settings.training_job_timeout を過ぎたジョブを失敗にする
+
+        ワーカーが学習中に停止するとジョブは running のまま残り、同じ条件の学習が
+        実行中として返され続けるため、開始日時（未開始なら作成日時）で期限切れを判定する。
+
+        Args:
+            spec_key: 対象の学習条件のキー（省略時はすべてのジョブ）
+
+        Returns:
+            失敗にしたジョブ数
+        """
+        cutoff = datetime.now() - timedelta(seconds=settings.training_job_timeout)
+        stale = update(ModelTrainingJob).where(
+            ModelTrainingJob.status.in_(ACTIVE_JOB_STATUSES),
+            func.coalesce(ModelTrainingJob.started_at, ModelTrainingJob.created_at) < cutoff
+        )
+        if spec_key is not None:
+            stale = stale.where(ModelTrainingJob.spec_key == spec_key)
+
+        try:
+            result = self.db.execute(
+                stale.values(
+                    status="failed",
+                    error_message=f"{settings.training_job_timeout}秒以内に完了しなかったため失敗にしました",
+                    completed_at=datetime.now()
+                ).execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to expire stale training jobs: {str(e)}")
+            raise DatabaseError(f"期限切れの学習ジョブの更新に失敗しました: {str(e)}")
+
+        if result.rowcount:
+            logger.warning(f"Marked {result.rowcount} stale training jobs as failed")
+        return result.rowcount or 0
+
+    def _acquire_lock(self, spec_key: str, job_id: str) -> Optional[ModelTrainingJob]:
+        """ロックを取得（取得できなければ、ロックを保持している実行中のジョブを返す）"""
+        for _ in range(2):
+            if self.lock.acquire(spec_key, job_id, settings.training_lock_ttl):
+                return None
+            owner = self.lock.owner(spec_key)
+            running = self.get_job(owner) if owner else None
+            if running is not None and running.status in ACTIVE_JOB_STATUSES:
+                return running
+            # 所有者のジョブが終了している（ワーカーが停止してロックが残った）場合は解放して取り直す
+            if owner:
+                self.lock.release(spec_key, owner)
+        raise RuntimeError("学習ジョブのロックを取得できませんでした")
+
+    def _release_lock(self, spec_key: str, job_id: str) -> None:
+        """ロックを解放（失敗しても学習結果には影響させず、ロックは有効期間で切れる）"""
+        try:
+            self.lock.release(spec_key, job_id)
+        except Exception as e:
+            logger.error(f"Failed to release training lock for job {job_id}: {str(e)}")
+
+    def update_progress(self, job_id: str, progress: float, message: str) -> None:
+        """ジョブの進捗を記録（学習中のトランザクションとは別に即座にコミット）"""
+        self.db.execute(
+            update(ModelTrainingJob)
+            .where(ModelTrainingJob.job_id == job_id)
+            .values(progress=round(float(progress), 1), progress_message=message[:255])
+        )
+        self.db.commit()
+
+    def run(self, job_id: str) -> Dict[str, Any]:
+        """
+        学習ジョブを実行（ワーカーから呼ばれる）
+
+        学習したモデルのアクティブ化とジョブの完了は1トランザクションで反映するため、
+        予測側から学習途中のモデルや、古いモデルと新しいモデルが両方アクティブな状態は見えない。
+
+        Args:
+            job_id: ジョブID
+
+        Returns:
+            学習結果
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            raise NotFoundError("学習ジョブ", job_id)
+        if job.status not in ACTIVE_JOB_STATUSES:
+            logger.info(f"Training job {job_id} already finished: {job.status}")
+            return {"job_id": job_id, "status": job.status}
+
+        spec = dict(job.hyperparameters or {})
+        kind = spec.pop("kind")
+        spec_key = job.spec_key
+
+        try:
+            job.status = "running"
+            job.started_at = datetime.now()
+            self.db.commit()
+
+            outcome = TRAINING_RUNNERS[kind](
+                self.db, spec, lambda progress, message: self.update_progress(job_id, progress, message)
+            )
+
+            self.update_progress(job_id, 95, "Activating model")
+            self._activate_models(outcome.model_ids, outcome.replace_active)
+            job.status = "completed"
+            job.completed_at = datetime.now()
+            job.progress = 100.0
+            job.progress_message = "Completed"
+            job.result_model_ids = outcome.model_ids
+            job.performance_metrics = outcome.metrics
+            if outcome.training_data_count is not None:
+                job.training_data_count = outcome.training_data_count
+            self.db.commit()
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Training job {job_id} failed: {str(e)}")
+            self._finish_failed(job_id, str(e))
+            raise
+        finally:
+            if spec_key:
+                self._release_lock(spec_key, job_id)
+
+        logger.info(f"Training job completed: {job_id} (models: {outcome.model_ids})")
+        return {
+            "job_id": job_id,
+            "status": "completed",
+            "kind": kind,
+            "model_ids": outcome.model_ids,
+            "performance_metrics": outcome.metrics,
+            "training_summary": outcome.summary
+        }
+
+    def _activate_models(self, model_ids: List[str], replace_active: str) -> None:
+        """
+        モデルをアクティブにする（コミットは呼び出し元で行う）
+
+        Args:
+            model_ids: アクティブにするモデルID
+            replace_active: "all" なら他のアクティブモデルをすべて、"name" なら同じ名前のモデルだけ非アクティブにする
+        """
+        if not model_ids:
+            return
+
+        deactivate = update(AIModel).where(AIModel.is_active.is_(True), AIModel.id.notin_(model_ids))
+        if replace_active == "name":
+            names = [name for (name,) in self.db.query(AIModel.name).filter(AIModel.id.in_(model_ids))]
+            deactivate = deactivate.where(AIModel.name.in_(names))
+        self.db.execute(deactivate.values(is_active=False))
+        self.db.execute(update(AIModel).where(AIModel.id.in_(model_ids)).values(is_active=True))
+
+    def _finish_failed(self, job_id: str, error_message: str) -> None:
+        """ジョブを失敗として記録"""
+        try:
+            self.db.execute(
+                update(ModelTrainingJob)
+                .where(ModelTrainingJob.job_id == job_id)
+                .values(status="failed", error_message=error_message, completed_at=datetime.now())
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Failed to record training job failure {job_id}: {str(e)}")
+
+
+def job_to_response(job: ModelTrainingJob, created: bool) -> Dict[str, Any]:
+    """学習ジョブを API のレスポンス形式に変換"""
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "algorithm": job.algorithm,
+        "progress": job.progress or 0.0,
+        "progress_message": job.progress_message,
+        "created_at": job.created_at,
+        "is_duplicate": not created
+    }
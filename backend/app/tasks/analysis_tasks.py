@@ -0,0 +1,56 @@
+"""
+分析関連のバックグラウンドタスク
+
+このモジュールには以下のタスクが含まれます：
+- batch_health_assessment_task: チーム単位の健康評価
+"""
+
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from app.core.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.roster_health_service import RosterHealthService
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True, name="batch_health_assessment_task", queue="analysis_queue")
+def batch_health_assessment_task(
+    self,
+    user_ids: List[str],
+    days: int = 28,
+    end_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    チーム単位の健康評価タスク
+    
+    Args:
+        user_ids: 選手のユーザーIDリスト
+        days: 分析期間（日数）
+        end_date: 期間の最終日（ISO形式、デフォルト: 今日）
+        
+    Returns:
+        選手ごとの評価結果とチーム全体の集計
+    """
+    db = SessionLocal()
+    try:
+        logger.info(f"Starting batch health assessment task for {len(user_ids)} athletes")
+        self.update_state(state="PROGRESS", meta={"status": "Assessing roster health"})
+        
+        service = RosterHealthService(db)
+        result = service.assess_roster(
+            user_ids,
+            days=days,
+            end_date=date.fromisoformat(end_date) if end_date else None
+        )
+        
+        logger.info(f"Batch health assessment task completed for {result['athlete_count']} athletes")
+        return dict(result, status="completed")
+        
+    except Exception as e:
+        logger.error(f"Batch health assessment task failed: {str(e)}")
+        raise
+    finally:
+        db.close()
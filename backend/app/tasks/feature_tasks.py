@@ -0,0 +1,222 @@
+"""
+特徴量関連のバックグラウンドタスク
+
+このモジュールには以下のタスクが含まれます：
+- feature_calculation_task: 特徴量計算のオーケストレーター（ユーザーをチャンクに分割して並列実行）
+- feature_chunk_task: 1チャンク分のユーザーの特徴量計算（一括取得・一括保存）
+- feature_aggregate_task: チャンクごとの件数を集計する chord のコールバック
+- refresh_dirty_users_task: データが変わったユーザーだけの特徴量・予測の再計算（Celery beat で定期実行）
+
+チャンクは feature_queue の group として並列に実行されるため、全ユーザーの特徴量更新は
+ワーカー数にほぼ比例して速くなる。タスクの結果には件数だけを返し、特徴量そのものは
+feature_store テーブルにのみ保存する（結果バックエンドに大きな値を置かない）。
+
+計算したユーザーは user_change_tracking の last_feature_at を更新するため、定期実行の
+refresh_dirty_users_task は前回の計算以降にデータが書き込まれたユーザーだけを再計算する。
+"""
+
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from celery import chain, chord, group
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.ml.feature_store import FeatureStore
+from app.models.change_tracking import mark_users_refreshed, select_dirty_users
+from app.models.user import User
+from app.tasks.ml_tasks import prediction_refresh_task
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_user_ids(user_ids: List[str], chunk_size: int) -> List[List[str]]:
+    """ユーザーIDを重複を除いて chunk_size 件ずつに分割"""
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+    chunk_size = max(1, chunk_size)
+    return [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+
+
+@celery_app.task(bind=True, name="feature_calculation_task", queue="feature_queue")
+def feature_calculation_task(
+    self,
+    user_ids: Optional[List[str]] = None,
+    analysis_period_days: int = 30,
+    chunk_size: Optional[int] = None,
+    end_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    特徴量計算タスク
+
+    ユーザーをチャンクに分割し、feature_chunk_task の group と feature_aggregate_task の chord に
+    置き換える（このタスクIDの結果は集計結果になる）。
+
+    Args:
+        user_ids: ユーザーIDのリスト（省略時は有効な全ユーザー）
+        analysis_period_days: 分析期間（日数）
+        chunk_size: 1チャンクのユーザー数（デフォルト: settings.feature_chunk_size）
+        end_date: 期間の最終日（ISO形式、デフォルト: 今日）
+
+    Returns:
+        特徴量計算結果の件数の集計
+    """
+    if user_ids is None:
+        db = SessionLocal()
+        try:
+            user_ids = [row[0] for row in db.query(User.id).filter(User.is_active.is_(True)).order_by(User.id)]
+        finally:
+            db.close()
+
+    end_date = end_date or date.today().isoformat()
+    chunks = chunk_user_ids(user_ids, chunk_size or settings.feature_chunk_size)
+    logger.info(f"Starting feature calculation task for {sum(map(len, chunks))} users in {len(chunks)} chunks")
+
+    if not chunks:
+        return feature_aggregate_task([], analysis_period_days=analysis_period_days)
+
+    workflow = chord(
+        group(feature_chunk_task.s(chunk, analysis_period_days, end_date) for chunk in chunks),
+        feature_aggregate_task.s(analysis_period_days=analysis_period_days)
+    )
+    return self.replace(workflow)
+
+
+@celery_app.task(bind=True, name="feature_chunk_task", queue="feature_queue", max_retries=3)
+def feature_chunk_task(
+    self,
+    user_ids: List[str],
+    analysis_period_days: int = 30,
+    end_date: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    1チャンク分のユーザーの特徴量計算タスク
+
+    ロールアップを1回のクエリで取得し、特徴量を1回の INSERT で保存する。
+    保存は1トランザクションのため、失敗してリトライしてもチャンクの一部だけが保存されることはない。
+    データ不足のユーザーも含め、チャンクの全ユーザーの last_feature_at を計算開始時刻に更新する。
+
+    Args:
+        user_ids: ユーザーIDのリスト
+        analysis_period_days: 分析期間（日数）
+        end_date: 期間の最終日（ISO形式、デフォルト: 今日）
+
+    Returns:
+        件数（users / succeeded / insufficient_data / failed）
+    """
+    # 計算中に書き込まれた変更を取りこぼさないよう、データを読む前の時刻を記録する
+    refreshed_at = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        feature_store = FeatureStore(db)
+        features, insufficient = feature_store.calculate_features_bulk(
+            user_ids,
+            analysis_period_days=analysis_period_days,
+            end_date=date.fromisoformat(end_date) if end_date else None
+        )
+        saved = feature_store.save_features_bulk(features, analysis_period_days)
+        mark_users_refreshed(db.connection(), "feature", user_ids, refreshed_at)
+        db.commit()
+
+        logger.info(f"Feature chunk completed: {saved}/{len(user_ids)} users saved")
+        return {
+            "users": len(user_ids),
+            "succeeded": saved,
+            "insufficient_data": len(insufficient),
+            "failed": 0
+        }
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Feature chunk failed ({len(user_ids)} users): {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60)
+        # chord 全体を止めないよう、リトライを使い切ったチャンクは失敗件数として返す
+        return {"users": len(user_ids), "succeeded": 0, "insufficient_data": 0, "failed": len(user_ids)}
+    except Exception as e:
+        # 計算側の例外はリトライしても同じ結果になるため、リトライせずに失敗件数として返す
+        db.rollback()
+        logger.error(f"Feature chunk failed ({len(user_ids)} users): {str(e)}", exc_info=True)
+        return {"users": len(user_ids), "succeeded": 0, "insufficient_data": 0, "failed": len(user_ids)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="feature_aggregate_task", queue="feature_queue")
+def feature_aggregate_task(chunk_results: List[Dict[str, int]], analysis_period_days: int = 30) -> Dict[str, Any]:
+    """
+    チャンクごとの件数を集計（chord のコールバック）
+
+    Args:
+        chunk_results: feature_chunk_task の結果のリスト
+        analysis_period_days: 分析期間（日数）
+
+    Returns:
+        特徴量計算結果の件数の集計
+    """
+    def total(key: str) -> int:
+        return sum(result.get(key, 0) for result in chunk_results)
+
+    summary = {
+        "status": "completed",
+        "total_users": total("users"),
+        "successful_calculations": total("succeeded"),
+        "insufficient_data": total("insufficient_data"),
+        "failed_calculations": total("failed") + total("insufficient_data"),
+        "chunks": len(chunk_results),
+        "analysis_period_days": analysis_period_days,
+        "calculation_date": datetime.now().isoformat()
+    }
+    logger.info(
+        f"Feature calculation completed: {summary['successful_calculations']}/{summary['total_users']} users "
+        f"in {summary['chunks']} chunks"
+    )
+    return summary
+
+
+@celery_app.task(name="refresh_dirty_users_task", queue="feature_queue")
+def refresh_dirty_users_task(limit: Optional[int] = None, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    データが変わったユーザーの特徴量・予測の再計算タスク（Celery beat で定期実行）
+
+    user_change_tracking から前回の計算以降にデータが書き込まれたユーザーだけを選び、
+    特徴量の再計算（feature_calculation_task）の完了後に予測の再計算（prediction_refresh_task）を
+    チャンクごとに並列実行する。変更のないユーザーは読み込まない。
+
+    Args:
+        limit: 対象にする最大ユーザー数（デフォルト: settings.dirty_refresh_limit）
+        chunk_size: 1チャンクのユーザー数（デフォルト: settings.feature_chunk_size）
+
+    Returns:
+        対象ユーザー数と起動したワークフローのID
+    """
+    limit = limit or settings.dirty_refresh_limit
+    chunk_size = chunk_size or settings.feature_chunk_size
+
+    db = SessionLocal()
+    try:
+        feature_user_ids = select_dirty_users(db, "feature", limit)
+        prediction_user_ids = select_dirty_users(db, "prediction", limit)
+    finally:
+        db.close()
+
+    logger.info(
+        f"Dirty users: {len(feature_user_ids)} need features, {len(prediction_user_ids)} need predictions"
+    )
+
+    steps = []
+    if feature_user_ids:
+        steps.append(feature_calculation_task.si(user_ids=feature_user_ids, chunk_size=chunk_size))
+    prediction_chunks = chunk_user_ids(prediction_user_ids, chunk_size)
+    if prediction_chunks:
+        steps.append(group(prediction_refresh_task.si(chunk) for chunk in prediction_chunks))
+
+    workflow_id = chain(*steps).apply_async().id if steps else None
+    return {
+        "status": "dispatched" if steps else "up_to_date",
+        "feature_users": len(feature_user_ids),
+        "prediction_users": len(prediction_user_ids),
+        "workflow_id": workflow_id
+    }
@@ -2,136 +2,72 @@
 機械学習関連のバックグラウンドタスク
 
 このモジュールには以下のタスクが含まれます：
-- train_models_task: モデル学習タスク
+- run_training_job_task: モデル学習ジョブの実行タスク
 - batch_prediction_task: バッチ予測処理
+- prediction_refresh_task: データが変わったユーザーの予測の再計算
 - model_evaluation_task: モデル評価タスク
 - hyperparameter_optimization_task: ハイパーパラメータ最適化タスク
+- performance_analysis_task: パフォーマンス分析タスク
+
+バッチ予測・パフォーマンス分析のユーザーごとの結果は task_results / task_result_items に保存し、
+タスクの結果には集計と参照（result_ref）だけを返す（/api/tasks/results/{task_id} でページング取得）。
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from celery import current_task
 from sqlalchemy.orm import Session
 
 from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.services.ml_model_manager import MLModelManager
 from app.services.feature_store import FeatureStoreService
-from app.ml.feature_store import FeatureStore
-from app.ml.training_pipeline import TrainingPipeline
-from app.models.ai import ModelTrainingJob
+from app.models.change_tracking import mark_users_refreshed
+from app.services.task_results import TaskResultWriter
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(bind=True, name="train_models_task")
-def train_models_task(
-    self,
-    algorithm: str,
-    optimize_hyperparams: bool = False,
-    training_data_limit: int = 1000
-) -> Dict[str, Any]:
+@celery_app.task(bind=True, name="run_training_job_task", queue="ml_queue")
+def run_training_job_task(self, job_id: str) -> Dict[str, Any]:
     """
-    モデル学習タスク
+    モデル学習ジョブの実行タスク
+    
+    ジョブは TrainingJobService.submit で作成され、タスクIDはジョブIDと同じ。
+    進捗は ModelTrainingJob に記録し、学習したモデルは完了時にアクティブにする。
     
     Args:
-        algorithm: アルゴリズム名
-        optimize_hyperparams: ハイパーパラメータ最適化フラグ
-        training_data_limit: 学習データ数制限
+        job_id: 学習ジョブID
         
     Returns:
         学習結果辞書
     """
+    from app.services.training_jobs import TrainingJobService
+    
     db = SessionLocal()
     try:
-        logger.info(f"Starting model training task: {algorithm}")
-        
-        # タスクの進捗更新
-        self.update_state(state="PROGRESS", meta={"status": "Initializing training pipeline"})
-        
-        # 学習ジョブの作成
-        job = ModelTrainingJob(
-            job_id=self.request.id,
-            status="running",
-            algorithm=algorithm,
-            training_data_count=training_data_limit,
-            hyperparameters={"optimize_hyperparams": optimize_hyperparams}
-        )
-        db.add(job)
-        db.commit()
-        
-        # 特徴量データの取得
-        self.update_state(state="PROGRESS", meta={"status": "Loading training data"})
-        feature_service = FeatureStoreService(db)
-        X, y = feature_service.get_features_for_training(limit=training_data_limit)
-        
-        if len(X) < 10:
-            raise ValueError("Insufficient training data")
-        
-        # 学習パイプラインの実行
-        self.update_state(state="PROGRESS", meta={"status": "Training models"})
-        pipeline = TrainingPipeline()
-        pipeline.prepare_training_data(X, y)
-        pipeline.split_data()
-        pipeline.train_models(optimize_hyperparams=optimize_hyperparams)
-        
-        # モデル評価
-        self.update_state(state="PROGRESS", meta={"status": "Evaluating models"})
-        results = pipeline.evaluate_models()
-        
-        # 最良モデルの保存
-        self.update_state(state="PROGRESS", meta={"status": "Saving best model"})
-        best_model_info = pipeline.save_best_model()
-        
-        # モデルマネージャーでモデルを保存
-        model_manager = MLModelManager(db)
-        saved_model = model_manager.save_model(
-            model=best_model_info['model'],
-            name=f"{algorithm}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            version="1.0",
-            algorithm=algorithm,
-            performance_metrics=best_model_info['metrics'],
-            training_data_count=len(X),
-            feature_count=len(X[0]) if X else 0,
-            description=f"Auto-trained {algorithm} model"
-        )
-        
-        # 最良モデルをアクティブに設定
-        model_manager.set_active_model(saved_model.id)
-        
-        # ジョブの完了
-        job.status = "completed"
-        job.completed_at = datetime.now()
-        job.result_model_id = saved_model.id
-        job.performance_metrics = best_model_info['metrics']
-        db.commit()
-        
-        result = {
-            "status": "completed",
-            "model_id": saved_model.id,
-            "model_name": saved_model.name,
-            "algorithm": algorithm,
-            "performance_metrics": best_model_info['metrics'],
-            "training_summary": pipeline.get_training_summary()
-        }
-        
-        logger.info(f"Model training completed: {saved_model.id}")
-        return result
-        
-    except Exception as e:
-        logger.error(f"Model training failed: {str(e)}")
-        
-        # ジョブの失敗記録
-        if 'job' in locals():
-            job.status = "failed"
-            job.error_message = str(e)
-            job.completed_at = datetime.now()
-            db.commit()
-        
-        # エラーを再発生
-        raise self.retry(exc=e, countdown=60, max_retries=3)
-        
+        logger.info(f"Starting model training job: {job_id}")
+        return TrainingJobService(db).run(job_id)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="fail_stale_training_jobs_task")
+def fail_stale_training_jobs_task() -> Dict[str, Any]:
+    """
+    ワーカーの停止で実行中のまま残った学習ジョブを失敗にするタスク（Celery beat で定期実行）
+    
+    Returns:
+        失敗にしたジョブ数
+    """
+    from app.services.training_jobs import TrainingJobService
+    
+    db = SessionLocal()
+    try:
+        return {"failed_jobs": TrainingJobService(db).fail_stale_jobs()}
     finally:
         db.close()
 
@@ -155,13 +91,16 @@ def batch_prediction_task(
         バッチ予測結果辞書
     """
     db = SessionLocal()
+    loop = asyncio.new_event_loop()
     try:
         logger.info(f"Starting batch prediction task for {len(user_ids)} users")
         
         from app.services.prediction_service import PredictionService
         
         prediction_service = PredictionService(db)
-        results = []
+        # ユーザーごとの予測結果はデータベースに保存し、結果バックエンドには集計だけを返す
+        writer = TaskResultWriter(db, self.request.id, "batch_prediction_task").start()
+        successful_predictions = 0
         
         for i, user_id in enumerate(user_ids):
             # 進捗更新
@@ -173,38 +112,27 @@ def batch_prediction_task(
             
             try:
                 # 予測実行
-                result = prediction_service.execute_prediction(
+                result = loop.run_until_complete(prediction_service.execute_prediction(
                     user_id=user_id,
                     race_type=race_type,
                     distance=distance
-                )
-                results.append({
-                    "user_id": user_id,
-                    "success": True,
-                    "result": result
-                })
+                ))
+                writer.add(user_id, True, result)
+                successful_predictions += 1
                 
             except Exception as e:
                 logger.error(f"Prediction failed for user {user_id}: {str(e)}")
-                results.append({
-                    "user_id": user_id,
-                    "success": False,
-                    "error": str(e)
-                })
+                writer.add(user_id, False, {"error": str(e)})
         
         # 結果の集計
-        successful_predictions = len([r for r in results if r["success"]])
-        failed_predictions = len(results) - successful_predictions
-        
-        batch_result = {
+        batch_result = writer.finish({
             "status": "completed",
             "total_users": len(user_ids),
             "successful_predictions": successful_predictions,
-            "failed_predictions": failed_predictions,
-            "results": results,
+            "failed_predictions": len(user_ids) - successful_predictions,
             "race_type": race_type,
             "distance": distance
-        }
+        })
         
         logger.info(f"Batch prediction completed: {successful_predictions}/{len(user_ids)} successful")
         return batch_result
@@ -214,6 +142,68 @@ def batch_prediction_task(
         raise self.retry(exc=e, countdown=60, max_retries=3)
         
     finally:
+        loop.close()
+        db.close()
+
+
+@celery_app.task(bind=True, name="prediction_refresh_task", queue="prediction_queue")
+def prediction_refresh_task(self, user_ids: List[str]) -> Dict[str, Any]:
+    """
+    予測の再計算タスク
+
+    settings.prediction_refresh_races の各種目について予測を実行し、全種目が成功したユーザーの
+    last_prediction_at を更新する（失敗したユーザーは次回の定期実行でも対象に残る）。
+
+    Args:
+        user_ids: ユーザーIDリスト
+
+    Returns:
+        再計算結果の件数
+    """
+    from app.services.prediction_service import PredictionService
+
+    # 計算中に書き込まれた変更を取りこぼさないよう、データを読む前の時刻を記録する
+    refreshed_at = datetime.now(timezone.utc)
+    db = SessionLocal()
+    loop = asyncio.new_event_loop()
+    succeeded: List[str] = []
+    failed: List[str] = []
+    try:
+        logger.info(f"Starting prediction refresh task for {len(user_ids)} users")
+        prediction_service = PredictionService(db)
+
+        for user_id in user_ids:
+            try:
+                for race_type, distance in settings.prediction_refresh_races.items():
+                    loop.run_until_complete(prediction_service.execute_prediction(
+                        user_id=user_id,
+                        race_type=race_type,
+                        distance=distance
+                    ))
+                succeeded.append(user_id)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Prediction refresh failed for user {user_id}: {str(e)}")
+                failed.append(user_id)
+
+        mark_users_refreshed(db.connection(), "prediction", succeeded, refreshed_at)
+        db.commit()
+
+        logger.info(f"Prediction refresh completed: {len(succeeded)}/{len(user_ids)} successful")
+        return {
+            "status": "completed",
+            "total_users": len(user_ids),
+            "successful_predictions": len(succeeded),
+            "failed_predictions": len(failed)
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Prediction refresh failed: {str(e)}")
+        raise self.retry(exc=e, countdown=60, max_retries=3)
+
+    finally:
+        loop.close()
         db.close()
 
 
@@ -374,76 +364,6 @@ def hyperparameter_optimization_task(
         db.close()
 
 
-@celery_app.task(bind=True, name="feature_calculation_task")
-def feature_calculation_task(self, user_ids: List[str], analysis_period_days: int = 30):
-    """
-    特徴量計算タスク
-    
-    Args:
-        user_ids: ユーザーIDのリスト
-        analysis_period_days: 分析期間（日数）
-        
-    Returns:
-        特徴量計算結果辞書
-    """
-    db = SessionLocal()
-    try:
-        logger.info(f"Starting feature calculation task for {len(user_ids)} users")
-        
-        feature_store = FeatureStore(db)
-        results = []
-        
-        for i, user_id in enumerate(user_ids):
-            # 進捗更新
-            progress = (i / len(user_ids)) * 100
-            self.update_state(
-                state="PROGRESS", 
-                meta={"status": f"Calculating features for user {user_id}", "progress": progress}
-            )
-            
-            try:
-                # 特徴量計算
-                features = feature_store.calculate_features(
-                    user_id=user_id,
-                    analysis_period_days=analysis_period_days
-                )
-                
-                # 特徴量を保存
-                feature_id = feature_store.save_features(user_id, features)
-                
-                results.append({
-                    "user_id": user_id,
-                    "success": True,
-                    "feature_id": feature_id,
-                    "features": features
-                })
-                
-            except Exception as e:
-                logger.error(f"Feature calculation failed for user {user_id}: {str(e)}")
-                results.append({
-                    "user_id": user_id,
-                    "success": False,
-                    "error": str(e)
-                })
-        
-        logger.info(f"Feature calculation task completed for {len(user_ids)} users")
-        return {
-            "status": "completed",
-            "total_users": len(user_ids),
-            "successful_calculations": len([r for r in results if r["success"]]),
-            "failed_calculations": len([r for r in results if not r["success"]]),
-            "results": results,
-            "analysis_period_days": analysis_period_days,
-            "calculation_date": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Feature calculation task failed: {str(e)}")
-        raise
-    finally:
-        db.close()
-
-
 @celery_app.task(bind=True, name="performance_analysis_task")
 def performance_analysis_task(self, user_ids: List[str], analysis_period_days: int = 30):
     """
@@ -451,14 +371,13 @@ def performance_analysis_task(self, user_ids: List[str], analysis_period_days: i
     ユーザーのパフォーマンスデータを分析し、トレンドや改善点を特定
     """
     from app.services.performance_analyzer import PerformanceAnalyzer
-    from app.models.user import User
-    from app.models.workout import Workout
-    from app.models.race import Race
     
-    db = next(get_db())
+    db = SessionLocal()
     try:
         analyzer = PerformanceAnalyzer(db)
-        results = []
+        # ユーザーごとの分析結果はデータベースに保存し、結果バックエンドには集計だけを返す
+        writer = TaskResultWriter(db, self.request.id, "performance_analysis_task").start()
+        successful_analyses = 0
         
         for i, user_id in enumerate(user_ids):
             # 進捗更新
@@ -474,27 +393,19 @@ def performance_analysis_task(self, user_ids: List[str], analysis_period_days: i
                     user_id=user_id,
                     period_days=analysis_period_days
                 )
-                results.append({
-                    "user_id": user_id,
-                    "success": True,
-                    "analysis": analysis_result
-                })
+                writer.add(user_id, True, analysis_result)
+                successful_analyses += 1
                 
             except Exception as e:
                 logger.error(f"Performance analysis failed for user {user_id}: {str(e)}")
-                results.append({
-                    "user_id": user_id,
-                    "success": False,
-                    "error": str(e)
-                })
+                writer.add(user_id, False, {"error": str(e)})
         
-        return {
+        return writer.finish({
             "task": "performance_analysis",
             "total_users": len(user_ids),
-            "successful_analyses": len([r for r in results if r["success"]]),
-            "failed_analyses": len([r for r in results if not r["success"]]),
-            "results": results
-        }
+            "successful_analyses": successful_analyses,
+            "failed_analyses": len(user_ids) - successful_analyses
+        })
         
     except Exception as e:
         logger.error(f"Performance analysis task failed: {str(e)}")
@@ -504,54 +415,41 @@ def performance_analysis_task(self, user_ids: List[str], analysis_period_days: i
 
 
 @celery_app.task(bind=True, name="cleanup_old_data_task")
-def cleanup_old_data_task(self, days_to_keep: int = 90):
+def cleanup_old_data_task(
+    self,
+    days_to_keep: int = 90,
+    keep_latest_per_user: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    time_budget_seconds: Optional[float] = None
+):
     """
     古いデータのクリーンアップタスク
-    指定された日数より古いデータを削除
+    指定された日数より古いデータを、バッチごとにコミットしながら一括削除する
+    （処理時間の上限に達した場合、残りは次回の実行で削除する）
     """
-    from datetime import datetime, timedelta
-    from app.models.ai import AIModel, PredictionResult, FeatureStore, TrainingMetrics
-    from app.models.workout import Workout
-    from app.models.race import Race
+    from app.services.data_retention import cleanup_expired_data
     
-    db = next(get_db())
+    db = SessionLocal()
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
-        
-        # 古いAIモデルデータの削除
-        old_models = db.query(AIModel).filter(AIModel.created_at < cutoff_date).all()
-        model_count = len(old_models)
-        for model in old_models:
-            db.delete(model)
-        
-        # 古い予測結果の削除
-        old_predictions = db.query(PredictionResult).filter(PredictionResult.created_at < cutoff_date).all()
-        prediction_count = len(old_predictions)
-        for prediction in old_predictions:
-            db.delete(prediction)
-        
-        # 古い特徴量データの削除
-        old_features = db.query(FeatureStore).filter(FeatureStore.created_at < cutoff_date).all()
-        feature_count = len(old_features)
-        for feature in old_features:
-            db.delete(feature)
-        
-        # 古いトレーニングメトリクスの削除
-        old_metrics = db.query(TrainingMetrics).filter(TrainingMetrics.created_at < cutoff_date).all()
-        metrics_count = len(old_metrics)
-        for metric in old_metrics:
-            db.delete(metric)
-        
-        db.commit()
+        result = cleanup_expired_data(
+            db,
+            days_to_keep=days_to_keep,
+            keep_latest_per_user=keep_latest_per_user,
+            batch_size=batch_size,
+            time_budget_seconds=time_budget_seconds
+        )
+        deleted = result["deleted"]
         
         return {
             "task": "cleanup_old_data",
-            "cutoff_date": cutoff_date.isoformat(),
-            "deleted_models": model_count,
-            "deleted_predictions": prediction_count,
-            "deleted_features": feature_count,
-            "deleted_metrics": metrics_count,
-            "total_deleted": model_count + prediction_count + feature_count + metrics_count
+            "cutoff_date": result["cutoff_date"],
+            "deleted_models": deleted["models"],
+            "deleted_predictions": deleted["predictions"],
+            "deleted_features": deleted["features"],
+            "deleted_metrics": deleted["metrics"],
+            "total_deleted": sum(deleted.values()),
+            "batches": result["batches"],
+            "complete": result["complete"]
         }
         
     except Exception as e:
@@ -0,0 +1,62 @@
+"""
+ベンチマーク共通ユーティリティ
+
+- 処理済みトレーニングデータ（ml_training_data/*_processed.csv）の読み込み
+- レイテンシ計測
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# SimpleRaceTimePredictor と同じく、ターゲットから導出される列は特徴量に含めない
+EXCLUDED_COLUMNS = ['target_time_seconds', 'distance_km', 'target_pace', 'vdot']
+TARGET_COLUMN = 'target_time_seconds'
+
+
+def list_events(data_dir: str = "ml_training_data") -> List[str]:
+    """処理済みデータが存在する種目の一覧"""
+    return sorted(p.stem.replace("_processed", "") for p in Path(data_dir).glob("*_processed.csv"))
+
+
+def load_event_frame(data_dir: str, event: str) -> pd.DataFrame:
+    """種目の処理済みデータをDataFrameとして読み込み"""
+    return pd.read_csv(Path(data_dir) / f"{event}_processed.csv")
+
+
+def load_event_data(data_dir: str, event: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    種目の処理済みデータから特徴量とターゲットを読み込み
+
+    Returns:
+        (特徴量配列, ターゲット配列, 特徴量名リスト)
+    """
+    df = load_event_frame(data_dir, event)
+    feature_columns = [col for col in df.columns if col not in EXCLUDED_COLUMNS]
+    X = df[feature_columns].fillna(df[feature_columns].median()).values.astype(np.float64)
+    y = df[TARGET_COLUMN].fillna(df[TARGET_COLUMN].median()).values.astype(np.float64)
+    return X, y, feature_columns
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """関数呼び出しの中央値レイテンシ（ミリ秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    """MAE / MAPE の計算"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    mask = y_true != 0
+    return {
+        'mae': float(np.mean(np.abs(y_true - y_pred))),
+        'mape': float(np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100) if np.any(mask) else 0.0
+    }
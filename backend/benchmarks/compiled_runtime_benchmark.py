@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+推論ランタイムの等価性検証・レイテンシベンチマーク
+
+処理済みトレーニングデータで各予測器を学習し、compiled_runtime に変換したモデルと
+sklearn の predict の出力が一致することを確認したうえで、1行・100行・10,000行の
+予測レイテンシを比較します。
+
+使用方法:
+    python benchmarks/compiled_runtime_benchmark.py
+    python benchmarks/compiled_runtime_benchmark.py --event marathon --repeat 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.compiled_runtime import compile_predictor
+from app.ml.ensemble_predictor import EnsemblePredictor
+from benchmarks.common import load_event_data, time_call
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZES = [1, 100, 10000]
+
+
+def benchmark_model(model: Any, X: np.ndarray, repeat: int, rng: np.random.Generator) -> Dict[str, Any]:
+    """1モデル分の等価性検証とレイテンシ計測"""
+    compiled = compile_predictor(model)
+    if compiled is None:
+        return {'error': 'compilation not supported'}
+
+    # 等価性検証（学習データ近傍の摂動サンプルも含める）
+    X_check = np.vstack([X, X[rng.integers(0, len(X), 1000)] * rng.normal(1.0, 0.05, (1000, X.shape[1]))])
+    expected = model.predict(X_check)
+    actual = compiled.predict(X_check)
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    if not np.allclose(expected, actual, rtol=1e-9, atol=1e-6):
+        raise AssertionError(f"{model.name}: compiled predictions differ from sklearn (max diff {max_abs_diff})")
+
+    latencies = {}
+    for batch_size in BATCH_SIZES:
+        X_batch = X[rng.integers(0, len(X), batch_size)]
+        n_repeat = max(3, repeat // 10) if batch_size >= 10000 else repeat
+        sklearn_ms = time_call(lambda: model.predict(X_batch), n_repeat)
+        compiled_ms = time_call(lambda: compiled.predict(X_batch), n_repeat)
+        latencies[str(batch_size)] = {
+            'sklearn_ms': sklearn_ms,
+            'compiled_ms': compiled_ms,
+            'speedup': sklearn_ms / compiled_ms if compiled_ms > 0 else None
+        }
+
+    return {'compiled': repr(compiled), 'max_abs_diff': max_abs_diff, 'latency': latencies}
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="推論ランタイムの等価性検証・レイテンシベンチマーク")
+    parser.add_argument("--data-dir", type=str, default="ml_training_data", help="処理済みデータディレクトリ")
+    parser.add_argument("--event", type=str, default="5000m", help="種目 (デフォルト: 5000m)")
+    parser.add_argument("--repeat", type=int, default=30, help="計測回数 (デフォルト: 30)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    X, y, _ = load_event_data(args.data_dir, args.event)
+
+    ensemble = EnsemblePredictor(name=f"{args.event}_predictor")
+    ensemble.add_default_models()
+    ensemble.fit(X, y)
+
+    models = {model.name: model for model in ensemble.models}
+    models[ensemble.name] = ensemble
+
+    results = {}
+    for name, model in models.items():
+        results[name] = benchmark_model(model, X, args.repeat, rng)
+
+    print(f"{'model':<24}{'rows':>8}{'sklearn ms':>12}{'compiled ms':>13}{'speedup':>9}")
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:<24}{result['error']:>42}")
+            continue
+        for batch_size, latency in result['latency'].items():
+            print(f"{name:<24}{batch_size:>8}{latency['sklearn_ms']:>12.3f}"
+                  f"{latency['compiled_ms']:>13.3f}{latency['speedup']:>8.1f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'event': args.event, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+メトリクス相関の累積統計の等価性検証・レイテンシベンチマーク
+
+欠測を含む日次メトリクスを生成し、1日ずつ追加する co-moment（Welford 法）、
+日付で揃えた配列からの一括計算、pairwise-complete な np.corrcoef の相関係数が一致すること、
+および保存形式（to_dict / from_dict）を経由して追加を続けても一致することを確認したうえで、
+1日追加・相関の読み出し・一括計算の時間を比較します。
+
+使用方法:
+    python benchmarks/correlation_stats_benchmark.py
+    python benchmarks/correlation_stats_benchmark.py --years 10 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import sys
+from itertools import combinations
+from typing import Dict
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.health.correlation_stats import (
+    CORRELATION_METRICS,
+    MIN_CORRELATION_OBSERVATIONS,
+    CorrelationAccumulators,
+)
+from benchmarks.common import time_call
+
+
+def generate_values(days: int, rng: np.random.Generator) -> np.ndarray:
+    """相関のある日次メトリクス（約2割の欠測を含む）を生成"""
+    latent = rng.normal(size=(days, 1))
+    values = 5 + 2 * latent @ rng.uniform(-1, 1, (1, len(CORRELATION_METRICS))) + rng.normal(size=(days, len(CORRELATION_METRICS)))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    return values
+
+
+def day_dicts(values: np.ndarray):
+    return [
+        {name: value for name, value in zip(CORRELATION_METRICS, row) if not np.isnan(value)}
+        for row in values
+    ]
+
+
+def reference_correlations(values: np.ndarray) -> Dict[str, float]:
+    """両方記録された日だけで np.corrcoef を取る従来の計算"""
+    result = {}
+    for (i, x), (j, y) in combinations(enumerate(CORRELATION_METRICS), 2):
+        both = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+        if both.sum() >= MIN_CORRELATION_OBSERVATIONS:
+            result[f"{x}|{y}"] = float(np.corrcoef(values[both, i], values[both, j])[0, 1])
+    return result
+
+
+def copy_accumulators(accumulators: CorrelationAccumulators) -> CorrelationAccumulators:
+    return CorrelationAccumulators.from_dict(accumulators.to_dict())
+
+
+def max_diff(expected: Dict[str, float], accumulators: CorrelationAccumulators) -> float:
+    diffs = [abs(accumulators.correlation(*key.split("|")) - r) for key, r in expected.items()]
+    return max(diffs) if diffs else 0.0
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="メトリクス相関の累積統計の等価性検証・レイテンシベンチマーク")
+    parser.add_argument("--years", type=int, default=10, help="日次データの年数 (デフォルト: 10)")
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数 (デフォルト: 20)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    days = args.years * 365
+    values = generate_values(days, rng)
+    rows = day_dicts(values)
+    expected = reference_correlations(values)
+
+    online = CorrelationAccumulators()
+    for row in rows:
+        online.add_day(row)
+    batch = CorrelationAccumulators.from_matrix(values)
+
+    # 30日前までの一括計算を保存形式経由で読み直し、直近30日を追加すると全期間と一致すること
+    resumed = copy_accumulators(CorrelationAccumulators.from_matrix(values[:-30]))
+    for row in rows[-30:]:
+        resumed.add_day(row)
+
+    diffs = {
+        'online_vs_corrcoef': max_diff(expected, online),
+        'batch_vs_corrcoef': max_diff(expected, batch),
+        'resumed_vs_corrcoef': max_diff(expected, resumed),
+    }
+    assert max(diffs.values()) < 1e-9, diffs
+
+    last_day = rows[-1]
+    add_ms = time_call(lambda: copy_accumulators(online).add_day(last_day), args.repeat)
+    read_ms = time_call(lambda: online.correlation('training_load', 'fatigue_level'), args.repeat)
+    batch_ms = time_call(lambda: CorrelationAccumulators.from_matrix(values), args.repeat)
+    corrcoef_ms = time_call(lambda: reference_correlations(values), max(3, args.repeat // 5))
+
+    report = {
+        'days': days,
+        'pairs': len(online.moments),
+        'max_abs_diff': diffs,
+        'add_day_with_load_ms': add_ms,
+        'read_ms': read_ms,
+        'batch_ms': batch_ms,
+        'pairwise_corrcoef_ms': corrcoef_ms
+    }
+
+    print(f"{days} days, {len(online.moments)} pairs (max abs diff {max(diffs.values()):.2e})")
+    print(f"  add one day (incl. JSON load): {add_ms:10.3f} ms")
+    print(f"  read one correlation:          {read_ms:10.4f} ms")
+    print(f"  batch from matrix:             {batch_ms:10.3f} ms")
+    print(f"  pairwise np.corrcoef:          {corrcoef_ms:10.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+ワークアウト重複検出のベンチマーク
+
+日々の記録と、1回のインポートの全行が同じ日付になる CSV インポート（一部は再インポート）を想定した
+重複（完全一致・値が少しずれた近似一致）を含む記録を生成し、
+- sorted neighborhood 法の検出結果が同じ日の全組を比較した場合のグループとどれだけ一致するか
+- 記録数を増やしたときの検出時間（O(n log n) と総当たりの比較）
+を計測します。
+
+使用方法:
+    python benchmarks/duplicate_detection_benchmark.py
+    python benchmarks/duplicate_detection_benchmark.py --sizes 1000 10000 100000 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.duplicate_detection import (
+    DEFAULT_WINDOW_SIZE,
+    WorkoutFingerprint,
+    find_duplicate_groups,
+    record_similarity,
+)
+from benchmarks.common import time_call
+
+
+def generate_records(count: int, duplicate_rate: float, rng: np.random.Generator,
+                     import_rows: int = 0, import_interval: int = 30) -> List[WorkoutFingerprint]:
+    """1日1-3件（import_interval 日ごとに import_rows 件のインポート）の記録と、その一部の重複を生成"""
+    start = date(2020, 1, 1)
+    records: List[WorkoutFingerprint] = []
+    day = 0
+    while len(records) < count:
+        imported = import_rows if import_rows and day % import_interval == 0 else 0
+        rows = imported or int(rng.integers(1, 4))
+        # インポートの日は半分の確率で同じ CSV を再インポートする
+        rate = (1.0 if rng.random() < 0.5 else 0.0) if imported else duplicate_rate
+        for _ in range(rows):
+            distance = float(rng.integers(3000, 30000))
+            duration = distance * float(rng.uniform(0.24, 0.40))
+            heart_rate = float(rng.integers(120, 180)) if rng.random() < 0.7 else None
+            base = WorkoutFingerprint(
+                id=f"w{len(records)}", date=start + timedelta(days=day),
+                created_at=datetime(2020, 1, 1) + timedelta(seconds=len(records)),
+                distance=distance, duration=duration, heart_rate=heart_rate,
+                workout_name=None, completeness=3
+            )
+            records.append(base)
+            if rng.random() < rate:
+                jitter = rng.random() < 0.5
+                records.append(WorkoutFingerprint(
+                    id=f"w{len(records)}", date=base.date, created_at=base.created_at + timedelta(days=1),
+                    distance=distance * (1 + float(rng.uniform(-0.01, 0.01))) if jitter else distance,
+                    duration=duration * (1 + float(rng.uniform(-0.02, 0.02))) if jitter else duration,
+                    heart_rate=heart_rate, workout_name=None, completeness=2
+                ))
+        day += 1
+    return records[:count]
+
+
+def exhaustive_pairs(records: List[WorkoutFingerprint], threshold: float) -> Set[Tuple[str, str]]:
+    """同じ日の全組を比較してしきい値以上の組を列挙（検証用）"""
+    by_day: Dict[date, List[WorkoutFingerprint]] = {}
+    for record in records:
+        by_day.setdefault(record.date, []).append(record)
+    pairs = set()
+    for day_records in by_day.values():
+        for i, a in enumerate(day_records):
+            for b in day_records[i + 1:]:
+                if a.key == b.key or record_similarity(a, b) >= threshold:
+                    pairs.add(tuple(sorted((a.id, b.id))))
+    return pairs
+
+
+def grouped_pairs(records: List[WorkoutFingerprint], threshold: float,
+                  window_size: int = DEFAULT_WINDOW_SIZE) -> Set[Tuple[str, str]]:
+    """検出した重複グループ内の組（重複の可能性ありの組は含めない）"""
+    groups, _, _ = find_duplicate_groups(records, threshold, window_size=window_size)
+    pairs = set()
+    for group in groups:
+        ids = sorted(record.id for record in group.records)
+        pairs.update((a, b) for i, a in enumerate(ids) for b in ids[i + 1:])
+    return pairs
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="ワークアウト重複検出のベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="記録数")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="重複を作る割合 (デフォルト: 0.1)")
+    parser.add_argument("--import-rows", type=int, default=300, help="インポート1回の行数 (デフォルト: 300)")
+    parser.add_argument("--threshold", type=float, default=0.8, help="類似度のしきい値 (デフォルト: 0.8)")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数 (デフォルト: 3)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    report: List[Dict[str, Any]] = []
+
+    for size in args.sizes:
+        records = generate_records(size, args.duplicate_rate, rng, args.import_rows)
+        # 同じ日の全組を比較した場合のグループとの一致率
+        expected = grouped_pairs(records, args.threshold, window_size=len(records))
+        found = grouped_pairs(records, args.threshold)
+        recall = len(expected & found) / len(expected) if expected else 1.0
+
+        groups, potential_links, compared = find_duplicate_groups(records, args.threshold)
+        detect_ms = time_call(lambda: find_duplicate_groups(records, args.threshold), args.repeat)
+        exhaustive_ms = time_call(lambda: exhaustive_pairs(records, args.threshold), args.repeat)
+        report.append({
+            'records': size,
+            'groups': len(groups),
+            'potential_links': len(potential_links),
+            'compared_pairs': compared,
+            'pair_recall': recall,
+            'detect_ms': detect_ms,
+            'exhaustive_ms': exhaustive_ms
+        })
+        print(f"{size:7d} records: {len(groups):6d} groups, {compared:8d} pairs compared, "
+              f"recall {recall:.3f}, {detect_ms:9.2f} ms (exhaustive same-day {exhaustive_ms:9.2f} ms)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+フィットネス・疲労モデルの等価性検証・レイテンシベンチマーク
+
+10年分の練習履歴（休養日・2部練を含む）と候補計画を生成し、
+- 履歴のフィットネス・疲労・フォームが1日ずつ進める素朴なループ実装と一致すること
+- 候補計画の一括予測が計画ごとに練習を1件ずつ処理するループ実装と一致すること
+を確認したうえで、それぞれの計算時間を比較します。
+
+使用方法:
+    python benchmarks/fitness_fatigue_benchmark.py
+    python benchmarks/fitness_fatigue_benchmark.py --years 10 --plans 1000 --horizon 28 --repeat 10
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.coaching.effectiveness_analyzer import EffectivenessAnalyzer
+from app.ml.coaching.fitness_fatigue import FITNESS_GAIN, FATIGUE_GAIN, plan_stress_matrix
+from benchmarks.common import time_call
+
+WORKOUT_TYPES = ['easy', 'recovery', 'tempo', 'interval', 'long']
+
+
+def generate_workout(rng: np.random.Generator) -> Dict[str, Any]:
+    """練習1件を生成（継続時間は一部欠測）"""
+    distance = float(rng.gamma(4.0, 2.5))
+    pace = float(rng.uniform(220, 380))
+    workout = {
+        'type': WORKOUT_TYPES[int(rng.integers(len(WORKOUT_TYPES)))],
+        'distance': distance,
+        'pace': pace,
+        'intensity': float(rng.uniform(0.3, 0.9))
+    }
+    if rng.random() < 0.8:
+        workout['duration_minutes'] = distance * pace / 60
+    return workout
+
+
+def generate_history(days: int, end: date, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """休養日と2部練を含む練習履歴を生成"""
+    start = end - timedelta(days=days - 1)
+    workouts = []
+    for offset in range(days):
+        if rng.random() < 0.3:
+            continue
+        for _ in range(2 if rng.random() < 0.1 else 1):
+            workout = generate_workout(rng)
+            workout['date'] = (start + timedelta(days=offset)).isoformat()
+            workouts.append(workout)
+    return workouts
+
+
+def generate_plans(count: int, horizon: int, rng: np.random.Generator) -> List[List[Dict[str, Any]]]:
+    """'day' で日を指定した候補計画を生成"""
+    plans = []
+    for _ in range(count):
+        days = np.flatnonzero(rng.random(horizon) < rng.uniform(0.4, 0.9))
+        plan = []
+        for day in days:
+            workout = generate_workout(rng)
+            workout['day'] = int(day)
+            plan.append(workout)
+        plans.append(plan)
+    return plans
+
+
+def naive_stress(workout: Dict[str, Any], avg_pace: float) -> float:
+    """練習1件のストレス（検証用）"""
+    duration = workout.get('duration_minutes')
+    if duration is None:
+        duration = workout['distance'] * workout['pace'] / 60
+    pace_factor = min(2.0, max(0.5, avg_pace / workout['pace']))
+    return workout['distance'] * workout['intensity'] * pace_factor * min(duration / 60, 2.0)
+
+
+def naive_fitness_fatigue(daily_stress: List[float], fitness: float = 0.0, fatigue: float = 0.0) -> Dict[str, List[float]]:
+    """1日ずつ進めるループ実装（検証用）"""
+    fitness_decay = math.exp(-1 / 42)
+    fatigue_decay = math.exp(-1 / 7)
+    result = {'fitness': [], 'fatigue': [], 'form': [], 'performance': []}
+    for stress in daily_stress:
+        result['form'].append(fitness - fatigue)
+        fitness = fitness * fitness_decay + stress * (1 - fitness_decay)
+        fatigue = fatigue * fatigue_decay + stress * (1 - fatigue_decay)
+        result['fitness'].append(fitness)
+        result['fatigue'].append(fatigue)
+        result['performance'].append(FITNESS_GAIN * fitness - FATIGUE_GAIN * fatigue)
+    return result
+
+
+def naive_daily_stress(workouts: List[Dict[str, Any]], start: date, days: int, avg_pace: float) -> List[float]:
+    """練習を1件ずつ日次ストレスに加算（検証用）"""
+    daily = [0.0] * days
+    for workout in workouts:
+        daily[(date.fromisoformat(workout['date']) - start).days] += naive_stress(workout, avg_pace)
+    return daily
+
+
+def naive_project(history: Dict[str, List[float]], plans: List[List[Dict[str, Any]]],
+                  horizon: int, avg_pace: float) -> List[float]:
+    """計画ごとに日次ストレスを作ってループで予測（検証用、予測期間末のパフォーマンス）"""
+    fitness, fatigue = history['fitness'][-1], history['fatigue'][-1]
+    finals = []
+    for plan in plans:
+        daily = [0.0] * horizon
+        for workout in plan:
+            daily[workout['day']] += naive_stress(workout, avg_pace)
+        finals.append(naive_fitness_fatigue(daily, fitness, fatigue)['performance'][-1])
+    return finals
+
+
+def naive_project_matrix(history: Dict[str, List[float]], stress: np.ndarray) -> List[float]:
+    """日次ストレス行列の計画ごとにループで予測（検証用、予測期間末のパフォーマンス）"""
+    fitness, fatigue = history['fitness'][-1], history['fatigue'][-1]
+    return [naive_fitness_fatigue(row, fitness, fatigue)['performance'][-1] for row in stress.tolist()]
+
+
+def max_abs_diff(a, b) -> float:
+    return float(np.max(np.abs(np.asarray(a) - np.asarray(b))))
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="フィットネス・疲労モデルの等価性検証・レイテンシベンチマーク")
+    parser.add_argument("--years", type=int, default=10, help="練習履歴の年数 (デフォルト: 10)")
+    parser.add_argument("--plans", type=int, default=1000, help="候補計画数 (デフォルト: 1000)")
+    parser.add_argument("--horizon", type=int, default=28, help="予測期間（日） (デフォルト: 28)")
+    parser.add_argument("--repeat", type=int, default=10, help="計測回数 (デフォルト: 10)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(42)
+    analyzer = EffectivenessAnalyzer()
+    profile = {'avg_pace': 300}
+
+    end = date.today()
+    days = args.years * 365
+    history = generate_history(days, end, rng)
+    plans = generate_plans(args.plans, args.horizon, rng)
+
+    # 履歴の等価性
+    series = analyzer.calculate_fitness_fatigue(history, profile, end)
+    expected_stress = naive_daily_stress(history, series.start_date, series.days, profile['avg_pace'])
+    expected = naive_fitness_fatigue(expected_stress)
+    history_diff = max(
+        max_abs_diff(series.stress, expected_stress),
+        *(max_abs_diff(getattr(series, name), expected[name]) for name in expected)
+    )
+    assert history_diff < 1e-9, history_diff
+
+    # 候補計画の等価性
+    ranked = analyzer.project_training_plans(history, plans, profile, args.horizon, end)
+    projected = [0.0] * len(plans)
+    for result in ranked:
+        projected[result['plan_index']] = result['final_performance']
+    expected_finals = naive_project(expected, plans, args.horizon, profile['avg_pace'])
+    plan_diff = max_abs_diff(projected, expected_finals)
+    assert plan_diff < 1e-9, plan_diff
+    assert [r['plan_index'] for r in ranked] == sorted(range(len(plans)), key=lambda i: -expected_finals[i])
+
+    history_loop_ms = time_call(
+        lambda: naive_fitness_fatigue(naive_daily_stress(history, series.start_date, series.days, 300)),
+        max(3, args.repeat // 2)
+    )
+    history_vector_ms = time_call(lambda: analyzer.calculate_fitness_fatigue(history, profile, end), args.repeat)
+    plans_loop_ms = time_call(lambda: naive_project(expected, plans, args.horizon, 300), max(3, args.repeat // 2))
+    plans_vector_ms = time_call(
+        lambda: analyzer.project_training_plans(history, plans, profile, args.horizon, end), args.repeat
+    )
+
+    # 日次ストレス行列ができた後の予測だけの比較
+    stress = plan_stress_matrix(plans, args.horizon, end + timedelta(days=1), profile['avg_pace'])
+    matrix_diff = max_abs_diff(
+        analyzer.fitness_fatigue_model.project_plans(series, stress).final_performance, expected_finals
+    )
+    assert matrix_diff < 1e-9, matrix_diff
+    matrix_ms = time_call(lambda: plan_stress_matrix(plans, args.horizon, end + timedelta(days=1)), args.repeat)
+    projection_loop_ms = time_call(lambda: naive_project_matrix(expected, stress), max(3, args.repeat // 2))
+    projection_vector_ms = time_call(
+        lambda: analyzer.fitness_fatigue_model.project_plans(series, stress), args.repeat
+    )
+
+    report = {
+        'history_days': series.days,
+        'history_workouts': len(history),
+        'plans': len(plans),
+        'horizon_days': args.horizon,
+        'planned_workouts': sum(len(plan) for plan in plans),
+        'max_abs_diff': {'history': history_diff, 'plans': plan_diff},
+        'history_ms': {'loop': history_loop_ms, 'vectorized': history_vector_ms},
+        'plans_ms': {'loop': plans_loop_ms, 'vectorized': plans_vector_ms},
+        'stress_matrix_ms': matrix_ms,
+        'projection_ms': {'loop': projection_loop_ms, 'vectorized': projection_vector_ms}
+    }
+
+    print(f"history: {series.days} days, {len(history)} workouts (max diff {history_diff:.2e})")
+    print(f"  loop:       {history_loop_ms:10.3f} ms")
+    print(f"  vectorized: {history_vector_ms:10.3f} ms ({history_loop_ms / history_vector_ms:.1f}x)")
+    print(f"plans: {len(plans)} x {args.horizon} days, {report['planned_workouts']} workouts "
+          f"(max diff {plan_diff:.2e}, history included)")
+    print(f"  loop:       {plans_loop_ms:10.3f} ms (history excluded)")
+    print(f"  vectorized: {plans_vector_ms:10.3f} ms")
+    print(f"    dict -> stress matrix: {matrix_ms:10.3f} ms")
+    print("projection from stress matrix")
+    print(f"  loop:       {projection_loop_ms:10.3f} ms")
+    print(f"  vectorized: {projection_vector_ms:10.3f} ms ({projection_loop_ms / projection_vector_ms:.1f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+メトリクストレンド構築の等価性検証・レイテンシベンチマーク
+
+欠測日・同日の重複記録を含む日次メトリクスを生成し、日付ごとに行を線形探索する従来の実装と
+密な配列に1パスで配置する build_trend_series の日次系列が一致することを確認したうえで、
+日次・週次・月次（平均 / LTTB）の構築時間を比較します。
+
+使用方法:
+    python benchmarks/metrics_trends_benchmark.py
+    python benchmarks/metrics_trends_benchmark.py --days 3650 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.metrics_trends import TREND_METRICS, build_trend_series
+from benchmarks.common import time_call
+
+
+def generate_rows(days: int, rng: np.random.Generator) -> Tuple[date, List[Tuple[Any, ...]]]:
+    """欠測日・欠測値・同日の重複記録を含む (date, メトリクス...) の行を生成"""
+    start = date.today() - timedelta(days=days - 1)
+    rows = []
+    for offset in range(days):
+        if rng.random() < 0.25:
+            continue
+        for _ in range(2 if rng.random() < 0.05 else 1):
+            values = [
+                round(float(rng.normal(60, 1.5)), 1),
+                round(float(rng.normal(7, 1)), 1),
+                int(rng.integers(1, 11)),
+                int(rng.integers(1, 11)),
+                int(rng.integers(1, 11)),
+                int(rng.integers(1, 11)),
+                int(rng.integers(1, 11)),
+                int(rng.integers(45, 65))
+            ]
+            values = [None if rng.random() < 0.1 else value for value in values]
+            rows.append((start + timedelta(days=offset), *values))
+    return start, rows
+
+
+def naive_trends(rows: List[Tuple[Any, ...]], start_date: date, days: int) -> Dict[str, List[Optional[float]]]:
+    """日付ごとに行を線形探索する従来の実装（検証用、同日の重複は後の行を優先）"""
+    result = {'dates': []}
+    result.update({name: [] for name in TREND_METRICS})
+    current_date = start_date
+    end_date = start_date + timedelta(days=days - 1)
+    while current_date <= end_date:
+        result['dates'].append(current_date.isoformat())
+        day_row = next((row for row in reversed(rows) if row[0] == current_date), None)
+        for i, name in enumerate(TREND_METRICS):
+            result[name].append(day_row[i + 1] if day_row else None)
+        current_date += timedelta(days=1)
+    return result
+
+
+def verify(rows: List[Tuple[Any, ...]], start_date: date, days: int) -> None:
+    """日次系列が従来の実装と一致し、ダウンサンプリング結果が各バケットの値域に収まることを確認"""
+    expected = naive_trends(rows, start_date, days)
+    actual = build_trend_series(rows, start_date, days, 'daily')
+    assert actual['dates'] == expected['dates']
+    for name in TREND_METRICS:
+        assert actual[name] == [None if v is None else float(v) for v in expected[name]], name
+
+    for resolution in ('weekly', 'monthly'):
+        mean = build_trend_series(rows, start_date, days, resolution, 'mean')
+        lttb = build_trend_series(rows, start_date, days, resolution, 'lttb')
+        assert mean['dates'] == lttb['dates']
+        for name in TREND_METRICS:
+            daily = np.array([np.nan if v is None else v for v in actual[name]], dtype=np.float64)
+            lo, hi = np.nanmin(daily), np.nanmax(daily)
+            for series in (mean[name], lttb[name]):
+                assert all(value is None or lo <= value <= hi for value in series), (resolution, name)
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="メトリクストレンド構築の等価性検証・レイテンシベンチマーク")
+    parser.add_argument("--days", type=int, default=365, help="線形探索と比較する日数 (デフォルト: 365)")
+    parser.add_argument("--long-days", type=int, default=3650, help="ダウンサンプリングの日数 (デフォルト: 3650)")
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数 (デフォルト: 20)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    start, rows = generate_rows(args.days, rng)
+    verify(rows, start, args.days)
+    loop_ms = time_call(lambda: naive_trends(rows, start, args.days), max(3, args.repeat // 5))
+    dense_ms = time_call(lambda: build_trend_series(rows, start, args.days, 'daily'), args.repeat)
+
+    long_start, long_rows = generate_rows(args.long_days, rng)
+    verify(long_rows, long_start, args.long_days)
+    long_ms = {}
+    for resolution, method in (('daily', 'mean'), ('weekly', 'mean'), ('weekly', 'lttb'),
+                               ('monthly', 'mean'), ('monthly', 'lttb')):
+        long_ms[f"{resolution}_{method}"] = time_call(
+            lambda: build_trend_series(long_rows, long_start, args.long_days, resolution, method), args.repeat
+        )
+
+    report = {
+        'days': args.days,
+        'rows': len(rows),
+        'loop_ms': loop_ms,
+        'dense_ms': dense_ms,
+        'speedup': loop_ms / dense_ms if dense_ms > 0 else None,
+        'long_range': {
+            'days': args.long_days,
+            'rows': len(long_rows),
+            'build_ms': long_ms
+        }
+    }
+
+    print(f"{args.days} days, {len(rows)} rows (daily series identical)")
+    print(f"  linear search: {loop_ms:10.3f} ms")
+    print(f"  dense array:   {dense_ms:10.3f} ms ({report['speedup']:.1f}x)")
+    print(f"{args.long_days} days, {len(long_rows)} rows")
+    for name, ms in long_ms.items():
+        print(f"  {name:14s} {ms:10.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+モデル読み込みメモリベンチマーク
+
+uvicorn / Celery のワーカーを模した複数プロセスで全種目のモデルを読み込み、
+mmap_mode='r' の有無によるワーカーごとのメモリ使用量（RSS / USS / PSS）を比較します。
+
+- RSS: プロセスが参照している物理メモリ（共有ページを含む）
+- USS: そのプロセス固有のメモリ（共有ページを含まない）
+- PSS: 共有ページを参照プロセス数で按分したメモリ
+
+旧形式（メタデータなし）のアーティファクトは一時ディレクトリで現行フォーマットに変換してから計測します。
+
+使用方法:
+    python benchmarks/model_memory_benchmark.py --workers 4
+    python benchmarks/model_memory_benchmark.py --model-dir trained_models --output memory_report.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import psutil
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.model_artifacts import convert_model_artifact, is_mmap_compatible, load_model_artifact
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _memory_snapshot() -> Dict[str, float]:
+    """現在プロセスのメモリ使用量（MB）"""
+    process = psutil.Process()
+    snapshot = {'rss_mb': process.memory_info().rss / 1024 / 1024}
+
+    try:
+        full_info = process.memory_full_info()
+        snapshot['uss_mb'] = full_info.uss / 1024 / 1024
+        if hasattr(full_info, 'pss'):
+            snapshot['pss_mb'] = full_info.pss / 1024 / 1024
+    except (psutil.AccessDenied, AttributeError):
+        pass
+
+    return snapshot
+
+
+def _worker(model_files: List[str], use_mmap: bool, loaded_barrier, release_event, result_queue):
+    """モデルを読み込み、全ワーカーの読み込み完了後にメモリを計測するワーカー"""
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    baseline = _memory_snapshot()
+    models = []
+    for model_file in model_files:
+        models.append(load_model_artifact(model_file, mmap=use_mmap))
+
+    # 全ワーカーがモデルを保持した状態で計測する（PSSの按分を正しく反映させるため）
+    loaded_barrier.wait()
+    loaded = _memory_snapshot()
+    result_queue.put({
+        'pid': os.getpid(),
+        'baseline': baseline,
+        'loaded': loaded,
+        'delta_rss_mb': loaded['rss_mb'] - baseline['rss_mb'],
+        'delta_uss_mb': loaded.get('uss_mb', 0.0) - baseline.get('uss_mb', 0.0),
+        'n_models': len(models)
+    })
+    release_event.wait()
+
+
+def run_mode(model_files: List[str], n_workers: int, use_mmap: bool) -> Dict[str, Any]:
+    """
+    指定モードで複数ワーカーを起動して計測
+
+    Args:
+        model_files: 読み込むアーティファクトのパス
+        n_workers: ワーカー数
+        use_mmap: メモリマップを使用するか
+
+    Returns:
+        計測結果辞書
+    """
+    ctx = mp.get_context('spawn')
+    loaded_barrier = ctx.Barrier(n_workers)
+    release_event = ctx.Event()
+    result_queue = ctx.Queue()
+
+    processes = [
+        ctx.Process(target=_worker, args=(model_files, use_mmap, loaded_barrier, release_event, result_queue))
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+
+    workers = [result_queue.get() for _ in range(n_workers)]
+    release_event.set()
+    for process in processes:
+        process.join()
+
+    def _mean(key: str) -> float:
+        values = [w['loaded'].get(key) for w in workers if w['loaded'].get(key) is not None]
+        return sum(values) / len(values) if values else 0.0
+
+    return {
+        'mmap': use_mmap,
+        'workers': workers,
+        'avg_rss_mb': _mean('rss_mb'),
+        'avg_uss_mb': _mean('uss_mb'),
+        'avg_pss_mb': _mean('pss_mb'),
+        'total_pss_mb': sum(w['loaded'].get('pss_mb', 0.0) for w in workers),
+        'avg_model_delta_uss_mb': sum(w['delta_uss_mb'] for w in workers) / len(workers)
+    }
+
+
+def prepare_artifacts(model_dir: Path, work_dir: Path) -> List[str]:
+    """旧形式アーティファクトを現行フォーマットに変換した一覧を作成"""
+    model_files = []
+    for model_file in sorted(model_dir.glob("*.joblib")):
+        if is_mmap_compatible(model_file):
+            model_files.append(str(model_file))
+            continue
+
+        converted = work_dir / model_file.name
+        try:
+            convert_model_artifact(model_file, converted)
+            model_files.append(str(converted))
+        except Exception as e:
+            logger.warning(f"Skipping {model_file.name}: {e}")
+
+    return model_files
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="モデル読み込みのワーカー別メモリベンチマーク")
+    parser.add_argument("--model-dir", type=str, default="ml_models", help="モデルディレクトリ (デフォルト: ml_models)")
+    parser.add_argument("--workers", type=int, default=4, help="ワーカー数 (デフォルト: 4)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_files = prepare_artifacts(Path(args.model_dir), Path(tmp_dir))
+        if not model_files:
+            logger.error(f"No loadable model artifacts found in {args.model_dir}")
+            return
+
+        total_size_mb = sum(os.path.getsize(f) for f in model_files) / 1024 / 1024
+        logger.info(f"Benchmarking {len(model_files)} artifacts ({total_size_mb:.1f} MB) with {args.workers} workers")
+
+        results = {
+            'model_dir': args.model_dir,
+            'n_artifacts': len(model_files),
+            'artifact_size_mb': total_size_mb,
+            'n_workers': args.workers,
+            'without_mmap': run_mode(model_files, args.workers, use_mmap=False),
+            'with_mmap': run_mode(model_files, args.workers, use_mmap=True)
+        }
+
+    print(f"{'mode':<14}{'avg RSS MB':>12}{'avg USS MB':>12}{'avg PSS MB':>12}{'total PSS MB':>14}")
+    for label in ('without_mmap', 'with_mmap'):
+        mode = results[label]
+        print(f"{label:<14}{mode['avg_rss_mb']:>12.1f}{mode['avg_uss_mb']:>12.1f}"
+              f"{mode['avg_pss_mb']:>12.1f}{mode['total_pss_mb']:>14.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+予測器オフラインベンチマーク
+
+ローカルの処理済みトレーニングデータ（ml_training_data/*_processed.csv）のみを使用し、
+種目 × アルゴリズムごとに以下を計測します：
+- 学習時間
+- 単一行・バッチ予測のレイテンシ
+- 学習時のピークメモリ（tracemalloc）
+- テストデータでの MAE / MAPE
+
+結果はJSONで出力し、保存済みのベースラインと比較して悪化した指標を報告します。
+回帰が検出された場合は終了コード1で終了します。
+
+使用方法:
+    python benchmarks/predictor_benchmark.py
+    python benchmarks/predictor_benchmark.py --events 5000m marathon --algorithms RandomForest LinearRegression
+    python benchmarks/predictor_benchmark.py --update-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai.simple_race_predictor import SimpleRaceTimePredictor
+from app.ml.ensemble_predictor import EnsemblePredictor
+from app.ml.predictors.gradient_boosting_predictor import GradientBoostingPredictor
+from app.ml.predictors.linear_regression_predictor import LinearRegressionPredictor
+from app.ml.predictors.random_forest_predictor import RandomForestPredictor
+from app.ml.predictors.ridge_regression_predictor import RidgeRegressionPredictor
+from benchmarks.common import (
+    TARGET_COLUMN, list_events, load_event_data, regression_metrics, time_call
+)
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# SimpleRaceTimePredictor.predict は配列でスケーラーを呼ぶため、特徴量名の警告を抑制する
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "predictor_baseline.json")
+
+# 指標ごとの許容悪化率（ベースライン比）
+DEFAULT_TOLERANCES = {
+    'fit_time_ms': 0.25,
+    'single_predict_ms': 0.25,
+    'batch_predict_ms': 0.25,
+    'peak_memory_mb': 0.20,
+    'mae': 0.05,
+    'mape': 0.05
+}
+
+
+class SimpleRaceTimePredictorAdapter:
+    """SimpleRaceTimePredictor を種目単位でベンチマークするためのアダプター"""
+
+    name = "SimpleRaceTimePredictor"
+
+    def __init__(self, event: str, feature_columns: List[str]):
+        self.event = event
+        self.feature_columns = feature_columns
+        self.predictor = SimpleRaceTimePredictor()
+
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        train_df = pd.DataFrame(X, columns=self.feature_columns)
+        train_df[TARGET_COLUMN] = y
+        # 学習データを差し替え、ベンチマーク対象の分割だけで学習させる
+        self.predictor.load_processed_data = lambda: {self.event: train_df}
+        self.predictor.train_models()
+        if self.event not in self.predictor.models:
+            raise RuntimeError(f"SimpleRaceTimePredictor could not train {self.event}")
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # 公開APIは1件ずつの辞書入力のため、行ごとに呼び出す
+        predictions = []
+        for row in np.atleast_2d(X):
+            result = self.predictor.predict(self.event, dict(zip(self.feature_columns, row)))
+            if 'error' in result:
+                raise RuntimeError(result['error'])
+            predictions.append(result['predicted_time_seconds'])
+        return np.array(predictions)
+
+
+def _ensemble_factory(event: str, feature_columns: List[str]) -> EnsemblePredictor:
+    ensemble = EnsemblePredictor(name="EnsemblePredictor")
+    ensemble.add_default_models()
+    return ensemble
+
+
+ALGORITHMS: Dict[str, Callable[[str, List[str]], Any]] = {
+    'RandomForest': lambda event, columns: RandomForestPredictor(n_estimators=100, max_depth=10),
+    'GradientBoosting': lambda event, columns: GradientBoostingPredictor(n_estimators=100, learning_rate=0.1),
+    'LinearRegression': lambda event, columns: LinearRegressionPredictor(),
+    'RidgeRegression': lambda event, columns: RidgeRegressionPredictor(alpha=1.0),
+    'EnsemblePredictor': _ensemble_factory,
+    'SimpleRaceTimePredictor': SimpleRaceTimePredictorAdapter,
+}
+
+
+def benchmark_algorithm(
+    factory: Callable[[str, List[str]], Any],
+    event: str,
+    feature_columns: List[str],
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: np.ndarray,
+    y_test: np.ndarray,
+    repeat: int,
+    batch_size: int,
+    rng: np.random.Generator
+) -> Dict[str, Any]:
+    """
+    1種目・1アルゴリズムの計測
+
+    Returns:
+        計測結果辞書
+    """
+    model = factory(event, feature_columns)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time_ms = (time.perf_counter() - start) * 1000
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    y_pred = model.predict(X_test)
+    metrics = regression_metrics(y_test, y_pred)
+
+    single_row = X_test[:1]
+    batch = X_test[rng.integers(0, len(X_test), batch_size)]
+    single_predict_ms = time_call(lambda: model.predict(single_row), repeat)
+    batch_predict_ms = time_call(lambda: model.predict(batch), max(3, repeat // 10))
+
+    return {
+        'fit_time_ms': fit_time_ms,
+        'single_predict_ms': single_predict_ms,
+        'batch_predict_ms': batch_predict_ms,
+        'batch_size': batch_size,
+        'batch_rows_per_second': batch_size / (batch_predict_ms / 1000) if batch_predict_ms > 0 else None,
+        'peak_memory_mb': peak_bytes / 1024 / 1024,
+        'train_samples': len(X_train),
+        'test_samples': len(X_test),
+        **metrics
+    }
+
+
+def run_benchmarks(
+    data_dir: str,
+    events: List[str],
+    algorithms: List[str],
+    repeat: int,
+    batch_size: int,
+    seed: int
+) -> Dict[str, Any]:
+    """
+    全種目・全アルゴリズムのベンチマークを実行
+
+    Returns:
+        ベンチマーク結果（JSONシリアライズ可能な辞書）
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for event in events:
+        X, y, feature_columns = load_event_data(data_dir, event)
+        # SimpleRaceTimePredictor と同じ分割（test_size=0.2, random_state=42）でテストデータを固定する
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        results[event] = {}
+
+        for name in algorithms:
+            rng = np.random.default_rng(seed)
+            try:
+                results[event][name] = benchmark_algorithm(
+                    ALGORITHMS[name], event, feature_columns,
+                    X_train, X_test, y_train, y_test,
+                    repeat, batch_size, rng
+                )
+            except Exception as e:
+                logger.error(f"Benchmark failed for {event}/{name}: {e}")
+                results[event][name] = {'error': str(e)}
+
+            print(_format_row(event, name, results[event][name]), flush=True)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'data_dir': data_dir,
+            'repeat': repeat,
+            'batch_size': batch_size,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine()
+        },
+        'results': results
+    }
+
+
+def compare_with_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerances: Dict[str, float]
+) -> List[Dict[str, Any]]:
+    """
+    ベースラインと比較して悪化した指標を抽出
+
+    全指標とも値が小さいほど良いものとして扱う。
+
+    Returns:
+        回帰のリスト
+    """
+    regressions = []
+    baseline_results = baseline.get('results', {})
+
+    for event, algorithms in current.get('results', {}).items():
+        for name, metrics in algorithms.items():
+            base_metrics = baseline_results.get(event, {}).get(name)
+            if not base_metrics or 'error' in base_metrics:
+                continue
+
+            if 'error' in metrics:
+                regressions.append({'event': event, 'algorithm': name, 'metric': 'error', 'current': metrics['error']})
+                continue
+
+            for metric, tolerance in tolerances.items():
+                base_value = base_metrics.get(metric)
+                value = metrics.get(metric)
+                if base_value is None or value is None or base_value <= 0:
+                    continue
+
+                change = (value - base_value) / base_value
+                if change > tolerance:
+                    regressions.append({
+                        'event': event,
+                        'algorithm': name,
+                        'metric': metric,
+                        'baseline': base_value,
+                        'current': value,
+                        'change_pct': change * 100,
+                        'tolerance_pct': tolerance * 100
+                    })
+
+    return regressions
+
+
+def _format_row(event: str, name: str, result: Dict[str, Any]) -> str:
+    if 'error' in result:
+        return f"{event:<14}{name:<26}ERROR: {result['error']}"
+    return (f"{event:<14}{name:<26}{result['fit_time_ms']:>10.1f}{result['single_predict_ms']:>10.3f}"
+            f"{result['batch_predict_ms']:>10.2f}{result['peak_memory_mb']:>9.1f}"
+            f"{result['mae']:>10.2f}{result['mape']:>8.2f}")
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="予測器オフラインベンチマーク（精度・レイテンシ・メモリ）")
+    parser.add_argument("--data-dir", type=str, default="ml_training_data", help="処理済みデータディレクトリ")
+    parser.add_argument("--events", nargs="*", default=None, help="対象種目（省略時は全種目）")
+    parser.add_argument("--algorithms", nargs="*", default=None, choices=list(ALGORITHMS.keys()),
+                        help="対象アルゴリズム（省略時は全アルゴリズム）")
+    parser.add_argument("--repeat", type=int, default=20, help="単一行予測の計測回数 (デフォルト: 20)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="バッチ予測の行数 (デフォルト: 1000)")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード (デフォルト: 42)")
+    parser.add_argument("--output", type=str, default="predictor_benchmark_results.json", help="JSON結果の出力先")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE_PATH, help="比較するベースラインJSON")
+    parser.add_argument("--update-baseline", action="store_true", help="今回の結果でベースラインを更新")
+    parser.add_argument("--latency-tolerance", type=float, default=None, help="レイテンシ・学習時間の許容悪化率（例: 0.25）")
+    parser.add_argument("--accuracy-tolerance", type=float, default=None, help="MAE/MAPEの許容悪化率（例: 0.05）")
+    args = parser.parse_args()
+
+    events = args.events or list_events(args.data_dir)
+    algorithms = args.algorithms or list(ALGORITHMS.keys())
+
+    tolerances = dict(DEFAULT_TOLERANCES)
+    if args.latency_tolerance is not None:
+        for metric in ('fit_time_ms', 'single_predict_ms', 'batch_predict_ms'):
+            tolerances[metric] = args.latency_tolerance
+    if args.accuracy_tolerance is not None:
+        for metric in ('mae', 'mape'):
+            tolerances[metric] = args.accuracy_tolerance
+
+    print(f"{'event':<14}{'algorithm':<26}{'fit ms':>10}{'1row ms':>10}{'batch ms':>10}{'peak MB':>9}{'MAE':>10}{'MAPE%':>8}")
+    current = run_benchmarks(args.data_dir, events, algorithms, args.repeat, args.batch_size, args.seed)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline found at {args.baseline} (run with --update-baseline to create one)")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare_with_baseline(current, baseline, tolerances)
+    if not regressions:
+        print("No regressions against baseline")
+        return
+
+    print(f"\n{len(regressions)} regression(s) against baseline:")
+    for regression in regressions:
+        if regression['metric'] == 'error':
+            print(f"  {regression['event']}/{regression['algorithm']}: now failing ({regression['current']})")
+        else:
+            print(f"  {regression['event']}/{regression['algorithm']} {regression['metric']}: "
+                  f"{regression['baseline']:.4g} -> {regression['current']:.4g} "
+                  f"(+{regression['change_pct']:.1f}%, tolerance {regression['tolerance_pct']:.0f}%)")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
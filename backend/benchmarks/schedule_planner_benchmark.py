@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+練習スケジュール探索の最適性検証・レイテンシベンチマーク
+
+短い期間では全スケジュール（選択肢数^日数）を総当たりで評価し、ビームサーチの上位 k 件の
+スコアが総当たりの上位 k 件とどれだけ近いかを確認します。あわせて、毎日その日に許される
+最大強度を選ぶ貪欲法とのスコア差と、7-28日の期間での探索時間を計測します。
+
+使用方法:
+    python benchmarks/schedule_planner_benchmark.py
+    python benchmarks/schedule_planner_benchmark.py --exhaustive-days 8 --top-k 5 --repeat 20
+"""
+
+import argparse
+import json
+import os
+import sys
+from itertools import product
+from typing import Any, Dict
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.health.schedule_planner import (
+    WORKOUT_OPTIONS,
+    WorkoutSchedulePlanner,
+    max_allowed_option,
+    training_readiness,
+)
+from benchmarks.common import time_call
+
+# 週80km・週6回・5:00/kmの選手（TrainingConditionCorrelator.suggest_workout_schedules と同じ換算）
+SESSION_DISTANCE = 80 / 6
+PACE = 300
+RECOVERY_ABILITY = 0.5
+
+
+def problem(days: int, initial_fatigue: float) -> Dict[str, Any]:
+    """探索の入力を作成"""
+    distances = np.array([option['distance_factor'] * SESSION_DISTANCE for option in WORKOUT_OPTIONS])
+    intensities = np.array([option['intensity'] for option in WORKOUT_OPTIONS])
+    duration_hours = distances * PACE / 3600
+    fatigue_gains = np.minimum(5.0, intensities * distances * 0.1 * duration_hours * (1 - RECOVERY_ABILITY * 0.3))
+    return {
+        'initial_fatigue': initial_fatigue,
+        'energy_by_day': np.minimum(10.0, 7 + RECOVERY_ABILITY * 0.3 * np.arange(days)),
+        'sleep_quality': 8,
+        'stress_level': 4,
+        'fatigue_gains': fatigue_gains,
+        'loads': intensities * distances,
+        'daily_recovery': RECOVERY_ABILITY * 0.5
+    }
+
+
+def evaluate(planner: WorkoutSchedulePlanner, sequences: np.ndarray, inputs: Dict[str, Any]) -> np.ndarray:
+    """スケジュール（本数, 日数）をまとめて評価（許されない選択を含むものは -inf）"""
+    fatigue = np.full(len(sequences), float(inputs['initial_fatigue']))
+    scores = np.zeros(len(sequences))
+    for day in range(sequences.shape[1]):
+        energy = inputs['energy_by_day'][day]
+        readiness = training_readiness(fatigue, energy, inputs['sleep_quality'], inputs['stress_level'])
+        option = sequences[:, day]
+        valid = option <= max_allowed_option(readiness, fatigue, energy)
+        fatigue = np.clip(fatigue + inputs['fatigue_gains'][option] - inputs['daily_recovery'], 1, 10)
+        scores += readiness / 10 * inputs['loads'][option]
+        scores -= planner.fatigue_deviation_weight * (fatigue - planner.fatigue_target) ** 2
+        scores[~valid] = -np.inf
+    return scores - planner.fatigue_carryover_weight * np.maximum(fatigue - planner.fatigue_target, 0.0)
+
+
+def greedy_sequence(days: int, inputs: Dict[str, Any]) -> np.ndarray:
+    """毎日その日に許される最大強度を選ぶ"""
+    fatigue = float(inputs['initial_fatigue'])
+    sequence = np.zeros(days, dtype=np.int64)
+    for day in range(days):
+        energy = inputs['energy_by_day'][day]
+        readiness = training_readiness(fatigue, energy, inputs['sleep_quality'], inputs['stress_level'])
+        sequence[day] = int(max_allowed_option(np.array(readiness), np.array(fatigue), np.array(energy)))
+        fatigue = float(np.clip(fatigue + inputs['fatigue_gains'][sequence[day]] - inputs['daily_recovery'], 1, 10))
+    return sequence
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="練習スケジュール探索の最適性検証・レイテンシベンチマーク")
+    parser.add_argument("--exhaustive-days", type=int, default=8, help="総当たりと比較する日数 (デフォルト: 8)")
+    parser.add_argument("--top-k", type=int, default=3, help="比較する上位件数 (デフォルト: 3)")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="探索の時間予算 (デフォルト: 50)")
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数 (デフォルト: 20)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    planner = WorkoutSchedulePlanner()
+    report: Dict[str, Any] = {'exhaustive': [], 'latency': []}
+
+    print(f"exhaustive comparison ({args.exhaustive_days} days, top {args.top_k})")
+    for initial_fatigue in (3.0, 5.0, 6.5):
+        inputs = problem(args.exhaustive_days, initial_fatigue)
+        sequences = np.array(list(product(range(len(WORKOUT_OPTIONS)), repeat=args.exhaustive_days)))
+        exhaustive_scores = np.sort(evaluate(planner, sequences, inputs))[::-1][:args.top_k]
+
+        result = planner.search(top_k=args.top_k, latency_budget_ms=float('inf'), **inputs)
+        beam_scores = np.array([candidate.score for candidate in result.candidates])
+        rescored = evaluate(planner, np.array([candidate.options for candidate in result.candidates]), inputs)
+        assert np.allclose(rescored, beam_scores), (rescored, beam_scores)
+
+        greedy_score = float(evaluate(planner, greedy_sequence(args.exhaustive_days, inputs)[None, :], inputs)[0])
+        gap = float(exhaustive_scores[0] - beam_scores[0])
+        report['exhaustive'].append({
+            'initial_fatigue': initial_fatigue,
+            'sequences': len(sequences),
+            'exhaustive_top_k': exhaustive_scores.tolist(),
+            'beam_top_k': beam_scores.tolist(),
+            'greedy': greedy_score,
+            'top1_gap': gap
+        })
+        print(f"  fatigue {initial_fatigue}: exhaustive {exhaustive_scores.round(3).tolist()} "
+              f"beam {beam_scores.round(3).tolist()} greedy {greedy_score:.3f} (gap {gap:.2e})")
+
+    print(f"latency (budget {args.budget_ms} ms)")
+    for days in (7, 14, 21, 28):
+        inputs = problem(days, 5.0)
+        result = planner.search(top_k=args.top_k, latency_budget_ms=args.budget_ms, **inputs)
+        ms = time_call(lambda: planner.search(top_k=args.top_k, latency_budget_ms=args.budget_ms, **inputs),
+                       args.repeat)
+        greedy_score = float(evaluate(planner, greedy_sequence(days, inputs)[None, :], inputs)[0])
+        report['latency'].append({
+            'days': days,
+            'search_ms': ms,
+            'expanded_states': result.expanded_states,
+            'within_budget': result.within_budget,
+            'best_score': result.candidates[0].score,
+            'greedy_score': greedy_score
+        })
+        print(f"  {days:2d} days: {ms:8.3f} ms, {result.expanded_states:6d} states, "
+              f"best {result.candidates[0].score:.2f} vs greedy {greedy_score:.2f}"
+              f"{'' if result.within_budget else ' (budget exceeded)'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+バックグラウンドタスクの結果保存のベンチマーク
+
+バッチ予測と同じ形のユーザーごとの結果を生成し、
+- 従来: 全ユーザーの結果を Celery の結果（JSON）として結果バックエンドに置く
+- 現行: 結果は task_result_items に保存し、Celery の結果は集計と参照だけにする
+の結果バックエンドに置くサイズと、結果取得（全体のデコード / 1ページの読み出し）の時間を比較します。
+ページを順にたどった結果が元の結果と一致することも確認します。
+
+使用方法:
+    python benchmarks/task_result_store_benchmark.py
+    python benchmarks/task_result_store_benchmark.py --users 20000 --page-size 100 --repeat 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+from kombu.utils.json import dumps as kombu_dumps, loads as kombu_loads
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.task_result import TaskResult, TaskResultItem
+from app.services.task_results import TaskResultWriter, read_result_page
+from benchmarks.common import time_call
+
+
+def generate_results(users: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """execute_prediction と同じ形のユーザーごとの予測結果を生成"""
+    results = []
+    for i in range(users):
+        predicted = float(rng.normal(3000, 300))
+        results.append({
+            "user_id": f"user-{i:06d}",
+            "success": True,
+            "result": {
+                "predicted_time_seconds": predicted,
+                "confidence_interval": [predicted * 0.95, predicted * 1.05],
+                "confidence": float(rng.uniform(0.6, 0.95)),
+                "model_id": "active-model",
+                "features_used": {f"feature_{j:02d}": float(v) for j, v in enumerate(rng.normal(size=20))}
+            }
+        })
+    return results
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="バックグラウンドタスクの結果保存のベンチマーク")
+    parser.add_argument("--users", type=int, default=10000, help="ユーザー数 (デフォルト: 10000)")
+    parser.add_argument("--page-size", type=int, default=100, help="1ページの件数 (デフォルト: 100)")
+    parser.add_argument("--repeat", type=int, default=10, help="計測回数 (デフォルト: 10)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(42)
+    results = generate_results(args.users, rng)
+    summary = {"status": "completed", "total_users": args.users, "successful_predictions": args.users,
+               "failed_predictions": 0, "race_type": "10k", "distance": 10.0}
+
+    # 従来: 全ユーザーの結果をそのまま Celery の結果にする
+    legacy_blob = kombu_dumps({**summary, "results": results})
+    legacy_decode_ms = time_call(lambda: kombu_loads(legacy_blob), args.repeat)
+
+    # 現行: task_result_items に保存し、Celery の結果は集計と参照だけ
+    engine = create_engine("sqlite://")
+    TaskResult.__table__.create(engine)
+    TaskResultItem.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+
+    def store() -> Dict[str, Any]:
+        writer = TaskResultWriter(db, "benchmark-task", "batch_prediction_task").start()
+        for item in results:
+            writer.add(item["user_id"], item["success"], item["result"])
+        return writer.finish(summary)
+
+    store_ms = time_call(store, max(1, args.repeat // 5))
+    compact_blob = kombu_dumps(store())
+
+    # ページをたどった結果が元の結果と一致すること
+    restored, cursor = [], -1
+    while cursor is not None:
+        page = read_result_page(db, "benchmark-task", cursor=cursor, limit=args.page_size)
+        restored.extend({"user_id": item["user_id"], "success": item["success"], "result": item["payload"]}
+                        for item in page["items"])
+        cursor = page["next_cursor"]
+    assert restored == json.loads(json.dumps(results)), "ページングした結果が元の結果と一致しません"
+
+    last_cursor = args.users - args.page_size - 1
+    first_page_ms = time_call(lambda: read_result_page(db, "benchmark-task", limit=args.page_size), args.repeat)
+    last_page_ms = time_call(
+        lambda: read_result_page(db, "benchmark-task", cursor=last_cursor, limit=args.page_size), args.repeat
+    )
+
+    report = {
+        'users': args.users,
+        'page_size': args.page_size,
+        'legacy_result_bytes': len(legacy_blob),
+        'compact_result_bytes': len(compact_blob),
+        'legacy_decode_ms': legacy_decode_ms,
+        'store_ms': store_ms,
+        'first_page_ms': first_page_ms,
+        'last_page_ms': last_page_ms
+    }
+
+    print(f"{args.users} users, page size {args.page_size}")
+    print(f"  result backend payload: {len(legacy_blob):>12,} bytes -> {len(compact_blob):>8,} bytes")
+    print(f"  legacy full decode:     {legacy_decode_ms:10.2f} ms")
+    print(f"  store all items:        {store_ms:10.2f} ms")
+    print(f"  first page:             {first_page_ms:10.2f} ms")
+    print(f"  last page:              {last_page_ms:10.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+トレーニングデータ準備の変換処理と読み込みのベンチマーク
+
+元CSV（../deepresearchresult）の値を複製して行数を増やし、
+- 時間文字列の秒への変換・年齢・範囲形式の変換（従来の値ごとの関数 vs 重複を除いた値のベクトル化）
+- 処理済みデータの読み込み（CSV のパース vs 列指向ファイル .npz）
+の結果が一致することを確認したうえで、処理時間を比較します。
+
+使用方法:
+    python benchmarks/training_data_prep_benchmark.py
+    python benchmarks/training_data_prep_benchmark.py --rows 1000000 --repeat 3
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.training_data_store import load_columnar, save_columnar
+from benchmarks.common import time_call
+from scripts.prepare_ml_training_data import MLTrainingDataPreparer
+
+
+def legacy_convert_time(time_str):
+    """従来の時間文字列の変換（Series.apply で値ごとに呼ぶ）"""
+    if isinstance(time_str, str) and ':' in time_str:
+        parts = time_str.split(':')
+        if len(parts) == 3:
+            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+        elif len(parts) == 2:
+            return int(parts[0]) * 60 + int(parts[1])
+    return time_str
+
+
+def legacy_convert_age(age_str):
+    """従来の年齢の変換"""
+    if isinstance(age_str, str) and '-' in age_str:
+        parts = age_str.split('-')
+        if len(parts) == 2:
+            return (int(parts[0]) + int(parts[1])) / 2
+    elif isinstance(age_str, (int, float)):
+        return float(age_str)
+    return 30.0
+
+
+def legacy_convert_range(value):
+    """従来の範囲形式の変換"""
+    if isinstance(value, str) and '-' in value:
+        try:
+            parts = value.split('-')
+            if len(parts) == 2:
+                return (float(parts[0]) + float(parts[1])) / 2
+        except ValueError:
+            pass
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def sample_series(values, rows: int, rng: np.random.Generator) -> pd.Series:
+    """値を rows 件になるよう無作為に複製"""
+    values = np.asarray(values, dtype=object)
+    return pd.Series(values[rng.integers(0, len(values), rows)], dtype=object)
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="トレーニングデータ準備の変換処理と読み込みのベンチマーク")
+    parser.add_argument("--rows", type=int, default=200000, help="変換する行数 (デフォルト: 200000)")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数 (デフォルト: 5)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(42)
+    preparer = MLTrainingDataPreparer()
+    raw = preparer.load_all_data()
+
+    finish_times = raw['marathon']['FinishTime'].dropna().tolist() + ['45:30', '1:02:03', 'DNF']
+    ages = ['20-29', '30-39', '40-49', '25', 'unknown', 31, 42.0, np.nan]
+    ranges = raw['10000m']['Weekly_Mileage_km'].dropna().tolist() + ['-5', '1e-3', '12', 'n/a', '1-2-3', np.nan]
+
+    cases = {
+        'time_to_seconds': (
+            sample_series(finish_times, args.rows, rng),
+            lambda s: s.apply(legacy_convert_time),
+            preparer._convert_time_to_seconds
+        ),
+        'age_to_numeric': (
+            sample_series(ages, args.rows, rng),
+            lambda s: s.apply(legacy_convert_age),
+            preparer._convert_age_to_numeric
+        ),
+        'range_to_numeric': (
+            sample_series(ranges, args.rows, rng),
+            lambda s: s.apply(legacy_convert_range),
+            preparer._convert_range_to_numeric
+        ),
+    }
+
+    report = {'rows': args.rows, 'converters': {}}
+    print(f"{args.rows} rows")
+    for name, (series, legacy, vectorized) in cases.items():
+        expected = legacy(series).infer_objects()
+        actual = vectorized(series)
+        pd.testing.assert_series_equal(expected, actual, check_dtype=False)
+
+        legacy_ms = time_call(lambda: legacy(series), args.repeat)
+        vectorized_ms = time_call(lambda: vectorized(series), args.repeat)
+        report['converters'][name] = {'legacy_ms': legacy_ms, 'vectorized_ms': vectorized_ms}
+        print(f"  {name:18s} legacy {legacy_ms:10.2f} ms  vectorized {vectorized_ms:8.2f} ms  "
+              f"({legacy_ms / vectorized_ms:.1f}x)")
+
+    # 処理済みデータの読み込み（同じ種目のデータを複製して rows 行にする）
+    processed = preparer.clean_data(preparer.standardize_features(raw['marathon'], 'marathon'))
+    frame = processed.iloc[rng.integers(0, len(processed), args.rows)].reset_index(drop=True)
+    workdir = Path(tempfile.mkdtemp(prefix="training_data_benchmark_"))
+    csv_file = workdir / "marathon_processed.csv"
+    npz_file = workdir / "marathon_processed.npz"
+    frame.to_csv(csv_file, index=False)
+    save_columnar(frame, npz_file)
+    pd.testing.assert_frame_equal(pd.read_csv(csv_file), load_columnar(npz_file), check_exact=False)
+
+    csv_ms = time_call(lambda: pd.read_csv(csv_file), args.repeat)
+    npz_ms = time_call(lambda: load_columnar(npz_file), args.repeat)
+    report['load'] = {'columns': len(frame.columns), 'csv_ms': csv_ms, 'columnar_ms': npz_ms}
+    print(f"  load {len(frame.columns)} columns   csv    {csv_ms:10.2f} ms  columnar   {npz_ms:8.2f} ms  "
+          f"({csv_ms / npz_ms:.1f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+ワーカープロセスのモデルプリロードのベンチマーク
+
+一時ディレクトリに種目ごとのモデル・スケーラーとアクティブなモデルを保存し、
+バッチ予測タスク（アクティブなモデルの取得 + 全種目 x ユーザー数の予測）の
+- 従来の読み込み（予測のたびにモデル・スケーラーをファイルから読み込む）
+- プリロードなしの最初のタスク（プロセス内のキャッシュが空の状態）
+- worker_process_init 相当のプリロード後の最初のタスク
+- 定常状態のタスク
+のレイテンシを比較します。
+
+使用方法:
+    python benchmarks/worker_model_preload_benchmark.py
+    python benchmarks/worker_model_preload_benchmark.py --trees 200 --users 50 --repeat 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.model_artifacts import load_model_artifact, save_model_artifact
+from app.ml.model_cache import warm_model_cache
+from app.models.ai import AIModel
+from app.schemas.prediction import TargetEventEnum
+from app.services.ml_model_manager import MLModelManager
+from app.services.model_training_service import ModelTrainingService
+from benchmarks.common import time_call
+
+EVENTS = [TargetEventEnum.five_k, TargetEventEnum.ten_k, TargetEventEnum.half_marathon, TargetEventEnum.marathon]
+FEATURE_NAMES = [f"feature_{i:02d}" for i in range(16)]
+
+
+def build_artifacts(trees: int, samples: int, rng: np.random.Generator) -> None:
+    """カレントディレクトリの models/ と scalers/ に種目ごとのモデル・スケーラーを保存"""
+    for event in EVENTS:
+        X = rng.normal(size=(samples, len(FEATURE_NAMES)))
+        y = X @ rng.normal(size=len(FEATURE_NAMES)) * 60 + 3600 + rng.normal(scale=30, size=samples)
+        scaler = StandardScaler().fit(X)
+        model = RandomForestRegressor(n_estimators=trees, random_state=0, n_jobs=1).fit(scaler.transform(X), y)
+        save_model_artifact(model, Path("models") / f"{event.value}_model.joblib", metadata={'event': event.value})
+        save_model_artifact(scaler, Path("scalers") / f"{event.value}_scaler.joblib", metadata={'event': event.value})
+
+
+def legacy_predict(features: Dict[str, float], event: TargetEventEnum) -> float:
+    """従来の load_trained_model と同じく、予測のたびにファイルから読み込んで予測"""
+    model = load_model_artifact(Path("models") / f"{event.value}_model.joblib")
+    scaler = load_model_artifact(Path("scalers") / f"{event.value}_scaler.joblib")
+    values = np.array([features.get(name, 0) for name in sorted(features.keys())]).reshape(1, -1)
+    return float(model.predict(scaler.transform(values))[0])
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="ワーカープロセスのモデルプリロードのベンチマーク")
+    parser.add_argument("--trees", type=int, default=100, help="ランダムフォレストの木の数 (デフォルト: 100)")
+    parser.add_argument("--samples", type=int, default=2000, help="種目ごとの学習サンプル数 (デフォルト: 2000)")
+    parser.add_argument("--users", type=int, default=5, help="1タスクで予測するユーザー数 (デフォルト: 5)")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数 (デフォルト: 5)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    output = os.path.abspath(args.output) if args.output else None
+    rng = np.random.default_rng(42)
+    workdir = tempfile.mkdtemp(prefix="preload_benchmark_")
+    os.chdir(workdir)
+    build_artifacts(args.trees, args.samples, rng)
+
+    # アクティブなモデル（AIModel）だけを持つデータベース
+    engine = create_engine("sqlite://")
+    AIModel.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(AIModel(id="active-model", name="5k_predictor", version="1.0", algorithm="RandomForest",
+                   is_active=True, model_path=str(Path("models") / "5k_model.joblib")))
+    db.commit()
+
+    manager = MLModelManager(db)
+    service = ModelTrainingService(db)
+    users: List[Dict[str, float]] = [
+        dict(zip(FEATURE_NAMES, rng.normal(size=len(FEATURE_NAMES)).tolist())) for _ in range(args.users)
+    ]
+
+    def task() -> List[Any]:
+        manager.load_model("active-model")
+        return [service.predict_with_trained_model(features, event)[0] for event in EVENTS for features in users]
+
+    def legacy_task() -> List[Any]:
+        load_model_artifact(Path("models") / "5k_model.joblib")
+        return [legacy_predict(features, event) for event in EVENTS for features in users]
+
+    # 予測結果の一致
+    warm_model_cache.clear()
+    assert np.allclose(task(), legacy_task())
+
+    def cold_first_task():
+        warm_model_cache.clear()
+        task()
+
+    def preload():
+        warm_model_cache.clear()
+        warm_model_cache.preload(db)
+
+    def preloaded_first_task_ms() -> float:
+        preload()
+        return time_call(task, 1)
+
+    legacy_ms = time_call(legacy_task, args.repeat)
+    cold_ms = time_call(cold_first_task, args.repeat)
+    preload_ms = time_call(preload, args.repeat)
+    preloaded_ms = float(np.median([preloaded_first_task_ms() for _ in range(args.repeat)]))
+    steady_ms = time_call(task, args.repeat)
+
+    report = {
+        'events': [event.value for event in EVENTS],
+        'predictions_per_task': len(EVENTS) * args.users,
+        'legacy_task_ms': legacy_ms,
+        'cold_first_task_ms': cold_ms,
+        'preload_ms': preload_ms,
+        'preloaded_first_task_ms': preloaded_ms,
+        'steady_state_task_ms': steady_ms,
+        'cache': warm_model_cache.stats()
+    }
+
+    print(f"{report['predictions_per_task']} predictions per task ({len(EVENTS)} events, {args.users} users)")
+    print(f"  legacy (load per prediction):  {legacy_ms:10.2f} ms")
+    print(f"  first task without preload:    {cold_ms:10.2f} ms")
+    print(f"  worker preload (once):         {preload_ms:10.2f} ms")
+    print(f"  first task after preload:      {preloaded_ms:10.2f} ms")
+    print(f"  steady-state task:             {steady_ms:10.2f} ms")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+ワークロードエンジンの等価性検証・レイテンシベンチマーク
+
+10年分の日次負荷（休養日・同日2回練習を含む）を生成し、WorkloadEngine のベクトル演算と
+1日ずつ進める素朴なループ実装の急性・慢性負荷、ACWR、モノトニー、ストレイン、連続練習日数が
+一致することを確認したうえで、1人分と複数選手分（選手数×日数の2次元配列）の計算時間を比較します。
+
+使用方法:
+    python benchmarks/workload_engine_benchmark.py
+    python benchmarks/workload_engine_benchmark.py --years 10 --athletes 1000 --repeat 20
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.health.workload_engine import (
+    MAX_MONOTONY,
+    WorkloadEngine,
+    build_daily_load_series,
+    ewma_alpha,
+)
+from benchmarks.common import time_call
+
+
+def generate_workouts(days: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """休養日と2部練を含む練習データを生成"""
+    start = date.today() - timedelta(days=days - 1)
+    workouts = []
+    for offset in range(days):
+        if rng.random() < 0.3:
+            continue
+        for _ in range(2 if rng.random() < 0.1 else 1):
+            workouts.append({
+                'date': (start + timedelta(days=offset)).isoformat(),
+                'distance': float(rng.gamma(4.0, 2.5)),
+                'intensity': float(rng.uniform(0.3, 0.9))
+            })
+    return workouts
+
+
+def naive_workload(loads: List[float], engine: WorkloadEngine) -> Dict[str, List[float]]:
+    """1日ずつ進めるループ実装（検証用）"""
+    acute_alpha = ewma_alpha(engine.acute_days)
+    chronic_alpha = ewma_alpha(engine.chronic_days)
+    window = engine.monotony_days
+
+    acute = chronic = 0.0
+    streak = 0
+    result = {'acute_load': [], 'chronic_load': [], 'acwr': [], 'monotony': [], 'strain': [], 'streak': []}
+    for day, load in enumerate(loads):
+        acute = acute_alpha * load + (1 - acute_alpha) * acute
+        chronic = chronic_alpha * load + (1 - chronic_alpha) * chronic
+        if day >= engine.chronic_days - 1 and chronic > 0:
+            acwr = acute / chronic
+        else:
+            acwr = math.nan
+
+        week = [0.0] * max(0, window - 1 - day) + loads[max(0, day - window + 1):day + 1]
+        mean = sum(week) / window
+        std = math.sqrt(sum((x - mean) ** 2 for x in week) / window)
+        if std > 1e-9:
+            monotony = min(mean / std, MAX_MONOTONY)
+        else:
+            monotony = MAX_MONOTONY if mean > 0 else 0.0
+
+        streak = streak + 1 if load > 0 else 0
+
+        result['acute_load'].append(acute)
+        result['chronic_load'].append(chronic)
+        result['acwr'].append(acwr)
+        result['monotony'].append(monotony)
+        result['strain'].append(sum(week) * monotony)
+        result['streak'].append(streak)
+    return result
+
+
+def verify(loads: np.ndarray, engine: WorkloadEngine) -> Dict[str, float]:
+    """ベクトル実装とループ実装の最大差分を確認"""
+    metrics = engine.compute(loads)
+    expected = naive_workload(loads.tolist(), engine)
+
+    max_diffs = {}
+    for name, values in expected.items():
+        values = np.asarray(values, dtype=np.float64)
+        actual = getattr(metrics, name).astype(np.float64)
+        if not np.allclose(actual, values, rtol=1e-9, atol=1e-9, equal_nan=True):
+            raise AssertionError(f"{name}: vectorized result differs from loop implementation")
+        both = ~np.isnan(values)
+        max_diffs[name] = float(np.max(np.abs(actual[both] - values[both]))) if both.any() else 0.0
+    return max_diffs
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="ワークロードエンジンの等価性検証・レイテンシベンチマーク")
+    parser.add_argument("--years", type=int, default=10, help="日次データの年数 (デフォルト: 10)")
+    parser.add_argument("--athletes", type=int, default=1000, help="2次元計算の選手数 (デフォルト: 1000)")
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数 (デフォルト: 20)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    engine = WorkloadEngine()
+    days = args.years * 365
+
+    workouts = generate_workouts(days, rng)
+    series = build_daily_load_series(workouts)
+    max_diffs = verify(series.loads, engine)
+
+    loads = series.loads.tolist()
+    loop_ms = time_call(lambda: naive_workload(loads, engine), max(3, args.repeat // 5))
+    densify_ms = time_call(lambda: build_daily_load_series(workouts), args.repeat)
+    vector_ms = time_call(lambda: engine.compute_series(series), args.repeat)
+
+    roster = rng.gamma(4.0, 2.5, (args.athletes, days)) * (rng.random((args.athletes, days)) > 0.3)
+    roster_ms = time_call(lambda: engine.compute(roster), max(3, args.repeat // 5))
+
+    report = {
+        'days': days,
+        'workouts': len(workouts),
+        'max_abs_diff': max_diffs,
+        'single': {
+            'loop_ms': loop_ms,
+            'densify_ms': densify_ms,
+            'vectorized_ms': vector_ms,
+            'speedup': loop_ms / vector_ms if vector_ms > 0 else None
+        },
+        'roster': {
+            'athletes': args.athletes,
+            'vectorized_ms': roster_ms,
+            'per_athlete_ms': roster_ms / args.athletes
+        }
+    }
+
+    print(f"{days} days, {len(workouts)} workouts (max abs diff {max(max_diffs.values()):.2e})")
+    print(f"  loop:        {loop_ms:10.3f} ms")
+    print(f"  densify:     {densify_ms:10.3f} ms")
+    print(f"  vectorized:  {vector_ms:10.3f} ms ({report['single']['speedup']:.1f}x)")
+    print(f"  {args.athletes} athletes: {roster_ms:10.3f} ms ({report['roster']['per_athlete_ms']:.4f} ms/athlete)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
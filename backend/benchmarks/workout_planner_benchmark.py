@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+期分けプラン生成のキャッシュ・一括生成の等価性検証・レイテンシベンチマーク
+
+選手ごとの体力レベルと候補レース日の組み合わせについて、
+- キャッシュを使う generate_periodized_plan が週ごとに generate_weekly_plan を呼ぶ従来の生成と一致すること
+- generate_periodized_plans（一括生成）が1件ずつの生成と一致すること
+を確認したうえで、キャッシュなし・キャッシュあり・一括生成の計算時間を比較します。
+従来の生成には、キャッシュキーと同じく丸めた平均ペース・週間距離・頻度を渡します。
+
+使用方法:
+    python benchmarks/workout_planner_benchmark.py
+    python benchmarks/workout_planner_benchmark.py --athletes 200 --race-dates 12 --repeat 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.coaching.workout_planner import (
+    DISTANCE_BUCKET_KM,
+    PACE_BUCKET_SECONDS,
+    TrainingPlan,
+    WorkoutPlanner,
+    periodized_plan_cache,
+)
+from benchmarks.common import time_call
+
+RACES = ['5k', '10k', 'half_marathon', 'marathon']
+EXPERIENCE_LEVELS = ['beginner', 'intermediate', 'advanced']
+
+
+def generate_requests(athletes: int, race_dates: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """選手ごとに候補レース日の数だけリクエストを生成"""
+    current_date = datetime(2026, 1, 5, 9, 0)
+    requests = []
+    for athlete in range(athletes):
+        fitness = {
+            'avg_pace': float(rng.uniform(240, 420)),
+            'experience_level': EXPERIENCE_LEVELS[int(rng.integers(len(EXPERIENCE_LEVELS)))]
+        }
+        target_race = RACES[int(rng.integers(len(RACES)))]
+        weekly_distance = float(rng.uniform(15, 90))
+        frequency = float(rng.uniform(2.5, 6.5))
+        for weeks in rng.choice(np.arange(4, 30), size=race_dates, replace=False):
+            requests.append({
+                'user_id': athlete,
+                'current_fitness': fitness,
+                'target_race': target_race,
+                'race_date': current_date + timedelta(weeks=int(weeks), days=int(rng.integers(7))),
+                'current_date': current_date,
+                'current_weekly_distance': weekly_distance,
+                'training_frequency': frequency
+            })
+    return requests
+
+
+def legacy_plan(planner: WorkoutPlanner, request: Dict[str, Any]) -> TrainingPlan:
+    """週ごとに generate_weekly_plan を呼ぶ従来の生成（丸めた入力を使う）"""
+    fitness = dict(request['current_fitness'])
+    fitness['avg_pace'] = round(fitness['avg_pace'] / PACE_BUCKET_SECONDS) * PACE_BUCKET_SECONDS
+    weekly_distance = round(request['current_weekly_distance'] / DISTANCE_BUCKET_KM) * DISTANCE_BUCKET_KM
+    frequency = max(1, int(round(request['training_frequency'])))
+    race_date, current_date = request['race_date'], request['current_date']
+    target_race = request['target_race']
+
+    weeks_remaining = planner._calculate_weeks_remaining(race_date, current_date)
+    phase_weeks = planner._calculate_phase_weeks(weeks_remaining)
+    peak_distance = planner._calculate_peak_distance(weekly_distance, target_race, fitness)
+
+    weekly_plans = []
+    distance = weekly_distance
+    for week_num in range(weeks_remaining):
+        phase = planner._get_phase_for_week(week_num, phase_weeks).value
+        if phase == 'base':
+            distance = min(distance * 1.1, peak_distance * 0.7)
+        elif phase == 'build':
+            distance = min(distance * 1.05, peak_distance)
+        elif phase == 'peak':
+            distance = peak_distance
+        else:
+            distance = peak_distance * 0.6
+        weekly_plans.append(planner.generate_weekly_plan(
+            request['user_id'], fitness, target_race, race_date,
+            current_date + timedelta(weeks=week_num), distance, frequency
+        ))
+
+    return TrainingPlan(
+        user_id=request['user_id'],
+        target_race=target_race,
+        race_date=race_date,
+        current_date=current_date,
+        weeks_remaining=weeks_remaining,
+        weekly_plans=weekly_plans,
+        total_distance=sum(plan.total_distance for plan in weekly_plans),
+        peak_distance=peak_distance
+    )
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="期分けプラン生成のキャッシュ・一括生成のベンチマーク")
+    parser.add_argument("--athletes", type=int, default=200, help="選手数 (デフォルト: 200)")
+    parser.add_argument("--race-dates", type=int, default=12, help="選手ごとの候補レース日数 (デフォルト: 12)")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数 (デフォルト: 5)")
+    parser.add_argument("--output", type=str, default=None, help="JSONレポートの出力先")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(42)
+    planner = WorkoutPlanner()
+    requests = generate_requests(args.athletes, args.race_dates, rng)
+    periodized_plan_cache.max_entries = max(periodized_plan_cache.max_entries, len(requests))
+
+    # 等価性（キャッシュなし・キャッシュあり・一括生成）
+    periodized_plan_cache.clear()
+    expected = [asdict(legacy_plan(planner, request)) for request in requests]
+    cold = [asdict(planner.generate_periodized_plan(**request)) for request in requests]
+    warm = [asdict(planner.generate_periodized_plan(**request)) for request in requests]
+    periodized_plan_cache.clear()
+    batch = [asdict(result.plan) for result in planner.generate_periodized_plans(requests)]
+    assert cold == expected
+    assert warm == expected
+    assert batch == expected
+
+    def run_cold():
+        periodized_plan_cache.clear()
+        for request in requests:
+            planner.generate_periodized_plan(**request)
+
+    def run_batch_cold():
+        periodized_plan_cache.clear()
+        planner.generate_periodized_plans(requests)
+
+    legacy_ms = time_call(lambda: [legacy_plan(planner, request) for request in requests], args.repeat)
+    cold_ms = time_call(run_cold, args.repeat)
+    batch_cold_ms = time_call(run_batch_cold, args.repeat)
+    warm_ms = time_call(lambda: [planner.generate_periodized_plan(**request) for request in requests], args.repeat)
+
+    report = {
+        'requests': len(requests),
+        'weeks': sum(plan['weeks_remaining'] for plan in expected),
+        'legacy_ms': legacy_ms,
+        'cold_ms': cold_ms,
+        'batch_cold_ms': batch_cold_ms,
+        'cached_ms': warm_ms,
+        'cache': periodized_plan_cache.stats()
+    }
+
+    print(f"{len(requests)} plans, {report['weeks']} weeks (identical to weekly loop)")
+    print(f"  weekly loop:        {legacy_ms:10.3f} ms")
+    print(f"  memoized (cold):    {cold_ms:10.3f} ms ({legacy_ms / cold_ms:.1f}x)")
+    print(f"  batch (cold):       {batch_cold_ms:10.3f} ms ({legacy_ms / batch_cold_ms:.1f}x)")
+    print(f"  memoized (cached):  {warm_ms:10.3f} ms ({legacy_ms / warm_ms:.1f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,21 +9,141 @@
 - 練習量指標（週間距離/体重、月間距離密度）
 - 年齢・性別・経験年数の交互作用項
 - VO2max推定値との相関特徴量
+
+出力:
+- ml_training_data/{event}_processed.csv
+- ml_training_data/{event}_processed.npz（列指向バイナリ、学習時は CSV をパースせずに読み込む）
+- ml_training_data/source_manifest.json（元CSVのハッシュ、インクリメンタルモードで使用）
+
+使用方法:
+    python scripts/prepare_ml_training_data.py
+    python scripts/prepare_ml_training_data.py --incremental  # 内容が変わった元CSVだけを再処理
 """
 
 import pandas as pd
 import numpy as np
+import argparse
+import hashlib
 import os
+import sys
 import logging
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from pathlib import Path
 import json
 from datetime import datetime
 
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml.training_data_store import columnar_path, load_columnar, save_columnar
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 特徴量の定義を変えたら上げる（インクリメンタルモードでも全種目を再処理する）
+PREPARER_VERSION = 2
+MANIFEST_FILE = "source_manifest.json"
+
+# 特徴量名と、元CSVでの列名の候補（先に見つかった列を使う）
+COLUMN_ALIASES = {
+    'age': ['Age_years', 'Age'],
+    'vo2max': ['VO2max_est', 'VO2max_ml_kg_min'],
+    'training_frequency': ['Training_Freq_per_week', 'Training_Frequency_days_per_week', 'Training_Frequency_days_week'],
+    'running_history': ['Running_History_years'],
+    'strength_frequency': ['Strength_Freq_per_week', 'Strength_Training_freq_per_week', 'Strength_Training_freq_week'],
+    'resting_hr': ['Resting_HR_bpm', 'RestingHeartRate_bpm', 'Resting_Heart_Rate_bpm'],
+    'weekly_distance': ['Weekly_KM', 'Weekly_Mileage_km', 'Weekly_Distance_km'],
+    'monthly_distance': ['Monthly_KM', 'Monthly_Mileage_km', 'Monthly_Distance_km'],
+    'tempo_pace': ['Tempo_Run_Pace_sec_per_km', 'Tempo_Run_10k_pace_s_per_km', 'Tempo_20_30km_pace_sec_km'],
+    'tempo_distance': ['Tempo_Run_Dist_km'],
+    'long_run_distance': ['Long_Run_Dist_km', 'Long_Run_km', 'Long_Run_Max_Dist_km'],
+    'long_run_pace': ['Long_Run_Pace_sec_per_km', 'Long_Run_pace_s_per_km', 'Long_Run_pace_sec_km'],
+}
+
+
+def file_hash(path: Path) -> str:
+    """ファイル内容の SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def convert_unique_values(series: pd.Series, convert) -> pd.Series:
+    """
+    値の種類ごとに1回だけ変換して元の並びに戻す
+    
+    年齢帯・距離の範囲・タイムなどの列は同じ値が多いため、pd.factorize で重複を除いた値だけを
+    ベクトル化した変換に渡す。欠損値は NaN のまま返す。
+    
+    Args:
+        series: 変換する列
+        convert: 重複を除いた値の Series を受け取り、同じ長さの Series を返す変換
+        
+    Returns:
+        変換後の列
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return convert(series)
+    
+    converted = convert(pd.Series(uniques)).reset_index(drop=True)
+    result = converted.iloc[codes]
+    result.index = series.index
+    missing = codes < 0
+    return result.where(~missing) if missing.any() else result
+
+
+def time_strings_to_seconds(values: pd.Series) -> pd.Series:
+    """時間文字列（HH:MM:SS / MM:SS）を秒に変換（それ以外の値はそのまま）"""
+    colons = values.str.count(':')
+    parts = values.str.split(':', expand=True)
+    if parts.shape[1] < 2:
+        return values
+    
+    parts = parts.iloc[:, :3].apply(pd.to_numeric, errors='coerce')
+    hms = (parts[0] * 3600 + parts[1] * 60 + parts[2]) if parts.shape[1] == 3 else np.nan
+    seconds = pd.Series(
+        np.where(colons == 2, hms, np.where(colons == 1, parts[0] * 60 + parts[1], np.nan)),
+        index=values.index
+    )
+    converted = seconds.notna()
+    
+    result = values.astype(object)
+    result[converted] = seconds[converted].astype(np.int64)
+    return result.infer_objects()
+
+
+def range_strings_to_numeric(values: pd.Series) -> pd.Series:
+    """範囲形式の文字列（'170-210'）を中央値に、それ以外を数値に変換（変換できない文字列は0）"""
+    is_str = values.str.len().notna()
+    parts = values.str.split('-')
+    low = pd.to_numeric(parts.str[0], errors='coerce')
+    high = pd.to_numeric(parts.str[1], errors='coerce')
+    is_range = is_str & (parts.str.len() == 2) & low.notna() & high.notna()
+    
+    numbers = pd.to_numeric(values.where(~is_range), errors='coerce')
+    numbers = numbers.where(~is_range, (low + high) / 2)
+    return numbers.mask(is_str & numbers.isna(), 0.0).astype(float)
+
+
+def age_strings_to_numeric(values: pd.Series) -> pd.Series:
+    """年齢帯（'20-29'）を中央値に変換（範囲形式以外の文字列は30、数値はそのまま）"""
+    is_str = values.str.len().notna()
+    parts = values.str.split('-')
+    low = pd.to_numeric(parts.str[0], errors='coerce')
+    high = pd.to_numeric(parts.str[1], errors='coerce')
+    is_range = is_str & (parts.str.len() == 2) & low.notna() & high.notna()
+    
+    numbers = pd.to_numeric(values.where(~is_str), errors='coerce')
+    return pd.Series(
+        np.where(is_range, (low + high) / 2, np.where(is_str, 30.0, numbers)),
+        index=values.index
+    )
+
+
 class MLTrainingDataPreparer:
     """機械学習用トレーニングデータ準備クラス"""
     
@@ -36,7 +156,10 @@ class MLTrainingDataPreparer:
         """
         self.data_dir = Path(data_dir)
         self.processed_data = {}
-        self.feature_mappings = {}
+        self.feature_mappings = {}  # 種目別の {特徴量名: 元CSVの列名}
+        self.source_hashes: Dict[str, str] = {}
+        self.updated_events: Optional[List[str]] = None  # 今回処理した種目（インクリメンタルモードで変更がなかった種目は含まない）
+        self._column_cache: Dict[Tuple[str, ...], Dict[str, str]] = {}
         
         # 種目別の距離設定
         self.event_distances = {
@@ -53,27 +176,42 @@ class MLTrainingDataPreparer:
         
         logger.info(f"MLTrainingDataPreparer initialized with data_dir: {self.data_dir}")
     
-    def load_all_data(self) -> Dict[str, pd.DataFrame]:
+    def source_files(self) -> Dict[str, Path]:
         """
-        全種目のCSVデータを読み込み
+        種目別の元CSVファイル
         
         Returns:
-            種目別のDataFrame辞書
+            種目名とファイルパスの辞書
         """
-        data = {}
-        
         # プロジェクトルートから相対パスでデータディレクトリを指定
         data_path = Path("../deepresearchresult")
         
         if not data_path.exists():
             logger.error(f"Data directory {data_path} does not exist")
-            return data
+            return {}
+        
+        return {
+            csv_file.stem.replace("_results", ""): csv_file
+            for csv_file in sorted(data_path.glob("*.csv"))
+            if not csv_file.name.endswith(":Zone.Identifier")
+        }
+    
+    def load_all_data(self, events: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        全種目のCSVデータを読み込み
+        
+        Args:
+            events: 読み込む種目（省略時は全種目）
+            
+        Returns:
+            種目別のDataFrame辞書
+        """
+        data = {}
         
-        for csv_file in data_path.glob("*.csv"):
-            if csv_file.name.endswith(":Zone.Identifier"):
+        for event_name, csv_file in self.source_files().items():
+            if events is not None and event_name not in events:
                 continue
-                
-            event_name = csv_file.stem.replace("_results", "")
+            
             logger.info(f"Loading data for {event_name} from {csv_file}")
             
             try:
@@ -97,6 +235,7 @@ class MLTrainingDataPreparer:
             標準化されたDataFrame
         """
         standardized_df = pd.DataFrame()
+        self.feature_mappings[event_name] = self._resolve_columns(df.columns)
         
         # 共通特徴量の抽出
         common_features = self._extract_common_features(df, event_name)
@@ -113,16 +252,36 @@ class MLTrainingDataPreparer:
         logger.info(f"Standardized features for {event_name}: {len(standardized_df.columns)} features")
         return standardized_df
     
+    def _resolve_columns(self, columns) -> Dict[str, str]:
+        """
+        特徴量名ごとに使用する元CSVの列名を決定（同じ列構成の結果は再利用）
+        
+        Args:
+            columns: 元CSVの列名
+            
+        Returns:
+            {特徴量名: 列名}（候補が見つからない特徴量は含まない）
+        """
+        key = tuple(columns)
+        resolved = self._column_cache.get(key)
+        if resolved is None:
+            available = set(key)
+            resolved = {}
+            for feature, candidates in COLUMN_ALIASES.items():
+                column = next((col for col in candidates if col in available), None)
+                if column is not None:
+                    resolved[feature] = column
+            self._column_cache[key] = resolved
+        return resolved
+    
     def _extract_common_features(self, df: pd.DataFrame, event_name: str) -> pd.DataFrame:
         """共通特徴量の抽出"""
+        resolved = self._resolve_columns(df.columns)
         features = pd.DataFrame()
         
         # 基本情報 - 年齢
-        age_cols = ['Age_years', 'Age']
-        for col in age_cols:
-            if col in df.columns:
-                features['age'] = df[col]
-                break
+        if 'age' in resolved:
+            features['age'] = df[resolved['age']]
         
         # 性別（数値化）
         if 'Gender' in df.columns:
@@ -143,97 +302,25 @@ class MLTrainingDataPreparer:
         if 'Competition_Level' in df.columns:
             features['competition_level'] = df['Competition_Level'].map(level_mapping).fillna(1)
         
-        # VO2max
-        vo2max_cols = ['VO2max_est', 'VO2max_ml_kg_min']
-        for col in vo2max_cols:
-            if col in df.columns:
-                features['vo2max'] = df[col]
-                break
-        
-        # トレーニング頻度
-        freq_cols = ['Training_Freq_per_week', 'Training_Frequency_days_per_week', 'Training_Frequency_days_week']
-        for col in freq_cols:
-            if col in df.columns:
-                features['training_frequency'] = df[col]
-                break
-        
-        # ランニング歴
-        history_cols = ['Running_History_years', 'Running_History_years']
-        for col in history_cols:
-            if col in df.columns:
-                features['running_history'] = df[col]
-                break
-        
-        # 筋力トレーニング頻度
-        strength_cols = ['Strength_Freq_per_week', 'Strength_Training_freq_per_week', 'Strength_Training_freq_week']
-        for col in strength_cols:
-            if col in df.columns:
-                features['strength_frequency'] = df[col]
-                break
-        
-        # 安静時心拍数
-        hr_cols = ['Resting_HR_bpm', 'RestingHeartRate_bpm', 'Resting_Heart_Rate_bpm']
-        for col in hr_cols:
-            if col in df.columns:
-                features['resting_hr'] = df[col]
-                break
+        # VO2max・トレーニング頻度・ランニング歴・筋力トレーニング頻度・安静時心拍数
+        for feature in ['vo2max', 'training_frequency', 'running_history', 'strength_frequency', 'resting_hr']:
+            if feature in resolved:
+                features[feature] = df[resolved[feature]]
         
         return features
     
     def _extract_event_specific_features(self, df: pd.DataFrame, event_name: str) -> pd.DataFrame:
         """種目固有の特徴量抽出"""
+        resolved = self._resolve_columns(df.columns)
         features = pd.DataFrame()
         
-        # 週間・月間距離
-        weekly_cols = ['Weekly_KM', 'Weekly_Mileage_km', 'Weekly_Distance_km']
-        monthly_cols = ['Monthly_KM', 'Monthly_Mileage_km', 'Monthly_Distance_km']
-        
-        for col in weekly_cols:
-            if col in df.columns:
-                features['weekly_distance'] = df[col]
-                break
-        
-        for col in monthly_cols:
-            if col in df.columns:
-                features['monthly_distance'] = df[col]
-                break
-        
-        # テンポ走関連
-        tempo_cols = [
-            'Tempo_Run_Pace_sec_per_km', 'Tempo_Run_10k_pace_s_per_km',
-            'Tempo_20_30km_pace_sec_km'
-        ]
-        tempo_dist_cols = [
-            'Tempo_Run_Dist_km'
-        ]
-        
-        for col in tempo_cols:
-            if col in df.columns:
-                features['tempo_pace'] = df[col]
-                break
-        
-        for col in tempo_dist_cols:
-            if col in df.columns:
-                features['tempo_distance'] = df[col]
-                break
-        
-        # ロング走関連
-        long_run_cols = [
-            'Long_Run_Dist_km', 'Long_Run_km', 'Long_Run_Max_Dist_km'
-        ]
-        long_pace_cols = [
-            'Long_Run_Pace_sec_per_km', 'Long_Run_pace_s_per_km', 'Long_Run_pace_sec_km'
-        ]
-        
-        for col in long_run_cols:
-            if col in df.columns:
-                features['long_run_distance'] = df[col]
-                break
-        
-        for col in long_pace_cols:
-            if col in df.columns:
-                features['long_run_pace'] = df[col]
-                break
+        # 週間・月間距離、テンポ走関連、ロング走関連
+        for feature in [
+            'weekly_distance', 'monthly_distance', 'tempo_pace', 'tempo_distance',
+            'long_run_distance', 'long_run_pace'
+        ]:
+            if feature in resolved:
+                features[feature] = df[resolved[feature]]
         
         # インターバル関連（種目に応じて）
         self._extract_interval_features(df, features, event_name)
@@ -331,16 +418,9 @@ class MLTrainingDataPreparer:
     
     def _convert_time_to_seconds(self, time_series: pd.Series) -> pd.Series:
         """時間文字列を秒に変換"""
-        def convert_time(time_str):
-            if isinstance(time_str, str) and ':' in time_str:
-                parts = time_str.split(':')
-                if len(parts) == 3:  # HH:MM:SS
-                    return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-                elif len(parts) == 2:  # MM:SS
-                    return int(parts[0]) * 60 + int(parts[1])
-            return time_str
-        
-        return time_series.apply(convert_time)
+        if not pd.api.types.is_string_dtype(time_series.dtype):
+            return time_series
+        return convert_unique_values(time_series, time_strings_to_seconds)
     
     def _estimate_vdot(self, features: pd.DataFrame) -> pd.Series:
         """VDOT推定（簡易版）"""
@@ -479,12 +559,12 @@ class MLTrainingDataPreparer:
     def _convert_string_columns_to_numeric(self, df: pd.DataFrame) -> pd.DataFrame:
         """文字列列を数値に変換"""
         for col in df.columns:
-            if df[col].dtype == 'object':
+            if pd.api.types.is_string_dtype(df[col].dtype):
                 # 文字列データを数値に変換を試行
                 try:
                     # 範囲形式（'170-210'）の処理
-                    if df[col].str.contains('-', na=False).any():
-                        df[col] = df[col].apply(self._convert_range_to_numeric)
+                    if df[col].str.contains('-', na=False, regex=False).any():
+                        df[col] = self._convert_range_to_numeric(df[col])
                     else:
                         df[col] = pd.to_numeric(df[col], errors='coerce')
                 except Exception as e:
@@ -494,45 +574,55 @@ class MLTrainingDataPreparer:
         
         return df
     
-    def _convert_range_to_numeric(self, value):
+    def _convert_range_to_numeric(self, series: pd.Series) -> pd.Series:
         """範囲形式の文字列を数値に変換"""
-        if isinstance(value, str) and '-' in value:
-            try:
-                parts = value.split('-')
-                if len(parts) == 2:
-                    return (float(parts[0]) + float(parts[1])) / 2
-            except ValueError:
-                pass
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return 0.0
+        return convert_unique_values(series, range_strings_to_numeric)
     
     def _convert_age_to_numeric(self, age_series: pd.Series) -> pd.Series:
         """年齢文字列を数値に変換"""
-        def convert_age(age_str):
-            if isinstance(age_str, str) and '-' in age_str:
-                # '20-29' -> 25 (中央値)
-                parts = age_str.split('-')
-                if len(parts) == 2:
-                    return (int(parts[0]) + int(parts[1])) / 2
-            elif isinstance(age_str, (int, float)):
-                return float(age_str)
-            return 30.0  # デフォルト値
-        
-        return age_series.apply(convert_age)
-    
-    def prepare_all_data(self) -> Dict[str, pd.DataFrame]:
+        if not pd.api.types.is_string_dtype(age_series.dtype):
+            return age_series.astype(float)
+        return convert_unique_values(age_series, age_strings_to_numeric)
+    
+    def prepare_all_data(self, incremental: bool = False, output_dir: str = "ml_training_data") -> Dict[str, pd.DataFrame]:
         """
         全種目のデータを準備
         
+        インクリメンタルモードでは、元CSVのハッシュが前回の出力時（source_manifest.json）と同じで
+        出力ファイルが揃っている種目は再処理せず、列指向ファイルから読み込む。
+        
+        Args:
+            incremental: 内容が変わった元CSVの種目だけを処理するか
+            output_dir: 前回の出力ディレクトリ（インクリメンタルモードで参照）
+            
         Returns:
             種目別の準備済みDataFrame辞書
         """
         logger.info("Starting data preparation for all events")
         
+        sources = self.source_files()
+        self.source_hashes = {event_name: file_hash(path) for event_name, path in sources.items()}
+        
+        unchanged = set()
+        if incremental:
+            manifest = self.load_manifest(output_dir)
+            previous = manifest.get('events', {}) if manifest.get('version') == PREPARER_VERSION else {}
+            for event_name, digest in self.source_hashes.items():
+                entry = previous.get(event_name, {})
+                if (
+                    entry.get('sha256') == digest
+                    and columnar_path(output_dir, event_name).exists()
+                    and (Path(output_dir) / f"{event_name}_processed.csv").exists()
+                ):
+                    self.processed_data[event_name] = load_columnar(columnar_path(output_dir, event_name))
+                    self.feature_mappings[event_name] = entry.get('columns', {})
+                    unchanged.add(event_name)
+            logger.info(f"Skipping {len(unchanged)} unchanged events: {sorted(unchanged)}")
+        
+        self.updated_events = [event_name for event_name in sources if event_name not in unchanged]
+        
         # 全データを読み込み
-        raw_data = self.load_all_data()
+        raw_data = self.load_all_data(events=self.updated_events)
         
         # 各種目のデータを標準化・クリーニング
         for event_name, df in raw_data.items():
@@ -551,19 +641,47 @@ class MLTrainingDataPreparer:
         
         return self.processed_data
     
+    def load_manifest(self, output_dir: str = "ml_training_data") -> Dict[str, Any]:
+        """
+        前回の出力時の元CSVのハッシュを読み込み
+        
+        Args:
+            output_dir: 出力ディレクトリ
+            
+        Returns:
+            マニフェスト（ない場合は空の辞書）
+        """
+        manifest_file = Path(output_dir) / MANIFEST_FILE
+        if not manifest_file.exists():
+            return {}
+        try:
+            with open(manifest_file) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read {manifest_file}: {e}")
+            return {}
+    
     def save_processed_data(self, output_dir: str = "ml_training_data"):
         """
         処理済みデータを保存
         
+        今回処理した種目の CSV と列指向ファイル（.npz）を書き出し、
+        全種目の特徴量マッピングと元CSVのハッシュを更新する。
+        
         Args:
             output_dir: 出力ディレクトリ
         """
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
         
-        for event_name, df in self.processed_data.items():
+        events = self.updated_events if self.updated_events is not None else list(self.processed_data)
+        for event_name in events:
+            df = self.processed_data.get(event_name)
+            if df is None:
+                continue
             output_file = output_path / f"{event_name}_processed.csv"
             df.to_csv(output_file, index=False)
+            save_columnar(df, columnar_path(output_path, event_name))
             logger.info(f"Saved processed data for {event_name} to {output_file}")
         
         # 特徴量マッピングを保存
@@ -571,6 +689,23 @@ class MLTrainingDataPreparer:
         with open(mapping_file, 'w') as f:
             json.dump(self.feature_mappings, f, indent=2)
         logger.info(f"Saved feature mappings to {mapping_file}")
+        
+        # 元CSVのハッシュを保存（インクリメンタルモードで使用）
+        manifest = {
+            'version': PREPARER_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'events': {
+                event_name: {
+                    'sha256': digest,
+                    'records': len(self.processed_data[event_name]),
+                    'columns': self.feature_mappings.get(event_name, {})
+                }
+                for event_name, digest in self.source_hashes.items()
+                if event_name in self.processed_data
+            }
+        }
+        with open(output_path / MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, indent=2)
     
     def get_feature_summary(self) -> Dict[str, Any]:
         """
@@ -596,21 +731,27 @@ class MLTrainingDataPreparer:
 
 def main():
     """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="機械学習用トレーニングデータの準備")
+    parser.add_argument("--incremental", action="store_true", help="内容が変わった元CSVの種目だけを再処理")
+    parser.add_argument("--output-dir", type=str, default="ml_training_data", help="出力ディレクトリ (デフォルト: ml_training_data)")
+    args = parser.parse_args()
+    
     logger.info("Starting ML training data preparation")
     
     # データ準備器を初期化
     preparer = MLTrainingDataPreparer()
     
     # 全データを準備
-    processed_data = preparer.prepare_all_data()
+    processed_data = preparer.prepare_all_data(incremental=args.incremental, output_dir=args.output_dir)
     
     # 処理済みデータを保存
-    preparer.save_processed_data()
+    preparer.save_processed_data(args.output_dir)
     
     # 特徴量サマリーを表示
     summary = preparer.get_feature_summary()
     
     logger.info("Data preparation completed!")
+    logger.info(f"Processed {len(preparer.updated_events)} events: {preparer.updated_events}")
     logger.info("Feature Summary:")
     for event_name, event_summary in summary.items():
         logger.info(f"{event_name}: {event_summary['record_count']} records, {event_summary['feature_count']} features")
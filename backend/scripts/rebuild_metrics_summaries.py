@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+週間・月間メトリクスサマリー（weekly_metrics_summary / monthly_metrics_summary）の再構築スクリプト
+
+通常は DailyMetrics の追加・更新・削除時に自動更新されます。
+ORMを経由せずに DailyMetrics を書き換えた場合や、集計に不整合が疑われる場合に実行してください。
+
+使用方法:
+    python scripts/rebuild_metrics_summaries.py
+    python scripts/rebuild_metrics_summaries.py --user-id <USER_ID>
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.models.metrics_rollup import rebuild_metrics_summaries
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="週間・月間メトリクスサマリーの再構築")
+    parser.add_argument("--user-id", type=str, default=None, help="対象ユーザーID（省略時は全ユーザー）")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        counts = rebuild_metrics_summaries(connection, args.user_id)
+
+    target = f"user {args.user_id}" if args.user_id else "all users"
+    logger.info(f"Rebuilt {counts['weekly']} weekly and {counts['monthly']} monthly summary rows for {target}")
+
+
+if __name__ == "__main__":
+    main()
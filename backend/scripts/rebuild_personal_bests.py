@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+自己ベスト（personal_bests）の再計算スクリプト
+
+通常はレース結果の追加・更新・削除時に自動更新されます。
+ORMを経由せずにレース結果を書き換えた場合や、自己ベストに不整合が疑われる場合に実行してください。
+手入力の自己ベストは変更・削除しません。
+
+使用方法:
+    python scripts/rebuild_personal_bests.py
+    python scripts/rebuild_personal_bests.py --user-id <USER_ID>
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# プロジェクトルートをパスに追加
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.services.personal_best_service import recompute_personal_bests
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="自己ベストの再計算")
+    parser.add_argument("--user-id", type=str, default=None, help="対象ユーザーID（省略時は全ユーザー）")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        counts = recompute_personal_bests(connection, [args.user_id] if args.user_id else None)
+
+    target = f"user {args.user_id}" if args.user_id else "all users"
+    logger.info(
+        f"Recomputed personal bests for {target}: "
+        f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['deleted']} deleted"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,7 @@ from app.models.user import User
 from app.models.daily_metrics import DailyMetrics
 from app.models.workout import Workout
 from app.ml.health.training_condition_correlator import TrainingConditionCorrelator
+from app.services.correlation_store import CorrelationStoreService
 from sqlalchemy.orm import Session
 
 # ログ設定
@@ -60,6 +61,16 @@ class CorrelationAnalysis:
     training_readiness_correlation: float
 
 
+# CorrelationAnalysis の項目 -> 相関を取るメトリクスのペア（日付で揃えて計算）
+CORRELATION_PAIRS = {
+    'workout_fatigue': ('training_load', 'fatigue_level'),
+    'sleep_quality_fatigue': ('fatigue_level', 'sleep_quality_score'),
+    'motivation_energy': ('motivation_level', 'energy_level'),
+    'stress_sleep': ('sleep_quality_score', 'stress_level'),
+    'training_readiness': ('training_readiness', 'readiness_composite'),
+}
+
+
 class HealthDataValidator:
     """体調データ検証器"""
     
@@ -67,6 +78,7 @@ class HealthDataValidator:
         """初期化"""
         self.db = next(get_db())
         self.correlator = TrainingConditionCorrelator()
+        self.correlation_store = CorrelationStoreService(self.db)
         
         # 健康的な範囲の定義
         self.health_ranges = {
@@ -294,112 +306,24 @@ class HealthDataValidator:
         return recommendations
     
     def analyze_correlations(self, user_id: str) -> CorrelationAnalysis:
-        """相関分析を実行"""
+        """相関分析を実行（日付で揃えた累積統計から読み出す）"""
         try:
             logger.info(f"Analyzing correlations for user: {user_id}")
             
-            # 体調記録を取得
-            daily_metrics = self.db.query(DailyMetrics).filter(
-                DailyMetrics.user_id == user_id
-            ).order_by(DailyMetrics.date).all()
-            
-            if len(daily_metrics) < 10:
-                logger.warning(f"Insufficient data for correlation analysis: {len(daily_metrics)} records")
-                return CorrelationAnalysis(
-                    workout_fatigue_correlation=0.0,
-                    sleep_quality_fatigue_correlation=0.0,
-                    motivation_energy_correlation=0.0,
-                    stress_sleep_correlation=0.0,
-                    training_readiness_correlation=0.0
-                )
-            
-            # データを配列に変換
-            fatigue_levels = [m.fatigue_level for m in daily_metrics if m.fatigue_level is not None]
-            sleep_qualities = [m.sleep_quality_score for m in daily_metrics if m.sleep_quality_score is not None]
-            motivation_levels = [m.motivation_level for m in daily_metrics if m.motivation_level is not None]
-            energy_levels = [m.energy_level for m in daily_metrics if m.energy_level is not None]
-            stress_levels = [m.stress_level for m in daily_metrics if m.stress_level is not None]
-            training_readiness = [m.training_readiness for m in daily_metrics if m.training_readiness is not None]
-            
-            # 練習データを取得
-            workouts = self.db.query(Workout).filter(
-                Workout.user_id == user_id
-            ).order_by(Workout.date).all()
-            
-            # 練習強度データを作成（日付ベース）
-            workout_intensities = {}
-            for workout in workouts:
-                workout_intensities[workout.date] = workout.distance_km / (workout.duration_minutes / 60) if workout.duration_minutes else 0
-            
-            # 相関計算
-            correlations = {}
-            
-            # 練習と疲労の相関
-            if len(fatigue_levels) > 1:
-                workout_fatigue_values = []
-                for i, metrics in enumerate(daily_metrics):
-                    if metrics.fatigue_level is not None and metrics.date in workout_intensities:
-                        workout_fatigue_values.append((workout_intensities[metrics.date], metrics.fatigue_level))
-                
-                if len(workout_fatigue_values) > 3:
-                    workout_vals, fatigue_vals = zip(*workout_fatigue_values)
-                    correlations['workout_fatigue'] = np.corrcoef(workout_vals, fatigue_vals)[0, 1]
-                else:
-                    correlations['workout_fatigue'] = 0.0
-            else:
-                correlations['workout_fatigue'] = 0.0
-            
-            # 睡眠の質と疲労の相関
-            if len(sleep_qualities) > 1 and len(fatigue_levels) > 1:
-                correlations['sleep_quality_fatigue'] = np.corrcoef(sleep_qualities, fatigue_levels)[0, 1]
-            else:
-                correlations['sleep_quality_fatigue'] = 0.0
-            
-            # モチベーションとエネルギーの相関
-            if len(motivation_levels) > 1 and len(energy_levels) > 1:
-                correlations['motivation_energy'] = np.corrcoef(motivation_levels, energy_levels)[0, 1]
-            else:
-                correlations['motivation_energy'] = 0.0
+            correlations = self.correlation_store.get_correlations(user_id, pairs=list(CORRELATION_PAIRS.values()))
             
-            # ストレスと睡眠の相関
-            if len(stress_levels) > 1 and len(sleep_qualities) > 1:
-                correlations['stress_sleep'] = np.corrcoef(stress_levels, sleep_qualities)[0, 1]
-            else:
-                correlations['stress_sleep'] = 0.0
-            
-            # トレーニング準備度の相関（疲労、エネルギー、睡眠の質の組み合わせ）
-            if len(training_readiness) > 1:
-                readiness_factors = []
-                for metrics in daily_metrics:
-                    if all([
-                        metrics.training_readiness is not None,
-                        metrics.fatigue_level is not None,
-                        metrics.energy_level is not None,
-                        metrics.sleep_quality_score is not None
-                    ]):
-                        readiness_factors.append((
-                            metrics.training_readiness,
-                            metrics.fatigue_level,
-                            metrics.energy_level,
-                            metrics.sleep_quality_score
-                        ))
-                
-                if len(readiness_factors) > 3:
-                    readiness_vals, fatigue_vals, energy_vals, sleep_vals = zip(*readiness_factors)
-                    # 複合指標として疲労（逆）、エネルギー、睡眠の質の平均
-                    composite_factor = [(10 - f) + e + s for f, e, s in zip(fatigue_vals, energy_vals, sleep_vals)]
-                    correlations['training_readiness'] = np.corrcoef(readiness_vals, composite_factor)[0, 1]
-                else:
-                    correlations['training_readiness'] = 0.0
-            else:
-                correlations['training_readiness'] = 0.0
+            # 観測が足りないペアは 0.0 とする
+            values = {
+                name: correlations[f"{x}|{y}"]['correlation'] or 0.0
+                for name, (x, y) in CORRELATION_PAIRS.items()
+            }
             
             analysis = CorrelationAnalysis(
-                workout_fatigue_correlation=correlations.get('workout_fatigue', 0.0),
-                sleep_quality_fatigue_correlation=correlations.get('sleep_quality_fatigue', 0.0),
-                motivation_energy_correlation=correlations.get('motivation_energy', 0.0),
-                stress_sleep_correlation=correlations.get('stress_sleep', 0.0),
-                training_readiness_correlation=correlations.get('training_readiness', 0.0)
+                workout_fatigue_correlation=values['workout_fatigue'],
+                sleep_quality_fatigue_correlation=values['sleep_quality_fatigue'],
+                motivation_energy_correlation=values['motivation_energy'],
+                stress_sleep_correlation=values['stress_sleep'],
+                training_readiness_correlation=values['training_readiness']
             )
             
             logger.info(f"Correlation analysis completed for user {user_id}")
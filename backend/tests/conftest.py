@@ -73,6 +73,34 @@ def client():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="function")
+def db_session():
+    """ORMセッションフィクスチャ（テストごとのインメモリSQLite）"""
+    memory_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=memory_engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        memory_engine.dispose()
+
+
+@pytest.fixture
+def test_user(db_session):
+    """テストユーザー（データベースに保存済み）"""
+    from app.models.user import User
+
+    user = User(email="test_user@example.com", hashed_password="not-a-real-hash", name="テストユーザー")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
 @pytest_asyncio.fixture(scope="function")
 async def async_db_session() -> AsyncGenerator[AsyncSession, None]:
     """非同期データベースセッションフィクスチャ"""
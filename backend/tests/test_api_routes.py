@@ -0,0 +1,36 @@
+"""
+APIのルーティングのテスト
+
+ルーター自身の prefix と include_router の prefix が重複していないことを確認する。
+"""
+import pytest
+
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def api_paths():
+    return set(app.openapi()["paths"])
+
+
+class TestRouterPrefixes:
+    """main.py で登録した prefix でエンドポイントが公開されること"""
+
+    @pytest.mark.parametrize("path", [
+        "/api/ai/health/batch",
+        "/api/ai/health-summary",
+        "/api/ai/predict-time",
+        "/api/ai/generate-plan/batch",
+        "/api/tasks/results/{task_id}",
+        "/api/tasks/training-jobs",
+        "/api/admin/ai/models",
+        "/api/data-quality/duplicates/detect",
+        "/api/data-quality/duplicates/merge",
+    ])
+    def test_served_path(self, api_paths, path):
+        assert path in api_paths
+
+    def test_no_duplicated_prefix(self, api_paths):
+        duplicated = [path for path in api_paths
+                      if path.startswith(("/api/ai/api/", "/api/tasks/api/", "/api/admin/ai/api/"))]
+        assert duplicated == []
@@ -0,0 +1,123 @@
+"""
+ユーザーごとのデータ変更の記録（user_change_tracking）のテスト
+
+Workout / RaceResult / DailyMetrics / UserProfile の書き込みで after_flush フックが更新した変更日時から
+選ばれる再計算対象のユーザーが、最後の再計算以降に書き込まれたユーザーの集合と一致することを確認する。
+"""
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.models.change_tracking import mark_users_refreshed, select_dirty_users
+from app.models.daily_metrics import DailyMetrics
+from app.models.race import RaceResult
+from app.models.user import User
+from app.models.user_profile import UserProfile
+from app.models.workout import Workout, WorkoutType
+
+
+@pytest.fixture
+def users(db_session):
+    users = [User(email=f"tracked_{i}@example.com", hashed_password="not-a-real-hash") for i in range(4)]
+    db_session.add_all(users)
+    db_session.commit()
+    return [user.id for user in users]
+
+
+@pytest.fixture
+def workout_type(db_session, users):
+    workout_type = WorkoutType(name="ジョグ", category="easy", created_by=users[0])
+    db_session.add(workout_type)
+    db_session.commit()
+    return workout_type.id
+
+
+def make_row(kind, user_id, workout_type_id, day):
+    if kind == 'workout':
+        return Workout(user_id=user_id, workout_type_id=workout_type_id, date=day, actual_distance_meters=5000)
+    if kind == 'race':
+        return RaceResult(user_id=user_id, race_date=day, race_name="記録会", race_type="track",
+                          distance_meters=5000, time_seconds=1200.0, pace_seconds=240.0)
+    return DailyMetrics(user_id=user_id, date=day, fatigue_level=5)
+
+
+def refresh_all(db_session, kind):
+    """全ユーザーを再計算したことにする（計算開始時刻は現在）"""
+    dirty = select_dirty_users(db_session, kind)
+    mark_users_refreshed(db_session.connection(), kind, dirty, datetime.now(timezone.utc))
+    db_session.commit()
+
+
+class TestChangeTrackingHooks:
+    """after_flush フックによる変更日時の更新と再計算対象の選択"""
+
+    def test_dirty_users_match_written_users(self, db_session, users, workout_type):
+        rng = random.Random(0)
+        rows = []
+        for kind in ('feature', 'prediction'):
+            assert select_dirty_users(db_session, kind) == []
+
+        for step in range(6):
+            written = set()
+            added = []
+            for _ in range(rng.randint(1, 4)):
+                action = rng.choice(['insert', 'update', 'delete']) if rows else 'insert'
+                if action == 'insert':
+                    user_id = rng.choice(users)
+                    row = make_row(rng.choice(['workout', 'race', 'metrics']), user_id, workout_type,
+                                   date(2024, 1, 1) + timedelta(days=rng.randrange(30)))
+                    db_session.add(row)
+                    added.append(row)
+                    written.add(user_id)
+                elif action == 'update':
+                    row = rng.choice(rows)
+                    if isinstance(row, Workout):
+                        row.actual_distance_meters = rng.choice([3000, 8000])
+                    elif isinstance(row, RaceResult):
+                        row.time_seconds = rng.choice([1150.0, 1250.0])
+                    else:
+                        row.fatigue_level = rng.randint(1, 10)
+                    written.add(row.user_id)
+                else:
+                    row = rows.pop(rng.randrange(len(rows)))
+                    written.add(row.user_id)
+                    db_session.delete(row)
+            db_session.commit()
+            rows.extend(added)
+
+            assert set(select_dirty_users(db_session, 'feature')) == written
+            # 予測は特徴量とは独立に再計算日時を持つ
+            assert set(select_dirty_users(db_session, 'prediction')) == written
+            refresh_all(db_session, 'feature')
+            refresh_all(db_session, 'prediction')
+            assert select_dirty_users(db_session, 'feature') == []
+
+    def test_change_during_refresh_stays_dirty(self, db_session, users, workout_type):
+        started_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db_session.add(make_row('workout', users[0], workout_type, date(2024, 1, 1)))
+        db_session.commit()
+
+        # 計算開始後に書き込まれた変更は、計算完了後も再計算の対象に残る
+        mark_users_refreshed(db_session.connection(), 'feature', [users[0]], started_at)
+        db_session.commit()
+        assert select_dirty_users(db_session, 'feature') == [users[0]]
+
+    def test_profile_and_reassignment_mark_both_users(self, db_session, users, workout_type):
+        race = make_row('race', users[0], workout_type, date(2024, 1, 1))
+        db_session.add_all([race, UserProfile(user_id=users[1], height_cm=170.0)])
+        db_session.commit()
+        assert set(select_dirty_users(db_session, 'feature')) == {users[0], users[1]}
+        refresh_all(db_session, 'feature')
+
+        # commit 後（期限切れ）の行の user_id を付け替えると、変更前のユーザーも対象になる
+        race.user_id = users[2]
+        db_session.commit()
+        assert set(select_dirty_users(db_session, 'feature')) == {users[0], users[2]}
+
+    def test_limit_returns_oldest_changes_first(self, db_session, users, workout_type):
+        for user_id in (users[2], users[0], users[1]):
+            db_session.add(make_row('metrics', user_id, workout_type, date(2024, 1, 1)))
+            db_session.commit()
+
+        assert select_dirty_users(db_session, 'feature', limit=2) == [users[2], users[0]]
@@ -0,0 +1,82 @@
+"""
+推論ランタイム（compiled_runtime）のテスト
+
+変換したモデルの予測が sklearn の predict と一致することを確認する。
+"""
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+
+from app.ml.compiled_runtime import (
+    CompiledEnsemble,
+    CompiledLinearModel,
+    CompiledTreeEnsemble,
+    compile_predictor,
+)
+from app.ml.ensemble_predictor import EnsemblePredictor
+
+
+@pytest.fixture(scope="module")
+def regression_data():
+    """非線形の回帰データと、学習データ近傍の摂動サンプル"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    y = 3.0 * X[:, 0] - 2.0 * X[:, 1] ** 2 + np.sin(X[:, 2]) + rng.normal(scale=0.1, size=400)
+    X_check = np.vstack([X, X[rng.integers(0, len(X), 200)] * rng.normal(1.0, 0.05, (200, X.shape[1]))])
+    return X, y, X_check
+
+
+def assert_same_predictions(model, compiled, X):
+    """一括予測・1行予測の両方が sklearn と一致すること"""
+    expected = model.predict(X)
+    np.testing.assert_allclose(compiled.predict(X), expected, rtol=1e-9, atol=1e-6)
+    assert compiled.predict_single(list(X[0])) == pytest.approx(float(expected[0]), rel=1e-9, abs=1e-6)
+
+
+class TestCompileEstimators:
+    """sklearn の推定器の変換"""
+
+    @pytest.mark.parametrize("estimator, compiled_type", [
+        (LinearRegression(), CompiledLinearModel),
+        (Ridge(alpha=1.0), CompiledLinearModel),
+        (RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0), CompiledTreeEnsemble),
+        (GradientBoostingRegressor(n_estimators=30, learning_rate=0.1, random_state=0), CompiledTreeEnsemble),
+    ])
+    def test_matches_sklearn(self, regression_data, estimator, compiled_type):
+        X, y, X_check = regression_data
+        estimator.fit(X, y)
+
+        compiled = compile_predictor(estimator)
+
+        assert isinstance(compiled, compiled_type)
+        assert_same_predictions(estimator, compiled, X_check)
+
+    def test_unsupported_estimator_returns_none(self):
+        assert compile_predictor(object()) is None
+
+
+class TestCompileEnsemble:
+    """EnsemblePredictor の変換"""
+
+    def test_matches_ensemble_predict(self, regression_data):
+        X, y, X_check = regression_data
+        ensemble = EnsemblePredictor(name="test_predictor")
+        ensemble.add_default_models()
+        ensemble.fit(X, y)
+
+        compiled = compile_predictor(ensemble)
+
+        assert isinstance(compiled, CompiledEnsemble)
+        assert_same_predictions(ensemble, compiled, X_check)
+
+    def test_members_match_predictors(self, regression_data):
+        X, y, X_check = regression_data
+        ensemble = EnsemblePredictor(name="test_predictor")
+        ensemble.add_default_models()
+        ensemble.fit(X, y)
+
+        for member in ensemble.models:
+            compiled = compile_predictor(member)
+            assert compiled is not None, member.name
+            assert_same_predictions(member, compiled, X_check)
@@ -0,0 +1,142 @@
+"""
+メトリクス間相関の累積統計ストア（CorrelationStoreService）のテスト
+
+保存済みの統計の読み出しが元データを集計しないこと、反映済みの日の書き換えで after_flush フックが
+再構築フラグを立てること、フックと増分追加で更新した統計が全期間の一括計算と一致することを確認する。
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.ml.health.correlation_stats import CorrelationAccumulators
+from app.models.correlation_stats import UserCorrelationStats
+from app.models.daily_metrics import DailyMetrics
+from app.models.workout import Workout, WorkoutType
+from app.services.correlation_store import CorrelationStoreService
+
+
+def rounded(accumulators):
+    """統計の値（浮動小数点は丸める）"""
+    return {key: [round(value, 6) for value in values] for key, values in accumulators.to_dict().items()}
+
+
+def assert_matches_batch(service, user_id, through_date, accumulators):
+    """累積統計が through_date までの一括計算と一致すること"""
+    _, values = service.load_daily_values(user_id, end_date=through_date)
+    assert rounded(accumulators) == rounded(CorrelationAccumulators.from_matrix(values))
+
+
+def make_metrics(rng, user_id, day):
+    """ランダムな値の体調記録（欠損を含む）"""
+    return DailyMetrics(
+        user_id=user_id,
+        date=day,
+        sleep_duration_hours=rng.choice([None, 6.0, 7.5, 8.0]),
+        sleep_quality_score=rng.choice([None, 3, 6, 9]),
+        fatigue_level=rng.randint(1, 10),
+        motivation_level=rng.choice([None, 4, 7]),
+        stress_level=rng.randint(1, 10),
+        energy_level=rng.randint(1, 10),
+        training_readiness=rng.choice([None, 5, 8])
+    )
+
+
+@pytest.fixture
+def workout_type(db_session, test_user):
+    workout_type = WorkoutType(name="ジョグ", category="easy", created_by=test_user.id)
+    db_session.add(workout_type)
+    db_session.commit()
+    return workout_type
+
+
+@pytest.fixture
+def history(db_session, test_user, workout_type):
+    """昨日までの60日分の体調記録と練習"""
+    rng = random.Random(0)
+    start = date.today() - timedelta(days=60)
+    metrics = [make_metrics(rng, test_user.id, start + timedelta(days=offset)) for offset in range(60)]
+    workouts = [
+        Workout(
+            user_id=test_user.id,
+            workout_type_id=workout_type.id,
+            date=start + timedelta(days=offset),
+            actual_distance_meters=rng.choice([3000, 8000, 12000]),
+            intensity=rng.choice([None, 4, 8])
+        )
+        for offset in rng.sample(range(60), 40)
+    ]
+    db_session.add_all(metrics + workouts)
+    db_session.commit()
+    return metrics, workouts
+
+
+class TestCorrelationStore:
+    """累積統計の読み出しと無効化"""
+
+    def test_read_after_refresh_is_a_single_lookup(self, db_session, test_user, history):
+        user_id = test_user.id
+        service = CorrelationStoreService(db_session)
+        service.get_correlations(user_id)
+
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            correlations = service.get_correlations(user_id, pairs=[('fatigue_level', 'energy_level')])
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith("SELECT")
+        assert "user_correlation_stats" in statements[0]
+        assert correlations['fatigue_level|energy_level']['observations'] == 60
+
+    def test_past_day_change_triggers_rebuild(self, db_session, test_user, history):
+        metrics, workouts = history
+        service = CorrelationStoreService(db_session)
+        through_date = date.today() - timedelta(days=1)
+        service.refresh(test_user.id)
+
+        metrics[10].fatigue_level = 10
+        metrics[10].energy_level = 1
+        db_session.commit()
+        assert db_session.get(UserCorrelationStats, test_user.id).needs_rebuild
+
+        assert_matches_batch(service, test_user.id, through_date, service.refresh(test_user.id))
+        assert not db_session.get(UserCorrelationStats, test_user.id).needs_rebuild
+
+        # 練習の削除もロールアップ経由で負荷が変わるため再構築する
+        db_session.delete(workouts[0])
+        db_session.commit()
+        assert db_session.get(UserCorrelationStats, test_user.id).needs_rebuild
+        assert_matches_batch(service, test_user.id, through_date, service.refresh(test_user.id))
+
+    def test_new_days_are_added_incrementally(self, db_session, test_user, history):
+        metrics, workouts = history
+        service = CorrelationStoreService(db_session)
+        through_date = date.today() - timedelta(days=1)
+        service.refresh(test_user.id, through_date - timedelta(days=10))
+
+        # 未反映の日の書き換えは再構築不要
+        metrics[-1].fatigue_level = 1
+        db_session.commit()
+        assert not db_session.get(UserCorrelationStats, test_user.id).needs_rebuild
+
+        assert_matches_batch(service, test_user.id, through_date, service.refresh(test_user.id))
+
+    def test_moving_a_workout_out_of_a_reflected_day_triggers_rebuild(self, db_session, test_user, history):
+        _, workouts = history
+        service = CorrelationStoreService(db_session)
+        through_date = date.today() - timedelta(days=1)
+        service.refresh(test_user.id, through_date - timedelta(days=20))
+
+        # 移動先は未反映の日だが、移動元（反映済みの日）の負荷が変わる
+        workout = min(workouts, key=lambda w: w.date)
+        workout.date = through_date
+        db_session.commit()
+        assert db_session.get(UserCorrelationStats, test_user.id).needs_rebuild
+
+        assert_matches_batch(service, test_user.id, through_date, service.refresh(test_user.id))
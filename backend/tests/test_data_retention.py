@@ -0,0 +1,212 @@
+"""
+保持期間を過ぎたデータの一括削除（app.services.data_retention）のテスト
+
+ユーザーごとに新しい方から N 件を残すルール、バッチ削除の終了条件と処理時間の上限での打ち切り、
+タスク結果の明細→ヘッダーの削除順、アクティブなモデルと参照されている（学習ジョブが記録したものを含む）
+モデルが残ることを確認する。
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.ai import AIModel, FeatureStore, ModelTrainingJob, PredictionResult, TrainingMetrics
+from app.models.data_version import UserDataVersion
+from app.models.task_result import TaskResult, TaskResultItem
+from app.models.user import User
+from app.services import data_retention
+from app.services.data_retention import cleanup_expired_data, delete_in_batches, expired_ids_query
+
+NOW = datetime.now(timezone.utc)
+
+
+def days_ago(days):
+    return NOW - timedelta(days=days)
+
+
+class FakeClock:
+    """time.monotonic() の代わりに呼ばれるたびに1秒進む時計"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        self.now += 1.0
+        return self.now
+
+
+@pytest.fixture
+def other_user(db_session):
+    user = User(email="other_user@example.com", hashed_password="not-a-real-hash", name="別のユーザー")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def add_features(db_session, user_id, ages_in_days):
+    """指定した日数前に計算した特徴量"""
+    rows = [
+        FeatureStore(user_id=user_id, calculation_date=days_ago(age), features={'age': age})
+        for age in ages_in_days
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return {row.features['age']: row.id for row in rows}
+
+
+def add_model(db_session, age_in_days, is_active=False):
+    model = AIModel(name=f"model-{age_in_days}", version="1", algorithm="ridge",
+                    is_active=is_active, created_at=days_ago(age_in_days))
+    db_session.add(model)
+    db_session.commit()
+    return model.id
+
+
+def add_task_result(db_session, task_id, expires_at, items):
+    db_session.add(TaskResult(id=task_id, task_name="batch_predict", item_count=items, expires_at=expires_at))
+    db_session.add_all([TaskResultItem(task_id=task_id, seq=seq, payload={'seq': seq}) for seq in range(items)])
+    db_session.commit()
+
+
+class TestExpiredIdsQuery:
+    """削除対象の ID の選択"""
+
+    def test_keeps_latest_per_user(self, db_session, test_user, other_user):
+        mine = add_features(db_session, test_user.id, [200, 150, 120, 100, 10])
+        theirs = add_features(db_session, other_user.id, [300, 250])
+
+        query = expired_ids_query(FeatureStore, FeatureStore.calculation_date, days_ago(90), keep_latest_per_user=2)
+
+        # 新しい2件（10日前・100日前）と、他のユーザーの2件は古くても残る
+        selected = set(db_session.execute(query).scalars())
+        assert selected == {mine[200], mine[150], mine[120]}
+        assert selected.isdisjoint(theirs.values())
+
+    def test_without_keep_latest_uses_cutoff_only(self, db_session, test_user):
+        features = add_features(db_session, test_user.id, [200, 100, 10])
+
+        query = expired_ids_query(FeatureStore, FeatureStore.calculation_date, days_ago(90))
+
+        assert set(db_session.execute(query).scalars()) == {features[200], features[100]}
+
+
+class TestDeleteInBatches:
+    """バッチ削除"""
+
+    @pytest.mark.parametrize("rows, batches", [(7, 3), (6, 3), (0, 1)])
+    def test_stops_after_short_batch(self, db_session, test_user, rows, batches):
+        add_features(db_session, test_user.id, range(100, 100 + rows))
+        query = expired_ids_query(FeatureStore, FeatureStore.calculation_date, days_ago(90))
+
+        result = delete_in_batches(db_session, FeatureStore, query, batch_size=3)
+
+        assert (result.deleted, result.batches, result.complete) == (rows, batches, True)
+        assert db_session.query(FeatureStore).count() == 0
+
+    def test_bumps_data_version_of_versioned_models(self, db_session, test_user, other_user):
+        add_features(db_session, test_user.id, [200, 10])
+        add_features(db_session, other_user.id, [10])
+        query = expired_ids_query(FeatureStore, FeatureStore.calculation_date, days_ago(90))
+        before = {row.user_id: row.version for row in db_session.query(UserDataVersion)}
+
+        delete_in_batches(db_session, FeatureStore, query, batch_size=10)
+
+        db_session.expire_all()
+        after = {row.user_id: row.version for row in db_session.query(UserDataVersion)}
+        assert after[test_user.id] == before[test_user.id] + 1
+        assert after[other_user.id] == before[other_user.id]
+
+    def test_stops_at_deadline(self, db_session, test_user, monkeypatch):
+        monkeypatch.setattr(data_retention, "time", FakeClock())
+        add_features(db_session, test_user.id, range(100, 110))
+        query = expired_ids_query(FeatureStore, FeatureStore.calculation_date, days_ago(90))
+
+        # 1回目の確認（1秒）は期限前、2回目（2秒）で打ち切る
+        result = delete_in_batches(db_session, FeatureStore, query, batch_size=3, deadline=2.0)
+
+        assert (result.deleted, result.batches, result.complete) == (3, 1, False)
+        assert db_session.query(FeatureStore).count() == 7
+
+
+class TestCleanupExpiredData:
+    """保持期間クリーンアップ全体"""
+
+    def test_keeps_active_and_referenced_models(self, db_session, test_user):
+        active = add_model(db_session, 200, is_active=True)
+        predicted = add_model(db_session, 200)
+        measured = add_model(db_session, 200)
+        measured_long_ago = add_model(db_session, 200)
+        add_model(db_session, 200)  # 参照されていない古いモデル
+        recent = add_model(db_session, 10)
+        db_session.add_all([
+            PredictionResult(user_id=test_user.id, model_id=predicted, race_type="road", distance=5.0,
+                             predicted_time=1200.0, created_at=days_ago(5)),
+            TrainingMetrics(model_id=measured, created_at=days_ago(5)),
+            # 古い学習メトリクスは同じ実行で先に削除されるため、モデルも削除される
+            TrainingMetrics(model_id=measured_long_ago, created_at=days_ago(200)),
+        ])
+        db_session.commit()
+
+        result = cleanup_expired_data(db_session, days_to_keep=90)
+
+        assert result['complete']
+        assert result['deleted']['metrics'] == 1
+        assert result['deleted']['models'] == 2
+        remaining = set(db_session.execute(AIModel.__table__.select().with_only_columns(AIModel.id)).scalars())
+        assert remaining == {active, predicted, measured, recent}
+
+    def test_keeps_models_reported_by_training_jobs(self, db_session):
+        trained = add_model(db_session, 200)
+        activated = add_model(db_session, 200)
+        unused = add_model(db_session, 200)
+        db_session.add_all([
+            ModelTrainingJob(job_id="job-1", status="completed", result_model_ids=[trained, activated]),
+            ModelTrainingJob(job_id="job-2", status="failed", result_model_ids=None),
+        ])
+        db_session.commit()
+
+        result = cleanup_expired_data(db_session, days_to_keep=90)
+
+        assert result['deleted']['models'] == 1
+        remaining = set(db_session.execute(AIModel.__table__.select().with_only_columns(AIModel.id)).scalars())
+        assert remaining == {trained, activated}
+        assert unused not in remaining
+
+    def test_keep_latest_per_user(self, db_session, test_user):
+        features = add_features(db_session, test_user.id, [300, 200, 100])
+
+        result = cleanup_expired_data(db_session, days_to_keep=90, keep_latest_per_user=1)
+
+        assert result['deleted']['features'] == 2
+        assert [row.id for row in db_session.query(FeatureStore)] == [features[100]]
+
+    def test_task_result_items_are_deleted_before_header(self, db_session):
+        add_task_result(db_session, "expired", NOW - timedelta(hours=1), items=5)
+        add_task_result(db_session, "live", NOW + timedelta(hours=1), items=2)
+
+        result = cleanup_expired_data(db_session, batch_size=2)
+
+        assert result['complete']
+        assert result['deleted']['task_result_items'] == 5
+        assert result['deleted']['task_results'] == 1
+        assert [row.id for row in db_session.query(TaskResult)] == ["live"]
+        assert db_session.query(TaskResultItem).filter(TaskResultItem.task_id == "live").count() == 2
+
+    def test_header_with_remaining_items_is_kept_until_next_run(self, db_session, monkeypatch):
+        add_task_result(db_session, "expired", NOW - timedelta(hours=1), items=5)
+        monkeypatch.setattr(data_retention, "time", FakeClock())
+
+        # 期限の計算・空のテーブル4つ・明細の1バッチ目で1秒ずつ進み、明細の2バッチ目の前で打ち切る
+        result = cleanup_expired_data(db_session, batch_size=2, time_budget_seconds=5.5)
+
+        assert not result['complete']
+        assert result['deleted']['task_result_items'] == 2
+        assert result['deleted']['task_results'] == 0
+        assert db_session.query(TaskResult).count() == 1
+
+        result = cleanup_expired_data(db_session, batch_size=2, time_budget_seconds=100)
+
+        assert result['complete']
+        assert result['deleted']['task_result_items'] == 3
+        assert result['deleted']['task_results'] == 1
+        assert db_session.query(TaskResult).count() == 0
+        assert db_session.query(TaskResultItem).count() == 0
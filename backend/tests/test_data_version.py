@@ -0,0 +1,88 @@
+"""
+ユーザーごとのデータバージョン（user_data_versions）のテスト
+
+Workout / DailyMetrics の書き込みで after_flush フックが該当ユーザーのバージョンだけを
+1 flush につき1増やすことを確認する。
+"""
+from datetime import date
+
+import pytest
+
+from app.models.daily_metrics import DailyMetrics
+from app.models.data_version import bump_user_data_versions, get_user_data_version
+from app.models.user import User
+from app.models.workout import Workout, WorkoutType
+
+
+@pytest.fixture
+def other_user(db_session):
+    user = User(email="other_user@example.com", hashed_password="not-a-real-hash")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def workout_type(db_session, test_user):
+    workout_type = WorkoutType(name="ジョグ", category="easy", created_by=test_user.id)
+    db_session.add(workout_type)
+    db_session.commit()
+    return workout_type
+
+
+def versions(session, *users):
+    return tuple(get_user_data_version(session, user.id) for user in users)
+
+
+class TestDataVersionHooks:
+    """after_flush フックによるデータバージョンの更新"""
+
+    def test_write_bumps_only_affected_user(self, db_session, test_user, other_user, workout_type):
+        assert versions(db_session, test_user, other_user) == (0, 0)
+
+        workout = Workout(user_id=test_user.id, workout_type_id=workout_type.id, date=date(2024, 1, 1),
+                          actual_distance_meters=5000)
+        db_session.add_all([workout, Workout(user_id=test_user.id, workout_type_id=workout_type.id,
+                                             date=date(2024, 1, 2), actual_distance_meters=8000)])
+        db_session.commit()
+        assert versions(db_session, test_user, other_user) == (1, 0)
+
+        metrics = DailyMetrics(user_id=other_user.id, date=date(2024, 1, 1), fatigue_level=4)
+        db_session.add(metrics)
+        db_session.commit()
+        assert versions(db_session, test_user, other_user) == (1, 1)
+
+        workout.actual_distance_meters = 6000
+        db_session.commit()
+        assert versions(db_session, test_user, other_user) == (2, 1)
+
+        db_session.delete(metrics)
+        db_session.commit()
+        assert versions(db_session, test_user, other_user) == (2, 2)
+
+    def test_unmodified_object_does_not_bump(self, db_session, test_user, workout_type):
+        workout = Workout(user_id=test_user.id, workout_type_id=workout_type.id, date=date(2024, 1, 1))
+        db_session.add(workout)
+        db_session.commit()
+
+        workout.intensity = workout.intensity
+        db_session.commit()
+        assert get_user_data_version(db_session, test_user.id) == 1
+
+    @pytest.mark.parametrize("model", [Workout, DailyMetrics])
+    def test_user_reassignment_bumps_both_users(self, db_session, test_user, other_user, workout_type, model):
+        values = {"workout_type_id": workout_type.id} if model is Workout else {}
+        obj = model(user_id=test_user.id, date=date(2024, 1, 1), **values)
+        db_session.add(obj)
+        db_session.commit()
+
+        # commit 後の期限切れのオブジェクトでも変更前のユーザーが更新されること
+        obj.user_id = other_user.id
+        db_session.commit()
+        assert versions(db_session, test_user, other_user) == (2, 1)
+
+    def test_bulk_bump(self, db_session, test_user, other_user):
+        bump_user_data_versions(db_session.connection(), [test_user.id, other_user.id, test_user.id])
+        bump_user_data_versions(db_session.connection(), [other_user.id])
+        db_session.commit()
+        assert versions(db_session, test_user, other_user) == (1, 2)
@@ -0,0 +1,156 @@
+"""
+ワークアウトの重複検出（app.services.duplicate_detection）のテスト
+
+しきい値以上の組だけが統合・削除の対象になるグループを作り、しきい値に届かない組は
+「重複の可能性あり」として別に報告され、統合できないことを確認する。
+統合（一括 DELETE）の後は相関統計が再構築されることも確認する。
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.ml.health.correlation_stats import CorrelationAccumulators
+from app.models.correlation_stats import UserCorrelationStats
+from app.models.daily_metrics import DailyMetrics
+from app.models.workout import Workout, WorkoutType
+from app.services.correlation_store import CorrelationStoreService
+from app.services.duplicate_detection import (
+    DuplicateDetectionService,
+    WorkoutFingerprint,
+    find_duplicate_groups,
+)
+
+DAY = date(2024, 5, 1)
+
+
+def rounded(accumulators):
+    """相関統計の値（浮動小数点は丸める）"""
+    return {key: [round(value, 6) for value in values] for key, values in accumulators.to_dict().items()}
+
+
+def fingerprint(record_id, distance, duration, heart_rate=None, completeness=3, offset=0):
+    return WorkoutFingerprint(
+        id=record_id, date=DAY, created_at=datetime(2024, 5, 1, 8) + timedelta(minutes=offset),
+        distance=distance, duration=duration, heart_rate=heart_rate,
+        workout_name=None, completeness=completeness
+    )
+
+
+class TestFindDuplicateGroups:
+    """重複グループと「重複の可能性あり」の組の検出"""
+
+    def test_near_miss_is_reported_separately(self):
+        records = [
+            fingerprint("a", 5000, 1500, offset=0),
+            fingerprint("b", 5000, 1500, offset=1),
+            fingerprint("c", 5100, 1530, offset=2),
+        ]
+        groups, potential_links, _ = find_duplicate_groups(records, similarity_threshold=0.8)
+
+        assert [[r.id for r in g.records] for g in groups] == [["a", "b"]]
+        assert groups[0].similarity_type == 'exact'
+        assert [[r.id for r in link.records] for link in potential_links] == [["a", "c"]]
+        assert potential_links[0].similarity_type == 'potential'
+        assert potential_links[0].suggested_action == 'keep_all'
+
+        _, potential_links, _ = find_duplicate_groups(records, similarity_threshold=0.8, include_potential=False)
+        assert potential_links == []
+
+    def test_members_only_linked_through_another_record_are_not_grouped(self):
+        # a-b, b-c はしきい値以上だが a-c は届かない
+        records = [
+            fingerprint("a", 10000, 3000, completeness=5),
+            fingerprint("b", 10200, 3000),
+            fingerprint("c", 10300, 3000),
+        ]
+        groups, potential_links, _ = find_duplicate_groups(records, similarity_threshold=0.8)
+
+        assert [[r.id for r in g.records] for g in groups] == [["a", "b"]]
+        assert groups[0].similarity_type == 'similar'
+        assert all(score >= 0.8 for score in groups[0].similarity_scores)
+        assert [[r.id for r in link.records] for link in potential_links] == [["a", "c"]]
+
+    def test_records_on_other_days_are_not_compared(self):
+        other_day = fingerprint("b", 5000, 1500)
+        other_day.date = DAY + timedelta(days=1)
+        other_day.__post_init__()
+        groups, potential_links, compared = find_duplicate_groups([fingerprint("a", 5000, 1500), other_day])
+
+        assert groups == [] and potential_links == [] and compared == 0
+
+
+@pytest.fixture
+def workout_type(db_session, test_user):
+    workout_type = WorkoutType(name="ジョグ", category="easy", created_by=test_user.id)
+    db_session.add(workout_type)
+    db_session.commit()
+    return workout_type
+
+
+class TestDuplicateDetectionService:
+    """検出・統合のサービス"""
+
+    def add_workouts(self, db_session, user_id, workout_type_id, values):
+        workouts = [
+            Workout(user_id=user_id, workout_type_id=workout_type_id, date=DAY,
+                    actual_distance_meters=distance, actual_times_seconds=[duration], intensity=intensity)
+            for distance, duration, intensity in values
+        ]
+        db_session.add_all(workouts)
+        db_session.commit()
+        return [workout.id for workout in workouts]
+
+    def test_merge_keeps_near_miss_record(self, db_session, test_user, workout_type):
+        user_id = test_user.id
+        ids = self.add_workouts(db_session, user_id, workout_type.id, [
+            (5000, 1500, 5), (5000, 1500, None), (5100, 1530, 6)
+        ])
+        service = DuplicateDetectionService(db_session)
+        scan = service.detect(user_id)
+
+        assert scan.total_duplicates == 1
+        assert len(scan.potential_links) == 1
+
+        result = service.merge_group(user_id, scan.groups[0].id)
+
+        assert result['deleted_count'] == 1
+        remaining = {w.id for w in db_session.query(Workout).filter(Workout.user_id == user_id)}
+        assert ids[2] in remaining
+        assert len(remaining) == 2
+
+    def test_potential_link_cannot_be_merged(self, db_session, test_user, workout_type):
+        user_id = test_user.id
+        self.add_workouts(db_session, user_id, workout_type.id, [(5000, 1500, 5), (5100, 1530, 6)])
+        service = DuplicateDetectionService(db_session)
+        scan = service.detect(user_id)
+
+        assert scan.groups == []
+        with pytest.raises(ValidationError):
+            service.merge_group(user_id, scan.potential_links[0].id)
+        assert db_session.query(Workout).filter(Workout.user_id == user_id).count() == 2
+
+    def test_merge_rebuilds_correlation_stats(self, db_session, test_user, workout_type):
+        user_id = test_user.id
+        db_session.add_all([
+            DailyMetrics(user_id=user_id, date=DAY - timedelta(days=offset), fatigue_level=2 + offset % 7,
+                         energy_level=9 - offset % 5, stress_level=3 + offset % 4)
+            for offset in range(20)
+        ] + [
+            Workout(user_id=user_id, workout_type_id=workout_type.id, date=DAY - timedelta(days=offset),
+                    actual_distance_meters=4000 + 1000 * (offset % 6), actual_times_seconds=[1500], intensity=5)
+            for offset in range(1, 20)
+        ])
+        db_session.commit()
+        self.add_workouts(db_session, user_id, workout_type.id, [(12000, 3600, 8), (12000, 3600, None)])
+
+        store = CorrelationStoreService(db_session)
+        store.refresh(user_id, DAY)
+        service = DuplicateDetectionService(db_session)
+        service.merge_group(user_id, service.detect(user_id).groups[0].id)
+
+        assert db_session.get(UserCorrelationStats, user_id).needs_rebuild
+        accumulators = store.refresh(user_id, DAY)
+        _, values = store.load_daily_values(user_id, end_date=DAY)
+        assert rounded(accumulators) == rounded(CorrelationAccumulators.from_matrix(values))
+        assert not db_session.get(UserCorrelationStats, user_id).needs_rebuild
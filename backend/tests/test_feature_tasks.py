@@ -0,0 +1,21 @@
+"""
+特徴量計算のチャンクタスク（feature_chunk_task）のテスト
+
+計算中の想定外の例外で chord 全体が止まらず、チャンクの全ユーザーが失敗件数として返ることを確認する。
+"""
+from app.tasks import feature_tasks
+
+
+class TestFeatureChunkTask:
+    """チャンクタスクのエラー処理"""
+
+    def test_unexpected_error_returns_failed_counts(self, db_session, monkeypatch):
+        def fail(*args, **kwargs):
+            raise ValueError("broken feature input")
+
+        monkeypatch.setattr(feature_tasks, "SessionLocal", lambda: db_session)
+        monkeypatch.setattr(feature_tasks.FeatureStore, "calculate_features_bulk", fail)
+
+        result = feature_tasks.feature_chunk_task.apply(args=(["u1", "u2", "u3"],)).get()
+
+        assert result == {"users": 3, "succeeded": 0, "insufficient_data": 0, "failed": 3}
@@ -0,0 +1,32 @@
+"""
+フィットネス・疲労モデル（app.ml.coaching.fitness_fatigue）のテスト
+
+練習データの欠損値（None）が NaN として負荷計算に伝播しないことを確認する。
+"""
+import numpy as np
+
+from app.ml.coaching.fitness_fatigue import training_stress_scores, workout_arrays
+
+
+class TestWorkoutArrays:
+    """練習データの列配列への変換"""
+
+    def test_missing_values_use_defaults(self):
+        arrays = workout_arrays([
+            {'distance': None, 'intensity': None, 'pace': None, 'duration_minutes': None},
+            {'distance': 10, 'pace': 300},
+        ])
+
+        assert arrays['distance'].tolist() == [0.0, 10.0]
+        assert arrays['intensity'].tolist() == [0.5, 0.5]
+        assert arrays['pace'].tolist() == [300.0, 300.0]
+        assert arrays['duration_minutes'].tolist() == [0.0, 50.0]
+
+    def test_none_intensity_gives_finite_stress(self):
+        arrays = workout_arrays([{'distance': 8, 'intensity': None, 'pace': 330}])
+        stress = training_stress_scores(
+            arrays['distance'], arrays['intensity'], arrays['pace'], arrays['duration_minutes']
+        )
+
+        assert np.isfinite(stress).all()
+        assert stress[0] > 0
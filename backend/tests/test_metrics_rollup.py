@@ -0,0 +1,104 @@
+"""
+週間・月間メトリクスサマリー（weekly_metrics_summary / monthly_metrics_summary）のテスト
+
+DailyMetrics の追加・更新・削除で after_flush フックが差分更新したサマリーが、
+rebuild_metrics_summaries による全件再構築の結果と一致することを確認する。
+"""
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.models.daily_metrics import DailyMetrics, MonthlyMetricsSummary, WeeklyMetricsSummary
+from app.models.metrics_rollup import rebuild_metrics_summaries
+
+
+def summary_snapshot(session):
+    """サマリー行の値（id・updated_at などを除き、浮動小数点は丸める）"""
+    snapshot = {}
+    for model, key_columns in ((WeeklyMetricsSummary, ("user_id", "week_start_date")),
+                               (MonthlyMetricsSummary, ("user_id", "year", "month"))):
+        for row in session.execute(select(model.__table__)):
+            values = {
+                key: round(value, 6) if isinstance(value, float) else value
+                for key, value in row._mapping.items() if key not in ("id", "created_at", "updated_at")
+            }
+            snapshot[(model.__tablename__,) + tuple(values[column] for column in key_columns)] = values
+    return snapshot
+
+
+def assert_matches_rebuild(session):
+    """フックで更新した状態と全件再構築の結果が一致すること"""
+    incremental = summary_snapshot(session)
+    rebuild_metrics_summaries(session.connection())
+    assert summary_snapshot(session) == incremental
+    session.rollback()
+
+
+def random_values(rng):
+    """メトリクスの値（欠損を含む）"""
+    return {
+        "weight_kg": rng.choice([None, 60.0, 60.4, 61.2]),
+        "sleep_duration_hours": rng.choice([None, 6.5, 7.0, 8.25]),
+        "fatigue_level": rng.choice([None, 2, 5, 9]),
+        "motivation_level": rng.choice([None, 3, 7]),
+        "stress_level": rng.choice([None, 4, 8, 10]),
+        "energy_level": rng.choice([None, 2, 6]),
+        "training_readiness": rng.choice([None, 5, 8]),
+        "resting_heart_rate": rng.choice([None, 48, 55]),
+    }
+
+
+class TestMetricsSummaryHooks:
+    """after_flush フックによるサマリーの差分更新"""
+
+    def test_insert_update_delete_matches_rebuild(self, db_session, test_user):
+        rng = random.Random(0)
+        start = date(2024, 1, 22)
+        days = rng.sample(range(70), 45)
+        metrics = []
+        for offset in days:
+            row = DailyMetrics(user_id=test_user.id, date=start + timedelta(days=offset), **random_values(rng))
+            db_session.add(row)
+            metrics.append(row)
+        db_session.commit()
+        assert_matches_rebuild(db_session)
+
+        # commit 後の期限切れのオブジェクトの値の変更
+        for row in rng.sample(metrics, 15):
+            for name, value in random_values(rng).items():
+                setattr(row, name, value)
+        db_session.commit()
+        assert_matches_rebuild(db_session)
+
+        # 別の週・月への日付の移動（移動元のサマリーからも差し引かれる）
+        used = {row.date for row in metrics}
+        for row in rng.sample(metrics, 8):
+            new_day = start + timedelta(days=rng.randrange(70, 120))
+            while new_day in used:
+                new_day += timedelta(days=1)
+            used.add(new_day)
+            row.date = new_day
+        db_session.commit()
+        assert_matches_rebuild(db_session)
+
+        # 削除（記録がなくなった週・月の行は消える）
+        for row in rng.sample(metrics, 20):
+            db_session.delete(row)
+        db_session.commit()
+        assert_matches_rebuild(db_session)
+
+    def test_weekly_summary_values(self, db_session, test_user):
+        monday = date(2024, 4, 1)
+        for offset, fatigue in enumerate([2, 4, 6, 8]):
+            db_session.add(DailyMetrics(user_id=test_user.id, date=monday + timedelta(days=offset),
+                                        fatigue_level=fatigue, stress_level=8))
+        db_session.commit()
+
+        weekly = db_session.execute(select(WeeklyMetricsSummary)).scalar_one()
+        assert weekly.days_recorded == 4
+        assert weekly.avg_fatigue_level == 5
+        assert weekly.fatigue_trend == "increasing"
+
+        monthly = db_session.execute(select(MonthlyMetricsSummary)).scalar_one()
+        assert monthly.stress_peak_days == 4
@@ -0,0 +1,138 @@
+"""
+プロセス内の学習済みモデルのキャッシュ（app.ml.model_cache）のテスト
+
+ファイルの更新日時・サイズが変わった場合の読み直し、アクティブなモデルだけをキャッシュし
+非アクティブになったモデルを破棄すること、ワーカー起動時のプリロードを確認する。
+"""
+import os
+
+import joblib
+import pytest
+
+from app.ml.model_cache import WarmModelCache
+from app.models.ai import AIModel
+
+
+def dump(path, obj):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(obj, path)
+    return path
+
+
+def add_model(db_session, path, is_active=True):
+    model = AIModel(name=path.stem, version="1", algorithm="ridge", model_path=str(path), is_active=is_active)
+    db_session.add(model)
+    db_session.commit()
+    return model.id
+
+
+@pytest.fixture
+def cache():
+    return WarmModelCache()
+
+
+class TestLoadArtifact:
+    """ファイルのシグネチャによる読み直し"""
+
+    def test_unchanged_file_is_reused(self, cache, tmp_path):
+        path = dump(tmp_path / "model.joblib", {'coef': [1, 2, 3]})
+
+        first = cache.load_artifact(path)
+        second = cache.load_artifact(path)
+
+        assert second is first
+        assert (cache.loads, cache.hits) == (1, 1)
+
+    def test_size_change_reloads(self, cache, tmp_path):
+        path = dump(tmp_path / "model.joblib", {'coef': [1, 2, 3]})
+        cache.load_artifact(path)
+
+        dump(path, {'coef': [1, 2, 3, 4, 5, 6]})
+
+        assert cache.load_artifact(path) == {'coef': [1, 2, 3, 4, 5, 6]}
+        assert cache.loads == 2
+
+    def test_mtime_change_with_same_size_reloads(self, cache, tmp_path):
+        path = dump(tmp_path / "model.joblib", {'coef': 1})
+        cache.load_artifact(path)
+        size = path.stat().st_size
+
+        dump(path, {'coef': 2})
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert path.stat().st_size == size
+        assert cache.load_artifact(path) == {'coef': 2}
+        assert cache.loads == 2
+
+    def test_missing_file_drops_entry(self, cache, tmp_path):
+        path = dump(tmp_path / "model.joblib", {'coef': 1})
+        cache.load_artifact(path)
+
+        path.unlink()
+
+        assert cache.load_artifact(path) is None
+        assert cache.stats()['artifacts'] == 0
+
+
+class TestGetModel:
+    """AIModel の行のモデルの取得"""
+
+    def test_only_active_models_are_cached(self, cache, db_session, tmp_path):
+        active = add_model(db_session, dump(tmp_path / "active.joblib", {'name': 'active'}))
+        retired = [
+            add_model(db_session, dump(tmp_path / f"retired_{i}.joblib", {'name': i}), is_active=False)
+            for i in range(3)
+        ]
+
+        assert cache.get_model(db_session, active) == {'name': 'active'}
+        for _ in range(2):
+            assert [cache.get_model(db_session, model_id) for model_id in retired] == [{'name': i} for i in range(3)]
+
+        assert cache.stats()['artifacts'] == 1
+        assert set(cache._model_paths) == {active}
+        assert cache.get_model(db_session, "no-such-model") is None
+
+    def test_deactivated_model_is_dropped(self, cache, db_session, tmp_path):
+        model_id = add_model(db_session, dump(tmp_path / "model.joblib", {'name': 'model'}))
+        cache.get_model(db_session, model_id)
+        assert cache.stats()['artifacts'] == 1
+
+        db_session.get(AIModel, model_id).is_active = False
+        db_session.commit()
+
+        assert cache.check_active_models(db_session, force=True)
+        assert cache.stats()['artifacts'] == 0
+        assert cache._model_paths == {}
+
+    def test_model_activated_after_check_is_dropped_when_retired(self, cache, db_session, tmp_path):
+        cache.check_active_models(db_session, force=True)
+        model_id = add_model(db_session, dump(tmp_path / "model.joblib", {'name': 'model'}))
+
+        # 照合の間隔内なので get_model は照合せずにキャッシュする
+        assert cache.get_model(db_session, model_id) == {'name': 'model'}
+        db_session.get(AIModel, model_id).is_active = False
+        db_session.commit()
+
+        cache.check_active_models(db_session, force=True)
+        assert cache._model_paths == {}
+        assert cache.stats()['artifacts'] == 0
+
+
+class TestPreload:
+    """ワーカー起動時のプリロード"""
+
+    def test_preloads_active_event_and_ensemble_models(self, cache, db_session, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        dump(tmp_path / "models" / "5k_model.joblib", {'event': '5k'})
+        dump(tmp_path / "scalers" / "5k_scaler.joblib", {'scaler': '5k'})
+        dump(tmp_path / "models" / "10k_model.joblib", {'event': '10k'})  # スケーラーがない種目は読まない
+        dump(tmp_path / "ml_models" / "marathon_model.joblib", {'ensemble': 'marathon'})
+        add_model(db_session, dump(tmp_path / "active.joblib", {'name': 'active'}))
+        add_model(db_session, dump(tmp_path / "retired.joblib", {'name': 'retired'}), is_active=False)
+
+        summary = cache.preload(db_session, events=['5k', '10k'])
+
+        assert summary == {'active_models': 1, 'event_models': 1, 'ensemble_models': 1, 'artifacts_loaded': 4}
+        assert cache.load_event_model('5k') == ({'event': '5k'}, {'scaler': '5k'})
+        assert cache.loads == 4
@@ -0,0 +1,184 @@
+"""
+自己ベスト管理サービス（personal_best_service）のテスト
+
+レース結果からの再計算がレース結果由来の行（source="race"）だけを作成・更新・削除し、
+手入力の自己ベストを変更・削除しないこと、統計が自己ベストの集計と一致することを確認する。
+"""
+from datetime import date
+
+import pytest
+
+from app.models.personal_best import PersonalBest, SOURCE_MANUAL, SOURCE_RACE
+from app.models.race import RaceResult
+from app.services.personal_best_service import (
+    RACE_RESULT_DISTANCE,
+    get_personal_best_stats,
+    recompute_user_personal_bests
+)
+
+
+def make_race(user_id, distance_meters, time_seconds, race_date, race_type="road"):
+    """レース結果"""
+    return RaceResult(
+        user_id=user_id,
+        race_date=race_date,
+        race_name=f"{distance_meters}m {race_date}",
+        race_type=race_type,
+        distance_meters=distance_meters,
+        time_seconds=time_seconds,
+        pace_seconds=time_seconds / distance_meters * 1000
+    )
+
+
+def make_manual_pb(user_id, distance_meters, time_seconds, achieved_date, race_type="road"):
+    """手入力のカスタム距離の自己ベスト"""
+    return PersonalBest(
+        user_id=user_id,
+        race_type=race_type,
+        distance=RACE_RESULT_DISTANCE,
+        custom_distance_m=distance_meters,
+        time_seconds=time_seconds,
+        achieved_date=achieved_date,
+        race_name="手入力",
+        source=SOURCE_MANUAL
+    )
+
+
+def personal_bests(db_session, user_id):
+    """(race_type, custom_distance_m) ごとの自己ベスト"""
+    db_session.expire_all()
+    rows = db_session.query(PersonalBest).filter(PersonalBest.user_id == user_id).all()
+    return {(pb.race_type, pb.custom_distance_m, pb.source): pb for pb in rows}
+
+
+class TestRecomputePersonalBests:
+    """レース結果からの自己ベスト再計算"""
+
+    def test_fastest_race_becomes_personal_best(self, db_session, test_user):
+        db_session.add_all([
+            make_race(test_user.id, 5000, 1200.4, date(2026, 1, 10)),
+            make_race(test_user.id, 5000, 1150.6, date(2026, 3, 1)),
+            make_race(test_user.id, 10000, 2500.0, date(2026, 2, 1))
+        ])
+        db_session.commit()
+
+        counts = recompute_user_personal_bests(db_session, test_user.id)
+
+        assert counts == {"inserted": 2, "updated": 0, "deleted": 0}
+        pbs = personal_bests(db_session, test_user.id)
+        assert pbs[("road", 5000, SOURCE_RACE)].time_seconds == 1151
+        assert pbs[("road", 5000, SOURCE_RACE)].achieved_date == date(2026, 3, 1)
+        assert pbs[("road", 10000, SOURCE_RACE)].time_seconds == 2500
+
+        # 変更がなければ書き込まない
+        assert recompute_user_personal_bests(db_session, test_user.id) == {"inserted": 0, "updated": 0, "deleted": 0}
+
+    def test_deleted_race_falls_back_to_next_fastest(self, db_session, test_user):
+        fastest = make_race(test_user.id, 5000, 1150.0, date(2026, 3, 1))
+        only_10k = make_race(test_user.id, 10000, 2500.0, date(2026, 2, 1))
+        db_session.add_all([make_race(test_user.id, 5000, 1200.0, date(2026, 1, 10)), fastest, only_10k])
+        db_session.commit()
+        recompute_user_personal_bests(db_session, test_user.id)
+
+        db_session.delete(fastest)
+        db_session.delete(only_10k)
+        db_session.commit()
+        counts = recompute_user_personal_bests(db_session, test_user.id)
+
+        assert counts == {"inserted": 0, "updated": 1, "deleted": 1}
+        pbs = personal_bests(db_session, test_user.id)
+        assert list(pbs) == [("road", 5000, SOURCE_RACE)]
+        assert pbs[("road", 5000, SOURCE_RACE)].time_seconds == 1200
+
+    def test_manual_custom_personal_best_is_kept(self, db_session, test_user):
+        # レース結果のない手入力のカスタム距離の自己ベストは削除しない
+        db_session.add(make_manual_pb(test_user.id, 3000, 600, date(2025, 5, 1)))
+        db_session.commit()
+
+        counts = recompute_user_personal_bests(db_session, test_user.id)
+
+        assert counts == {"inserted": 0, "updated": 0, "deleted": 0}
+        pbs = personal_bests(db_session, test_user.id)
+        assert pbs[("road", 3000, SOURCE_MANUAL)].time_seconds == 600
+
+    @pytest.mark.parametrize("manual_time", [1100, 1200])
+    def test_faster_manual_personal_best_is_not_overwritten(self, db_session, test_user, manual_time):
+        db_session.add_all([
+            make_manual_pb(test_user.id, 5000, manual_time, date(2025, 5, 1)),
+            make_race(test_user.id, 5000, 1200.0, date(2026, 1, 10))
+        ])
+        db_session.commit()
+
+        counts = recompute_user_personal_bests(db_session, test_user.id)
+
+        assert counts == {"inserted": 0, "updated": 0, "deleted": 0}
+        pbs = personal_bests(db_session, test_user.id)
+        assert list(pbs) == [("road", 5000, SOURCE_MANUAL)]
+        assert pbs[("road", 5000, SOURCE_MANUAL)].time_seconds == manual_time
+        assert pbs[("road", 5000, SOURCE_MANUAL)].race_name == "手入力"
+
+    def test_faster_race_is_added_next_to_slower_manual_personal_best(self, db_session, test_user):
+        db_session.add_all([
+            make_manual_pb(test_user.id, 5000, 1300, date(2025, 5, 1)),
+            make_race(test_user.id, 5000, 1200.0, date(2026, 1, 10))
+        ])
+        db_session.commit()
+
+        counts = recompute_user_personal_bests(db_session, test_user.id)
+
+        assert counts == {"inserted": 1, "updated": 0, "deleted": 0}
+        pbs = personal_bests(db_session, test_user.id)
+        assert pbs[("road", 5000, SOURCE_MANUAL)].time_seconds == 1300
+        assert pbs[("road", 5000, SOURCE_RACE)].time_seconds == 1200
+        assert get_personal_best_stats(db_session, test_user.id)["race_type_stats"]["road"]["best_time"] == 1200
+
+        # 手入力の自己ベストをレースより速く直すとレース結果由来の行は削除する
+        pbs[("road", 5000, SOURCE_MANUAL)].time_seconds = 1150
+        db_session.commit()
+
+        assert recompute_user_personal_bests(db_session, test_user.id) == {"inserted": 0, "updated": 0, "deleted": 1}
+        assert list(personal_bests(db_session, test_user.id)) == [("road", 5000, SOURCE_MANUAL)]
+
+    def test_race_row_edited_by_hand_is_kept(self, db_session, test_user):
+        db_session.add(make_race(test_user.id, 5000, 1200.0, date(2026, 1, 10)))
+        db_session.commit()
+        recompute_user_personal_bests(db_session, test_user.id)
+
+        # 手入力で編集した行は手入力の自己ベストとして扱う
+        pb = personal_bests(db_session, test_user.id)[("road", 5000, SOURCE_RACE)]
+        pb.time_seconds = 1180
+        pb.source = SOURCE_MANUAL
+        db_session.commit()
+
+        assert recompute_user_personal_bests(db_session, test_user.id) == {"inserted": 0, "updated": 0, "deleted": 0}
+        pbs = personal_bests(db_session, test_user.id)
+        assert list(pbs) == [("road", 5000, SOURCE_MANUAL)]
+        assert pbs[("road", 5000, SOURCE_MANUAL)].time_seconds == 1180
+
+
+class TestPersonalBestStats:
+    """自己ベストの統計"""
+
+    def test_stats_match_personal_bests(self, db_session, test_user):
+        db_session.add_all([
+            make_race(test_user.id, 5000, 1150.0, date(2026, 3, 1)),
+            make_race(test_user.id, 10000, 2500.0, date(2026, 2, 1)),
+            make_race(test_user.id, 3000, 540.0, date(2025, 8, 1), race_type="track")
+        ])
+        db_session.add(make_manual_pb(test_user.id, 1500, 250, date(2026, 4, 1), race_type="track"))
+        db_session.commit()
+        recompute_user_personal_bests(db_session, test_user.id)
+
+        stats = get_personal_best_stats(db_session, test_user.id)
+
+        assert stats["total_count"] == 4
+        assert stats["race_type_stats"]["road"] == {
+            "count": 2, "best_time": 1150, "best_distance": RACE_RESULT_DISTANCE, "recent_date": date(2026, 3, 1)
+        }
+        assert stats["race_type_stats"]["track"]["count"] == 2
+        assert stats["race_type_stats"]["track"]["best_time"] == 250
+        assert stats["latest_achievement"]["time_seconds"] == 250
+        assert stats["latest_achievement"]["achieved_date"] == date(2026, 4, 1)
+
+    def test_no_personal_bests(self, db_session, test_user):
+        assert get_personal_best_stats(db_session, test_user.id) is None
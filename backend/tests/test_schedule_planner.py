@@ -0,0 +1,116 @@
+"""
+疲労状態を考慮した練習スケジュール探索（app.ml.health.schedule_planner）のテスト
+
+ビームサーチが全探索と同じ上位スケジュールを返すこと、疲労バケットごとの上位 k 件の枝刈り、
+レイテンシ予算を使い切った後の貪欲法による補完、先読み日数の範囲チェックを確認する。
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from app.ml.health.schedule_planner import (
+    WORKOUT_OPTIONS,
+    WorkoutSchedulePlanner,
+    max_allowed_option,
+    training_readiness
+)
+from app.ml.health.training_condition_correlator import TrainingConditionCorrelator
+
+SEARCH_ARGS = dict(
+    initial_fatigue=4.0,
+    energy_by_day=np.array([7.0, 7.5, 8.0, 8.5, 9.0]),
+    sleep_quality=8.0,
+    stress_level=3.0,
+    fatigue_gains=np.array([0.0, 0.8, 1.6, 2.6]),
+    loads=np.array([0.0, 2.4, 3.6, 3.84]),
+    daily_recovery=0.9
+)
+
+
+def simulate(planner, options, args=SEARCH_ARGS):
+    """選択肢の並びのスコア（許されない選択肢を含む場合は None）"""
+    fatigue = args['initial_fatigue']
+    score = 0.0
+    for day, option in enumerate(options):
+        energy = args['energy_by_day'][day]
+        readiness = training_readiness(np.array([fatigue]), energy, args['sleep_quality'], args['stress_level'])
+        if option > max_allowed_option(readiness, np.array([fatigue]), energy)[0]:
+            return None
+        next_fatigue = min(max(fatigue + args['fatigue_gains'][option] - args['daily_recovery'], 1), 10)
+        score += (
+            readiness[0] / 10 * args['loads'][option]
+            - planner.fatigue_deviation_weight * (next_fatigue - planner.fatigue_target) ** 2
+        )
+        fatigue = next_fatigue
+    return score - planner.fatigue_carryover_weight * max(fatigue - planner.fatigue_target, 0.0)
+
+
+def greedy_options(args=SEARCH_ARGS):
+    """各日に許される最大強度を選ぶスケジュール"""
+    fatigue = args['initial_fatigue']
+    options = []
+    for energy in args['energy_by_day']:
+        readiness = training_readiness(np.array([fatigue]), energy, args['sleep_quality'], args['stress_level'])
+        option = int(max_allowed_option(readiness, np.array([fatigue]), energy)[0])
+        options.append(option)
+        fatigue = min(max(fatigue + args['fatigue_gains'][option] - args['daily_recovery'], 1), 10)
+    return options
+
+
+class TestWorkoutSchedulePlanner:
+    """ビームサーチによるスケジュール探索"""
+
+    def test_matches_exhaustive_search(self):
+        # バケットを十分に細かくすると同じ疲労の部分スケジュールだけが枝刈りされ、全探索と一致する
+        planner = WorkoutSchedulePlanner(beam_width=10_000, fatigue_bucket=1e-9)
+        result = planner.search(**SEARCH_ARGS, top_k=3, latency_budget_ms=float('inf'))
+
+        horizon = len(SEARCH_ARGS['energy_by_day'])
+        scores = [simulate(planner, options) for options in itertools.product(range(len(WORKOUT_OPTIONS)), repeat=horizon)]
+        expected = sorted((score for score in scores if score is not None), reverse=True)[:3]
+
+        assert result.within_budget
+        assert [candidate.score for candidate in result.candidates] == pytest.approx(expected)
+        for candidate in result.candidates:
+            assert simulate(planner, candidate.options) == pytest.approx(candidate.score)
+
+    def test_zero_budget_gives_greedy_schedule(self):
+        result = WorkoutSchedulePlanner().search(**SEARCH_ARGS, top_k=3, latency_budget_ms=0)
+
+        assert not result.within_budget
+        assert len(result.candidates) == 1
+        assert result.candidates[0].options.tolist() == greedy_options()
+
+    def test_select_keeps_top_k_per_bucket_and_beam_width(self):
+        fatigue = np.array([1.0, 1.02, 1.04, 2.0, 2.01])
+        scores = np.array([5.0, 9.0, 7.0, 1.0, 3.0])
+
+        kept = WorkoutSchedulePlanner(fatigue_bucket=0.1)._select(fatigue, scores, per_bucket=2)
+        assert sorted(kept.tolist()) == [1, 2, 3, 4]
+
+        kept = WorkoutSchedulePlanner(beam_width=3, fatigue_bucket=0.1)._select(fatigue, scores, per_bucket=2)
+        assert sorted(kept.tolist()) == [1, 2, 4]
+
+
+class TestSuggestWorkoutSchedules:
+    """TrainingConditionCorrelator.suggest_workout_schedules"""
+
+    condition = {'fatigue_level': 4, 'energy_level': 7, 'sleep_quality_score': 8, 'stress_level': 3}
+    profile = {'recovery_ability': 0.6, 'weekly_distance': 40, 'training_frequency': 5, 'avg_pace': 300}
+
+    @pytest.mark.parametrize("days", [0, 29])
+    def test_days_out_of_range(self, days):
+        with pytest.raises(ValueError):
+            TrainingConditionCorrelator().suggest_workout_schedules(self.condition, self.profile, days_ahead=days)
+
+    def test_schedules_are_sorted_by_score(self):
+        schedules = TrainingConditionCorrelator().suggest_workout_schedules(
+            self.condition, self.profile, days_ahead=7, top_k=3, latency_budget_ms=float('inf')
+        )
+
+        assert len(schedules) == 3
+        assert [schedule['score'] for schedule in schedules] == sorted(
+            (schedule['score'] for schedule in schedules), reverse=True
+        )
+        assert all(len(schedule['schedule']) == 7 for schedule in schedules)
@@ -0,0 +1,141 @@
+"""
+バックグラウンドタスクの結果の保存とページング（app.services.task_results）のテスト
+
+TaskResultWriter のバッチ書き込みと集計、seq のキーセットによるページング（cursor / next_cursor・
+最後のページ・件数の上限）、保存されていない・保持期限を過ぎたタスクIDの扱い、
+GET /api/tasks/results/{task_id} を確認する。
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import task_management
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.models.task_result import TaskResult, TaskResultItem
+from app.services.task_results import TaskResultWriter, get_task_result, read_result_page
+
+
+def write_results(db_session, task_id, count, batch_size=4):
+    """count 件の結果を書き込んで完了にする"""
+    writer = TaskResultWriter(db_session, task_id, "batch_prediction_task", batch_size=batch_size).start()
+    for i in range(count):
+        writer.add(f"user-{i}", i % 3 != 0, {'predicted_time': np.float64(1200 + i)})
+    return writer.finish({'total': count})
+
+
+def read_all_pages(db_session, task_id, limit):
+    """next_cursor をたどって全ページを取得"""
+    pages = []
+    cursor = -1
+    while cursor is not None:
+        page = read_result_page(db_session, task_id, cursor=cursor, limit=limit)
+        pages.append(page)
+        cursor = page['next_cursor']
+    return pages
+
+
+class TestTaskResultWriter:
+    """結果の書き込み"""
+
+    def test_writes_items_in_batches(self, db_session):
+        result = write_results(db_session, "task-1", 10, batch_size=4)
+
+        assert result['total'] == 10
+        assert result['result_ref'] == {
+            'store': 'database', 'task_id': 'task-1', 'item_count': 10, 'url': '/api/tasks/results/task-1'
+        }
+        header = get_task_result(db_session, "task-1")
+        assert (header.status, header.item_count, header.summary) == ("completed", 10, {'total': 10})
+        assert [item.seq for item in db_session.query(TaskResultItem).order_by(TaskResultItem.seq)] == list(range(10))
+
+    def test_restart_replaces_previous_items(self, db_session):
+        write_results(db_session, "task-1", 10)
+        write_results(db_session, "task-1", 3)
+
+        assert db_session.query(TaskResultItem).count() == 3
+        assert get_task_result(db_session, "task-1").item_count == 3
+
+
+class TestReadResultPage:
+    """seq のキーセットによるページング"""
+
+    def test_cursor_sequence_covers_all_items(self, db_session):
+        write_results(db_session, "task-1", 10)
+
+        pages = read_all_pages(db_session, "task-1", limit=4)
+
+        assert [[item['seq'] for item in page['items']] for page in pages] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+        assert [page['next_cursor'] for page in pages] == [3, 7, None]
+        assert pages[0]['items'][1] == {
+            'seq': 1, 'user_id': 'user-1', 'success': True, 'payload': {'predicted_time': 1201.0}
+        }
+
+    def test_exact_last_page_has_no_next_cursor(self, db_session):
+        write_results(db_session, "task-1", 8)
+
+        pages = read_all_pages(db_session, "task-1", limit=4)
+
+        assert [page['next_cursor'] for page in pages] == [3, None]
+        assert len(pages[-1]['items']) == 4
+
+    def test_limit_is_capped(self, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "task_result_max_page_size", 5)
+        monkeypatch.setattr(settings, "task_result_page_size", 3)
+        write_results(db_session, "task-1", 10)
+
+        assert read_result_page(db_session, "task-1", limit=100)['limit'] == 5
+        assert len(read_result_page(db_session, "task-1", limit=100)['items']) == 5
+        assert read_result_page(db_session, "task-1")['limit'] == 3
+        assert read_result_page(db_session, "task-1", limit=0)['limit'] == 3
+
+    def test_unknown_task_id(self, db_session):
+        assert get_task_result(db_session, "no-such-task") is None
+        assert read_result_page(db_session, "no-such-task") == {
+            'items': [], 'limit': settings.task_result_page_size, 'next_cursor': None
+        }
+
+    def test_expired_task_result_is_not_returned(self, db_session):
+        write_results(db_session, "task-1", 3)
+        db_session.get(TaskResult, "task-1").expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db_session.commit()
+
+        assert get_task_result(db_session, "task-1") is None
+
+
+class TestTaskResultsRoute:
+    """GET /api/tasks/results/{task_id}"""
+
+    @pytest.fixture
+    def client(self, db_session, monkeypatch):
+        monkeypatch.setattr(task_management, "get_task_status", lambda task_id: {
+            "task_id": task_id, "status": "PENDING", "result": None, "error": None, "traceback": None
+        })
+        app.dependency_overrides[get_current_user] = lambda: "test-user-id"
+        app.dependency_overrides[get_db] = lambda: db_session
+        try:
+            yield TestClient(app)
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_pages_stored_results(self, client, db_session):
+        write_results(db_session, "task-1", 5)
+
+        first = client.get("/api/tasks/results/task-1", params={"limit": 3}).json()
+        second = client.get("/api/tasks/results/task-1", params={"limit": 3, "cursor": first['next_cursor']}).json()
+
+        assert (first['status'], first['item_count'], first['result']) == ("completed", 5, {'total': 5})
+        assert [item['seq'] for item in first['items']] == [0, 1, 2]
+        assert [item['seq'] for item in second['items']] == [3, 4]
+        assert second['next_cursor'] is None
+
+    def test_unknown_task_falls_back_to_task_status(self, client):
+        response = client.get("/api/tasks/results/no-such-task")
+
+        assert response.status_code == 200
+        assert response.json()['status'] == "pending"
+        assert 'items' not in response.json()
@@ -0,0 +1,154 @@
+"""
+トレーニングデータ準備の変換処理と列指向ファイル（scripts/prepare_ml_training_data.py・
+app.ml.training_data_store）のテスト
+
+重複を除いた値のベクトル化した変換が従来の値ごとの変換と同じ結果になること、
+.npz の保存・読み込みで欠損を含む文字列列も元に戻ること、CSV の方が新しい種目は CSV から読むことを確認する。
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.training_data_store import columnar_path, load_columnar, load_processed_frames, save_columnar
+from scripts.prepare_ml_training_data import MLTrainingDataPreparer
+
+
+def legacy_convert_time(time_str):
+    """従来の時間文字列の変換（Series.apply で値ごとに呼ぶ）"""
+    if isinstance(time_str, str) and ':' in time_str:
+        parts = time_str.split(':')
+        if len(parts) == 3:
+            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+        elif len(parts) == 2:
+            return int(parts[0]) * 60 + int(parts[1])
+    return time_str
+
+
+def legacy_convert_age(age_str):
+    """従来の年齢の変換"""
+    if isinstance(age_str, str) and '-' in age_str:
+        parts = age_str.split('-')
+        if len(parts) == 2:
+            return (int(parts[0]) + int(parts[1])) / 2
+    elif isinstance(age_str, (int, float)):
+        return float(age_str)
+    return 30.0
+
+
+def legacy_convert_range(value):
+    """従来の範囲形式の変換"""
+    if isinstance(value, str) and '-' in value:
+        try:
+            parts = value.split('-')
+            if len(parts) == 2:
+                return (float(parts[0]) + float(parts[1])) / 2
+        except ValueError:
+            pass
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+@pytest.fixture(scope="module")
+def preparer():
+    return MLTrainingDataPreparer()
+
+
+class TestVectorizedConverters:
+    """従来の値ごとの変換との一致"""
+
+    @pytest.mark.parametrize("values", [
+        ['2:45:10', '45:30', '1:02:03', 'DNF', '45:30', np.nan, '3:05:00'],
+        ['DNF', 'DNS', np.nan],
+        ['45:30', '1:02:03'],
+    ])
+    def test_time_to_seconds(self, preparer, values):
+        series = pd.Series(values, dtype=object)
+
+        expected = series.apply(legacy_convert_time).infer_objects()
+        pd.testing.assert_series_equal(preparer._convert_time_to_seconds(series), expected, check_dtype=False)
+
+    @pytest.mark.parametrize("values", [
+        ['20-29', '30-39', '40-49', '25', 'unknown', 31, 42.0, np.nan, '20-29'],
+        ['20-29', '30-39'],
+    ])
+    def test_age_to_numeric(self, preparer, values):
+        series = pd.Series(values, dtype=object)
+
+        expected = series.apply(legacy_convert_age).infer_objects()
+        pd.testing.assert_series_equal(preparer._convert_age_to_numeric(series), expected, check_dtype=False)
+
+    def test_numeric_ages_are_kept(self, preparer):
+        series = pd.Series([25, 31, 42])
+
+        assert preparer._convert_age_to_numeric(series).tolist() == [25.0, 31.0, 42.0]
+
+    @pytest.mark.parametrize("values", [
+        ['170-210', '-5', '1e-3', '12', 'n/a', '1-2-3', np.nan, '170-210', '40.5-50'],
+        ['n/a', 'unknown'],
+    ])
+    def test_range_to_numeric(self, preparer, values):
+        series = pd.Series(values, dtype=object)
+
+        expected = series.apply(legacy_convert_range).infer_objects()
+        pd.testing.assert_series_equal(preparer._convert_range_to_numeric(series), expected, check_dtype=False)
+
+
+class TestColumnarStore:
+    """列指向ファイル（.npz）の保存と読み込み"""
+
+    @pytest.fixture
+    def frame(self):
+        return pd.DataFrame({
+            'age': [25, 31, 42],
+            'target_time': [10800.5, np.nan, 9500.0],
+            'is_female': [True, False, True],
+            'gender': ['F', None, 'M'],
+            'notes': [np.nan, 'ケガ明け', ''],
+        })
+
+    def test_round_trip_keeps_missing_strings(self, frame, tmp_path):
+        path = save_columnar(frame, tmp_path / "marathon_processed.npz")
+
+        loaded = load_columnar(path)
+
+        pd.testing.assert_frame_equal(loaded, frame.fillna({'gender': np.nan}))
+        assert loaded['gender'].isna().tolist() == [False, True, False]
+        assert loaded['notes'].tolist()[1:] == ['ケガ明け', '']
+        assert list(tmp_path.glob("*.tmp")) == []
+
+    def test_matches_csv(self, frame, tmp_path):
+        # CSV では空文字列も欠損として読まれるため、空文字列を含む列は比べない
+        frame = frame.drop(columns=['notes'])
+        csv_file = tmp_path / "marathon_processed.csv"
+        frame.to_csv(csv_file, index=False)
+
+        loaded = load_columnar(save_columnar(frame, columnar_path(tmp_path, "marathon")))
+
+        pd.testing.assert_frame_equal(pd.read_csv(csv_file), loaded, check_exact=False)
+
+    def test_newer_file_is_loaded(self, frame, tmp_path):
+        csv_file = tmp_path / "marathon_processed.csv"
+        npz_file = columnar_path(tmp_path, "marathon")
+        frame.to_csv(csv_file, index=False)
+        save_columnar(frame.iloc[:1], npz_file)
+
+        os.utime(csv_file, (1_000_000, 1_000_000))
+        os.utime(npz_file, (2_000_000, 2_000_000))
+        assert len(load_processed_frames(tmp_path)['marathon']) == 1
+
+        # 学習データを CSV だけ作り直した場合は古い .npz を使わない
+        os.utime(csv_file, (3_000_000, 3_000_000))
+        assert len(load_processed_frames(tmp_path)['marathon']) == 3
+
+    def test_events_with_only_one_format(self, frame, tmp_path):
+        frame.to_csv(tmp_path / "5000m_processed.csv", index=False)
+        save_columnar(frame.iloc[:2], columnar_path(tmp_path, "10000m"))
+
+        frames = load_processed_frames(tmp_path)
+
+        assert sorted(frames) == ['10000m', '5000m']
+        assert (len(frames['5000m']), len(frames['10000m'])) == (3, 2)
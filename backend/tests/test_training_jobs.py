@@ -0,0 +1,111 @@
+"""
+モデル学習ジョブ（TrainingJobService）のテスト
+
+ジョブの作成後に失敗したジョブが pending のまま残らないこと、ワーカーの停止で実行中のまま
+残ったジョブがタイムアウトで失敗になり、同じ条件の学習を再投入できることを確認する。
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.ai import ModelTrainingJob
+from app.services.training_jobs import TrainingJobService, training_spec_key
+from app.tasks.ml_tasks import run_training_job_task
+
+
+class InMemoryLock:
+    """TrainingLock と同じインターフェースのプロセス内ロック"""
+
+    def __init__(self, fail_acquire: bool = False):
+        self.owners = {}
+        self.fail_acquire = fail_acquire
+
+    def acquire(self, spec_key, job_id, ttl):
+        if self.fail_acquire:
+            raise ConnectionError("redis unavailable")
+        if spec_key in self.owners:
+            return False
+        self.owners[spec_key] = job_id
+        return True
+
+    def owner(self, spec_key):
+        return self.owners.get(spec_key)
+
+    def release(self, spec_key, job_id):
+        if self.owners.get(spec_key) != job_id:
+            return False
+        del self.owners[spec_key]
+        return True
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """ml_queue に投入したジョブID（ブローカーには送らない）"""
+    job_ids = []
+    monkeypatch.setattr(run_training_job_task, "apply_async", lambda args, task_id: job_ids.append(task_id))
+    return job_ids
+
+
+def statuses(db_session):
+    return sorted(status for (status,) in db_session.query(ModelTrainingJob.status))
+
+
+class TestTrainingJobSubmit:
+    """学習ジョブの投入"""
+
+    def test_duplicate_submit_returns_running_job(self, db_session, queued):
+        service = TrainingJobService(db_session, lock=InMemoryLock())
+        job, created = service.submit("event", {"target_event": "5k"})
+        again, created_again = service.submit("event", {"target_event": "5k"})
+
+        assert created and not created_again
+        assert again.job_id == job.job_id
+        assert queued == [job.job_id]
+        assert statuses(db_session) == ["pending"]
+
+    def test_lock_error_marks_job_failed(self, db_session, queued):
+        service = TrainingJobService(db_session, lock=InMemoryLock(fail_acquire=True))
+
+        with pytest.raises(RuntimeError):
+            service.submit("event", {"target_event": "5k"})
+
+        assert statuses(db_session) == ["failed"]
+        assert queued == []
+
+    def test_stale_running_job_is_failed_and_replaced(self, db_session, queued):
+        lock = InMemoryLock()
+        spec_key = training_spec_key("event", {"target_event": "5k"})
+        stale = ModelTrainingJob(
+            job_id="crashed-worker-job", status="running", spec_key=spec_key,
+            started_at=datetime.now() - timedelta(seconds=settings.training_job_timeout + 60)
+        )
+        db_session.add(stale)
+        db_session.commit()
+        lock.owners[spec_key] = stale.job_id
+
+        job, created = TrainingJobService(db_session, lock=lock).submit("event", {"target_event": "5k"})
+
+        assert created and job.job_id != "crashed-worker-job"
+        assert lock.owner(spec_key) == job.job_id
+        db_session.refresh(stale)
+        assert stale.status == "failed"
+        assert stale.completed_at is not None
+
+
+class TestFailStaleJobs:
+    """タイムアウトしたジョブの失敗処理"""
+
+    def test_only_jobs_past_timeout_are_failed(self, db_session):
+        old = datetime.now() - timedelta(seconds=settings.training_job_timeout + 60)
+        db_session.add_all([
+            ModelTrainingJob(job_id="stale-running", status="running", spec_key="a", started_at=old),
+            ModelTrainingJob(job_id="fresh-running", status="running", spec_key="b", started_at=datetime.now()),
+            ModelTrainingJob(job_id="old-completed", status="completed", spec_key="c", started_at=old),
+        ])
+        db_session.commit()
+
+        assert TrainingJobService(db_session, lock=InMemoryLock()).fail_stale_jobs() == 1
+
+        by_id = dict(db_session.query(ModelTrainingJob.job_id, ModelTrainingJob.status))
+        assert by_id == {"stale-running": "failed", "fresh-running": "running", "old-completed": "completed"}
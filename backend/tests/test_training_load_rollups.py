@@ -0,0 +1,106 @@
+"""
+練習負荷ロールアップ（workout_daily_rollups）のテスト
+
+Workout の追加・更新・削除で after_flush フックが更新したロールアップが、
+rebuild_workout_daily_rollups による全件再構築の結果と一致することを確認する。
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.training_load import WorkoutDailyRollup, rebuild_workout_daily_rollups
+from app.models.workout import Workout, WorkoutType
+
+
+def rollup_snapshot(session):
+    """(user_id, date) → ロールアップの値（id・updated_at を除き、浮動小数点は丸める）"""
+    table = WorkoutDailyRollup.__table__
+    snapshot = {}
+    for row in session.execute(select(table)):
+        values = {
+            key: round(value, 6) if isinstance(value, float) else value
+            for key, value in row._mapping.items() if key not in ("id", "updated_at")
+        }
+        snapshot[(row.user_id, row.date)] = values
+    return snapshot
+
+
+def assert_matches_rebuild(session):
+    """フックで更新した状態と全件再構築の結果が一致すること"""
+    incremental = rollup_snapshot(session)
+    rebuild_workout_daily_rollups(session.connection())
+    assert rollup_snapshot(session) == incremental
+    session.rollback()
+
+
+@pytest.fixture
+def workout_type(db_session, test_user):
+    workout_type = WorkoutType(name="ジョグ", category="easy", created_by=test_user.id)
+    db_session.add(workout_type)
+    db_session.commit()
+    return workout_type
+
+
+def make_workout(rng, user_id, workout_type_id, day):
+    """ランダムな値のワークアウト（距離・タイム・強度の欠損を含む）"""
+    distance = rng.choice([None, 3000, 5000, 8000, 12000])
+    return Workout(
+        user_id=user_id,
+        workout_type_id=workout_type_id,
+        date=day,
+        actual_distance_meters=distance,
+        target_distance_meters=rng.choice([None, 6000]),
+        actual_times_seconds=rng.choice([None, [distance * 0.3 if distance else 900], [300, 310, None]]),
+        intensity=rng.choice([None, 2, 5, 7, 10]),
+        extended_data=rng.choice([None, {"avg_heart_rate": 150, "calories": 420, "total_ascent": 35}])
+    )
+
+
+class TestWorkoutRollupHooks:
+    """after_flush フックによるロールアップの更新"""
+
+    def test_insert_update_delete_matches_rebuild(self, db_session, test_user, workout_type):
+        rng = random.Random(0)
+        start = date(2024, 1, 1)
+        workouts = []
+
+        for _ in range(60):
+            workout = make_workout(rng, test_user.id, workout_type.id, start + timedelta(days=rng.randrange(20)))
+            db_session.add(workout)
+            workouts.append(workout)
+        db_session.commit()
+        assert_matches_rebuild(db_session)
+
+        # 値の更新と日付の移動（移動元の日も再集計される）
+        for workout in rng.sample(workouts, 20):
+            workout.actual_distance_meters = rng.choice([None, 4000, 10000])
+            workout.intensity = rng.choice([1, 6, 9])
+        for workout in rng.sample(workouts, 10):
+            workout.date = start + timedelta(days=rng.randrange(20, 30))
+        db_session.commit()
+        assert_matches_rebuild(db_session)
+
+        # 削除（その日のワークアウトがなくなった行は消える）
+        for workout in rng.sample(workouts, 25):
+            db_session.delete(workout)
+        db_session.commit()
+        assert_matches_rebuild(db_session)
+
+    def test_day_rollup_values(self, db_session, test_user, workout_type):
+        day = date(2024, 3, 1)
+        db_session.add_all([
+            Workout(user_id=test_user.id, workout_type_id=workout_type.id, date=day,
+                    actual_distance_meters=5000, actual_times_seconds=[1500], intensity=3),
+            Workout(user_id=test_user.id, workout_type_id=workout_type.id, date=day,
+                    actual_distance_meters=10000, actual_times_seconds=[2700], intensity=9),
+        ])
+        db_session.commit()
+
+        rollup = db_session.execute(select(WorkoutDailyRollup)).scalar_one()
+        assert rollup.workout_count == 2
+        assert rollup.distance_sum == 15000
+        assert rollup.distance_max == 10000
+        assert rollup.pace_sum == pytest.approx(300 + 270)
+        assert (rollup.easy_count, rollup.race_intensity_count) == (1, 1)
@@ -0,0 +1,199 @@
+"""
+期分けプランのキャッシュと一括生成（app.ml.coaching.workout_planner）のテスト
+
+PeriodizedPlanCache の LRU 削除・有効期限・丸めた入力のキー、一括生成の結果が1件ずつの生成と
+週ごとの generate_weekly_plan による生成と一致すること、/api/ai/generate-plan/batch の件数上限を確認する。
+"""
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.ml.coaching.workout_planner import (
+    DISTANCE_BUCKET_KM,
+    PACE_BUCKET_SECONDS,
+    PeriodizedPlanCache,
+    TrainingPlan,
+    WeeklyPlan,
+    WorkoutPlanner,
+    periodized_plan_cache
+)
+
+CURRENT_DATE = datetime(2026, 1, 5, 9, 0)
+
+
+def make_request(user_id, weeks, avg_pace=300.0, weekly_distance=40.0, frequency=5.0,
+                 experience_level='intermediate', target_race='half_marathon'):
+    """generate_periodized_plan の引数"""
+    return {
+        'user_id': user_id,
+        'current_fitness': {'avg_pace': avg_pace, 'experience_level': experience_level},
+        'target_race': target_race,
+        'race_date': CURRENT_DATE + timedelta(weeks=weeks, days=2),
+        'current_date': CURRENT_DATE,
+        'current_weekly_distance': weekly_distance,
+        'training_frequency': frequency
+    }
+
+
+def weekly_plan_by_plan(planner, request):
+    """週ごとに generate_weekly_plan を呼ぶ従来の生成（丸めた入力を使う）"""
+    fitness = dict(request['current_fitness'])
+    fitness['avg_pace'] = round(fitness['avg_pace'] / PACE_BUCKET_SECONDS) * PACE_BUCKET_SECONDS
+    weekly_distance = round(request['current_weekly_distance'] / DISTANCE_BUCKET_KM) * DISTANCE_BUCKET_KM
+    frequency = max(1, int(round(request['training_frequency'])))
+    target_race = request['target_race']
+
+    weeks_remaining = planner._calculate_weeks_remaining(request['race_date'], request['current_date'])
+    phase_weeks = planner._calculate_phase_weeks(weeks_remaining)
+    peak_distance = planner._calculate_peak_distance(weekly_distance, target_race, fitness)
+
+    weekly_plans = []
+    distance = weekly_distance
+    for week_num in range(weeks_remaining):
+        phase = planner._get_phase_for_week(week_num, phase_weeks).value
+        if phase == 'base':
+            distance = min(distance * 1.1, peak_distance * 0.7)
+        elif phase == 'build':
+            distance = min(distance * 1.05, peak_distance)
+        elif phase == 'peak':
+            distance = peak_distance
+        else:
+            distance = peak_distance * 0.6
+        weekly_plans.append(planner.generate_weekly_plan(
+            request['user_id'], fitness, target_race, request['race_date'],
+            request['current_date'] + timedelta(weeks=week_num), distance, frequency
+        ))
+
+    return TrainingPlan(
+        user_id=request['user_id'],
+        target_race=target_race,
+        race_date=request['race_date'],
+        current_date=request['current_date'],
+        weeks_remaining=weeks_remaining,
+        weekly_plans=weekly_plans,
+        total_distance=sum(plan.total_distance for plan in weekly_plans),
+        peak_distance=peak_distance
+    )
+
+
+def plan_body(week_number=1):
+    """キャッシュに保存するプラン"""
+    return [WeeklyPlan(week_number=week_number, phase='base', total_distance=30.0, workouts=[], recovery_days=[])], 30.0, 40.0
+
+
+@pytest.fixture(autouse=True)
+def clear_plan_cache():
+    periodized_plan_cache.clear()
+    yield
+    periodized_plan_cache.clear()
+
+
+class TestPeriodizedPlanCache:
+    """期分けプランのLRUキャッシュ"""
+
+    def test_evicts_least_recently_used(self):
+        cache = PeriodizedPlanCache(max_entries=2, ttl_seconds=3600)
+        cache.put('a', plan_body(1))
+        cache.put('b', plan_body(2))
+        assert cache.get('a') is not None
+
+        cache.put('c', plan_body(3))
+
+        assert cache.get('b') is None
+        assert cache.get('a')[0][0].week_number == 1
+        assert cache.get('c')[0][0].week_number == 3
+        assert cache.stats()['entries'] == 2
+
+    def test_expired_entry_is_dropped(self):
+        cache = PeriodizedPlanCache(max_entries=2, ttl_seconds=0)
+        cache.put('a', plan_body())
+
+        assert cache.get('a') is None
+        assert cache.stats()['entries'] == 0
+        assert cache.stats()['misses'] == 1
+
+    def test_returned_plan_is_a_copy(self):
+        cache = PeriodizedPlanCache()
+        cache.put('a', plan_body())
+
+        cache.get('a')[0][0].recovery_days.append('Monday')
+
+        assert cache.get('a')[0][0].recovery_days == []
+
+    def test_key_uses_rounded_pace_and_distance(self):
+        planner = WorkoutPlanner()
+        planner.generate_periodized_plan(**make_request('u1', 12, avg_pace=301.0, weekly_distance=40.2))
+        planner.generate_periodized_plan(**make_request('u2', 12, avg_pace=302.4, weekly_distance=39.8))
+        assert periodized_plan_cache.stats()['hits'] == 1
+
+        planner.generate_periodized_plan(**make_request('u1', 12, avg_pace=310.0, weekly_distance=40.2))
+        planner.generate_periodized_plan(**make_request('u1', 12, avg_pace=301.0, weekly_distance=42.0))
+        stats = periodized_plan_cache.stats()
+        assert (stats['entries'], stats['hits'], stats['misses']) == (3, 1, 3)
+
+
+class TestGeneratePeriodizedPlans:
+    """期分けプランの一括生成"""
+
+    requests = [
+        make_request(user_id, weeks, avg_pace=pace, weekly_distance=distance, frequency=frequency,
+                     experience_level=level, target_race=race)
+        for user_id, pace, distance, frequency, level, race in [
+            ('u1', 287.3, 31.6, 4.4, 'beginner', '10k'),
+            ('u2', 352.0, 58.2, 5.6, 'advanced', 'marathon'),
+            ('u3', 301.9, 22.0, 3.0, 'intermediate', 'half_marathon'),
+        ]
+        for weeks in (4, 9, 17, 26)
+    ]
+
+    def test_batch_matches_single_and_weekly_generation(self):
+        planner = WorkoutPlanner()
+        expected = [asdict(weekly_plan_by_plan(planner, request)) for request in self.requests]
+
+        single = [asdict(planner.generate_periodized_plan(**request)) for request in self.requests]
+        cached = [asdict(planner.generate_periodized_plan(**request)) for request in self.requests]
+        periodized_plan_cache.clear()
+        batch = planner.generate_periodized_plans(self.requests)
+
+        assert single == expected
+        assert cached == expected
+        assert [result.index for result in batch] == list(range(len(self.requests)))
+        assert [asdict(result.plan) for result in batch] == expected
+
+    def test_too_close_race_is_reported_per_request(self):
+        results = WorkoutPlanner().generate_periodized_plans([make_request('u1', 2), make_request('u1', 8)])
+
+        assert results[0].plan is None
+        assert "4週間未満" in results[0].error
+        assert results[1].error is None
+        assert results[1].plan.weeks_remaining >= 4
+
+
+class TestGeneratePlanBatchRoute:
+    """POST /api/ai/generate-plan/batch"""
+
+    @pytest.fixture
+    def client(self):
+        app.dependency_overrides[get_current_user] = lambda: "test-user-id"
+        app.dependency_overrides[get_db] = lambda: None
+        try:
+            yield TestClient(app)
+        finally:
+            app.dependency_overrides.clear()
+
+    def test_rejects_more_than_max_batch_size(self, client):
+        race_dates = [
+            (CURRENT_DATE + timedelta(weeks=8, days=day)).isoformat()
+            for day in range(settings.plan_batch_max_size + 1)
+        ]
+
+        response = client.post("/api/ai/generate-plan/batch", params={"target_race": "10k"}, json=race_dates)
+
+        assert response.status_code == 400
+        assert str(settings.plan_batch_max_size) in response.json()["detail"]
@@ -142,6 +142,8 @@ export interface MetricsTrendResponse {
   energy_level: (number | null)[]
   training_readiness: (number | null)[]
   resting_heart_rate: (number | null)[]
+  resolution?: 'daily' | 'weekly' | 'monthly'
+  method?: 'mean' | 'lttb' | null
 }
 
 export interface HealthInsightsResponse {